@@ -14,6 +14,7 @@ if sys.stderr.encoding != 'utf-8':
     sys.stderr = _io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 import time
+from typing import Optional
 
 import streamlit as st
 
@@ -29,21 +30,31 @@ from config.survey_questions import (
 from config.settings import settings
 from src.utils.mock_data import get_mock_result_by_problem
 from src.utils.csv_logger import save_to_csv
+from src.utils.perf import PerformanceTracker
 from src.ui.state import initialize_session_state, next_page, prev_page
 from src.ui.components import (
     scroll_to_top,
     show_progress_bar,
     load_mari_image,
     get_image_base64,
+    load_resized_image,
     render_question,
 )
 from src.ui.media import fix_image_orientation, convert_image_to_bytes
 from src.ui.styles import inject_base_styles
 from src.services.analysis_service import (
     AnalysisJob,
+    AnalysisRejected,
+    prepare_analysis_backend,
+    prefetch_vision,
     start_analysis_job,
     job_done,
     job_result,
+    job_partial_result,
+    job_queue_position,
+    job_progress,
+    mark_job_delivered,
+    resume_analysis_job,
 )
 from src.ui.result_sections import (
     render_summary_card,
@@ -384,6 +395,26 @@ def page_environment():
     st.markdown('</div>', unsafe_allow_html=True)
 
 
+def prepare_dog_photo_bytes(dog_photo) -> Optional[bytes]:
+    """
+    업로드된 반려견 사진을 분석용 JPEG 바이트로 변환합니다 (업로드별 1회).
+    새 사진이면 Vision 선행 분석을 바로 시작합니다.
+    """
+    if dog_photo is None:
+        return None
+
+    upload_key = getattr(dog_photo, "file_id", None) or f"{getattr(dog_photo, 'name', '')}:{getattr(dog_photo, 'size', '')}"
+    prepared = st.session_state.get("dog_photo_prepared")
+    if prepared and prepared["key"] == upload_key:
+        return prepared["bytes"]
+
+    dog_photo_bytes = convert_image_to_bytes(fix_image_orientation(dog_photo))
+    st.session_state.dog_photo_prepared = {"key": upload_key, "bytes": dog_photo_bytes}
+    if dog_photo_bytes is not None:
+        prefetch_vision(dog_photo_bytes)
+    return dog_photo_bytes
+
+
 # ===== 페이지 5: 사진 및 참고자료 =====
 def page_photos():
     scroll_to_top()
@@ -416,6 +447,8 @@ def page_photos():
             if response is not None:
                 if q["id"] == "dog_photo":
                     st.session_state.dog_photo = response
+                    # 사용자가 나머지 항목을 작성하는 동안 Vision 분석을 미리 진행
+                    prepare_dog_photo_bytes(response)
                 elif q["id"] == "behavior_media":
                     st.session_state.behavior_media = response
 
@@ -439,6 +472,7 @@ def page_photos():
 
 # ===== 페이지 6: AI 분석 중 =====
 def page_analyzing():
+    page_started = time.thread_time()
     scroll_to_top()
 
     if st.session_state.analysis_result is not None:
@@ -464,29 +498,15 @@ def page_analyzing():
     if mari_image:
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            st.image(mari_image, width=300)
-
-    dog_name = st.session_state.responses.get("dog_name", "강아지")
-    dog_breed = st.session_state.responses.get("dog_breed", "우리 친구")
-    dynamic_messages = [
-        f"🐶 {dog_name}의 행동을 꼼꼼히 분석하고 있어요!",
-        "🔍 마리가 열심히 생각 중이에요...",
-        "💭 전문가 의견을 모으고 있어요!",
-        f"{dog_name}의 작은 표정 변화도 소중하죠. {dog_breed} 친구의 마음을 천천히 열어볼게요.",
-        "⏳ 조금만 기다려주세요, 거의 다 됐어요!",
-    ]
-    message_placeholder = st.empty()
-    st.markdown("### 분석 진행 중...")
-    progress_bar = st.progress(0.0)
+            st.image(load_resized_image(mari_image, 300), width=300)
 
-    if "analysis_inputs" not in st.session_state:
+    if "analysis_job" not in st.session_state:
         dog_photo = st.session_state.get("dog_photo")
         if dog_photo is None:
             st.error("강아지 사진이 업로드되지 않았습니다.")
             st.markdown('</div>', unsafe_allow_html=True)
             return
-        fixed_dog_photo = fix_image_orientation(dog_photo)
-        dog_photo_bytes = convert_image_to_bytes(fixed_dog_photo)
+        dog_photo_bytes = prepare_dog_photo_bytes(dog_photo)
         if dog_photo_bytes is None:
             st.error("이미지 처리 중 오류가 발생했습니다. 다른 이미지를 업로드해주세요.")
             st.markdown('</div>', unsafe_allow_html=True)
@@ -498,40 +518,100 @@ def page_analyzing():
             fixed = fix_image_orientation(behavior_media)
             behavior_media_bytes = convert_image_to_bytes(fixed)
 
-        st.session_state.analysis_inputs = {
-            "dog_photo_bytes": dog_photo_bytes,
-            "behavior_media_bytes": behavior_media_bytes,
-        }
-
-    inputs = st.session_state.analysis_inputs
-
-    if "analysis_job" not in st.session_state:
         st.session_state.analysis_job = start_analysis_job(
             responses=st.session_state.responses,
-            dog_photo=inputs["dog_photo_bytes"],
-            behavior_media=inputs["behavior_media_bytes"],
+            dog_photo=dog_photo_bytes,
+            behavior_media=behavior_media_bytes,
         )
+        # 새로고침/재접속해도 같은 작업을 이어 보도록 URL에 job id를 남김
+        st.query_params["job"] = st.session_state.analysis_job.job_id
 
-    job: AnalysisJob = st.session_state.analysis_job
-    elapsed = max(time.time() - job.started_at, 0.0)
-    expected = max(settings.ANALYSIS_EXPECTED_SECONDS, 1.0)
-    progress_ratio = min(elapsed / expected, 0.95)
-    progress_bar.progress(progress_ratio)
+    if settings.ANALYSIS_PROGRESS_FULL_RERUN:
+        # 기준선 측정용 이전 방식: 페이지 전체를 다시 실행 (CPU 기록에 페이지 본문 포함)
+        draw_analysis_progress(page_started, mode="rerun")
+        st.markdown('</div>', unsafe_allow_html=True)
+        time.sleep(settings.ANALYSIS_PROGRESS_POLL_SECONDS)
+        st.rerun()
 
-    msg_index = min(int(progress_ratio * len(dynamic_messages)), len(dynamic_messages) - 1)
-    message_placeholder.markdown(
-        f'<div class="dynamic-message blinking">{dynamic_messages[msg_index]}</div>',
-        unsafe_allow_html=True,
-    )
+    # 진행 상황은 fragment만 주기적으로 다시 그림 (페이지 전체 rerun 없이)
+    render_analysis_progress()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment(run_every=settings.ANALYSIS_PROGRESS_POLL_SECONDS)
+def render_analysis_progress():
+    """
+    분석 진행률/대기 순번/부분 결과를 그리는 fragment.
+
+    ANALYSIS_PROGRESS_POLL_SECONDS마다 이 함수만 다시 실행되고,
+    작업이 끝나면 결과를 저장한 뒤 한 번만 결과 페이지로 이동합니다.
+    """
+    draw_analysis_progress(time.thread_time(), mode="fragment")
+
+
+def draw_analysis_progress(tick_started: float, mode: str):
+    """
+    분석 진행률/대기 순번/부분 결과를 그리고, 작업이 끝났으면 결과를 저장한 뒤 결과 페이지로 이동합니다.
+
+    Args:
+        tick_started: 이번 갱신의 CPU 측정 시작 시각 (time.thread_time())
+        mode: "fragment" / "rerun" (CPU 기록 구분용)
+    """
+    job: Optional[AnalysisJob] = st.session_state.get("analysis_job")
+    if job is None:
+        return
+
+    dog_name = st.session_state.responses.get("dog_name", "강아지")
+    dog_breed = st.session_state.responses.get("dog_breed", "우리 친구")
+    dynamic_messages = [
+        f"🐶 {dog_name}의 행동을 꼼꼼히 분석하고 있어요!",
+        "🔍 마리가 열심히 생각 중이에요...",
+        "💭 전문가 의견을 모으고 있어요!",
+        f"{dog_name}의 작은 표정 변화도 소중하죠. {dog_breed} 친구의 마음을 천천히 열어볼게요.",
+        "⏳ 조금만 기다려주세요, 거의 다 됐어요!",
+    ]
+    message_placeholder = st.empty()
+    st.markdown("### 분석 진행 중...")
+    progress_bar = st.progress(0.0)
+    preview_placeholder = st.empty()
+
+    queue_position = job_queue_position(job)
+    if queue_position is not None:
+        # 대기열에 있는 동안은 경과 시간 대신 실제 순번을 보여줌
+        progress_bar.progress(0.0, text=f"앞에 {queue_position - 1}명이 분석 중이에요 (대기 {queue_position}번째)")
+        message_placeholder.markdown(
+            f'<div class="dynamic-message blinking">⏳ 요청이 많아 순서를 기다리고 있어요. {dog_name}의 차례가 곧 와요!</div>',
+            unsafe_allow_html=True,
+        )
+    else:
+        # analyzer의 단계 진행 이벤트 + 최근 기록으로 학습한 단계별 예상 시간
+        progress = job_progress(job)
+        eta_seconds = int(round(progress["eta_seconds"]))
+        eta_text = f"약 {eta_seconds}초 남음" if eta_seconds >= 1 else "거의 다 됐어요"
+        progress_bar.progress(progress["fraction"], text=f"{progress['label']} · {eta_text}")
+
+        msg_index = min(int(progress["fraction"] * len(dynamic_messages)), len(dynamic_messages) - 1)
+        message = progress["detail"] or dynamic_messages[msg_index]
+        message_placeholder.markdown(
+            f'<div class="dynamic-message blinking">{message}</div>',
+            unsafe_allow_html=True,
+        )
+
+    # 마리 변환 스트리밍: 완성된 header/summary/솔루션부터 먼저 표시
+    partial = job_partial_result(job)
+    if partial and partial.get("mari_story"):
+        with preview_placeholder.container():
+            render_partial_mari_preview(partial["mari_story"], dog_name)
 
     if not job_done(job):
-        time.sleep(0.8)
-        st.markdown('</div>', unsafe_allow_html=True)
-        st.rerun()
+        record_progress_cpu(tick_started, mode)
         return
 
     try:
         result = job_result(job)
+    except AnalysisRejected as exc:
+        st.warning(f"지금 분석 요청이 많아 바로 처리하지 못했어요 ({exc}). 임시 분석 결과를 보여드릴게요.")
+        result = build_mock_analysis_result(st.session_state.responses)
     except Exception as exc:
         st.error(f"분석 중 오류가 발생했습니다: {exc}")
         st.warning("임시 분석 결과를 생성합니다.")
@@ -553,8 +633,9 @@ def page_analyzing():
         st.warning(f"⚠️ CSV 저장 실패: {csv_error}\n\n"
                   f"상세 오류는 서버 로그를 확인해주세요.")
 
+    mark_job_delivered(job)
     st.session_state.pop("analysis_job", None)
-    st.session_state.pop("analysis_inputs", None)
+    record_progress_cpu(tick_started, mode, finished=True)
 
     progress_bar.progress(1.0)
     message_placeholder.markdown(
@@ -562,10 +643,33 @@ def page_analyzing():
         unsafe_allow_html=True,
     )
     time.sleep(1.5)
-    st.markdown('</div>', unsafe_allow_html=True)
+    # fragment 안에서 호출해도 앱 전체 rerun으로 결과 페이지에 한 번만 이동
     next_page()
 
 
+def record_progress_cpu(tick_started: float, mode: str, finished: bool = False):
+    """
+    대기 화면 갱신 1회의 서버 CPU 시간(스크립트 스레드 기준)을 누적하고, 작업이 끝나면
+    performance.log에 "analysis_progress_ui" 기록으로 남깁니다 (로그 레벨 설정과 무관).
+
+    mode("fragment" / "rerun")별 기록을 비교하면 fragment 갱신과 이전 전체 rerun 방식의 차이를 볼 수 있습니다.
+    """
+    stats = st.session_state.setdefault("analysis_progress_cpu", {"ticks": 0, "cpu_seconds": 0.0})
+    stats["ticks"] += 1
+    stats["cpu_seconds"] += time.thread_time() - tick_started
+    if finished:
+        PerformanceTracker(
+            name="analysis_progress_ui",
+            metadata={
+                "mode": mode,
+                "ticks": stats["ticks"],
+                "cpu_seconds": round(stats["cpu_seconds"], 4),
+                "cpu_ms_per_tick": round(stats["cpu_seconds"] / stats["ticks"] * 1000, 2),
+            },
+        ).finish()
+        st.session_state.pop("analysis_progress_cpu", None)
+
+
 def build_mock_analysis_result(responses: dict) -> dict:
     """API 오류 시 사용할 임시 분석 결과 생성."""
     dog_name = responses.get("dog_name", "강아지")
@@ -606,7 +710,7 @@ def normalize_mari_data_for_rendering(mari_story: dict) -> dict:
     Returns:
         dict: 기존 렌더링 함수와 호환되는 형식
             - summary: header를 summary 형식으로 변환
-            - solutions: steps → details, outcome → expected_outcome
+            - solutions: steps → details
             - guidance: description → content
             - core_message: mari_closing에서 추출
     """
@@ -622,14 +726,13 @@ def normalize_mari_data_for_rendering(mari_story: dict) -> dict:
         "key_characteristics": []  # 마리 변환에는 없으므로 빈 배열
     }
 
-    # 2. solutions: steps → details, outcome → expected_outcome
+    # 2. solutions: steps → details
     normalized_solutions = []
     for sol in solutions:
         normalized_solutions.append({
             "title": sol.get("title", ""),
             "content": sol.get("content", ""),
-            "details": sol.get("steps", []),  # steps를 details로 매핑
-            "expected_outcome": sol.get("outcome", "")  # outcome을 expected_outcome으로 매핑
+            "details": sol.get("steps", [])  # steps를 details로 매핑
         })
 
     # 3. guidance: description → content
@@ -637,8 +740,7 @@ def normalize_mari_data_for_rendering(mari_story: dict) -> dict:
     for guide in guidance:
         normalized_guidance.append({
             "principle": guide.get("principle", ""),
-            "content": guide.get("description", ""),  # description을 content로 매핑
-            "action": guide.get("action", "")
+            "content": guide.get("description", "")  # description을 content로 매핑
         })
 
     # 4. core_message 추출 (final_quote는 제외)
@@ -652,6 +754,26 @@ def normalize_mari_data_for_rendering(mari_story: dict) -> dict:
     }
 
 
+def render_partial_mari_preview(partial_story: dict, dog_name: str) -> None:
+    """
+    스트리밍 중인 마리 변환 결과 미리보기.
+    header/summary를 먼저 보여주고, 내용이 채워진 솔루션만 이어서 표시합니다.
+    """
+    normalized = normalize_mari_data_for_rendering(partial_story)
+    summary = normalized["summary"]
+
+    st.markdown("---")
+    st.markdown("#### 🐾 마리가 결과를 정리하고 있어요")
+    if summary.get("core_issue"):
+        st.markdown(f"**{summary['core_issue']}**")
+    if summary.get("root_cause"):
+        render_summary_card(summary, dog_name)
+
+    ready_solutions = [sol for sol in normalized["solutions"] if sol.get("content")]
+    if ready_solutions:
+        render_solutions(ready_solutions)
+
+
 def extract_structured_sections(result: dict) -> dict:
     """
     분석 결과에서 구조화된 섹션 추출.
@@ -781,8 +903,10 @@ def page_result():
             st.session_state.page = 0
             st.session_state.responses = {}
             st.session_state.dog_photo = None
+            st.session_state.pop("dog_photo_prepared", None)
             st.session_state.behavior_media = None
             st.session_state.analysis_result = None
+            st.query_params.pop("job", None)
             st.rerun()
 
     # 하단 패딩 추가 (모바일 환경 대응)
@@ -794,10 +918,45 @@ def page_result():
     )
 
 
+# ===== 작업 재개 =====
+def resume_job_from_query_params():
+    """
+    새로고침/재접속으로 세션이 비었을 때 URL의 job id로 분석 작업을 이어갑니다.
+
+    끝나서 이미 전달된 작업은 결과 페이지로, 그 밖에는 분석 페이지에서 진행 상황을 다시 폴링합니다.
+    """
+    job_id = st.query_params.get("job")
+    if not job_id or "analysis_job" in st.session_state or st.session_state.analysis_result is not None:
+        return
+
+    job = resume_analysis_job(job_id)
+    if job is None:
+        # 기록이 없거나 실행이 중단된 작업: 처음부터 다시 시작
+        st.query_params.pop("job", None)
+        return
+
+    st.session_state.responses = job.responses or {}
+    if job.delivered:
+        try:
+            st.session_state.analysis_result = job_result(job)
+            st.session_state.page = 7
+            return
+        except Exception:
+            st.query_params.pop("job", None)
+            return
+
+    st.session_state.analysis_job = job
+    st.session_state.page = 6
+
+
 # ===== 메인 앱 =====
 def main():
     # 세션 스테이트 초기화
     initialize_session_state()
+    resume_job_from_query_params()
+
+    # 분석 백엔드 준비 (백그라운드 루프 + provider 커넥션 워밍업, 프로세스당 1회)
+    prepare_analysis_backend()
 
     # 페이지 라우팅
     pages = [
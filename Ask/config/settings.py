@@ -5,7 +5,7 @@
 """
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
 
 
@@ -25,6 +25,21 @@ class Settings(BaseSettings):
     AI_TEXT_MODEL: str = "gpt-5.1"
     AI_TEXT_TEMPERATURE_EXPERT: float = 0.4
     AI_TEXT_TEMPERATURE_MARI: float = 0.7
+    AI_VISION_MODEL: str = "gpt-4o"
+    AI_CLAUDE_EXPERT_MODEL: str = "claude-sonnet-4-5-20250929"
+    AI_CLAUDE_MARI_MODEL: str = "claude-haiku-4-5"
+
+    # GPT 분석 방식 ("two_stage": 전문가 분석 → 마리 변환 2회 호출, "fused": 1회 호출로 두 섹션 동시 생성)
+    ANALYSIS_MODE: str = "two_stage"
+
+    # AI Provider HTTP 커넥션 풀
+    AI_HTTP_MAX_CONNECTIONS: int = 100
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    AI_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    AI_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AI_HTTP_READ_TIMEOUT_SECONDS: float = 120.0
+    AI_CLIENT_WARMUP: bool = True
+    AI_CLIENT_WARMUP_CONNECTIONS: int = 2
 
     # Supabase
     SUPABASE_URL: str
@@ -48,7 +63,125 @@ class Settings(BaseSettings):
     ALLOWED_IMAGE_EXTENSIONS: list[str] = [".jpg", ".jpeg", ".png", ".webp"]
     MAX_SURVEY_QUESTIONS: int = 10
     VISION_TIMEOUT_SECONDS: float = 8.0
-    ANALYSIS_EXPECTED_SECONDS: float = 32.0
+    # 분석 단계별 예상 소요 시간 (src/ai/progress.py): performance.log 표본이 부족할 때의 기본값,
+    # 표본이 PROGRESS_MIN_SAMPLES 이상이면 최근 PROGRESS_HISTORY_WINDOW건의 중앙값 사용
+    PROGRESS_DEFAULT_STAGE_SECONDS: Dict[str, float] = {"vision": 4.0, "expert": 18.0, "fused": 24.0, "mari": 10.0}
+    PROGRESS_HISTORY_WINDOW: int = 50
+    PROGRESS_MIN_SAMPLES: int = 5
+    # 분석 대기 화면에서 진행 상황 fragment를 다시 그리는 주기 (초)
+    ANALYSIS_PROGRESS_POLL_SECONDS: float = 0.8
+    # 기준선 측정용: True면 이전 방식(주기마다 페이지 전체 rerun)으로 갱신, CPU 기록의 mode="rerun"
+    ANALYSIS_PROGRESS_FULL_RERUN: bool = False
+
+    # 프로세스 워커 풀 (src/utils/worker_pool.py): 0이면 프로세스당 백그라운드 루프 1개만 사용
+    ASYNC_WORKER_PROCESSES: int = 0
+    ASYNC_WORKER_MAX_INFLIGHT: int = 8  # 워커 1개가 동시에 실행하는 작업 수
+    ASYNC_WORKER_START_METHOD: str = "spawn"  # Streamlit 스레드가 떠 있는 프로세스라 fork 대신 spawn
+
+    # 분석 작업 스케줄러 (src/services/analysis_service.py): provider별 동시 실행 수, 대기열 크기, 부하 차단
+    ANALYSIS_MAX_CONCURRENCY: Dict[str, int] = {"gpt": 4, "claude": 2}
+    ANALYSIS_QUEUE_MAX_SIZE: int = 20  # 가득 차면 새 작업 거절
+    ANALYSIS_QUEUE_MAX_WAIT_SECONDS: float = 60.0  # 이보다 오래 기다린 작업은 실행하지 않고 거절
+
+    # 분석 작업 저장소 (src/services/job_store.py, SQLite): 새로고침/다른 프로세스에서 작업 재개
+    JOB_STORE_RETENTION_SECONDS: float = 86400.0
+    JOB_STALE_SECONDS: float = 180.0  # 끝나지 않은 작업이 이 시간 동안 갱신이 없으면 유실로 보고 새로 시작
+    JOB_PARTIAL_SAVE_INTERVAL_SECONDS: float = 1.0  # 스트리밍 부분 결과 저장 간격
+
+    # 요청 단위 시간 예산 (Deadline): 폴백을 포함해 이 시간 안에 결과를 반환
+    ANALYSIS_HARD_SLA_SECONDS: float = 45.0
+    DEADLINE_EXPERT_FULL_SECONDS: float = 30.0  # 1차 시작 시 남은 시간이 이보다 적으면 effort/verbosity 한 단계 하향
+    DEADLINE_EXPERT_MINIMAL_SECONDS: float = 18.0  # 이보다 적으면 가장 낮은 effort/verbosity
+    DEADLINE_MARI_FULL_SECONDS: float = 12.0  # 2차 시작 시 남은 시간이 이보다 적으면 한 단계 하향
+    DEADLINE_MARI_MIN_SECONDS: float = 6.0  # 이보다 적으면 2차 LLM 대신 로컬 렌더러
+    DEADLINE_RESERVE_SECONDS: float = 1.0  # 폴백 렌더링/결과 반환용 여유
+
+    # 관측 지연/품질 기반 reasoning_effort·verbosity 적응형 조정 (src/ai/effort_controller.py)
+    EFFORT_CONTROLLER_ENABLED: bool = True
+    EFFORT_TARGET_P95_SECONDS: Dict[str, float] = {"expert": 20.0, "mari": 10.0}
+    EFFORT_MIN_SAMPLES: int = 20  # 레벨 결정에 필요한 표본 수 (변경 후 다시 모음)
+    EFFORT_WINDOW: int = 100
+    EFFORT_HYSTERESIS: float = 0.15  # 목표 ±15% 안에서는 레벨 유지
+    EFFORT_MIN_CONFIDENCE: float = 0.6  # 이보다 낮은 confidence_score는 품질 이상으로 집계
+    EFFORT_MAX_LOW_QUALITY_RATE: float = 0.2  # 현재 레벨의 품질 이상 비율 상한 (넘으면 한 단계 올림)
+
+    # Provider/모델별 Circuit Breaker + analyzer 자동 전환 (src/ai/circuit_breaker.py)
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_WINDOW: int = 20  # 최근 호출 수
+    CIRCUIT_BREAKER_MIN_CALLS: int = 5  # 이보다 적게 관측되면 열지 않음
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 40.0
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0  # open 후 half-open probe까지 대기
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES: int = 2  # 연속 성공해야 closed로 복구
+    ANALYZER_FAILOVER_ENABLED: bool = True  # 설정 provider의 circuit이 열리면 다른 analyzer로 새 작업 전환
+
+    # 공용 재시도 엔진 (src/ai/retry.py): 오류 분류, Retry-After, decorrelated jitter, 재시도 예산
+    RETRY_BASE_DELAY_SECONDS: float = 0.5
+    RETRY_MAX_DELAY_SECONDS: float = 8.0
+    RETRY_AFTER_MAX_SECONDS: float = 20.0  # 이보다 긴 Retry-After는 재시도하지 않고 폴백
+    RETRY_BUDGET_RATIO: float = 0.2  # 재시도 트래픽 상한 = 기본 요청의 20%
+    RETRY_BUDGET_MIN_PER_SECOND: float = 0.5  # 트래픽이 적을 때도 허용하는 최소 재시도량
+    RETRY_BUDGET_WINDOW_SECONDS: float = 10.0
+
+    # 사진 업로드 직후 Vision 선행 분석
+    VISION_PREFETCH_ENABLED: bool = True
+    VISION_PREFETCH_TIMEOUT_SECONDS: float = 30.0
+    VISION_PREFETCH_MAX_ENTRIES: int = 64
+
+    # Vision 결과 캐시 (이미지 내용 해시 기준)
+    VISION_CACHE_ENABLED: bool = True
+    VISION_CACHE_PERCEPTUAL_HASH: bool = True
+    VISION_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    VISION_CACHE_MAX_ENTRIES: int = 256
+    # 시간 초과 후에도 캐시를 채우기 위해 Vision 호출을 계속 진행하는 최대 시간
+    VISION_LATE_COMPLETION_SECONDS: float = 30.0
+    # 공유 Vision Task의 hard cap = 호출 예산 + 이 유예 시간 (넘기면 Task 취소)
+    VISION_HARD_CAP_GRACE_SECONDS: float = 5.0
+
+    # 1차 AI(전문가 분석) 결과 캐시
+    EXPERT_CACHE_ENABLED: bool = True
+    EXPERT_CACHE_TTL_SECONDS: float = 24 * 3600
+    EXPERT_CACHE_MAX_ENTRIES: int = 128
+    EXPERT_CACHE_MAX_DISK_ENTRIES: int = 1000
+
+    # 유사 사례 캐시 (data/vector_db, 높은 신뢰도의 과거 전문가 분석 재사용)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_MIN_CONFIDENCE: float = 0.8
+    SEMANTIC_CACHE_EMBEDDING_DIM: int = 256
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 50000
+
+    # 로컬 훈련 프로토콜 검색 (1차 AI 프롬프트에 참고 자료 주입)
+    RAG_ENABLED: bool = True
+    RAG_TOP_K: int = 3
+    RAG_MIN_SCORE: float = 0.1
+    RAG_SNIPPET_MAX_CHARS: int = 400
+    RAG_EMBEDDING_DIM: int = 1024
+
+    # 프롬프트 캐싱 (고정 페르소나/규칙을 prefix로 모아 provider 캐시 hit 유도)
+    PROMPT_CACHE_LAYOUT: bool = True
+    PROMPT_CACHE_KEY_PREFIX: str = "heartbridge"
+    ANTHROPIC_PROMPT_CACHING: bool = True
+
+    # 마리 변환 스트리밍 (부분 결과를 분석 화면에 먼저 표시)
+    MARI_STREAMING_ENABLED: bool = True
+    MARI_STREAM_EMIT_INTERVAL_SECONDS: float = 0.3
+
+    # 마리 변환 방식 ("llm": 2차 AI 호출, "local": 로컬 렌더러, "auto": 앞 단계가 느리면 로컬)
+    MARI_RENDER_MODE: str = "llm"
+    MARI_RENDER_TONE: str = "auto"  # "warm" / "cheerful" / "calm" / "auto"(주요 고민별)
+    MARI_LOCAL_RENDER_AFTER_SECONDS: float = 20.0
+
+    # Hedged request (tail latency 완화)
+    # 단계별 정책: "off" / "same"(같은 provider 재요청) / "alternate"(다른 provider로 경쟁)
+    HEDGE_ENABLED: bool = True
+    HEDGE_STAGES: Dict[str, str] = {"expert": "same", "mari": "off"}
+    HEDGE_QUANTILE: float = 0.9  # 이 분위수 지연을 넘기면 hedge 발사
+    HEDGE_MIN_SAMPLES: int = 20  # 표본이 이보다 적으면 기본 지연 사용
+    HEDGE_DEFAULT_DELAY_SECONDS: float = 25.0
+    HEDGE_MIN_DELAY_SECONDS: float = 3.0
+    HEDGE_MAX_RATE: float = 0.15  # 최근 호출 중 hedge 비율 상한 (provider 부하/비용 보호)
 
     class Config:
         # settings.py 파일 위치 기준으로 상위 디렉토리(Ask/)의 .env 파일 찾기
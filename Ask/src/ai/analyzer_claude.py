@@ -6,23 +6,39 @@
 
 import json
 import re
+import time
 import asyncio
 import logging
-from typing import Dict, Optional, List, Any
+from typing import Callable, Dict, Optional, List, Any
 import anthropic  # Claude API
 # from openai import OpenAI  # OpenAI API (주석 처리)
 
 from config.settings import settings
 from src.ai.prompt_builder_claude import (
+    EXPERT_PROMPT_VERSION,
     build_expert_analysis_prompt,
     build_mari_conversion_prompt,
+    structure_survey_responses,
 )
+from src.ai.circuit_breaker import CircuitOpenError, get_breaker, get_breaker_snapshot
+from src.ai.client_registry import get_anthropic_client
+from src.ai.expert_cache import build_expert_cache_key, get_or_compute_expert
+from src.ai.json_repair import is_expert_json_usable, loads_or_salvage, repair_expert_json
+from src.ai.schemas import validate_expert_json
+from src.ai.rag_search import get_rag_version
+from src.ai.retry import run_with_retry
+from src.ai.semantic_cache import find_similar_analysis, remember_analysis
+from src.ai.mari_renderer import format_mari_story_markdown, render_mari_story, should_render_locally
+from src.ai.progress import TWO_STAGE_PLAN, ProgressReporter
+from src.ai.hedging import hedged_call
 from src.ai.gpt4_vision import (
-    analyze_dog_image_with_gpt4,
     get_fallback_vision_analysis,
+    run_vision_stage,
 )
 from src.utils.mock_data import get_mock_result_by_problem
 from src.utils.paths import get_runtime_logs_dir
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.perf import PerformanceTracker, record_token_usage
 
 
 # ===== 로깅 설정 =====
@@ -72,17 +88,27 @@ async def call_claude_api(
     user: str,
     images: Optional[List[Dict]] = None,
     max_retries: int = 2,
-    model: str = "claude-sonnet-4-5-20250929"
+    model: Optional[str] = None,
+    stage: str = "claude",
+    deadline: Optional[Deadline] = None,
+    deadline_reserve: float = 0.0
 ) -> str:
     """
     Claude API를 호출합니다 (재시도 로직 포함).
 
+    ANTHROPIC_PROMPT_CACHING이 켜져 있으면 system 프롬프트를 cache_control 블록으로 보내
+    고정 페르소나 prefix를 재사용하고, 캐시 읽기/쓰기 토큰을 stage 이름으로 기록합니다.
+    재시도 여부와 대기 시간은 공용 재시도 엔진(run_with_retry)이 정합니다.
+
     Args:
         system: 시스템 프롬프트
         user: 사용자 프롬프트
         images: 이미지 리스트 (Optional)
         max_retries: 최대 재시도 횟수
-        model: Claude 모델명
+        model: Claude 모델명 (기본값: AI_CLAUDE_EXPERT_MODEL)
+        stage: 토큰 사용량 기록용 단계명 ("expert" / "mari")
+        deadline: 요청 단위 시간 예산 (Optional, 각 시도와 재시도 대기를 남은 예산 안으로 제한)
+        deadline_reserve: 호출 후 남겨 둘 시간 (초)
 
     Returns:
         str: AI 응답 텍스트
@@ -90,60 +116,95 @@ async def call_claude_api(
     Raises:
         Exception: API 호출 실패 시
     """
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    if model is None:
+        model = settings.AI_CLAUDE_EXPERT_MODEL
+    # 프로세스 공용 클라이언트 (모델별 keep-alive 커넥션 풀 재사용)
+    client = get_anthropic_client(model)
+    breaker = get_breaker("anthropic", model)
     logger.info(f"Claude API 호출 시작 (model={model}, images={len(images) if images else 0}개)")
     logger.debug(f"System prompt 길이: {len(system)} chars")
     logger.debug(f"User prompt 길이: {len(user)} chars")
 
-    for attempt in range(max_retries + 1):
+    request_options: Dict[str, Any] = {}
+    system_param: Any = system
+    if settings.ANTHROPIC_PROMPT_CACHING:
+        # 고정 system 프롬프트까지를 캐시 prefix로 지정 (요청별 데이터는 user 메시지)
+        system_param = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        request_options["extra_headers"] = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+    async def attempt_call(attempt: int) -> str:
+        logger.debug(f"API 호출 시도 {attempt + 1}/{max_retries + 1}")
+        if images:
+            content_blocks = []
+            for img in images:
+                content_blocks.append({
+                    "type": "image",
+                    "source": {
+                        "type": img["type"],
+                        "media_type": img["media_type"],
+                        "data": img["data"],
+                    }
+                })
+            content_blocks.append({"type": "text", "text": user})
+            messages = [{"role": "user", "content": content_blocks}]
+        else:
+            messages = [{"role": "user", "content": user}]
+
+        # 장애 중이면 재시도 없이 즉시 CircuitOpenError (호출부 폴백으로 바로 진행)
+        generation = breaker.acquire()
+        attempt_started = time.perf_counter()
         try:
-            logger.debug(f"API 호출 시도 {attempt + 1}/{max_retries + 1}")
-            if images:
-                content_blocks = []
-                for img in images:
-                    content_blocks.append({
-                        "type": "image",
-                        "source": {
-                            "type": img["type"],
-                            "media_type": img["media_type"],
-                            "data": img["data"],
-                        }
-                    })
-                content_blocks.append({"type": "text", "text": user})
-                message = client.messages.create(
-                    model=model, max_tokens=4096, system=system,
-                    messages=[{"role": "user", "content": content_blocks}]
-                )
-            else:
-                message = client.messages.create(
-                    model=model, max_tokens=4096, system=system,
-                    messages=[{"role": "user", "content": user}]
-                )
-            response_text = message.content[0].text
-            logger.info(f"Claude API 호출 성공 (응답 길이: {len(response_text)} chars)")
-            return response_text
-        except anthropic.APIError as e:
-            logger.error(f"Anthropic API 오류 (시도 {attempt + 1}/{max_retries + 1}): {str(e)}")
-            if attempt < max_retries:
-                wait_time = 2 ** attempt
-                logger.warning(f"{wait_time}초 후 재시도...")
-                await asyncio.sleep(wait_time)
-                continue
-            else:
-                error_msg = f"Claude API 호출 실패 (시도 {max_retries + 1}회): {str(e)}"
-                logger.critical(error_msg)
-                raise Exception(error_msg)
-        except Exception as e:
-            logger.error(f"예기치 않은 오류 (시도 {attempt + 1}/{max_retries + 1}): {str(e)}")
-            if attempt < max_retries:
-                wait_time = 2 ** attempt
-                logger.warning(f"{wait_time}초 후 재시도...")
-                await asyncio.sleep(wait_time)
-                continue
+            request = client.messages.create(
+                model=model, max_tokens=4096, system=system_param,
+                messages=messages, **request_options
+            )
+            if deadline is not None:
+                message = await deadline.run(request, reserve=deadline_reserve, what=f"Claude {stage}")
             else:
-                error_msg = f"예기치 않은 오류: {str(e)}"
-                logger.critical(error_msg)
-                raise Exception(error_msg)
+                message = await request
+        except (asyncio.CancelledError, DeadlineExceeded):
+            breaker.release(generation)
+            raise
+        except Exception as exc:
+            breaker.record_error(exc, time.perf_counter() - attempt_started, generation)
+            raise
+        breaker.record(True, time.perf_counter() - attempt_started, generation)
+        response_text = message.content[0].text
+        logger.info(f"Claude API 호출 성공 (응답 길이: {len(response_text)} chars)")
+
+        usage = getattr(message, "usage", None)
+        if usage is not None:
+            cache_read = getattr(usage, "cache_read_input_tokens", None)
+            cache_write = getattr(usage, "cache_creation_input_tokens", None)
+            logger.info(
+                f"토큰 사용량 ({stage}): input={usage.input_tokens} "
+                f"(cache_read={cache_read}, cache_write={cache_write}), output={usage.output_tokens}"
+            )
+            record_token_usage(
+                stage,
+                input_tokens=usage.input_tokens + (cache_read or 0) + (cache_write or 0),
+                cached_tokens=cache_read,
+                output_tokens=usage.output_tokens,
+                cache_write_tokens=cache_write,
+            )
+        return response_text
+
+    try:
+        return await run_with_retry(
+            stage, attempt_call, max_retries,
+            deadline=deadline, deadline_reserve=deadline_reserve, description=f"Claude {stage}"
+        )
+    except (DeadlineExceeded, CircuitOpenError) as e:
+        logger.error(f"Claude 호출 중단 ({stage}): {str(e)}")
+        raise
+    except anthropic.APIError as e:
+        error_msg = f"Claude API 호출 실패 ({stage}): {str(e)}"
+        logger.critical(error_msg)
+        raise Exception(error_msg) from e
+    except Exception as e:
+        error_msg = f"예기치 않은 오류: {str(e)}"
+        logger.critical(error_msg)
+        raise Exception(error_msg) from e
 
 
 # ===== GPT-5 Responses API 호출 (주석 처리) =====
@@ -187,7 +248,7 @@ async def call_gpt5_api(
 
 def parse_json_response(response: str) -> dict:
     """
-    AI 응답에서 JSON을 파싱하고 검증합니다.
+    AI 응답에서 JSON을 파싱하고 검증합니다 (검증 실패 시 스키마 기반 로컬 복구).
 
     Args:
         response: AI 응답 텍스트
@@ -206,42 +267,78 @@ def parse_json_response(response: str) -> dict:
         # JSON 블록 없으면 전체를 JSON으로 파싱 시도
         json_str = response
 
-    # JSON 파싱
-    try:
-        result = json.loads(json_str)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"JSON 파싱 실패: {str(e)}")
-
-    # 필수 필드 검증
-    required_fields = [
-        "analysis_summary",
-        "solutions_best_fit",
-        "future_guidance",
-        "core_message",
-        "confidence_score"
-    ]
-
-    for field in required_fields:
-        if field not in result:
-            raise ValueError(f"필수 필드 누락: {field}")
-
-    # solutions_best_fit가 정확히 3개인지 확인
-    if len(result["solutions_best_fit"]) != 3:
-        raise ValueError(f"solutions_best_fit는 3개여야 합니다 (현재: {len(result["solutions_best_fit"])}개)")
-
-    # future_guidance가 정확히 3개인지 확인
-    if len(result["future_guidance"]) != 3:
-        raise ValueError(f"future_guidance는 3개여야 합니다 (현재: {len(result["future_guidance"])}개)")
+    # JSON 파싱 (잘린 응답은 가능한 만큼 복원)
+    result = loads_or_salvage(json_str)
+
+    # 필수 필드/개수 검증, 실패하면 스키마 기반 로컬 복구 (Claude는 JSON Schema 강제가 없음)
+    is_valid, error_msg = validate_expert_json(result)
+    if not is_valid:
+        result, is_valid, repair_error = repair_expert_json(result)
+        if not is_valid:
+            raise ValueError(f"{error_msg} (로컬 복구 실패: {repair_error})")
 
     return result
 
 
 # ===== 2단계 AI 분석 메인 함수 =====
 
+async def call_expert_analysis(
+    responses: dict,
+    dog_photo: bytes,
+    behavior_media: Optional[bytes] = None,
+    vision_analysis: Optional[dict] = None,
+    expert_prompt: Optional[dict] = None,
+    deadline: Optional[Deadline] = None
+) -> dict:
+    """
+    1차 AI를 한 번 호출하고 JSON으로 파싱합니다.
+
+    hedged_call의 경쟁 요청으로도 쓰이며, GPT-5 분석기의 "alternate" hedge가 이 함수를 호출합니다.
+
+    Args:
+        responses: 설문 응답
+        dog_photo: 강아지 사진 바이트 데이터
+        behavior_media: 행동 영상/사진 (Optional)
+        vision_analysis: GPT-4 Vision 분석 결과 (Optional)
+        expert_prompt: 이미 만든 1차 프롬프트 (없으면 새로 생성)
+        deadline: 요청 단위 시간 예산 (Optional)
+
+    Returns:
+        dict: 파싱된 1차 분석 JSON
+    """
+    if expert_prompt is None:
+        expert_prompt = build_expert_analysis_prompt(
+            responses=responses,
+            dog_photo=dog_photo,
+            behavior_media=behavior_media,
+            vision_analysis=vision_analysis
+        )
+
+    # Claude API 호출
+    logger.info("1차 AI Claude API 호출 시작...")
+    raw_response = await call_claude_api(
+        system=expert_prompt["system"],
+        user=expert_prompt["user"],
+        images=expert_prompt["images"],
+        max_retries=2,
+        model=settings.AI_CLAUDE_EXPERT_MODEL,
+        stage="expert",
+        deadline=deadline,
+        deadline_reserve=settings.DEADLINE_RESERVE_SECONDS
+    )
+
+    # JSON 파싱
+    logger.debug("1차 AI 응답 JSON 파싱 중...")
+    return parse_json_response(raw_response)
+
+
 async def analyze_two_stage(
     responses: dict,
     dog_photo: bytes,
-    behavior_media: Optional[bytes] = None
+    behavior_media: Optional[bytes] = None,
+    on_partial: Optional[Callable[[dict], None]] = None,
+    deadline: Optional[Deadline] = None,
+    on_progress: Optional[Callable[[dict], None]] = None
 ) -> dict:
     """
     2단계 AI 분석을 실행합니다.
@@ -250,138 +347,277 @@ async def analyze_two_stage(
         responses: st.session_state.responses (설문 응답)
         dog_photo: 강아지 사진 바이트
         behavior_media: 행동 영상/사진 바이트 (Optional)
+        on_partial: 부분 결과 콜백 (GPT analyzer와 시그니처 통일용, Claude 경로는 스트리밍 미지원)
+        deadline: 요청 단위 시간 예산 (Optional, 없으면 ANALYSIS_HARD_SLA_SECONDS로 생성)
+        on_progress: 단계 진행 이벤트 콜백 (Optional, GPT analyzer와 같은 ProgressReporter 스냅샷)
 
     Returns:
         dict: {
             "final_text": str,           # 마리의 최종 Markdown 텍스트
             "confidence_score": float,   # 0.0-1.0
-            "raw_json": dict            # 1차 AI 원본 (디버깅/로깅용)
+            "raw_json": dict,           # 1차 AI 원본 (디버깅/로깅용)
+            "mari_story": dict | None   # 로컬 렌더러 사용 시 구조화된 마리 내러티브
         }
     """
+    if deadline is None:
+        deadline = Deadline(settings.ANALYSIS_HARD_SLA_SECONDS)
+
     # 강아지 정보 추출
     dog_name = responses.get("dog_name", "강아지")
     dog_age = responses.get("dog_birth", "알 수 없음")
     hardest_part = responses.get("hardest_part", "알 수 없음")
     main_concerns = responses.get("main_concerns", [])
 
-    # ===== 0단계: GPT-4 Vision 이미지 전처리 =====
-    logger.info(f"=== GPT-4 Vision 이미지 전처리 시작 (강아지: {dog_name}) ===")
-    logger.debug(f"dog_photo 크기: {len(dog_photo) if dog_photo else 0} bytes")
-    logger.debug(f"behavior_media 크기: {len(behavior_media) if behavior_media else 0} bytes")
+    # 단계별 토큰 사용량(프롬프트 캐시 hit 포함)을 performance.log에 남기기 위한 tracker
+    tracker = PerformanceTracker(
+        name="analyze_two_stage_claude",
+        metadata={
+            "dog_name": dog_name,
+            "app_env": settings.APP_ENV,
+            "main_concerns": main_concerns,
+            "hard_sla_seconds": deadline.budget_seconds,
+        }
+    )
+    tracker.activate()
+    final_status = "success"
 
-    vision_analysis = None
     try:
-        # GPT-4 Vision으로 이미지 분석
-        vision_analysis = await analyze_dog_image_with_gpt4(
-            image_bytes=dog_photo,
-            max_retries=2
-        )
-        logger.info("GPT-4 Vision 이미지 분석 성공!")
-        logger.debug(f"Vision 분석 결과: {vision_analysis.keys()}")
+        progress = ProgressReporter(on_progress, plan=TWO_STAGE_PLAN)
 
-    except Exception as e:
-        # GPT-4 Vision 실패 시: Fallback 사용
-        logger.error(f"GPT-4 Vision 실패, Fallback 사용: {str(e)}")
-        vision_analysis = get_fallback_vision_analysis(dog_name=dog_name)
+        # ===== 0단계: GPT-4 Vision 이미지 전처리 =====
+        logger.info(f"=== GPT-4 Vision 이미지 전처리 시작 (강아지: {dog_name}) ===")
+        progress.start("vision")
+        logger.debug(f"dog_photo 크기: {len(dog_photo) if dog_photo else 0} bytes")
+        logger.debug(f"behavior_media 크기: {len(behavior_media) if behavior_media else 0} bytes")
 
-    # ===== 1차 AI: 전문가 분석 =====
-    logger.info(f"=== 1차 AI 분석 시작 (강아지: {dog_name}) ===")
+        vision_analysis = None
+        try:
+            with tracker.span("vision_analysis"):
+                # GPT-4 Vision으로 이미지 분석 (선행 분석 재사용, VISION_TIMEOUT_SECONDS 내 완료 보장)
+                vision_analysis = await run_vision_stage(
+                    image_bytes=dog_photo,
+                    timeout=deadline.cap(settings.VISION_TIMEOUT_SECONDS, reserve=settings.DEADLINE_RESERVE_SECONDS),
+                    tracker=tracker
+                )
+            logger.info("GPT-4 Vision 이미지 분석 성공!")
+            logger.debug(f"Vision 분석 결과: {vision_analysis.keys()}")
+            progress.finish("vision")
 
-    try:
-        # 프롬프트 생성 (vision_analysis 포함)
-        logger.debug("1차 AI 프롬프트 생성 중...")
-        expert_prompt = build_expert_analysis_prompt(
-            responses=responses,
-            dog_photo=dog_photo,
-            behavior_media=behavior_media,
-            vision_analysis=vision_analysis  # ← GPT-4 Vision 결과 전달
-        )
-        logger.debug(f"프롬프트 생성 완료 (이미지 전송: {expert_prompt['images'] is not None})")
-
-        # Claude API 호출
-        logger.info("1차 AI Claude API 호출 시작...")
-        raw_response = await call_claude_api(
-            system=expert_prompt["system"],
-            user=expert_prompt["user"],
-            images=expert_prompt["images"],
-            max_retries=2
-        )
+        except asyncio.TimeoutError:
+            # 시간 예산 초과: 요청은 이미 취소됨
+            logger.warning("GPT-4 Vision 분석이 지연되어 Fallback으로 전환합니다.")
+            vision_analysis = get_fallback_vision_analysis(dog_name=dog_name)
+            progress.finish("vision", status="fallback", detail="사진 분석이 늦어져 기본 분석으로 진행해요")
 
-        # JSON 파싱
-        logger.debug("1차 AI 응답 JSON 파싱 중...")
-        raw_json = parse_json_response(raw_response)
-        logger.info("1차 AI 분석 성공!")
+        except Exception as e:
+            # GPT-4 Vision 실패 시: Fallback 사용
+            logger.error(f"GPT-4 Vision 실패, Fallback 사용: {str(e)}")
+            vision_analysis = get_fallback_vision_analysis(dog_name=dog_name)
+            progress.finish("vision", status="fallback", detail="사진 분석 대신 기본 분석으로 진행해요")
+
+        # ===== 1차 AI: 전문가 분석 =====
+        logger.info(f"=== 1차 AI 분석 시작 (강아지: {dog_name}) ===")
+        progress.start("expert")
+
+        structured_survey = structure_survey_responses(responses)
+
+        async def compute_expert_analysis():
+            """1차 AI 호출, (결과, Schema 검증 통과 여부)를 반환"""
+            # 거의 같은 과거 사례가 있으면 Claude 호출 없이 재사용
+            if settings.SEMANTIC_CACHE_ENABLED:
+                # SQLite 조회 + 행렬곱이 이벤트 루프를 막지 않도록 스레드에서 실행
+                similar = await asyncio.to_thread(find_similar_analysis, structured_survey, vision_analysis)
+                tracker.mark_event("semantic_cache", round(similar[1], 4) if similar else "miss")
+                if similar is not None:
+                    return similar[0], True
+
+            async def call_expert():
+                return await call_expert_analysis(
+                    responses, dog_photo, behavior_media, vision_analysis,
+                    expert_prompt=expert_prompt, deadline=deadline
+                )
 
-    except Exception as e:
-        # 1차 AI 실패 시: Mock 데이터 사용
-        logger.error(f"===== 1차 AI 실패 - Mock 데이터 폴백 =====")
-        logger.error(f"Error: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
-        logger.error(f"Full traceback:", exc_info=True)
-
-        # Mock 데이터 가져오기
-        problem_type = main_concerns[0] if main_concerns else "barking"
-        mock_result = get_mock_result_by_problem(problem_type)
-
-        # Mock 데이터를 1차 JSON 형식으로 변환
-        raw_json = {
-            "analysis_summary": {
-                "core_issue": "분석 실패로 인한 기본 응답",
-                "root_cause": "API 오류",
-                "key_characteristics": ["정보 부족"]
-            },
-            "solutions_best_fit": [
-                {"title": "솔루션 1", "content": "기본 솔루션", "details": [], "expected_outcome": "개선 기대"},
-                {"title": "솔루션 2", "content": "기본 솔루션", "details": [], "expected_outcome": "개선 기대"},
-                {"title": "솔루션 3", "content": "기본 솔루션", "details": [], "expected_outcome": "개선 기대"}
-            ],
-            "future_guidance": [
-                {"principle": "원칙 1", "content": "내용", "action": "행동"},
-                {"principle": "원칙 2", "content": "내용", "action": "행동"},
-                {"principle": "원칙 3", "content": "내용", "action": "행동"}
-            ],
-            "core_message": "일시적인 오류가 발생했습니다. 다시 시도해주세요.",
-            "confidence_score": 0.3
-        }
+            async def call_expert_gpt():
+                # hedge 정책 "alternate": 같은 입력으로 GPT-5 1차 분석을 경쟁시킴
+                from src.ai.analyzer_gpt5 import call_expert_analysis as call_gpt_expert_analysis
+                return await call_gpt_expert_analysis(
+                    responses, dog_photo, behavior_media, vision_analysis, deadline=deadline
+                )
 
-    # ===== 2차 AI: 마리 페르소나 변환 =====
-    logger.info(f"=== 2차 AI 변환 시작 (강아지: {dog_name}) ===")
+            # p90 안에 응답이 없으면 중복 요청을 보내고, Schema 검증(로컬 복구 포함)을 먼저 통과한 결과를 사용
+            raw_json = await hedged_call(
+                stage="expert",
+                provider="claude",
+                primary=call_expert,
+                alternate=call_expert_gpt,
+                is_valid=is_expert_json_usable
+            )
+            is_valid, _ = validate_expert_json(raw_json)
+            if is_valid and settings.SEMANTIC_CACHE_ENABLED:
+                await asyncio.to_thread(remember_analysis, structured_survey, vision_analysis, raw_json, provider="claude")
+            return raw_json, is_valid
 
-    try:
-        # 프롬프트 생성
-        logger.debug("2차 AI 프롬프트 생성 중...")
-        mari_prompt = build_mari_conversion_prompt(
-            raw_json=raw_json,
-            dog_name=dog_name,
-            dog_age=dog_age,
-            hardest_part=hardest_part
-        )
+        try:
+            with tracker.span("expert_analysis"):
+                # 프롬프트 생성 (vision_analysis 포함)
+                logger.debug("1차 AI 프롬프트 생성 중...")
+                expert_prompt = build_expert_analysis_prompt(
+                    responses=responses,
+                    dog_photo=dog_photo,
+                    behavior_media=behavior_media,
+                    vision_analysis=vision_analysis  # ← GPT-4 Vision 결과 전달
+                )
+                logger.debug(f"프롬프트 생성 완료 (이미지 전송: {expert_prompt['images'] is not None})")
+
+                if settings.EXPERT_CACHE_ENABLED and expert_prompt["images"] is None:
+                    # 같은 설문 + 같은 Vision 결과 + 같은 프롬프트/모델 설정이면 캐시 재사용
+                    cache_key = build_expert_cache_key(
+                        provider="claude",
+                        structured_survey=structured_survey,
+                        vision_analysis=vision_analysis,
+                        prompt_version=f"{EXPERT_PROMPT_VERSION}+{get_rag_version()}",
+                        system_prompt=expert_prompt["system"],
+                        model_settings={"model": settings.AI_CLAUDE_EXPERT_MODEL}
+                    )
+                    raw_json, cache_source = await get_or_compute_expert(cache_key, compute_expert_analysis)
+                    tracker.mark_event("expert_cache", cache_source)
+                    logger.info(f"1차 AI 분석 성공! (출처: {cache_source})")
+                else:
+                    raw_json, _ = await compute_expert_analysis()
+                    logger.info("1차 AI 분석 성공!")
+            progress.finish("expert")
 
-        # Claude API 호출 (haiku 4.5 - 고품질 텍스트 변환)
-        logger.info("2차 AI Claude Sonnet 4.5 API 호출 시작...")
-        final_text = await call_claude_api(
-            system=mari_prompt["system"],
-            user=mari_prompt["user"],
-            images=None,
-            max_retries=2,
-            model="claude-haiku-4-5"  # Sonnet 4.5 사용 (고품질)
+        except Exception as e:
+            # 1차 AI 실패 시: Mock 데이터 사용
+            logger.error(f"===== 1차 AI 실패 - Mock 데이터 폴백 =====")
+            logger.error(f"Error: {str(e)}")
+            logger.error(f"Error type: {type(e).__name__}")
+            logger.error(f"Full traceback:", exc_info=True)
+
+            # Mock 데이터 가져오기
+            problem_type = main_concerns[0] if main_concerns else "barking"
+            mock_result = get_mock_result_by_problem(problem_type)
+
+            # Mock 데이터를 1차 JSON 형식으로 변환
+            raw_json = {
+                "analysis_summary": {
+                    "core_issue": "분석 실패로 인한 기본 응답",
+                    "root_cause": "API 오류",
+                    "key_characteristics": ["정보 부족"]
+                },
+                "solutions_best_fit": [
+                    {"title": "솔루션 1", "content": "기본 솔루션", "details": []},
+                    {"title": "솔루션 2", "content": "기본 솔루션", "details": []},
+                    {"title": "솔루션 3", "content": "기본 솔루션", "details": []}
+                ],
+                "future_guidance": [
+                    {"principle": "원칙 1", "content": "내용"},
+                    {"principle": "원칙 2", "content": "내용"},
+                    {"principle": "원칙 3", "content": "내용"}
+                ],
+                "core_message": "일시적인 오류가 발생했습니다. 다시 시도해주세요.",
+                "confidence_score": 0.3
+            }
+            progress.finish("expert", status="fallback")
+
+        # ===== 2차 AI: 마리 페르소나 변환 =====
+        logger.info(f"=== 2차 AI 변환 시작 (강아지: {dog_name}) ===")
+
+        # 로컬 렌더러 결과만 구조화된 mari_story를 가짐 (Claude 변환 결과는 Markdown 텍스트)
+        mari_story = None
+        mari_local_render = (
+            should_render_locally(tracker.elapsed())
+            or deadline.remaining() < settings.DEADLINE_MARI_MIN_SECONDS
         )
-        logger.info("2차 AI 변환 성공 (Sonnet 4.5)!")
+        tracker.mark_event("mari_render", "local" if mari_local_render else "llm")
+        progress.start("mari")
 
-    except Exception as e:
-        # 2차 AI 실패 시: 간단한 템플릿 변환
-        logger.error(f"===== 2차 AI 실패 - simple_template_conversion 폴백 =====")
-        logger.error(f"Error: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
-        logger.error(f"Full traceback:", exc_info=True)
-        final_text = simple_template_conversion(raw_json, dog_name, dog_age)
+        try:
+            if mari_local_render:
+                with tracker.span("mari_local_render"):
+                    mari_story = render_mari_story(
+                        raw_json,
+                        dog_name=dog_name,
+                        dog_age=dog_age,
+                        hardest_part=hardest_part,
+                        main_concerns=main_concerns
+                    )
+                    final_text = format_mari_story_markdown(mari_story)
+                    logger.info("2차 변환 로컬 렌더링 완료 (LLM 호출 없음)")
+                progress.finish("mari", status="local")
+            else:
+                with tracker.span("mari_conversion"):
+                    # 프롬프트 생성
+                    logger.debug("2차 AI 프롬프트 생성 중...")
+                    mari_prompt = build_mari_conversion_prompt(
+                        raw_json=raw_json,
+                        dog_name=dog_name,
+                        dog_age=dog_age,
+                        hardest_part=hardest_part
+                    )
+
+                    # Claude API 호출 (haiku 4.5 - 고품질 텍스트 변환)
+                    logger.info("2차 AI Claude Sonnet 4.5 API 호출 시작...")
+                    final_text = await hedged_call(
+                        stage="mari",
+                        provider="claude",
+                        primary=lambda: call_claude_api(
+                            system=mari_prompt["system"],
+                            user=mari_prompt["user"],
+                            images=None,
+                            max_retries=2,
+                            model=settings.AI_CLAUDE_MARI_MODEL,  # Haiku 4.5 (고품질 텍스트 변환)
+                            stage="mari",
+                            deadline=deadline,
+                            deadline_reserve=settings.DEADLINE_RESERVE_SECONDS
+                        ),
+                        is_valid=lambda text: bool(text and text.strip())
+                    )
+                logger.info("2차 AI 변환 성공 (Sonnet 4.5)!")
+                progress.finish("mari")
+
+        except Exception as e:
+            # 2차 AI 실패 시: 로컬 렌더러 (그마저 실패하면 간단한 템플릿 변환)
+            logger.error(f"===== 2차 AI 실패 - 로컬 렌더러 폴백 =====")
+            logger.error(f"Error: {str(e)}")
+            logger.error(f"Error type: {type(e).__name__}")
+            logger.error(f"Full traceback:", exc_info=True)
+            try:
+                mari_story = render_mari_story(
+                    raw_json,
+                    dog_name=dog_name,
+                    dog_age=dog_age,
+                    hardest_part=hardest_part,
+                    main_concerns=main_concerns
+                )
+                final_text = format_mari_story_markdown(mari_story)
+            except Exception as render_error:
+                logger.error(f"로컬 렌더러 실패, simple_template_conversion 사용: {str(render_error)}")
+                mari_story = None
+                final_text = simple_template_conversion(raw_json, dog_name, dog_age)
+            progress.finish("mari", status="fallback")
+
+        progress.complete()
+
+        # 결과 반환
+        return {
+            "final_text": final_text,
+            "confidence_score": raw_json.get("confidence_score", 0.5),
+            "raw_json": raw_json,
+            "mari_story": mari_story
+        }
 
-    # 결과 반환
-    return {
-        "final_text": final_text,
-        "confidence_score": raw_json.get("confidence_score", 0.5),
-        "raw_json": raw_json
-    }
+    except asyncio.CancelledError:
+        final_status = "cancelled"
+        raise
+    except Exception as unexpected:
+        final_status = "error"
+        tracker.set_status("error", str(unexpected))
+        raise
+    finally:
+        # 예외/취소로 끝나도 활성 tracker를 해제하고 performance.log에 기록
+        tracker.add_metadata(circuit_breakers=get_breaker_snapshot())
+        tracker.finish(final_status)
 
 
 # ===== 폴백: 간단한 템플릿 변환 =====
@@ -437,7 +673,7 @@ def simple_template_conversion(raw_json: dict, dog_name: str, dog_age: str) -> s
 """
 
     for g in guidance[:3]:
-        text += f"- {g.get('principle', '원칙')}: {g.get('action', '행동')}\n"
+        text += f"- {g.get('principle', '원칙')}: {g.get('content', '')}\n"
 
     text += f"""
 
@@ -4,13 +4,61 @@
 작성일: 2025-01-26
 """
 
-from typing import Callable
+from typing import Callable, Optional
 from config.settings import settings
+from src.ai.circuit_breaker import get_breaker
+from src.ai.circuit_breaker import logger as breaker_logger
 
+# 장애 시 전환할 다른 provider
+_ALTERNATE_PROVIDER = {"gpt": "claude", "claude": "gpt"}
 
-def get_analyzer() -> Callable:
+
+def is_provider_available(provider: str) -> bool:
+    """
+    provider의 텍스트 모델 circuit breaker가 새 작업을 받을 수 있는지 확인합니다.
+
+    Args:
+        provider: "gpt" 또는 "claude"
+
+    Returns:
+        bool: closed이거나, open 대기 시간이 지나 probe를 보낼 수 있으면 True
     """
-    설정(AI_MODEL_PROVIDER)에 따라 적절한 analyzer 함수를 반환합니다.
+    if provider == "gpt":
+        return get_breaker("openai", settings.AI_TEXT_MODEL).is_available()
+    if provider == "claude":
+        return get_breaker("anthropic", settings.AI_CLAUDE_EXPERT_MODEL).is_available()
+    return True
+
+
+def select_provider() -> str:
+    """
+    새 분석 작업에 사용할 provider를 고릅니다.
+
+    설정된 AI_MODEL_PROVIDER의 circuit이 열려 있고 다른 provider가 정상이면 그쪽으로 보냅니다
+    (ANALYZER_FAILOVER_ENABLED). open 대기 시간이 지나면 다시 원래 provider로 보내
+    half-open probe가 circuit을 복구하도록 합니다.
+
+    Returns:
+        str: "gpt" 또는 "claude"
+    """
+    provider = settings.AI_MODEL_PROVIDER.lower()
+    if not settings.ANALYZER_FAILOVER_ENABLED or provider not in _ALTERNATE_PROVIDER:
+        return provider
+
+    if not is_provider_available(provider):
+        alternate = _ALTERNATE_PROVIDER[provider]
+        if is_provider_available(alternate):
+            breaker_logger.warning(f"{provider} circuit open - 새 분석 작업을 {alternate}로 전환합니다.")
+            return alternate
+    return provider
+
+
+def get_analyzer(provider: Optional[str] = None) -> Callable:
+    """
+    설정(AI_MODEL_PROVIDER)과 provider 상태(circuit breaker)에 따라 적절한 analyzer 함수를 반환합니다.
+
+    Args:
+        provider: 이미 고른 provider (기본: select_provider())
 
     Returns:
         Callable: analyze_two_stage 함수
@@ -18,7 +66,8 @@ def get_analyzer() -> Callable:
     Raises:
         ValueError: 지원하지 않는 AI_MODEL_PROVIDER 값일 때
     """
-    provider = settings.AI_MODEL_PROVIDER.lower()
+    if provider is None:
+        provider = select_provider()
 
     if provider == "gpt":
         # GPT-5 Responses API 사용
@@ -41,7 +90,7 @@ def get_analyzer_name() -> str:
     Returns:
         str: "Claude Sonnet 4.5" 또는 "GPT-5 Responses"
     """
-    provider = settings.AI_MODEL_PROVIDER.lower()
+    provider = select_provider()
 
     if provider == "gpt":
         return "GPT-5 Responses"
@@ -7,30 +7,58 @@
 
 import json
 import re
+import time
 import asyncio
 import logging
-import contextlib
-from typing import Dict, Optional, Any
-from openai import OpenAI, APIError
+from typing import Callable, Dict, Optional, Any
+from openai import APIError
 
 from config.settings import settings
 from src.ai.prompt_builder_gpt import (
+    EXPERT_PROMPT_VERSION,
     build_expert_analysis_prompt,
+    build_fused_analysis_prompt,
     build_mari_conversion_prompt,
+    structure_survey_responses,
+)
+from src.ai.circuit_breaker import CircuitOpenError, get_breaker, get_breaker_snapshot
+from src.ai.client_registry import get_openai_client
+from src.ai.expert_cache import (
+    build_expert_cache_key,
+    get_expert_cache_stats,
+    get_or_compute_expert,
 )
 from src.ai.gpt4_vision import (
-    analyze_dog_image_with_gpt4,
     get_fallback_vision_analysis,
+    run_vision_stage,
+)
+from src.ai.effort_controller import choose_effort, get_reasoning_effort_ladder
+from src.ai.hedging import hedged_call
+from src.ai.json_repair import (
+    is_expert_json_usable,
+    loads_or_salvage,
+    record_remote_fix,
+    repair_expert_json,
+    repair_mari_json,
 )
+from src.ai.json_stream import parse_partial_json
+from src.ai.mari_renderer import format_mari_story_markdown, render_mari_story, should_render_locally
+from src.ai.progress import FUSED_PLAN, TWO_STAGE_PLAN, ProgressReporter, mari_completion
+from src.ai.rag_search import get_rag_version
+from src.ai.retry import run_with_retry
+from src.ai.semantic_cache import find_similar_analysis, remember_analysis
 from src.ai.schemas import (
     EXPERT_ANALYSIS_SCHEMA,
+    FUSED_ANALYSIS_SCHEMA,
     MARI_NARRATIVE_SCHEMA,
     normalize_expert_json,
     validate_expert_json,
+    validate_mari_json,
 )
 from src.utils.mock_data import get_mock_result_by_problem
 from src.utils.paths import get_runtime_logs_dir
-from src.utils.perf import PerformanceTracker
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.perf import PerformanceTracker, get_active_tracker, record_token_usage
 
 
 # ===== 로깅 설정 =====
@@ -64,6 +92,53 @@ logger = setup_logger()
 
 # ===== GPT-5 Responses API 호출 (JSON Schema 강제 + verbosity + reasoning_effort) =====
 
+async def _create_response(client: Any, base_args: Dict[str, Any]) -> tuple[Any, str]:
+    """Responses API를 한 번에 호출합니다 (반환 형식은 _stream_response와 같음)."""
+    response = await client.responses.create(**base_args)
+    return response, response.output_text
+
+
+async def _stream_response(
+    client: Any,
+    base_args: Dict[str, Any],
+    on_text: Callable[[str], None]
+) -> tuple[Any, str]:
+    """
+    Responses API를 스트리밍으로 호출합니다.
+
+    텍스트 조각이 도착할 때마다 지금까지 누적된 전체 텍스트를 on_text로 전달합니다.
+
+    Args:
+        client: AsyncOpenAI 클라이언트
+        base_args: responses.create 인자
+        on_text: 누적 텍스트 콜백
+
+    Returns:
+        tuple: (최종 response 객체 또는 None, 전체 응답 텍스트)
+
+    Raises:
+        Exception: 스트림이 실패 이벤트로 끝났을 때
+    """
+    chunks: list[str] = []
+    final_response = None
+
+    stream = await client.responses.create(**base_args, stream=True)
+    async with stream:
+        async for event in stream:
+            if event.type == "response.output_text.delta":
+                chunks.append(event.delta)
+                on_text("".join(chunks))
+            elif event.type == "response.completed":
+                final_response = event.response
+            elif event.type in ("response.failed", "response.incomplete", "error"):
+                raise Exception(f"GPT-5 스트리밍 실패 (event={event.type})")
+
+    response_text = "".join(chunks)
+    if final_response is not None and final_response.output_text:
+        response_text = final_response.output_text
+    return final_response, response_text
+
+
 async def call_gpt5_api(
     system: str,
     user: str,
@@ -73,11 +148,29 @@ async def call_gpt5_api(
     json_schema: Optional[Dict[str, Any]] = None,
     temperature: float = 0.7,
     verbosity: str = "medium",
-    reasoning_effort: str = "medium"
+    reasoning_effort: str = "medium",
+    on_text: Optional[Callable[[str], None]] = None,
+    prompt_cache_key: Optional[str] = None,
+    stage: str = "gpt",
+    deadline: Optional[Deadline] = None,
+    deadline_reserve: float = 0.0
 ) -> str:
+    """
+    GPT-5 Responses API를 호출합니다 (재시도 로직 포함).
+
+    on_text가 주어지면 스트리밍 모드로 호출하고, 응답 텍스트가 도착할 때마다
+    누적 텍스트를 콜백으로 전달합니다. 반환값은 스트리밍 여부와 관계없이 전체 텍스트입니다.
+    prompt_cache_key는 같은 고정 prefix의 요청을 같은 캐시로 라우팅하는 힌트이며,
+    토큰 사용량(캐시 hit 토큰 포함)은 stage 이름으로 활성 PerformanceTracker에 기록됩니다.
+    재시도는 공용 재시도 엔진(run_with_retry)이 오류 분류/Retry-After/재시도 예산에 따라 결정합니다.
+    deadline이 주어지면 각 시도와 재시도 대기가 (남은 예산 - deadline_reserve) 안에서만 실행되고,
+    예산이 부족하면 재시도 없이 DeadlineExceeded를 발생시킵니다.
+    """
     if model is None:
         model = settings.AI_TEXT_MODEL
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    # 비동기 공유 클라이언트: keep-alive 풀을 재사용하고, 여러 세션의 호출이 루프에서 겹쳐 실행됨
+    client = get_openai_client(model)
+    breaker = get_breaker("openai", model)
 
     reasoning_prefixes = ("gpt-5", "o1", "o3")
     is_reasoning_model = model.startswith(reasoning_prefixes)
@@ -88,94 +181,115 @@ async def call_gpt5_api(
     logger.debug(f"System prompt 길이: {len(system)} chars")
     logger.debug(f"User prompt 길이: {len(user)} chars")
 
-    for attempt in range(max_retries + 1):
-        try:
-            logger.debug(f"API 호출 시도 {attempt + 1}/{max_retries + 1}")
-
-            input_messages = [
-                {"role": "system", "content": system},
-                {"role": "user", "content": user}
-            ]
-
-            base_args: dict[str, Any] = {
-                "model": model,
-                "input": input_messages,
-                "max_output_tokens": 8192,
-                "reasoning": {"effort": reasoning_effort},
+    async def attempt_call(attempt: int) -> str:
+        logger.debug(f"API 호출 시도 {attempt + 1}/{max_retries + 1}")
+
+        input_messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user}
+        ]
+
+        base_args: dict[str, Any] = {
+            "model": model,
+            "input": input_messages,
+            "max_output_tokens": 8192,
+            "reasoning": {"effort": reasoning_effort},
+        }
+        if (not is_reasoning_model) and (temperature is not None):
+            base_args["temperature"] = temperature
+        if prompt_cache_key and settings.PROMPT_CACHE_LAYOUT:
+            base_args["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+
+        if use_json_schema and json_schema:
+            schema_name = (
+                json_schema.get("name")
+                or json_schema.get("title")
+                or "structured_output"
+            )
+            schema_body = json_schema.get("schema", json_schema)
+            base_args["text"] = {
+                "verbosity": verbosity,
+                "format": {
+                    "type": "json_schema",
+                    "name": schema_name,
+                    "schema": schema_body,
+                    "strict": json_schema.get("strict", True),
+                },
             }
-            if (not is_reasoning_model) and (temperature is not None):
-                base_args["temperature"] = temperature
-
-            if use_json_schema and json_schema:
-                schema_name = (
-                    json_schema.get("name")
-                    or json_schema.get("title")
-                    or "structured_output"
-                )
-                schema_body = json_schema.get("schema", json_schema)
-                base_args["text"] = {
-                    "verbosity": verbosity,
-                    "format": {
-                        "type": "json_schema",
-                        "name": schema_name,
-                        "schema": schema_body,
-                        "strict": json_schema.get("strict", True),
-                    },
-                }
-                response = client.responses.create(**base_args)
-                response_text = response.output_text
+        else:
+            base_args["text"] = {
+                "verbosity": verbosity,
+            }
+
+        # 장애 중이면 재시도 없이 즉시 CircuitOpenError (호출부 폴백으로 바로 진행)
+        generation = breaker.acquire()
+        attempt_started = time.perf_counter()
+        try:
+            if on_text is not None:
+                request = _stream_response(client, base_args, on_text)
             else:
-                base_args["text"] = {
-                    "verbosity": verbosity,
-                }
-                response = client.responses.create(**base_args)
-                response_text = response.output_text
-
-            logger.info(f"GPT-5 API 호출 성공 (응답 길이: {len(response_text)} chars)")
-
-            if hasattr(response, "usage") and response.usage is not None:
-                try:
-                    logger.info(
-                        "토큰 사용량: prompt=%s, completion=%s, total=%s",
-                        getattr(response.usage, "prompt_tokens", None),
-                        getattr(response.usage, "completion_tokens", None),
-                        getattr(response.usage, "total_tokens", None),
-                    )
-                except Exception:
-                    pass
-
-            return response_text
-
-        except APIError as e:
-            logger.error(f"OpenAI API 오류 (시도 {attempt + 1}/{max_retries + 1}): {str(e)}")
-            if attempt < max_retries:
-                wait_time = (2 ** attempt) * 0.5
-                logger.warning(f"{wait_time}초 후 재시도...")
-                await asyncio.sleep(wait_time)
-                continue
+                request = _create_response(client, base_args)
+            if deadline is not None:
+                response, response_text = await deadline.run(request, reserve=deadline_reserve, what=f"GPT-5 {stage}")
             else:
-                error_msg = f"GPT-5 API 호출 실패 (시도 {max_retries + 1}회): {str(e)}"
-                logger.critical(error_msg)
-                raise Exception(error_msg)
+                response, response_text = await request
+        except (asyncio.CancelledError, DeadlineExceeded):
+            breaker.release(generation)
+            raise
+        except Exception as exc:
+            breaker.record_error(exc, time.perf_counter() - attempt_started, generation)
+            raise
+        breaker.record(True, time.perf_counter() - attempt_started, generation)
+
+        logger.info(f"GPT-5 API 호출 성공 (응답 길이: {len(response_text)} chars)")
+
+        if hasattr(response, "usage") and response.usage is not None:
+            try:
+                usage = response.usage
+                input_details = getattr(usage, "input_tokens_details", None)
+                cached_tokens = getattr(input_details, "cached_tokens", None)
+                logger.info(
+                    "토큰 사용량 (%s): input=%s (cached=%s), output=%s, total=%s",
+                    stage,
+                    getattr(usage, "input_tokens", None),
+                    cached_tokens,
+                    getattr(usage, "output_tokens", None),
+                    getattr(usage, "total_tokens", None),
+                )
+                record_token_usage(
+                    stage,
+                    input_tokens=getattr(usage, "input_tokens", None),
+                    cached_tokens=cached_tokens,
+                    output_tokens=getattr(usage, "output_tokens", None),
+                )
+            except Exception:
+                pass
 
-        except Exception as e:
-            logger.error(f"예기치 않은 오류 (시도 {attempt + 1}/{max_retries + 1}): {str(e)}")
-            if attempt < max_retries:
-                wait_time = (2 ** attempt) * 0.5
-                logger.warning(f"{wait_time}초 후 재시도...")
-                await asyncio.sleep(wait_time)
-                continue
-            else:
-                error_msg = f"예기치 않은 오류: {str(e)}"
-                logger.critical(error_msg)
-                raise Exception(error_msg)
+        return response_text
+
+    try:
+        return await run_with_retry(
+            stage, attempt_call, max_retries,
+            deadline=deadline, deadline_reserve=deadline_reserve, description=f"GPT-5 {stage}"
+        )
+    except (DeadlineExceeded, CircuitOpenError) as e:
+        logger.error(f"GPT-5 호출 중단 ({stage}): {str(e)}")
+        raise
+    except APIError as e:
+        error_msg = f"GPT-5 API 호출 실패 ({stage}): {str(e)}"
+        logger.critical(error_msg)
+        raise Exception(error_msg) from e
+    except Exception as e:
+        error_msg = f"예기치 않은 오류: {str(e)}"
+        logger.critical(error_msg)
+        raise Exception(error_msg) from e
 
 
 # ===== JSON 파싱 및 검증 =====
 
 def parse_json_response(response: str) -> dict:
     """
-    AI 응답에서 JSON을 파싱합니다.
+    AI 응답에서 JSON을 파싱합니다 (잘린 응답은 가능한 만큼 복원).
 
     Args:
         response: AI 응답 텍스트
@@ -186,11 +300,8 @@ def parse_json_response(response: str) -> dict:
     Raises:
         ValueError: JSON 파싱 실패
     """
-    try:
-        result = json.loads(response)
-        return result
-    except json.JSONDecodeError as e:
-        raise ValueError(f"JSON 파싱 실패: {str(e)}")
+    # 잘리거나 설명문/코드 블록으로 감싸진 응답은 로컬에서 복원
+    return loads_or_salvage(response)
 
 
 # ===== Self-Healing: 수정 프롬프트 =====
@@ -198,7 +309,8 @@ def parse_json_response(response: str) -> dict:
 async def fix_json_with_prompt(
     broken_json: dict,
     error_message: str,
-    original_prompt: str
+    original_prompt: str,
+    deadline: Optional[Deadline] = None
 ) -> dict:
     """
     JSON이 스키마를 위반한 경우, GPT-5에게 수정을 요청합니다.
@@ -207,6 +319,7 @@ async def fix_json_with_prompt(
         broken_json: 문제가 있는 JSON
         error_message: 검증 실패 메시지
         original_prompt: 원래 프롬프트 (컨텍스트)
+        deadline: 요청 단위 시간 예산 (Optional)
 
     Returns:
         dict: 수정된 JSON
@@ -245,7 +358,10 @@ async def fix_json_with_prompt(
             json_schema=EXPERT_ANALYSIS_SCHEMA,
             temperature=0.3,
             verbosity="low",  # 수정은 간결하게
-            reasoning_effort="medium"  # 중간 추론
+            reasoning_effort="medium",  # 중간 추론
+            stage="json_fix",
+            deadline=deadline,
+            deadline_reserve=settings.DEADLINE_RESERVE_SECONDS
         )
 
         fixed_json = parse_json_response(fixed_response)
@@ -257,20 +373,326 @@ async def fix_json_with_prompt(
         raise
 
 
+# ===== 마리 스트리밍: 부분 결과 전달 =====
+
+def build_mari_partial_emitter(
+    on_partial: Callable[[dict], None],
+    tracker: PerformanceTracker,
+    section: Optional[str] = None,
+    progress: Optional[ProgressReporter] = None,
+    stage: str = "mari"
+) -> Callable[[str], None]:
+    """
+    스트리밍 중인 마리 JSON 텍스트를 부분 mari_story로 변환해 전달하는 콜백을 만듭니다.
+
+    파싱 비용을 줄이기 위해 MARI_STREAM_EMIT_INTERVAL_SECONDS 간격으로만 전달하며,
+    첫 전달 시점(time-to-first-content)을 tracker에 기록합니다.
+
+    Args:
+        on_partial: 부분 결과 콜백 ({"mari_story": dict})
+        tracker: 성능 계측 객체
+        section: 마리 내러티브가 하위 키에 있을 때 그 키 (fused 모드: "mari_narrative")
+        progress: 진행 이벤트 객체 (Optional, 채워진 마리 항목 비율을 stage 진행률로 전달)
+        stage: 진행 이벤트 단계명 ("mari" / "fused")
+
+    Returns:
+        Callable[[str], None]: call_gpt5_api의 on_text 콜백
+    """
+    state = {"last_emit": 0.0, "first_sent": False}
+
+    def _emit(text: str) -> None:
+        now = time.perf_counter()
+        if now - state["last_emit"] < settings.MARI_STREAM_EMIT_INTERVAL_SECONDS:
+            return
+        state["last_emit"] = now
+
+        partial = parse_partial_json(text)
+        if section is not None and isinstance(partial, dict):
+            partial = partial.get(section)
+        if not isinstance(partial, dict) or not partial.get("header"):
+            return
+
+        if not state["first_sent"]:
+            state["first_sent"] = True
+            tracker.mark_event("mari_first_content", tracker.elapsed())
+        if progress is not None:
+            progress.stream(stage, mari_completion(partial))
+        try:
+            on_partial({"mari_story": partial})
+        except Exception as e:
+            logger.warning(f"부분 결과 전달 실패 (무시): {str(e)}")
+
+    return _emit
+
+
+# ===== 단일 호출(fused) 분석 =====
+
+def get_expert_model_settings() -> dict:
+    """
+    1차 AI(전문가 분석) GPT-5 기본 호출 설정 (effort 컨트롤러/Deadline 하향 적용 전).
+    """
+    return {
+        "model": settings.AI_TEXT_MODEL,
+        "temperature": settings.AI_TEXT_TEMPERATURE_EXPERT,
+        "verbosity": "medium",  # 중간 상세도
+        "reasoning_effort": "medium",  # 중간 추론 강도
+    }
+
+
+# 남은 시간이 부족할 때 낮춰 갈 단계 (앞쪽이 높은 설정, reasoning_effort는 모델별 목록 사용)
+VERBOSITY_LADDER = ("high", "medium", "low")
+
+
+def downgrade_for_deadline(
+    model_settings: dict,
+    deadline: Optional[Deadline],
+    full_seconds: float,
+    minimal_seconds: float
+) -> tuple[dict, str]:
+    """
+    남은 시간 예산에 맞춰 reasoning_effort/verbosity를 낮춥니다.
+
+    - 남은 시간 >= full_seconds: 그대로 ("full")
+    - minimal_seconds <= 남은 시간 < full_seconds: 한 단계씩 낮춤 ("reduced")
+    - 남은 시간 < minimal_seconds: 가장 낮은 단계 ("minimal")
+
+    reasoning_effort 단계는 model_settings["model"](없으면 AI_TEXT_MODEL)이 받는 값만 씁니다.
+
+    Args:
+        model_settings: call_gpt5_api에 넘길 설정 (reasoning_effort, verbosity 포함)
+        deadline: 요청 단위 시간 예산 (None이면 그대로 반환)
+        full_seconds: 원래 설정을 유지할 최소 남은 시간
+        minimal_seconds: 이보다 적게 남으면 가장 낮은 단계 사용
+
+    Returns:
+        tuple: (조정된 설정, "full" / "reduced" / "minimal")
+    """
+    if deadline is None or deadline.remaining() >= full_seconds:
+        return model_settings, "full"
+
+    level = "reduced" if deadline.remaining() >= minimal_seconds else "minimal"
+
+    def lower(value: str, ladder: tuple) -> str:
+        if level == "minimal" or value not in ladder:
+            return ladder[-1]
+        return ladder[min(ladder.index(value) + 1, len(ladder) - 1)]
+
+    downgraded = dict(model_settings)
+    effort_ladder = get_reasoning_effort_ladder(model_settings.get("model"))
+    downgraded["reasoning_effort"] = lower(model_settings.get("reasoning_effort", "medium"), effort_ladder)
+    downgraded["verbosity"] = lower(model_settings.get("verbosity", "medium"), VERBOSITY_LADDER)
+    return downgraded, level
+
+
+def resolve_expert_model_settings(deadline: Optional[Deadline] = None) -> dict:
+    """
+    이번 요청의 1차 AI 실제 호출 설정을 정합니다.
+
+    컨트롤러가 고른 effort/verbosity에 남은 시간에 따른 하향까지 적용한 결과이며,
+    전문가 분석 캐시 키도 이 설정으로 만들어 하향된 결과가 기본 설정 결과로 재사용되지 않게 합니다.
+
+    Args:
+        deadline: 요청 단위 시간 예산 (Optional)
+
+    Returns:
+        dict: call_gpt5_api에 넘길 모델 설정
+    """
+    base_settings = get_expert_model_settings()
+    effort_settings, effort_level = choose_effort(
+        "expert", {key: base_settings[key] for key in ("reasoning_effort", "verbosity")}, model=base_settings["model"]
+    )
+    model_settings, level = downgrade_for_deadline(
+        {**base_settings, **effort_settings},
+        deadline,
+        full_seconds=settings.DEADLINE_EXPERT_FULL_SECONDS,
+        minimal_seconds=settings.DEADLINE_EXPERT_MINIMAL_SECONDS
+    )
+    if level != "full":
+        logger.warning(f"남은 시간 부족으로 1차 AI 설정 하향 ({level}): {model_settings}")
+    tracker = get_active_tracker()
+    if tracker is not None:
+        tracker.mark_event("effort_level.expert", effort_level)
+        tracker.mark_event("expert_effort", level)
+    return model_settings
+
+
+async def call_expert_analysis(
+    responses: dict,
+    dog_photo: bytes,
+    behavior_media: Optional[bytes] = None,
+    vision_analysis: Optional[dict] = None,
+    expert_prompt: Optional[dict] = None,
+    deadline: Optional[Deadline] = None,
+    model_settings: Optional[dict] = None
+) -> dict:
+    """
+    1차 AI를 한 번 호출하고 JSON으로 파싱합니다 (Schema 검증/Self-Healing 전 단계).
+
+    hedged_call의 경쟁 요청으로도 쓰이며, Claude 분석기의 "alternate" hedge가 이 함수를 호출합니다.
+
+    Args:
+        responses: 설문 응답
+        dog_photo: 강아지 사진 바이트 데이터
+        behavior_media: 행동 영상/사진 (Optional)
+        vision_analysis: GPT-4 Vision 분석 결과 (Optional)
+        expert_prompt: 이미 만든 1차 프롬프트 (없으면 새로 생성)
+        deadline: 요청 단위 시간 예산 (Optional, 남은 시간에 따라 effort/verbosity 하향)
+        model_settings: resolve_expert_model_settings()로 이미 정한 호출 설정 (없으면 새로 결정)
+
+    Returns:
+        dict: 파싱된 1차 분석 JSON
+    """
+    if expert_prompt is None:
+        expert_prompt = build_expert_analysis_prompt(
+            responses=responses,
+            dog_photo=dog_photo,
+            behavior_media=behavior_media,
+            vision_analysis=vision_analysis
+        )
+
+    # 관측 지연/품질에 따라 컨트롤러가 고른 effort/verbosity → 남은 시간에 따라 추가 하향
+    if model_settings is None:
+        model_settings = resolve_expert_model_settings(deadline)
+
+    # GPT-5 Responses API 호출 (JSON Schema 강제)
+    logger.info("1차 AI GPT-5 API 호출 시작 (JSON Schema 강제)...")
+    raw_response = await call_gpt5_api(
+        system=expert_prompt["system"],
+        user=expert_prompt["user"],
+        max_retries=3,
+        use_json_schema=True,
+        json_schema=EXPERT_ANALYSIS_SCHEMA,
+        prompt_cache_key=expert_prompt["cache_key"],
+        stage="expert",
+        deadline=deadline,
+        deadline_reserve=settings.DEADLINE_RESERVE_SECONDS,
+        **model_settings
+    )
+
+    # JSON 파싱
+    logger.debug("1차 AI 응답 JSON 파싱 중...")
+    return parse_json_response(raw_response)
+
+
+async def run_fused_analysis(
+    responses: dict,
+    dog_photo: bytes,
+    behavior_media: Optional[bytes],
+    vision_analysis: Optional[dict],
+    tracker: PerformanceTracker,
+    on_partial: Optional[Callable[[dict], None]] = None,
+    deadline: Optional[Deadline] = None,
+    progress: Optional[ProgressReporter] = None
+) -> tuple[dict, dict]:
+    """
+    전문가 분석과 마리 내러티브를 GPT-5 1회 호출로 생성합니다 (ANALYSIS_MODE="fused").
+
+    전문가 섹션은 2단계 모드와 같은 Schema 검증/Normalize를 거치며, 검증에 실패하면
+    예외를 던져 호출부가 2단계 모드로 다시 시도하도록 합니다.
+
+    Args:
+        responses: 설문 응답
+        dog_photo: 강아지 사진 바이트
+        behavior_media: 행동 영상/사진 바이트 (Optional)
+        vision_analysis: GPT-4o Vision 결과 (Fallback 포함)
+        tracker: 성능 계측 객체
+        on_partial: 마리 섹션 스트리밍 부분 결과 콜백 (Optional)
+        deadline: 요청 단위 시간 예산 (Optional)
+        progress: 진행 이벤트 객체 (Optional)
+
+    Returns:
+        tuple: (전문가 분석 JSON, 마리 내러티브 JSON)
+
+    Raises:
+        Exception: API 호출 실패 또는 전문가 섹션 검증 실패 시
+    """
+    fused_prompt = build_fused_analysis_prompt(
+        responses=responses,
+        dog_photo=dog_photo,
+        behavior_media=behavior_media,
+        vision_analysis=vision_analysis
+    )
+    tracker.add_metadata(rag_references=fused_prompt["references"])
+
+    stream_callback = None
+    if on_partial is not None and settings.MARI_STREAMING_ENABLED:
+        stream_callback = build_mari_partial_emitter(
+            on_partial, tracker, section="mari_narrative", progress=progress, stage="fused"
+        )
+
+    # 전문가 분석이 주 비용이므로 "expert" 단계 컨트롤러 레벨을 따름 (fused 지연은 컨트롤러 표본에서 제외)
+    effort_settings, effort_level = choose_effort("expert", {"reasoning_effort": "medium", "verbosity": "medium"})
+    model_settings, level = downgrade_for_deadline(
+        effort_settings,
+        deadline,
+        full_seconds=settings.DEADLINE_EXPERT_FULL_SECONDS,
+        minimal_seconds=settings.DEADLINE_EXPERT_MINIMAL_SECONDS
+    )
+    tracker.mark_event("effort_level.fused", effort_level)
+    tracker.mark_event("fused_effort", level)
+
+    logger.info(f"단일 호출 분석 GPT-5 API 호출 시작 (JSON Schema, streaming={stream_callback is not None})...")
+    fused_str = await call_gpt5_api(
+        system=fused_prompt["system"],
+        user=fused_prompt["user"],
+        max_retries=2,
+        model=settings.AI_TEXT_MODEL,
+        use_json_schema=True,
+        json_schema=FUSED_ANALYSIS_SCHEMA,
+        temperature=settings.AI_TEXT_TEMPERATURE_EXPERT,
+        on_text=stream_callback,
+        prompt_cache_key=fused_prompt["cache_key"],
+        stage="fused",
+        deadline=deadline,
+        deadline_reserve=settings.DEADLINE_RESERVE_SECONDS,
+        **model_settings
+    )
+    fused = parse_json_response(fused_str)
+
+    raw_json = fused.get("expert_analysis") or {}
+    mari_story = fused.get("mari_narrative")
+    is_valid, error_msg = validate_expert_json(raw_json)
+    if not is_valid:
+        # normalize를 먼저 하면 기본 솔루션/가이던스가 채워져 대부분 비어 있는 섹션도 복구 대상이 되므로
+        # 로컬 복구(배열 길이 보정 포함)만 적용하고, 복구할 수 없으면 2단계 분석으로 넘김
+        raw_json, is_valid, error_msg = repair_expert_json(raw_json)
+    if isinstance(mari_story, dict) and not validate_mari_json(mari_story)[0]:
+        mari_story = repair_mari_json(mari_story)[0]
+    if not is_valid or not isinstance(mari_story, dict):
+        raise ValueError(f"단일 호출 결과 검증 실패: {error_msg or 'mari_narrative 누락'}")
+
+    if settings.SEMANTIC_CACHE_ENABLED:
+        await asyncio.to_thread(
+            remember_analysis, structure_survey_responses(responses), vision_analysis, raw_json, provider="gpt"
+        )
+    return raw_json, mari_story
+
+
 # ===== 2단계 AI 분석 메인 함수 =====
 
 async def analyze_two_stage(
     responses: dict,
     dog_photo: bytes,
-    behavior_media: Optional[bytes] = None
+    behavior_media: Optional[bytes] = None,
+    on_partial: Optional[Callable[[dict], None]] = None,
+    deadline: Optional[Deadline] = None,
+    on_progress: Optional[Callable[[dict], None]] = None
 ) -> dict:
     """
     2단계 AI 분석을 실행합니다 (GPT-5 Responses API, JSON Schema, Self-Healing).
 
+    ANALYSIS_MODE="fused"면 전문가 분석 + 마리 변환을 1회 호출로 먼저 시도하고,
+    실패하면 기존 2단계 흐름으로 이어갑니다. 반환 형식은 두 모드가 같습니다.
+
     Args:
         responses: st.session_state.responses (설문 응답)
         dog_photo: 강아지 사진 바이트
         behavior_media: 행동 영상/사진 바이트 (Optional)
+        on_partial: 마리 변환 스트리밍 중 부분 결과 콜백 (Optional)
+        deadline: 요청 단위 시간 예산 (Optional, 없으면 ANALYSIS_HARD_SLA_SECONDS로 생성).
+            남은 시간에 따라 각 단계가 effort/verbosity를 낮추고, 부족하면 폴백으로 넘어갑니다.
+        on_progress: 단계 진행 이벤트 콜백 (Optional, ProgressReporter 스냅샷 dict:
+            vision 시작/완료/폴백, expert 완료/self-heal, mari 스트리밍 진행률 등)
 
     Returns:
         dict: {
@@ -279,6 +701,9 @@ async def analyze_two_stage(
             "raw_json": dict
         }
     """
+    if deadline is None:
+        deadline = Deadline(settings.ANALYSIS_HARD_SLA_SECONDS)
+
     dog_name = responses.get("dog_name", "강아지")
     dog_age = responses.get("dog_birth", "알 수 없음")
     hardest_part = responses.get("hardest_part", "알 수 없음")
@@ -286,120 +711,215 @@ async def analyze_two_stage(
 
     tracker = PerformanceTracker(
         name="analyze_two_stage",
-        metadata={"dog_name": dog_name, "app_env": settings.APP_ENV, "main_concerns": main_concerns}
+        metadata={
+            "dog_name": dog_name,
+            "app_env": settings.APP_ENV,
+            "main_concerns": main_concerns,
+            "analysis_mode": settings.ANALYSIS_MODE,
+            "hard_sla_seconds": deadline.budget_seconds,
+        }
     )
+    tracker.activate()  # 하위 API 호출의 토큰 사용량(프롬프트 캐시 hit 포함)을 이 tracker에 기록
     final_status = "success"
     vision_fallback_used = False
     expert_mock_used = False
     mari_template_used = False
+    use_fused = settings.ANALYSIS_MODE == "fused" and settings.MARI_RENDER_MODE != "local"
+    progress = ProgressReporter(on_progress, plan=FUSED_PLAN if use_fused else TWO_STAGE_PLAN)
 
     try:
         # ===== 0단계: GPT-4o Vision 이미지 전처리 =====
         logger.info(f"=== GPT-4o Vision 이미지 전처리 시작 (강아지: {dog_name}) ===")
+        progress.start("vision")
 
         vision_analysis = None
-        vision_task = asyncio.create_task(
-            analyze_dog_image_with_gpt4(
-                image_bytes=dog_photo,
-                max_retries=2
-            )
-        )
         try:
             with tracker.span("vision_analysis"):
-                vision_analysis = await asyncio.wait_for(
-                    vision_task,
-                    timeout=settings.VISION_TIMEOUT_SECONDS
+                # 캐시 → 업로드 시점 선행 분석 → 새 분석 순으로 재사용
+                vision_analysis = await run_vision_stage(
+                    image_bytes=dog_photo,
+                    timeout=deadline.cap(settings.VISION_TIMEOUT_SECONDS, reserve=settings.DEADLINE_RESERVE_SECONDS),
+                    tracker=tracker
                 )
             logger.info("GPT-4o Vision 이미지 분석 성공!")
+            progress.finish("vision")
 
         except asyncio.TimeoutError:
             vision_fallback_used = True
             logger.warning("GPT-4o Vision 분석이 지연되어 Fallback으로 전환합니다.")
-            vision_task.cancel()
-            with contextlib.suppress(Exception):
-                await vision_task
             vision_analysis = get_fallback_vision_analysis(dog_name=dog_name)
+            progress.finish("vision", status="fallback", detail="사진 분석이 늦어져 기본 분석으로 진행해요")
 
         except Exception as e:
             vision_fallback_used = True
             logger.error(f"GPT-4o Vision 실패, Fallback 사용: {str(e)}")
             vision_analysis = get_fallback_vision_analysis(dog_name=dog_name)
+            progress.finish("vision", status="fallback", detail="사진 분석 대신 기본 분석으로 진행해요")
 
         tracker.mark_event("vision_fallback", vision_fallback_used)
 
+        # ===== 단일 호출 모드: 전문가 분석 + 마리 변환을 한 번에 (실패 시 2단계로 재시도) =====
+        if use_fused:
+            logger.info(f"=== 단일 호출 분석 시작 (강아지: {dog_name}) ===")
+            progress.start("fused")
+            try:
+                with tracker.span("fused_analysis"):
+                    raw_json, mari_story = await run_fused_analysis(
+                        responses=responses,
+                        dog_photo=dog_photo,
+                        behavior_media=behavior_media,
+                        vision_analysis=vision_analysis,
+                        tracker=tracker,
+                        on_partial=on_partial,
+                        deadline=deadline,
+                        progress=progress
+                    )
+                    final_text = format_mari_story_markdown(mari_story)
+                logger.info("단일 호출 분석 성공!")
+                progress.finish("fused")
+                progress.complete()
+                return {
+                    "final_text": final_text,
+                    "confidence_score": raw_json.get("confidence_score", 0.5),
+                    "raw_json": raw_json,
+                    "mari_story": mari_story
+                }
+            except Exception as e:
+                logger.error(f"단일 호출 분석 실패, 2단계 분석으로 전환: {str(e)}", exc_info=True)
+                tracker.mark_event("fused_fallback", str(e)[:200])
+                progress.replan(TWO_STAGE_PLAN)
+
         # ===== 1차 AI: 전문가 분석 (GPT-5, JSON Schema 강제) =====
         logger.info(f"=== 1차 AI 분석 시작 (GPT-5 + JSON Schema, 강아지: {dog_name}) ===")
+        progress.start("expert")
 
         raw_json = None
-        try:
-            with tracker.span("expert_analysis"):
-                # 프롬프트 생성
-                logger.debug("1차 AI 프롬프트 생성 중...")
-                expert_prompt = build_expert_analysis_prompt(
-                    responses=responses,
-                    dog_photo=dog_photo,
-                    behavior_media=behavior_media,
-                    vision_analysis=vision_analysis
+        expert_prompt = None
+        # 1차 AI 실제 호출 설정 (캐시 키에도 포함, 프롬프트 생성 직후 결정)
+        expert_model_settings = None
+
+        structured_survey = structure_survey_responses(responses)
+
+        async def compute_expert_analysis():
+            """1차 AI 호출 + Self-Healing, (결과, Schema 검증 통과 여부)를 반환"""
+            # 거의 같은 과거 사례가 있으면 GPT-5 호출 없이 재사용
+            if settings.SEMANTIC_CACHE_ENABLED:
+                # SQLite 조회 + 행렬곱이 이벤트 루프를 막지 않도록 스레드에서 실행
+                similar = await asyncio.to_thread(find_similar_analysis, structured_survey, vision_analysis)
+                tracker.mark_event("semantic_cache", round(similar[1], 4) if similar else "miss")
+                if similar is not None:
+                    return similar[0], True
+
+            async def call_expert():
+                return await call_expert_analysis(
+                    responses, dog_photo, behavior_media, vision_analysis,
+                    expert_prompt=expert_prompt, deadline=deadline, model_settings=expert_model_settings
                 )
 
-                # GPT-5 Responses API 호출 (JSON Schema 강제)
-                logger.info("1차 AI GPT-5 API 호출 시작 (JSON Schema 강제)...")
-                raw_response = await call_gpt5_api(
-                    system=expert_prompt["system"],
-                    user=expert_prompt["user"],
-                    max_retries=3,
-                    model=settings.AI_TEXT_MODEL,
-                    use_json_schema=True,
-                    json_schema=EXPERT_ANALYSIS_SCHEMA,
-                    temperature=settings.AI_TEXT_TEMPERATURE_EXPERT,
-                    verbosity="medium",  # 중간 상세도
-                    reasoning_effort="medium"  # 중간 추론 강도
+            async def call_expert_claude():
+                # hedge 정책 "alternate": 같은 입력으로 Claude 1차 분석을 경쟁시킴
+                from src.ai.analyzer_claude import call_expert_analysis as call_claude_expert_analysis
+                return await call_claude_expert_analysis(
+                    responses, dog_photo, behavior_media, vision_analysis, deadline=deadline
                 )
 
-                # JSON 파싱
-                logger.debug("1차 AI 응답 JSON 파싱 중...")
-                raw_json = parse_json_response(raw_response)
-
-                # ===== Self-Healing: Schema 검증 =====
-                is_valid, error_msg = validate_expert_json(raw_json)
+            # p90 안에 응답이 없으면 중복 요청을 보내고, Schema 검증(로컬 복구 포함)을 먼저 통과한 결과를 사용
+            raw_json = await hedged_call(
+                stage="expert",
+                provider="gpt",
+                primary=call_expert,
+                alternate=call_expert_claude,
+                is_valid=is_expert_json_usable
+            )
 
-                if not is_valid:
-                    logger.warning(f"Schema 검증 실패: {error_msg}")
-                    logger.info("=== Self-Healing 단계 1: Normalize 시도 ===")
+            # ===== Self-Healing: Schema 검증 =====
+            is_valid, error_msg = validate_expert_json(raw_json)
 
-                    # 1) Normalize (자동 보정)
-                    raw_json = normalize_expert_json(raw_json)
-                    logger.info("Normalize 완료")
+            if not is_valid:
+                logger.warning(f"Schema 검증 실패: {error_msg}")
+                logger.info("=== Self-Healing 단계 1: Normalize 시도 ===")
+                progress.note("self_heal", "분석 결과 형식을 다듬고 있어요")
 
-                    # 2) 재검증
-                    is_valid, error_msg = validate_expert_json(raw_json)
+                # 1) Normalize (자동 보정)
+                raw_json = normalize_expert_json(raw_json)
+                logger.info("Normalize 완료")
 
-                    if not is_valid:
-                        logger.warning(f"Normalize 후에도 검증 실패: {error_msg}")
-                        logger.info("=== Self-Healing 단계 2: 수정 프롬프트 시도 ===")
+                # 2) 재검증
+                is_valid, error_msg = validate_expert_json(raw_json)
 
-                        # 3) 수정 프롬프트
+                if not is_valid:
+                    logger.warning(f"Normalize 후에도 검증 실패: {error_msg}")
+                    logger.info("=== Self-Healing 단계 2: 스키마 기반 로컬 복구 ===")
+
+                    # 3) 로컬 복구 (타입 변환, 필수 키 채우기, 길이 절삭) - 성공하면 수정 프롬프트 생략
+                    repaired_json, is_valid, repair_error = repair_expert_json(raw_json)
+                    record_remote_fix(avoided=is_valid)
+
+                    if is_valid:
+                        logger.info("로컬 복구 성공 (수정 프롬프트 생략)")
+                        raw_json = repaired_json
+                    else:
+                        logger.warning(f"로컬 복구 후에도 검증 실패: {repair_error}")
+                        logger.info("=== Self-Healing 단계 3: 수정 프롬프트 시도 ===")
+                        progress.note("self_heal_remote", "분석 결과를 한 번 더 확인하고 있어요")
+
+                        # 4) 수정 프롬프트
                         try:
                             raw_json = await fix_json_with_prompt(
                                 broken_json=raw_json,
                                 error_message=error_msg,
-                                original_prompt=expert_prompt["user"]
+                                original_prompt=expert_prompt["user"],
+                                deadline=deadline
                             )
 
-                            # 4) 최종 검증
+                            # 5) 최종 검증
                             is_valid, error_msg = validate_expert_json(raw_json)
 
                             if not is_valid:
                                 logger.error(f"수정 프롬프트 후에도 검증 실패: {error_msg}")
-                                logger.warning("최종 Normalize 적용")
-                                raw_json = normalize_expert_json(raw_json)
+                                logger.warning("최종 로컬 복구 적용")
+                                raw_json, is_valid, _ = repair_expert_json(raw_json)
 
                         except Exception as fix_error:
                             logger.error(f"수정 프롬프트 실패: {str(fix_error)}")
-                            logger.warning("Normalize로 복구")
-                            raw_json = normalize_expert_json(raw_json)
+                            logger.warning("로컬 복구 결과 + Normalize 사용")
+                            raw_json = normalize_expert_json(repaired_json)
+
+            if is_valid and settings.SEMANTIC_CACHE_ENABLED:
+                await asyncio.to_thread(remember_analysis, structured_survey, vision_analysis, raw_json, provider="gpt")
+            return raw_json, is_valid
+
+        try:
+            with tracker.span("expert_analysis"):
+                # 프롬프트 생성
+                logger.debug("1차 AI 프롬프트 생성 중...")
+                expert_prompt = build_expert_analysis_prompt(
+                    responses=responses,
+                    dog_photo=dog_photo,
+                    behavior_media=behavior_media,
+                    vision_analysis=vision_analysis
+                )
+                tracker.add_metadata(rag_references=expert_prompt["references"])
+                expert_model_settings = resolve_expert_model_settings(deadline)
+
+                if settings.EXPERT_CACHE_ENABLED:
+                    # 같은 설문 + 같은 Vision 결과 + 같은 프롬프트/실제 호출 설정이면 캐시 재사용
+                    cache_key = build_expert_cache_key(
+                        provider="gpt",
+                        structured_survey=structured_survey,
+                        vision_analysis=vision_analysis,
+                        prompt_version=f"{EXPERT_PROMPT_VERSION}+{get_rag_version()}",
+                        system_prompt=expert_prompt["system"],
+                        model_settings={**expert_model_settings, "schema": EXPERT_ANALYSIS_SCHEMA["name"]}
+                    )
+                    raw_json, cache_source = await get_or_compute_expert(cache_key, compute_expert_analysis)
+                    tracker.mark_event("expert_cache", cache_source)
+                    tracker.add_metadata(expert_cache_stats=get_expert_cache_stats())
+                else:
+                    raw_json, _ = await compute_expert_analysis()
 
             logger.info("1차 AI 분석 및 검증 완료!")
+            progress.finish("expert")
 
         except Exception as e:
             expert_mock_used = True
@@ -417,58 +937,130 @@ async def analyze_two_stage(
                     "key_characteristics": ["정보 부족", "임시 응답", "재시도 권장"]
                 },
                 "solutions_best_fit": [
-                    {"title": "솔루션 1", "content": "기본 솔루션", "details": ["임시 응답"], "expected_outcome": "개선 기대"},
-                    {"title": "솔루션 2", "content": "기본 솔루션", "details": ["임시 응답"], "expected_outcome": "개선 기대"},
-                    {"title": "솔루션 3", "content": "기본 솔루션", "details": ["임시 응답"], "expected_outcome": "개선 기대"}
+                    {"title": "솔루션 1", "content": "기본 솔루션", "details": ["임시 응답"]},
+                    {"title": "솔루션 2", "content": "기본 솔루션", "details": ["임시 응답"]},
+                    {"title": "솔루션 3", "content": "기본 솔루션", "details": ["임시 응답"]}
                 ],
                 "future_guidance": [
-                    {"principle": "원칙 1", "content": "내용", "action": "행동"},
-                    {"principle": "원칙 2", "content": "내용", "action": "행동"},
-                    {"principle": "원칙 3", "content": "내용", "action": "행동"}
+                    {"principle": "원칙 1", "content": "내용"},
+                    {"principle": "원칙 2", "content": "내용"},
+                    {"principle": "원칙 3", "content": "내용"}
                 ],
                 "core_message": "일시적인 오류가 발생했습니다. 다시 시도해주세요.",
                 "confidence_score": 0.3
             }
+            progress.finish("expert", status="fallback")
 
         tracker.mark_event("expert_mock_fallback", expert_mock_used)
+        tracker.add_metadata(confidence_score=raw_json.get("confidence_score"))
 
         # ===== 2차 AI: 마리 페르소나 변환 (GPT-5, 자연어) =====
         logger.info(f"=== 2차 AI 변환 시작 (GPT-5, 강아지: {dog_name}) ===")
 
+        # 로컬 렌더러: MARI_RENDER_MODE="local"이거나, "auto"에서 앞 단계가 이미 오래 걸린 경우
+        # 남은 시간 예산이 LLM 변환에 부족해도 로컬 렌더러로 바로 전환
+        mari_local_render = (
+            should_render_locally(tracker.elapsed())
+            or deadline.remaining() < settings.DEADLINE_MARI_MIN_SECONDS
+        )
+        tracker.mark_event("mari_render", "local" if mari_local_render else "llm")
+        progress.start("mari")
+
         try:
-            with tracker.span("mari_conversion"):
-                mari_prompt = build_mari_conversion_prompt(
-                    raw_json=raw_json,
-                    dog_name=dog_name,
-                    dog_age=dog_age,
-                    hardest_part=hardest_part
-                )
+            if mari_local_render:
+                with tracker.span("mari_local_render"):
+                    mari_story = render_mari_story(
+                        raw_json,
+                        dog_name=dog_name,
+                        dog_age=dog_age,
+                        hardest_part=hardest_part,
+                        main_concerns=main_concerns
+                    )
+                    final_text = format_mari_story_markdown(mari_story)
+                logger.info("2차 변환 로컬 렌더링 완료 (LLM 호출 없음)")
+                progress.finish("mari", status="local")
+            else:
+                with tracker.span("mari_conversion"):
+                    mari_prompt = build_mari_conversion_prompt(
+                        raw_json=raw_json,
+                        dog_name=dog_name,
+                        dog_age=dog_age,
+                        hardest_part=hardest_part
+                    )
 
-                # GPT-5 Responses API 호출 (JSON Schema 모드)
-                logger.info("2차 AI GPT-5 API 호출 시작 (JSON Schema)...")
-                mari_json_str = await call_gpt5_api(
-                    system=mari_prompt["system"],
-                    user=mari_prompt["user"],
-                    max_retries=2,
-                    model=settings.AI_TEXT_MODEL,
-                    use_json_schema=True,
-                    json_schema=MARI_NARRATIVE_SCHEMA,
-                    temperature=settings.AI_TEXT_TEMPERATURE_MARI,
-                    verbosity="medium",
-                    reasoning_effort="low"
-                )
-                mari_story = parse_json_response(mari_json_str)
-                final_text = format_mari_story_markdown(mari_story)
-                logger.info("2차 AI 변환 성공!")
+                    # 스트리밍: header/summary가 완성되는 대로 화면에 먼저 전달
+                    stream_callback = None
+                    if on_partial is not None and settings.MARI_STREAMING_ENABLED:
+                        stream_callback = build_mari_partial_emitter(on_partial, tracker, progress=progress)
+
+                    mari_effort_settings, mari_effort_level = choose_effort(
+                        "mari", {"verbosity": "medium", "reasoning_effort": "low"}
+                    )
+                    tracker.mark_event("effort_level.mari", mari_effort_level)
+                    mari_model_settings, mari_level = downgrade_for_deadline(
+                        mari_effort_settings,
+                        deadline,
+                        full_seconds=settings.DEADLINE_MARI_FULL_SECONDS,
+                        minimal_seconds=settings.DEADLINE_MARI_MIN_SECONDS
+                    )
+                    tracker.mark_event("mari_effort", mari_level)
+
+                    async def call_mari(on_text=None):
+                        # GPT-5 Responses API 호출 (JSON Schema 모드)
+                        logger.info(f"2차 AI GPT-5 API 호출 시작 (JSON Schema, streaming={on_text is not None})...")
+                        mari_json_str = await call_gpt5_api(
+                            system=mari_prompt["system"],
+                            user=mari_prompt["user"],
+                            max_retries=2,
+                            model=settings.AI_TEXT_MODEL,
+                            use_json_schema=True,
+                            json_schema=MARI_NARRATIVE_SCHEMA,
+                            temperature=settings.AI_TEXT_TEMPERATURE_MARI,
+                            on_text=on_text,
+                            prompt_cache_key=mari_prompt["cache_key"],
+                            stage="mari",
+                            deadline=deadline,
+                            deadline_reserve=settings.DEADLINE_RESERVE_SECONDS,
+                            **mari_model_settings
+                        )
+                        mari_data = parse_json_response(mari_json_str)
+                        if not validate_mari_json(mari_data)[0]:
+                            mari_data = repair_mari_json(mari_data)[0]
+                        return mari_data
+
+                    # hedge 요청은 스트리밍 없이 보내 화면 partial이 두 응답으로 섞이지 않게 함
+                    mari_story = await hedged_call(
+                        stage="mari",
+                        provider="gpt",
+                        primary=lambda: call_mari(on_text=stream_callback),
+                        duplicate=call_mari,
+                        is_valid=lambda data: validate_mari_json(data)[0]
+                    )
+                    final_text = format_mari_story_markdown(mari_story)
+                    logger.info("2차 AI 변환 성공!")
+                    progress.finish("mari")
 
         except Exception as e:
             mari_template_used = True
-            logger.error("===== 2차 AI 실패 - simple_template_conversion 폴백 =====")
+            logger.error("===== 2차 AI 실패 - 로컬 렌더러 폴백 =====")
             logger.error(f"Error: {str(e)}", exc_info=True)
-            final_text = simple_template_conversion(raw_json, dog_name, dog_age)
-            mari_story = None
+            try:
+                mari_story = render_mari_story(
+                    raw_json,
+                    dog_name=dog_name,
+                    dog_age=dog_age,
+                    hardest_part=hardest_part,
+                    main_concerns=main_concerns
+                )
+                final_text = format_mari_story_markdown(mari_story)
+            except Exception as render_error:
+                logger.error(f"로컬 렌더러 실패, simple_template_conversion 사용: {str(render_error)}")
+                final_text = simple_template_conversion(raw_json, dog_name, dog_age)
+                mari_story = None
+            progress.finish("mari", status="fallback")
 
         tracker.mark_event("mari_template_fallback", mari_template_used)
+        progress.complete()
 
         # 결과 반환
         return {
@@ -484,6 +1076,7 @@ async def analyze_two_stage(
         raise
     finally:
         tracker.add_metadata(
+            circuit_breakers=get_breaker_snapshot(),
             used_mock_result=expert_mock_used,
             mari_template_fallback=mari_template_used,
             vision_fallback_used=vision_fallback_used,
@@ -544,7 +1137,7 @@ def simple_template_conversion(raw_json: dict, dog_name: str, dog_age: str) -> s
 """
 
     for g in guidance[:3]:
-        text += f"- {g.get('principle', '원칙')}: {g.get('action', '행동')}\n"
+        text += f"- {g.get('principle', '원칙')}: {g.get('content', '')}\n"
 
     text += f"""
 
@@ -552,50 +1145,3 @@ def simple_template_conversion(raw_json: dict, dog_name: str, dog_age: str) -> s
 """
 
     return text
-
-
-def format_mari_story_markdown(mari_story: dict | None) -> str:
-    if not mari_story:
-        return ""
-
-    header = mari_story.get("header", {})
-    solutions = mari_story.get("solutions", [])
-    guidance = mari_story.get("guidance", [])
-    closing = mari_story.get("mari_closing", {})
-
-    parts: list[str] = []
-    title = header.get("title")
-    if title:
-        parts.append(f"**\"{title}\"**\n")
-    summary = header.get("summary")
-    if summary:
-        parts.append(summary + "\n")
-
-    if solutions:
-        parts.append("\n---\n\n🐾 **이런 솔루션이 가장 잘 맞아요!**\n")
-        for idx, sol in enumerate(solutions, start=1):
-            steps = "\n".join(f"- {step}" for step in sol.get("steps", []))
-            parts.append(
-                f"{idx}️⃣ **{sol.get('title', '솔루션')}**\n"
-                f"{sol.get('content', '')}\n{steps}\n"
-                f"✨ 기대 효과: {sol.get('outcome', '')}\n\n"
-            )
-
-    if guidance:
-        parts.append("---\n\n🐾 **앞으로 이렇게 해보세요!**\n")
-        for item in guidance:
-            parts.append(
-                f"- **{item.get('principle', '')}**: {item.get('description', '')}\n"
-                f"  → {item.get('action', '')}\n"
-            )
-
-    core_message = closing.get("core_message")
-    final_quote = closing.get("final_quote")
-    if core_message or final_quote:
-        parts.append("\n---\n\n")
-    if core_message:
-        parts.append(core_message + "\n\n")
-    if final_quote:
-        parts.append(final_quote)
-
-    return "".join(parts).strip()
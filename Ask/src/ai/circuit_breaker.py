@@ -0,0 +1,223 @@
+"""
+파일명: circuit_breaker.py
+목적: Provider/모델별 Circuit Breaker - 장애 중인 API 호출을 즉시 차단하고 analyzer 전환 근거 제공
+작성일: 2026-10-18
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from config.settings import settings
+from src.utils.paths import get_runtime_logs_dir
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("circuit_breaker")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [BREAKER] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Circuit이 열려 있어 호출을 보내지 않았을 때 발생합니다 (재시도 대상 아님)."""
+
+
+class CircuitBreaker:
+    """
+    최근 호출의 실패율/느린 호출 비율로 열리고, 일정 시간 뒤 probe 호출로 복구되는 Circuit Breaker.
+
+    - closed: 모든 호출 허용. 최근 CIRCUIT_BREAKER_WINDOW개 중 실패율이나 느린 호출 비율이
+      임계값을 넘으면 open.
+    - open: 호출 즉시 거부 (CircuitOpenError). CIRCUIT_BREAKER_OPEN_SECONDS가 지나면 half_open.
+    - half_open: probe 호출을 CIRCUIT_BREAKER_HALF_OPEN_PROBES개까지만 허용. 모두 정상이면 closed,
+      하나라도 실패/느리면 다시 open.
+
+    호출부는 acquire()가 돌려준 세대(generation)로 반드시 record()/record_error() 또는
+    release()(취소 등 판정 불가) 중 하나를 호출해야 합니다. 상태가 바뀐 뒤 도착한 이전 세대 호출의
+    결과는 무시되어, open 전에 시작된 느린 호출이 half_open probe 판정을 흔들지 않습니다.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.state = CLOSED
+        self.trips = 0
+        self._results: Deque[Tuple[bool, bool]] = deque(maxlen=settings.CIRCUIT_BREAKER_WINDOW)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    # ----- 상태 전이 -----
+
+    def _open(self, reason: str) -> None:
+        self.state = OPEN
+        self._generation += 1
+        self.trips += 1
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        logger.warning(f"{self.key} circuit OPEN ({reason})")
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._generation += 1
+        self._results.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        logger.info(f"{self.key} circuit CLOSED (probe 성공)")
+
+    def _cooldown_elapsed(self) -> bool:
+        return time.monotonic() - self._opened_at >= settings.CIRCUIT_BREAKER_OPEN_SECONDS
+
+    # ----- 공개 API -----
+
+    def is_available(self) -> bool:
+        """
+        새 작업을 보내도 되는지 (호출 슬롯을 차지하지 않고) 확인합니다.
+        """
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return True
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return self._cooldown_elapsed()
+            return self._probes_in_flight < settings.CIRCUIT_BREAKER_HALF_OPEN_PROBES
+
+    def acquire(self) -> int:
+        """
+        호출을 시작하고 현재 상태 세대를 반환합니다. 허용되지 않으면 CircuitOpenError를 발생시킵니다.
+        """
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return self._generation
+        with self._lock:
+            if self.state == OPEN and self._cooldown_elapsed():
+                self.state = HALF_OPEN
+                self._generation += 1
+                logger.info(f"{self.key} circuit HALF_OPEN (probe 허용)")
+            if self.state == OPEN:
+                raise CircuitOpenError(f"{self.key} circuit open")
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= settings.CIRCUIT_BREAKER_HALF_OPEN_PROBES:
+                    raise CircuitOpenError(f"{self.key} circuit half-open (probe 진행 중)")
+                self._probes_in_flight += 1
+            return self._generation
+
+    def record(self, ok: bool, latency: float, generation: Optional[int] = None) -> None:
+        """
+        호출 결과를 기록합니다 (latency가 CIRCUIT_BREAKER_SLOW_CALL_SECONDS 이상이면 느린 호출).
+
+        generation이 현재 세대와 다르면(호출 중 상태가 바뀜) 결과를 무시합니다.
+        """
+        slow = latency >= settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                logger.debug(f"{self.key} 이전 세대 호출 결과 무시 (세대 {generation} → {self._generation})")
+                return
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                if not ok or slow:
+                    self._open("probe 실패" if not ok else f"probe 지연 {latency:.1f}s")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= settings.CIRCUIT_BREAKER_HALF_OPEN_PROBES:
+                    self._close()
+                return
+            if self.state == OPEN:
+                return  # 열리기 전에 시작된 호출
+
+            self._results.append((ok, slow))
+            calls = len(self._results)
+            if calls < settings.CIRCUIT_BREAKER_MIN_CALLS:
+                return
+            failure_rate = sum(1 for result in self._results if not result[0]) / calls
+            slow_rate = sum(1 for result in self._results if result[1]) / calls
+            if failure_rate >= settings.CIRCUIT_BREAKER_FAILURE_RATE:
+                self._open(f"실패율 {failure_rate:.0%} / 최근 {calls}회")
+            elif slow_rate >= settings.CIRCUIT_BREAKER_SLOW_CALL_RATE:
+                self._open(f"느린 호출 {slow_rate:.0%} / 최근 {calls}회")
+
+    def record_error(self, exc: BaseException, latency: float, generation: Optional[int] = None) -> None:
+        """
+        예외로 끝난 호출을 기록합니다.
+
+        provider 장애로 볼 수 있는 오류(retry.classify_error 기준 재시도 대상: 5xx, 타임아웃,
+        연결 오류)만 실패로 셉니다. 400/422 같은 요청 오류나 429, 응답 파싱 오류는 provider가
+        정상 응답한 것이므로 판정 없이 release()로 처리합니다.
+        """
+        # retry가 CircuitOpenError를 import하므로 순환 import를 피해 호출 시점에 가져옴
+        from src.ai.retry import RETRYABLE, classify_error
+
+        if classify_error(exc) == RETRYABLE:
+            self.record(False, latency, generation)
+        else:
+            self.release(generation)
+
+    def release(self, generation: Optional[int] = None) -> None:
+        """
+        결과 판정 없이 끝난 호출(취소, 요청 단위 Deadline 초과)의 probe 슬롯을 반환합니다.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._results)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": round(sum(1 for r in self._results if not r[0]) / calls, 3) if calls else 0.0,
+                "slow_rate": round(sum(1 for r in self._results if r[1]) / calls, 3) if calls else 0.0,
+                "trips": self.trips,
+            }
+
+
+# ===== 프로세스 공용 레지스트리 =====
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(provider: str, model: Optional[str]) -> CircuitBreaker:
+    """
+    provider("openai" / "anthropic") + 모델별 공용 breaker를 반환합니다.
+    """
+    key = f"{provider}:{model}"
+    with _registry_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key)
+        return breaker
+
+
+def get_breaker_snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    모든 breaker 상태 (performance.log metadata 기록용).
+    """
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.key: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,227 @@
+"""
+파일명: client_registry.py
+목적: 프로세스 공용 AI Provider 클라이언트 레지스트리 (keep-alive 커넥션 풀 + 부팅 시 워밍업)
+작성일: 2026-10-18
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import anthropic
+import httpx
+from openai import AsyncOpenAI
+
+from config.settings import settings
+from src.utils.paths import get_runtime_logs_dir
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("client_registry")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_file = get_runtime_logs_dir() / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [CLIENT] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+# ===== 레지스트리 상태 =====
+
+# (provider, model) → SDK 클라이언트 / 해당 클라이언트가 쓰는 httpx 커넥션 풀
+_clients: Dict[Tuple[str, str], Any] = {}
+_http_clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+_registry_loop: Optional[asyncio.AbstractEventLoop] = None
+_registry_lock = threading.Lock()
+# 루프 변경으로 버린 커넥션 풀을 닫는 task (완료 전 GC 방지)
+_closing_tasks: Set[asyncio.Task] = set()
+
+
+def _build_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.AI_HTTP_READ_TIMEOUT_SECONDS,
+        connect=settings.AI_HTTP_CONNECT_TIMEOUT_SECONDS,
+    )
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    """
+    설정값(풀 크기, keep-alive, 타임아웃)을 반영한 httpx 비동기 클라이언트를 생성합니다.
+
+    Returns:
+        httpx.AsyncClient: keep-alive 커넥션 풀
+    """
+    limits = httpx.Limits(
+        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=_build_timeout(), follow_redirects=True)
+
+
+def _build_openai_client(http_client: httpx.AsyncClient) -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=_build_timeout(),
+        # 재시도는 src/ai/retry.py의 공용 엔진이 전담 (SDK 내부 재시도와 중복되지 않도록)
+        max_retries=0,
+        http_client=http_client,
+    )
+
+
+def _build_anthropic_client(http_client: httpx.AsyncClient) -> anthropic.AsyncAnthropic:
+    return anthropic.AsyncAnthropic(
+        api_key=settings.ANTHROPIC_API_KEY,
+        timeout=_build_timeout(),
+        # 재시도는 src/ai/retry.py의 공용 엔진이 전담 (SDK 내부 재시도와 중복되지 않도록)
+        max_retries=0,
+        http_client=http_client,
+    )
+
+
+_FACTORIES: Dict[str, Callable[[httpx.AsyncClient], Any]] = {
+    "openai": _build_openai_client,
+    "anthropic": _build_anthropic_client,
+}
+
+
+async def _aclose_http_clients(http_clients: List[httpx.AsyncClient]) -> None:
+    for http_client in http_clients:
+        try:
+            await http_client.aclose()
+        except Exception as e:
+            logger.debug(f"이전 커넥션 풀 종료 실패 (무시): {str(e)}")
+
+
+def _close_stale_clients(http_clients: List[httpx.AsyncClient], old_loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """
+    루프 변경으로 버리는 커넥션 풀을 닫습니다 (소켓/파일 디스크립터 누수 방지).
+
+    이전 루프가 아직 돌고 있으면 그 루프에서 닫고, 이미 멈췄거나 닫혔으면
+    현재 루프에서 닫습니다 (실패는 무시).
+    """
+    if not http_clients:
+        return
+    if old_loop is not None and old_loop.is_running():
+        asyncio.run_coroutine_threadsafe(_aclose_http_clients(http_clients), old_loop)
+        return
+    task = asyncio.get_running_loop().create_task(_aclose_http_clients(http_clients))
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+
+
+def _bind_to_running_loop() -> None:
+    """
+    httpx 커넥션 풀은 생성된 이벤트 루프에 묶이므로,
+    async_runner가 루프를 새로 만든 경우 기존 클라이언트를 닫고 다시 생성합니다.
+    """
+    global _registry_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    if loop is not _registry_loop:
+        if _clients:
+            logger.info("이벤트 루프 변경 감지 - Provider 클라이언트를 재생성합니다.")
+        _close_stale_clients(list(_http_clients.values()), _registry_loop)
+        _clients.clear()
+        _http_clients.clear()
+        _registry_loop = loop
+
+
+def get_client(provider: str, model: str) -> Any:
+    """
+    (provider, model) 별로 공유되는 SDK 클라이언트를 반환합니다.
+
+    Args:
+        provider: "openai" 또는 "anthropic"
+        model: 모델명 (커넥션 풀 분리 단위)
+
+    Returns:
+        AsyncOpenAI | anthropic.AsyncAnthropic: 공유 클라이언트
+
+    Raises:
+        ValueError: 지원하지 않는 provider일 때
+    """
+    if provider not in _FACTORIES:
+        raise ValueError(f"지원하지 않는 provider: '{provider}'")
+
+    key = (provider, model)
+    with _registry_lock:
+        _bind_to_running_loop()
+        client = _clients.get(key)
+        if client is None:
+            http_client = _build_http_client()
+            client = _FACTORIES[provider](http_client)
+            _clients[key] = client
+            _http_clients[key] = http_client
+            logger.info(f"Provider 클라이언트 생성 (provider={provider}, model={model})")
+        return client
+
+
+def get_openai_client(model: str) -> AsyncOpenAI:
+    """OpenAI 모델용 공유 클라이언트를 반환합니다."""
+    return get_client("openai", model)
+
+
+def get_anthropic_client(model: str) -> anthropic.AsyncAnthropic:
+    """Anthropic 모델용 공유 클라이언트를 반환합니다."""
+    return get_client("anthropic", model)
+
+
+# ===== 워밍업 =====
+
+def get_warmup_targets() -> List[Tuple[str, str]]:
+    """
+    현재 설정에서 첫 분석이 사용할 (provider, model) 목록을 반환합니다.
+
+    Returns:
+        list: [(provider, model), ...]
+    """
+    targets = [("openai", settings.AI_VISION_MODEL)]
+    if settings.AI_MODEL_PROVIDER.lower() == "claude":
+        targets.append(("anthropic", settings.AI_CLAUDE_EXPERT_MODEL))
+        targets.append(("anthropic", settings.AI_CLAUDE_MARI_MODEL))
+    else:
+        targets.append(("openai", settings.AI_TEXT_MODEL))
+    return targets
+
+
+async def _open_connection(http_client: httpx.AsyncClient, base_url: str) -> None:
+    # 응답 내용(401/404 등)은 중요하지 않음: TCP + TLS 연결이 풀에 남는 것이 목적
+    await http_client.head(base_url)
+
+
+async def warm_up_clients(connections: Optional[int] = None) -> None:
+    """
+    배포 직후 첫 분석이 콜드 커넥션 비용을 내지 않도록 커넥션을 미리 엽니다.
+
+    Args:
+        connections: 대상별로 미리 열어둘 커넥션 수 (기본값: AI_CLIENT_WARMUP_CONNECTIONS)
+    """
+    count = connections if connections is not None else settings.AI_CLIENT_WARMUP_CONNECTIONS
+    for provider, model in get_warmup_targets():
+        try:
+            client = get_client(provider, model)
+            http_client = _http_clients[(provider, model)]
+            results = await asyncio.gather(
+                *(_open_connection(http_client, str(client.base_url)) for _ in range(count)),
+                return_exceptions=True,
+            )
+            failures = [r for r in results if isinstance(r, Exception)]
+            if failures:
+                logger.warning(f"워밍업 일부 실패 (provider={provider}, model={model}): {failures[0]}")
+            else:
+                logger.info(f"워밍업 완료 (provider={provider}, model={model}, connections={count})")
+        except Exception as e:
+            logger.warning(f"워밍업 실패 (provider={provider}, model={model}): {str(e)}")
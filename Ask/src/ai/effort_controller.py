@@ -0,0 +1,350 @@
+"""
+파일명: effort_controller.py
+목적: 관측 지연/품질 기반 reasoning_effort·verbosity 적응형 조정 (단계별 p95 목표 유지)
+작성일: 2026-10-18
+"""
+
+import json
+import logging
+import statistics
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from src.utils.paths import get_runtime_logs_dir
+from src.utils.perf import add_finish_listener, load_performance_records, percentile
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("effort_controller")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [EFFORT] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+# ===== 단계별 레벨 =====
+
+# (reasoning_effort, verbosity) - 0번이 기본 설정이자 상한, 마지막이 품질 하한 (가드레일)
+# "minimal"은 모델의 가장 낮은 reasoning_effort를 뜻하며, 실제 값은 fit_reasoning_effort로 모델에 맞춤
+EFFORT_LEVELS: Dict[str, List[Tuple[str, str]]] = {
+    "expert": [("medium", "medium"), ("low", "medium"), ("low", "low")],
+    "mari": [("low", "medium"), ("minimal", "medium"), ("minimal", "low")],
+}
+
+# 모델별 허용 reasoning_effort (앞쪽이 높은 설정, 긴 이름부터 prefix 매칭)
+# gpt-5.1은 "minimal" 대신 "none"을 받으며, 허용되지 않는 값은 400(재시도 불가)으로 거절됨
+REASONING_EFFORT_LADDERS: Dict[str, Tuple[str, ...]] = {
+    "gpt-5.1": ("high", "medium", "low", "none"),
+    "gpt-5": ("high", "medium", "low", "minimal"),
+}
+_EFFORT_RANK = {"high": 0, "medium": 1, "low": 2, "minimal": 3, "none": 4}
+
+# 시뮬레이터 기본 가정: 레벨별 호출 지연 비율 (기본 레벨 = 1.0)
+DEFAULT_LEVEL_LATENCY_FACTORS: Tuple[float, ...] = (1.0, 0.75, 0.6)
+
+# performance.log에서 단계별 지연을 읽을 span
+_STAGE_SPANS = {"expert": "expert_analysis", "mari": "mari_conversion"}
+
+# "expert_cache" 이벤트 중 실제 1차 AI 호출 없이 결과를 얻은 출처
+_EXPERT_CACHE_HIT_SOURCES = {"memory", "disk", "inflight"}
+
+
+def get_reasoning_effort_ladder(model: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    모델이 받는 reasoning_effort 목록을 높은 설정부터 반환합니다 (기본: AI_TEXT_MODEL).
+    """
+    model = model or settings.AI_TEXT_MODEL
+    for prefix in sorted(REASONING_EFFORT_LADDERS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return REASONING_EFFORT_LADDERS[prefix]
+    return REASONING_EFFORT_LADDERS["gpt-5"]
+
+
+def fit_reasoning_effort(effort: str, model: Optional[str] = None) -> str:
+    """
+    모델이 받지 않는 reasoning_effort를 그보다 높지 않은 가장 가까운 허용 값으로 바꿉니다
+    (예: gpt-5.1의 "minimal" → "none"). 더 낮은 값이 없으면 모델의 최저 설정을 씁니다.
+    """
+    ladder = get_reasoning_effort_ladder(model)
+    if effort in ladder:
+        return effort
+    rank = _EFFORT_RANK.get(effort, _EFFORT_RANK["medium"])
+    for value in ladder:
+        if _EFFORT_RANK[value] >= rank:
+            return value
+    return ladder[-1]
+
+
+def get_decision_log_path() -> Path:
+    return get_runtime_logs_dir() / "effort_decisions.log"
+
+
+def is_cache_hit_record(record: Dict[str, Any]) -> bool:
+    """
+    전문가 분석 캐시(memory/disk/inflight)나 의미 캐시가 hit한 기록인지 확인합니다.
+
+    이런 기록의 단계 시간은 LLM 호출 지연이 아니므로 지연 통계에서 제외해야 합니다.
+    """
+    for event in record.get("events", []):
+        label = event.get("label")
+        if label == "expert_cache" and event.get("value") in _EXPERT_CACHE_HIT_SOURCES:
+            return True
+        if label == "semantic_cache" and event.get("value") != "miss":
+            return True
+    return False
+
+
+def extract_stage_sample(record: Dict[str, Any], stage: str) -> Optional[Tuple[float, int, bool]]:
+    """
+    performance.log 기록 1건에서 (지연, 사용한 레벨, 품질 정상 여부)를 꺼냅니다.
+
+    컨트롤러가 고른 레벨로 실제 LLM을 호출한 기록만 사용합니다. 캐시 hit이나
+    Deadline 하향("{stage}_effort" != "full")으로 설정이 달라진 호출은 제외합니다.
+    """
+    if record.get("name") != "analyze_two_stage" or record.get("status") != "success":
+        return None
+    if is_cache_hit_record(record):
+        return None
+
+    level = None
+    latency = None
+    deadline_level = "full"
+    for event in record.get("events", []):
+        label = event.get("label")
+        if label == f"effort_level.{stage}":
+            level = event.get("value")
+        elif label == f"{stage}_effort":
+            deadline_level = event.get("value")
+        elif label == _STAGE_SPANS[stage] and "duration" in event:
+            latency = event["duration"]
+    if level is None or latency is None or deadline_level != "full":
+        return None
+
+    metadata = record.get("metadata", {})
+    if stage == "expert":
+        confidence = metadata.get("confidence_score")
+        ok = not metadata.get("used_mock_result") and (
+            confidence is None or confidence >= settings.EFFORT_MIN_CONFIDENCE
+        )
+    else:
+        ok = not metadata.get("mari_template_fallback")
+    return latency, int(level), ok
+
+
+class EffortController:
+    """
+    단계별 최근 호출의 p95 지연이 목표(EFFORT_TARGET_P95_SECONDS)를 넘으면 한 단계 낮추고,
+    여유가 있으면 한 단계 올립니다.
+
+    - 레벨은 EFFORT_LEVELS 범위 안에서만 움직입니다 (기본 설정보다 비싸지지 않고, 하한 아래로 내려가지 않음).
+    - 현재 레벨에서 품질 이상(Mock/템플릿 폴백, 낮은 confidence) 비율이 EFFORT_MAX_LOW_QUALITY_RATE를 넘으면
+      지연과 관계없이 한 단계 올립니다.
+    - 레벨을 바꾸면 해당 단계의 표본을 비우고 EFFORT_MIN_SAMPLES개가 다시 쌓일 때까지 유지합니다 (진동 방지).
+    - 모든 변경은 decision log(effort_decisions.log)에 JSON Lines로 남습니다.
+    """
+
+    def __init__(
+        self,
+        levels: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+        target_p95: Optional[Dict[str, float]] = None,
+        min_samples: Optional[int] = None,
+        window: Optional[int] = None,
+        hysteresis: Optional[float] = None,
+        max_low_quality_rate: Optional[float] = None,
+        decision_log_path: Optional[Path] = None
+    ) -> None:
+        self.levels = levels or EFFORT_LEVELS
+        self.target_p95 = target_p95 or settings.EFFORT_TARGET_P95_SECONDS
+        self.min_samples = min_samples or settings.EFFORT_MIN_SAMPLES
+        self.window = window or settings.EFFORT_WINDOW
+        self.hysteresis = settings.EFFORT_HYSTERESIS if hysteresis is None else hysteresis
+        self.max_low_quality_rate = (
+            settings.EFFORT_MAX_LOW_QUALITY_RATE if max_low_quality_rate is None else max_low_quality_rate
+        )
+        self.decision_log_path = decision_log_path
+        self.decisions: List[Dict[str, Any]] = []
+        self._level: Dict[str, int] = {stage: 0 for stage in self.levels}
+        self._samples: Dict[str, Deque[Tuple[float, int, bool]]] = {
+            stage: deque(maxlen=self.window) for stage in self.levels
+        }
+        self._lock = threading.Lock()
+
+    def current(self, stage: str) -> int:
+        return self._level.get(stage, 0)
+
+    def choose(self, stage: str) -> Tuple[Dict[str, str], int]:
+        """
+        이번 요청에 쓸 설정을 반환합니다.
+
+        Returns:
+            tuple: ({"reasoning_effort", "verbosity"}, 레벨 번호)
+        """
+        level = self.current(stage)
+        reasoning_effort, verbosity = self.levels[stage][level]
+        return {"reasoning_effort": reasoning_effort, "verbosity": verbosity}, level
+
+    def observe(self, stage: str, latency: float, level: int, ok: bool) -> Optional[Dict[str, Any]]:
+        """
+        호출 1건의 결과를 반영하고, 레벨을 바꿨으면 그 결정을 반환합니다.
+        """
+        if stage not in self.levels:
+            return None
+        with self._lock:
+            if level != self._level[stage]:
+                return None  # 레벨 변경 전에 시작된 요청
+            samples = self._samples[stage]
+            samples.append((latency, level, ok))
+            if len(samples) < self.min_samples:
+                return None
+
+            latencies = [sample[0] for sample in samples]
+            p95 = percentile(latencies, 0.95)
+            low_quality_rate = 1.0 - statistics.fmean(1.0 if sample[2] else 0.0 for sample in samples)
+            target = self.target_p95.get(stage)
+            floor = len(self.levels[stage]) - 1
+
+            new_level, reason = level, None
+            if low_quality_rate > self.max_low_quality_rate and level > 0:
+                new_level, reason = level - 1, "quality"
+            elif target and p95 > target * (1 + self.hysteresis) and level < floor:
+                if low_quality_rate <= self.max_low_quality_rate / 2:
+                    new_level, reason = level + 1, "latency_over_target"
+            elif target and p95 < target * (1 - self.hysteresis) and level > 0:
+                new_level, reason = level - 1, "latency_headroom"
+
+            if reason is None:
+                return None
+
+            decision = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "stage": stage,
+                "from_level": level,
+                "to_level": new_level,
+                "settings": dict(zip(("reasoning_effort", "verbosity"), self.levels[stage][new_level])),
+                "reason": reason,
+                "p95": round(p95, 3),
+                "target_p95": target,
+                "low_quality_rate": round(low_quality_rate, 3),
+                "samples": len(samples),
+            }
+            self._level[stage] = new_level
+            samples.clear()
+            self.decisions.append(decision)
+
+        logger.info(f"{stage} 레벨 변경 {level} → {new_level} ({reason}, p95={p95:.2f}s, 목표={target}s)")
+        if self.decision_log_path is not None:
+            with open(self.decision_log_path, "a", encoding="utf-8") as log_file:
+                log_file.write(json.dumps(decision, ensure_ascii=False) + "\n")
+        return decision
+
+    def observe_record(self, record: Dict[str, Any]) -> None:
+        """
+        PerformanceTracker.finish()의 기록(performance.log 1줄)을 단계별 표본으로 반영합니다.
+        """
+        for stage in self.levels:
+            sample = extract_stage_sample(record, stage)
+            if sample is not None:
+                self.observe(stage, *sample)
+
+
+# ===== 프로세스 공용 컨트롤러 =====
+
+_controller: Optional[EffortController] = None
+_controller_lock = threading.Lock()
+
+
+def get_effort_controller() -> EffortController:
+    """
+    공용 컨트롤러를 반환합니다 (첫 호출 시 tracker finish 기록을 구독).
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = EffortController(decision_log_path=get_decision_log_path())
+            add_finish_listener(_controller.observe_record)
+        return _controller
+
+
+def choose_effort(stage: str, default: Dict[str, str], model: Optional[str] = None) -> Tuple[Dict[str, str], int]:
+    """
+    단계 설정을 고릅니다. EFFORT_CONTROLLER_ENABLED가 꺼져 있으면 default(레벨 0)를 그대로 씁니다.
+
+    reasoning_effort는 호출할 모델(기본: AI_TEXT_MODEL)이 받는 값으로 맞춥니다.
+    """
+    if not settings.EFFORT_CONTROLLER_ENABLED:
+        chosen, level = dict(default), 0
+    else:
+        chosen, level = get_effort_controller().choose(stage)
+    chosen["reasoning_effort"] = fit_reasoning_effort(chosen["reasoning_effort"], model)
+    return chosen, level
+
+
+# ===== 오프라인 시뮬레이터 =====
+
+def simulate_effort_controller(
+    records: Optional[Sequence[Dict[str, Any]]] = None,
+    stage: str = "expert",
+    level_latency_factors: Sequence[float] = DEFAULT_LEVEL_LATENCY_FACTORS,
+    **controller_options: Any
+) -> Dict[str, Any]:
+    """
+    performance.log 기록을 순서대로 재생해 컨트롤러의 결정을 시뮬레이션합니다.
+
+    각 기록의 실제 지연을 "기록 당시 레벨 → 시뮬레이션 레벨" 비율(level_latency_factors)로
+    환산합니다. 품질 신호는 기록 값을 그대로 씁니다. 목표/표본 수 등은 controller_options로 바꿔
+    볼 수 있습니다 (예: target_p95={"expert": 15.0}).
+
+    Args:
+        records: 재생할 기록 (기본: performance.log의 analyze_two_stage 전체)
+        stage: "expert" / "mari"
+        level_latency_factors: 레벨별 지연 비율 가정
+        **controller_options: EffortController 인자
+
+    Returns:
+        dict: {"samples", "original_p95", "simulated_p95", "level_counts", "low_quality_rate", "decisions"}
+    """
+    if records is None:
+        records = load_performance_records("analyze_two_stage")
+    controller = EffortController(**controller_options)
+
+    original: List[float] = []
+    simulated: List[float] = []
+    level_counts: Dict[int, int] = {}
+    bad = 0
+    for record in records:
+        sample = extract_stage_sample(record, stage)
+        if sample is None:
+            continue
+        latency, recorded_level, ok = sample
+        level = controller.current(stage)
+        scaled = latency * level_latency_factors[level] / level_latency_factors[recorded_level]
+
+        original.append(latency)
+        simulated.append(scaled)
+        level_counts[level] = level_counts.get(level, 0) + 1
+        bad += 0 if ok else 1
+        controller.observe(stage, scaled, level, ok)
+
+    return {
+        "samples": len(original),
+        "original_p95": percentile(original, 0.95) if original else None,
+        "simulated_p95": percentile(simulated, 0.95) if simulated else None,
+        "level_counts": level_counts,
+        "low_quality_rate": bad / len(original) if original else None,
+        "decisions": controller.decisions,
+    }
@@ -0,0 +1,164 @@
+"""
+파일명: expert_cache.py
+목적: 1차 AI(전문가 분석) 결과 캐시 - 같은 설문 + 같은 Vision 결과의 재분석 방지
+작성일: 2026-10-18
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+from src.utils.cache import TieredCache
+from src.utils.paths import get_runtime_logs_dir
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("expert_cache")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [CACHE] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+# ===== 캐시 저장소 =====
+
+_expert_cache = TieredCache(
+    namespace="expert",
+    max_entries=settings.EXPERT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.EXPERT_CACHE_TTL_SECONDS,
+    max_disk_entries=settings.EXPERT_CACHE_MAX_DISK_ENTRIES,
+)
+
+# 캐시 키 → 계산 중인 Future (더블클릭/새로고침 등 동시 중복 요청은 1번만 계산)
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def build_expert_cache_key(
+    provider: str,
+    structured_survey: Dict[str, Any],
+    vision_analysis: Optional[Dict[str, Any]],
+    prompt_version: str,
+    system_prompt: str,
+    model_settings: Dict[str, Any]
+) -> str:
+    """
+    전문가 분석 캐시 키를 생성합니다.
+
+    입력을 정렬된 JSON으로 정규화해 해시하므로 dict 순서와 무관하게 같은 키가 나옵니다.
+    system 프롬프트 본문도 해시에 포함되어 페르소나를 수정하면 자동으로 무효화됩니다.
+
+    Args:
+        provider: "gpt" / "claude"
+        structured_survey: structure_survey_responses() 결과
+        vision_analysis: GPT-4o Vision 결과 (Fallback 포함)
+        prompt_version: 프롬프트 빌더의 EXPERT_PROMPT_VERSION
+        system_prompt: 1차 AI system 프롬프트
+        model_settings: 모델명, temperature, reasoning_effort 등 호출 설정
+
+    Returns:
+        str: "expert:<sha256>"
+    """
+    canonical = json.dumps(
+        {
+            "provider": provider,
+            "survey": structured_survey,
+            "vision": vision_analysis or {},
+            "prompt_version": prompt_version,
+            "system_prompt": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            "model_settings": model_settings,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return "expert:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def get_or_compute_expert(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Tuple[Dict[str, Any], bool]]]
+) -> Tuple[Dict[str, Any], str]:
+    """
+    캐시된 전문가 분석 결과를 반환하거나, 없으면 계산 후 저장합니다.
+
+    같은 키로 계산 중인 요청이 있으면 새로 호출하지 않고 그 결과를 함께 기다립니다.
+    compute가 (결과, 캐시 가능 여부)를 반환하며, Schema 검증을 통과한 결과만 저장합니다.
+
+    Args:
+        cache_key: build_expert_cache_key() 결과
+        compute: 실제 1차 AI 호출 코루틴 함수
+
+    Returns:
+        (결과, 출처): 출처는 "memory" / "disk" / "inflight" / "computed"
+
+    Raises:
+        Exception: compute 실패 시 (함께 기다리던 요청에도 전달)
+    """
+    pending = _inflight.get(cache_key)
+    if pending is not None:
+        logger.info(f"진행 중인 동일 분석 결과 대기 (key={cache_key[7:19]})")
+        try:
+            result, _ = await asyncio.shield(pending)
+            return copy.deepcopy(result), "inflight"
+        except asyncio.CancelledError:
+            # 먼저 시작한 요청이 취소된 경우에만 직접 계산, 이 요청 자체의 취소는 전달
+            if not pending.cancelled():
+                raise
+
+    # 캐시 조회(디스크 읽기 포함) 중에 들어온 같은 키 요청도 이 Future를 기다리도록 먼저 등록
+    future = asyncio.get_running_loop().create_future()
+    _inflight[cache_key] = future
+    try:
+        cached, tier = await asyncio.to_thread(_expert_cache.lookup, cache_key)
+        if tier is not None:
+            logger.info(f"전문가 분석 캐시 hit ({tier}, key={cache_key[7:19]})")
+            future.set_result((cached, tier))
+            return copy.deepcopy(cached), tier
+
+        result, cacheable = await compute()
+        future.set_result((result, "computed"))
+        if cacheable:
+            await asyncio.to_thread(_expert_cache.set, cache_key, result)
+            logger.info(f"전문가 분석 캐시 저장 (key={cache_key[7:19]})")
+        return copy.deepcopy(result), "computed"
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        if not future.done():
+            future.set_exception(exc)
+            future.exception()  # 기다리는 요청이 없어도 경고가 남지 않도록 소비
+        raise
+    finally:
+        if _inflight.get(cache_key) is future:
+            del _inflight[cache_key]
+
+
+def get_expert_cache_stats() -> Dict[str, int]:
+    """
+    전문가 분석 캐시 hit/miss 카운터를 반환합니다.
+    """
+    return _expert_cache.stats()
+
+
+def clear_expert_cache() -> None:
+    """
+    전문가 분석 캐시를 비웁니다 (프롬프트 실험 등 수동 무효화용).
+    """
+    _expert_cache.clear()
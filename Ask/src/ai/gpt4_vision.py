@@ -6,14 +6,27 @@
 """
 
 import base64
+import hashlib
+import io
+import json
 import logging
+import re
 import asyncio
-from typing import Dict, Optional
-from openai import OpenAI, APIError
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from openai import APIError
+from PIL import Image
 
 from config.settings import settings
-from src.ai.schemas import VISION_SCHEMA
+from src.ai.circuit_breaker import CircuitOpenError, get_breaker
+from src.ai.client_registry import get_openai_client
+from src.ai.retry import run_with_retry
+from src.ai.json_repair import repair_to_schema
+from src.ai.schemas import VISION_SCHEMA, validate_vision_json
+from src.utils.cache import TieredCache
+from src.utils.deadline import Deadline, DeadlineExceeded
 from src.utils.paths import get_runtime_logs_dir
+from src.utils.perf import PerformanceTracker, record_token_usage
 
 
 # ===== 로깅 설정 =====
@@ -94,14 +107,20 @@ VISION_ANALYSIS_PROMPT = """아래 이미지를 보고 다음 항목들을 상
 
 async def analyze_dog_image_with_gpt4(
     image_bytes: bytes,
-    max_retries: int = 2
+    max_retries: int = 2,
+    timeout: Optional[float] = None
 ) -> Dict[str, str]:
     """
     GPT-4o를 사용하여 반려견 이미지를 분석합니다 (JSON Schema 강제).
 
+    timeout이 주어지면 재시도와 백오프를 포함한 전체 호출이 그 시간 안에 끝납니다.
+    각 HTTP 요청에는 남은 예산만큼의 타임아웃이 걸리고, 예산이 소진되면
+    진행 중인 요청을 중단한 뒤 asyncio.TimeoutError를 발생시킵니다.
+
     Args:
         image_bytes: 이미지 바이트 데이터 (최대 20MB)
         max_retries: 최대 재시도 횟수
+        timeout: 전체 시간 예산 (초, None이면 제한 없음)
 
     Returns:
         dict: {
@@ -114,6 +133,7 @@ async def analyze_dog_image_with_gpt4(
         }
 
     Raises:
+        asyncio.TimeoutError: 시간 예산 초과 시
         Exception: API 호출 실패 시
     """
     logger.info(f"GPT-4o 이미지 분석 시작 (크기: {len(image_bytes)} bytes)")
@@ -126,16 +146,28 @@ async def analyze_dog_image_with_gpt4(
         logger.error(f"Base64 인코딩 실패: {str(e)}")
         raise Exception(f"이미지 인코딩 실패: {str(e)}")
 
-    # OpenAI 클라이언트 생성
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    budget = Deadline(timeout) if timeout is not None else None
 
-    for attempt in range(max_retries + 1):
-        try:
-            logger.debug(f"GPT-4o API 호출 시도 {attempt + 1}/{max_retries + 1}")
+    # 공유 OpenAI 비동기 클라이언트 (keep-alive 풀 재사용, SDK 내부 재시도 없음)
+    # 공용 재시도 엔진에서만 재시도하여 시간 예산을 정확히 지킴
+    client = get_openai_client(settings.AI_VISION_MODEL)
+    breaker = get_breaker("openai", settings.AI_VISION_MODEL)
+
+    async def attempt_call(attempt: int) -> Dict[str, str]:
+        remaining = budget.check(what="GPT-4o Vision") if budget is not None else None
+        request_options = {"timeout": remaining} if remaining is not None else {}
+        if settings.PROMPT_CACHE_LAYOUT:
+            # 고정 system + 분석 지시문이 prefix, 이미지만 요청마다 다름
+            request_options["extra_body"] = {"prompt_cache_key": f"{settings.PROMPT_CACHE_KEY_PREFIX}:vision"}
+
+        logger.debug(f"GPT-4o API 호출 시도 {attempt + 1}/{max_retries + 1} (남은 예산: {remaining})")
 
-            # GPT-4o API 호출 (JSON Schema 강제)
-            response = client.chat.completions.create(
-                    model="gpt-4o",
+        # GPT-4o API 호출 (JSON Schema 강제), 장애 중이면 재시도 없이 즉시 CircuitOpenError
+        generation = breaker.acquire()
+        attempt_started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                    model=settings.AI_VISION_MODEL,
                     messages=[
                         {
                             "role": "system",
@@ -163,68 +195,365 @@ async def analyze_dog_image_with_gpt4(
                     response_format={
                         "type": "json_schema",
                         "json_schema": VISION_SCHEMA  # JSON Schema 강제
-                    }
+                    },
+                    **request_options
                 )
+        except asyncio.CancelledError:
+            breaker.release(generation)
+            raise
+        except Exception as exc:
+            breaker.record_error(exc, time.perf_counter() - attempt_started, generation)
+            raise
+        breaker.record(True, time.perf_counter() - attempt_started, generation)
+
+        # 응답 추출
+        result_text = response.choices[0].message.content
+        logger.info(f"GPT-4o 응답 받음 (길이: {len(result_text)} chars)")
+
+        # 사용량 로깅
+        if getattr(response, 'usage', None) is not None:
+            usage = response.usage
+            cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+            logger.info(f"토큰 사용량: prompt={usage.prompt_tokens} (cached={cached_tokens}), completion={usage.completion_tokens}, total={usage.total_tokens}")
+            record_token_usage(
+                "vision",
+                input_tokens=usage.prompt_tokens,
+                cached_tokens=cached_tokens,
+                output_tokens=usage.completion_tokens,
+            )
+
+        # JSON 파싱: JSON 블록 추출 (```json ... ``` 형식 지원)
+        json_match = re.search(r"```json\s*\n(.*?)\n```", result_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(1)
+        else:
+            # JSON 블록 없으면 전체를 JSON으로 파싱 시도
+            json_str = result_text
+
+        # JSON Schema를 강제했는데도 파싱이 안 되면 재시도하지 않음 (JSONDecodeError는 fatal로 분류)
+        vision_result = json.loads(json_str)
+
+        # 길이 초과/누락 필드는 로컬 복구, 그래도 스키마 위반이면 폴백 (캐시·화면·CSV로 흘려보내지 않음)
+        is_valid, error_msg = validate_vision_json(vision_result)
+        if not is_valid:
+            logger.warning(f"Vision 결과 Schema 검증 실패, 로컬 복구 시도: {error_msg}")
+            vision_result = repair_to_schema(vision_result, VISION_SCHEMA)[0]
+            is_valid, error_msg = validate_vision_json(vision_result)
+            if not is_valid:
+                raise ValueError(f"Vision 결과 Schema 검증 실패: {error_msg}")
+
+        logger.info("GPT-4o 분석 성공!")
+        return vision_result
+
+    try:
+        return await run_with_retry(
+            "vision", attempt_call, max_retries, deadline=budget, description="GPT-4o Vision"
+        )
+    except (DeadlineExceeded, CircuitOpenError) as e:
+        logger.error(f"GPT-4o 호출 중단: {str(e)}")
+        raise
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON 파싱 실패: {str(e)}")
+        raise Exception(f"GPT-4o 응답을 JSON으로 파싱할 수 없습니다: {str(e)}") from e
+    except ValueError as e:
+        logger.error(str(e))
+        raise
+    except APIError as e:
+        error_msg = f"GPT-4o API 호출 실패: {str(e)}"
+        logger.critical(error_msg)
+        raise Exception(error_msg) from e
+    except Exception as e:
+        error_msg = f"예기치 않은 오류: {str(e)}"
+        logger.critical(error_msg)
+        raise Exception(error_msg) from e
+
+
+# ===== Vision 결과 캐시 (이미지 내용 해시 기준) =====
+
+_vision_cache = TieredCache(
+    namespace="vision",
+    max_entries=settings.VISION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.VISION_CACHE_TTL_SECONDS,
+)
+
+
+def compute_image_digest(image_bytes: bytes) -> str:
+    """
+    이미지 바이트의 SHA-256 digest를 반환합니다.
+
+    Args:
+        image_bytes: 이미지 바이트 데이터
+
+    Returns:
+        str: 16진수 digest
+    """
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def compute_perceptual_hash(image_bytes: bytes) -> Optional[str]:
+    """
+    이미지의 64bit difference hash(dHash)를 계산합니다.
+
+    재인코딩/리사이즈된 같은 사진은 바이트가 달라도 같은 해시가 나옵니다.
+
+    Args:
+        image_bytes: 이미지 바이트 데이터
+
+    Returns:
+        Optional[str]: 16자리 16진수 해시, 이미지를 열 수 없으면 None
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image.draft("L", (64, 64))  # JPEG은 축소 디코딩으로 빠르게 처리
+            pixels = list(image.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    except Exception:
+        return None
+
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | int(left > right)
+    return f"{bits:016x}"
+
+
+# 켜진 비트가 이보다 적거나 (64 - 이 값)보다 많은 dHash는 단색/저대비 이미지라
+# 서로 다른 사진끼리도 같은 값(예: 0000000000000000)이 나오므로 지각 해시 키로 쓰지 않음
+_DHASH_MIN_SET_BITS = 8
+
+
+def is_distinctive_hash(perceptual_hash: str) -> bool:
+    """
+    dHash가 캐시 키로 쓸 만큼 이미지 구조를 담고 있는지 확인합니다.
+    """
+    set_bits = bin(int(perceptual_hash, 16)).count("1")
+    return _DHASH_MIN_SET_BITS <= set_bits <= 64 - _DHASH_MIN_SET_BITS
+
+
+def _vision_cache_keys(image_bytes: bytes, digest: Optional[str] = None) -> List[str]:
+    keys = [f"sha256:{digest or compute_image_digest(image_bytes)}"]
+    if settings.VISION_CACHE_PERCEPTUAL_HASH:
+        perceptual_hash = compute_perceptual_hash(image_bytes)
+        if perceptual_hash and is_distinctive_hash(perceptual_hash):
+            keys.append(f"dhash:{perceptual_hash}")
+    return keys
+
+
+def lookup_cached_vision(
+    image_bytes: bytes,
+    digest: Optional[str] = None
+) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    캐시된 Vision 분석 결과를 조회합니다 (내용 해시 → 지각 해시 순).
+
+    이미지 디코딩과 디스크 읽기가 있으므로 이벤트 루프에서는 asyncio.to_thread로 호출합니다.
+
+    Returns:
+        (결과, 출처): 출처는 "memory" / "disk" / "perceptual_memory" / "perceptual_disk",
+        없으면 (None, None)
+    """
+    keys = _vision_cache_keys(image_bytes, digest)
+    for index, key in enumerate(keys):
+        value, tier = _vision_cache.lookup(key, record_miss=index == len(keys) - 1)
+        if tier is not None:
+            source = tier if key.startswith("sha256:") else f"perceptual_{tier}"
+            return dict(value), source
+    return None, None
+
+
+def store_vision_result(image_bytes: bytes, vision_result: Dict[str, str], digest: Optional[str] = None) -> None:
+    """
+    Vision 분석 결과를 캐시에 저장합니다 (이미지 디코딩 + 디스크 쓰기, 루프 밖에서 호출).
+    """
+    for key in _vision_cache_keys(image_bytes, digest):
+        _vision_cache.set(key, vision_result)
+
+
+def _inspect_image(image_bytes: bytes) -> Tuple[str, Optional[Dict[str, str]], Optional[str]]:
+    """
+    digest 계산과 캐시 조회를 한 번에 처리합니다 (asyncio.to_thread로 실행).
+
+    Returns:
+        (digest, 캐시 결과, 출처): 캐시가 꺼져 있거나 없으면 결과/출처는 None
+    """
+    digest = compute_image_digest(image_bytes)
+    if not settings.VISION_CACHE_ENABLED:
+        return digest, None, None
+    cached, source = lookup_cached_vision(image_bytes, digest)
+    return digest, cached, source
+
+
+def get_vision_cache_stats() -> Dict[str, int]:
+    """
+    Vision 캐시 hit/miss 카운터를 반환합니다.
+    """
+    return _vision_cache.stats()
+
+
+# ===== 업로드 시점 선행 분석 (prefetch) 및 진행 중 Task 공유 =====
+
+# 이미지 digest → Vision 분석 Task (진행 중 또는 완료), 오래된 항목부터 정리
+_vision_tasks: Dict[str, asyncio.Task] = {}
+# 진행 중인 캐시 저장 작업 (Task 참조 유지용)
+_cache_writes: Set[asyncio.Task] = set()
+
+
+def _is_usable(task: asyncio.Task) -> bool:
+    if not task.done():
+        return True
+    return not task.cancelled() and task.exception() is None
+
+
+def _evict_old_tasks() -> None:
+    while len(_vision_tasks) > settings.VISION_PREFETCH_MAX_ENTRIES:
+        oldest_digest = next(iter(_vision_tasks))
+        oldest_task = _vision_tasks.pop(oldest_digest)
+        if not oldest_task.done():
+            oldest_task.cancel()
+
+
+def _write_cache(image_bytes: bytes, digest: str, vision_result: Dict[str, str]) -> None:
+    try:
+        store_vision_result(image_bytes, vision_result, digest)
+        logger.info(f"Vision 결과 캐시 저장 (digest={digest[:12]})")
+    except Exception as e:
+        logger.warning(f"Vision 결과 캐시 저장 실패 (digest={digest[:12]}): {str(e)}")
+
+
+def _start_vision_task(image_bytes: bytes, digest: str, timeout: float, max_retries: int = 2) -> asyncio.Task:
+    """
+    Vision 분석 Task를 시작하고 digest로 등록합니다.
+    Task가 성공하면 (기다리던 쪽이 이미 시간 초과로 떠났더라도) 결과를 루프 밖에서 캐시에 저장합니다.
+
+    Task는 shield로 기다리므로 호출부의 시간 초과로는 취소되지 않습니다. 응답이 멈춘 요청이
+    커넥션과 재시도 예산을 계속 잡고 있지 않도록 timeout + VISION_HARD_CAP_GRACE_SECONDS가
+    지나면 직접 취소합니다.
+    """
+    task = asyncio.create_task(
+        analyze_dog_image_with_gpt4(
+            image_bytes=image_bytes,
+            max_retries=max_retries,
+            timeout=timeout
+        )
+    )
+
+    def _expire() -> None:
+        if not task.done():
+            logger.warning(f"Vision Task hard cap 초과로 취소 (digest={digest[:12]}, {hard_cap:.1f}s)")
+            task.cancel()
+
+    hard_cap = timeout + settings.VISION_HARD_CAP_GRACE_SECONDS
+    expiry = asyncio.get_running_loop().call_later(hard_cap, _expire)
+
+    def _on_done(finished: asyncio.Task) -> None:
+        expiry.cancel()
+        if finished.cancelled() or finished.exception() is not None:
+            return
+        if settings.VISION_CACHE_ENABLED:
+            write = asyncio.create_task(asyncio.to_thread(_write_cache, image_bytes, digest, finished.result()))
+            _cache_writes.add(write)
+            write.add_done_callback(_cache_writes.discard)
+
+    task.add_done_callback(_on_done)
+    _vision_tasks[digest] = task
+    _evict_old_tasks()
+    return task
 
-            # 응답 추출
-            result_text = response.choices[0].message.content
-            logger.info(f"GPT-4o 응답 받음 (길이: {len(result_text)} chars)")
-
-            # 사용량 로깅
-            if hasattr(response, 'usage'):
-                logger.info(f"토큰 사용량: prompt={response.usage.prompt_tokens}, completion={response.usage.completion_tokens}, total={response.usage.total_tokens}")
-
-            # JSON 파싱
-            import json
-            import re
-
-            # JSON 블록 추출 (```json ... ``` 형식 지원)
-            json_match = re.search(r"```json\s*\n(.*?)\n```", result_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # JSON 블록 없으면 전체를 JSON으로 파싱 시도
-                json_str = result_text
-
-            try:
-                vision_result = json.loads(json_str)
-                logger.info("GPT-4o 분석 성공!")
-                return vision_result
-
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON 파싱 실패: {str(e)}")
-
-                # 재시도할 것이므로 continue
-                if attempt < max_retries:
-                    continue
-                else:
-                    raise Exception(f"GPT-4o 응답을 JSON으로 파싱할 수 없습니다: {str(e)}")
-
-        except APIError as e:
-            logger.error(f"OpenAI API 오류 (시도 {attempt + 1}/{max_retries + 1}): {str(e)}")
-
-            if attempt < max_retries:
-                wait_time = (2 ** attempt) * 0.5  # 지수 백오프: 0.5s, 1s
-                logger.warning(f"{wait_time}초 후 재시도...")
-                await asyncio.sleep(wait_time)  # 비동기 sleep
-                continue
-            else:
-                error_msg = f"GPT-4o API 호출 실패 (시도 {max_retries + 1}회): {str(e)}"
-                logger.critical(error_msg)
-                raise Exception(error_msg)
-
-        except Exception as e:
-            logger.error(f"예기치 않은 오류 (시도 {attempt + 1}/{max_retries + 1}): {str(e)}")
-
-            if attempt < max_retries:
-                wait_time = (2 ** attempt) * 0.5
-                logger.warning(f"{wait_time}초 후 재시도...")
-                await asyncio.sleep(wait_time)
-                continue
-            else:
-                error_msg = f"예기치 않은 오류: {str(e)}"
-                logger.critical(error_msg)
-                raise Exception(error_msg)
+
+async def prefetch_vision_analysis(image_bytes: bytes) -> None:
+    """
+    사진 업로드 직후 Vision 분석을 백그라운드에서 시작합니다 (async_runner 루프에서 실행).
+
+    캐시에 결과가 있거나, 같은 이미지로 진행 중이거나 성공한 분석이 있으면 새로 시작하지 않습니다.
+    사용자가 나머지 화면을 보는 동안 GPT-4o 지연(3~8초)을 미리 소화하는 것이 목적입니다.
+
+    Args:
+        image_bytes: 분석용으로 정규화된 JPEG 바이트
+    """
+    digest, cached, source = await asyncio.to_thread(_inspect_image, image_bytes)
+    if cached is not None:
+        logger.info(f"Vision 선행 분석 생략: 캐시 결과 있음 ({source})")
+        return
+
+    task = _vision_tasks.get(digest)
+    if task is not None and _is_usable(task):
+        return
+
+    logger.info(f"Vision 선행 분석 시작 (digest={digest[:12]})")
+    _start_vision_task(image_bytes, digest, timeout=settings.VISION_PREFETCH_TIMEOUT_SECONDS)
+
+
+def has_vision_prefetch(image_bytes: bytes) -> bool:
+    """
+    이미지에 대해 사용 가능한(진행 중이거나 성공한) 선행 분석이 있는지 확인합니다.
+    """
+    task = _vision_tasks.get(compute_image_digest(image_bytes))
+    return task is not None and _is_usable(task)
+
+
+async def run_vision_stage(
+    image_bytes: bytes,
+    timeout: float,
+    max_retries: int = 2,
+    tracker: Optional[PerformanceTracker] = None
+) -> Dict[str, str]:
+    """
+    분석 작업의 Vision 단계를 실행합니다.
+
+    캐시 → 진행 중/완료된 선행 분석 → 새 분석 순으로 결과를 구합니다.
+    공유 Task는 시간 초과 시에도 취소하지 않고(shield) 계속 진행시켜 캐시를 채우며,
+    VISION_LATE_COMPLETION_SECONDS + VISION_HARD_CAP_GRACE_SECONDS가 지나면 취소됩니다. 캐시가 꺼져 있으면 새 분석은
+    시간 초과 시 HTTP 요청까지 취소됩니다.
+
+    Args:
+        image_bytes: 분석용 JPEG 바이트
+        timeout: 이 단계의 시간 예산 (초)
+        max_retries: 최대 재시도 횟수
+        tracker: 캐시 hit/miss, 선행 분석 사용 여부를 기록할 PerformanceTracker (선택)
+
+    Returns:
+        dict: Vision 분석 결과
+
+    Raises:
+        asyncio.TimeoutError: 시간 예산 초과 시
+        Exception: 분석 실패 시
+    """
+    # 해시 계산/이미지 디코딩/디스크 캐시 읽기는 루프 밖에서
+    digest, cached, source = await asyncio.to_thread(_inspect_image, image_bytes)
+    if settings.VISION_CACHE_ENABLED:
+        if tracker is not None:
+            tracker.mark_event("vision_cache", source or "miss")
+            tracker.add_metadata(vision_cache_stats=get_vision_cache_stats())
+        if cached is not None:
+            logger.info(f"Vision 캐시 결과 사용 ({source})")
+            return cached
+
+    task = _vision_tasks.get(digest)
+    prefetched = task is not None and _is_usable(task)
+    if tracker is not None:
+        tracker.mark_event("vision_prefetch_hit", prefetched)
+    if prefetched:
+        logger.info("Vision 선행 분석 결과 사용")
+        return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+
+    if not settings.VISION_CACHE_ENABLED:
+        return await asyncio.wait_for(
+            analyze_dog_image_with_gpt4(
+                image_bytes=image_bytes,
+                max_retries=max_retries,
+                timeout=timeout
+            ),
+            timeout=timeout
+        )
+
+    task = _start_vision_task(
+        image_bytes,
+        digest,
+        timeout=max(timeout, settings.VISION_LATE_COMPLETION_SECONDS),
+        max_retries=max_retries
+    )
+    return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
 
 
 # ===== 폴백: 간단한 기본 분석 =====
@@ -0,0 +1,205 @@
+"""
+파일명: hedging.py
+목적: Hedged request - 느린 provider 응답(tail latency)에 대비해 중복 요청을 경쟁시킴
+작성일: 2026-10-18
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from config.settings import settings
+from src.utils.latency_stats import get_latency_stats
+from src.utils.paths import get_runtime_logs_dir
+from src.utils.perf import get_active_tracker
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("hedging")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [HEDGE] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+_MISSING = object()
+
+# 단계별 최근 호출의 hedge 발사 여부 (HEDGE_MAX_RATE 예산 계산용)
+_recent_hedges: Dict[str, Deque[bool]] = {}
+_recent_lock = threading.Lock()
+
+
+def get_hedge_policy(stage: str) -> str:
+    """
+    단계별 hedging 정책: "off" / "same"(같은 provider) / "alternate"(다른 provider).
+    """
+    if not settings.HEDGE_ENABLED:
+        return "off"
+    return settings.HEDGE_STAGES.get(stage, "off")
+
+
+def get_hedge_delay(stage: str, provider: str) -> float:
+    """
+    hedge 요청을 보내기까지 기다릴 시간 (관측된 단계 지연의 HEDGE_QUANTILE 분위수).
+
+    표본이 HEDGE_MIN_SAMPLES보다 적으면 HEDGE_DEFAULT_DELAY_SECONDS를 사용합니다.
+    """
+    stats = get_latency_stats()
+    key = f"{provider}:{stage}"
+    delay = settings.HEDGE_DEFAULT_DELAY_SECONDS
+    if stats.count(key) >= settings.HEDGE_MIN_SAMPLES:
+        delay = stats.quantile(key, settings.HEDGE_QUANTILE) or delay
+    return max(delay, settings.HEDGE_MIN_DELAY_SECONDS)
+
+
+def _reserve_hedge(stage: str) -> bool:
+    """최근 hedge 비율이 HEDGE_MAX_RATE 이하일 때만 hedge를 허용합니다 (provider 부하 보호)."""
+    with _recent_lock:
+        recent = _recent_hedges.setdefault(stage, deque(maxlen=100))
+        rate = sum(recent) / len(recent) if recent else 0.0
+        allowed = rate < settings.HEDGE_MAX_RATE
+        recent.append(allowed)
+        return allowed
+
+
+def _record_no_hedge(stage: str) -> None:
+    with _recent_lock:
+        _recent_hedges.setdefault(stage, deque(maxlen=100)).append(False)
+
+
+def _count(stage: str, **values: float) -> None:
+    tracker = get_active_tracker()
+    if tracker is not None:
+        tracker.add_counters(f"hedge.{stage}", **values)
+
+
+async def _timed(factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = await factory()
+    return result, time.perf_counter() - started
+
+
+async def hedged_call(
+    stage: str,
+    provider: str,
+    primary: Callable[[], Awaitable[Any]],
+    duplicate: Optional[Callable[[], Awaitable[Any]]] = None,
+    alternate: Optional[Callable[[], Awaitable[Any]]] = None,
+    is_valid: Optional[Callable[[Any], bool]] = None
+) -> Any:
+    """
+    primary 호출이 관측 p90 안에 끝나지 않으면 중복 요청을 보내 먼저 도착한 유효 결과를 사용합니다.
+
+    - 정책 "same"은 duplicate(없으면 primary)를 한 번 더, "alternate"는 alternate(다른 provider)를 호출합니다.
+    - is_valid를 통과한 첫 결과가 이기고 나머지 요청은 취소됩니다.
+    - primary가 p90 전에 실패/무효 결과로 끝나면 기다리지 않고 바로 hedge를 보냅니다.
+    - 유효한 결과가 없으면 primary 결과(없으면 hedge 결과)를 반환해 호출부 Self-Healing에 맡기고,
+      모두 실패하면 첫 예외를 다시 던집니다.
+
+    hedge 발사/승리 횟수는 활성 PerformanceTracker의 "hedge.{stage}" 카운터로 기록됩니다.
+    primary가 hedge에 져서 취소되면 그때까지의 경과 시간(최소 hedge 지연)을 중도 절단 표본으로
+    지연 통계에 남깁니다. 빠른 완료만 기록하면 p90이 점점 낮아져 hedge가 과하게 발사되기 때문입니다.
+
+    Args:
+        stage: 단계명 ("expert" / "mari")
+        provider: primary provider ("gpt" / "claude") - 지연 통계 키
+        primary: 기본 호출 코루틴 함수
+        duplicate: 같은 provider 중복 요청용 코루틴 함수 (Optional, 예: 스트리밍 콜백 없는 호출)
+        alternate: 다른 provider 호출 코루틴 함수 (Optional)
+        is_valid: 결과 검증 함수 (Optional, 없으면 예외 없이 끝난 결과는 모두 유효)
+
+    Returns:
+        Any: 이긴 호출의 결과
+    """
+    policy = get_hedge_policy(stage)
+    stats_key = f"{provider}:{stage}"
+
+    if policy == "off":
+        result, elapsed = await _timed(primary)
+        get_latency_stats().record(stats_key, elapsed)
+        return result
+
+    hedge_factory = alternate if (policy == "alternate" and alternate is not None) else (duplicate or primary)
+    hedge_label = "alternate" if hedge_factory is alternate else "same"
+    delay = get_hedge_delay(stage, provider)
+    _count(stage, calls=1)
+
+    labels: Dict[asyncio.Future, str] = {}
+    primary_started = time.perf_counter()
+    primary_task = asyncio.ensure_future(_timed(primary))
+    labels[primary_task] = "primary"
+    pending = {primary_task}
+    hedge_fired = False
+    hedge_consulted = False  # _reserve_hedge가 이미 이번 호출을 비율 기록에 남겼는지
+    fallback: Any = _MISSING
+    first_error: Optional[BaseException] = None
+
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        while True:
+            for task in done:
+                label = labels[task]
+                try:
+                    result, elapsed = task.result()
+                except Exception as exc:
+                    logger.warning(f"{stage} {label} 요청 실패: {str(exc)}")
+                    first_error = first_error or exc
+                    continue
+
+                if label == "primary":
+                    get_latency_stats().record(stats_key, elapsed)
+
+                if is_valid is None or is_valid(result):
+                    if hedge_fired:
+                        _count(stage, **{f"{label}_wins": 1})
+                        logger.info(f"{stage} hedge 경쟁 종료: {label} 승리 ({elapsed:.2f}s)")
+                    return result
+
+                logger.warning(f"{stage} {label} 결과 검증 실패")
+                if fallback is _MISSING or label == "primary":
+                    fallback = result
+
+            if not hedge_consulted:
+                hedge_consulted = True
+                if _reserve_hedge(stage):
+                    hedge_fired = True
+                    hedge_task = asyncio.ensure_future(_timed(hedge_factory))
+                    labels[hedge_task] = hedge_label
+                    pending.add(hedge_task)
+                    _count(stage, hedged=1)
+                    logger.info(f"{stage} hedge 요청 발사 ({hedge_label}, 기준 지연 {delay:.2f}s)")
+                else:
+                    logger.info(f"{stage} hedge 예산 초과로 생략 (HEDGE_MAX_RATE={settings.HEDGE_MAX_RATE})")
+
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if primary_task in pending:
+            # 끝나지 않은 primary의 실제 지연은 최소 지금까지의 경과 시간 (중도 절단 표본)
+            censored = max(time.perf_counter() - primary_started, delay)
+            get_latency_stats().record(stats_key, censored)
+            _count(stage, primary_censored=1)
+        for task in pending:
+            task.cancel()
+        if not hedge_consulted:
+            _record_no_hedge(stage)
+
+    if fallback is not _MISSING:
+        _count(stage, no_valid=1)
+        return fallback
+    raise first_error
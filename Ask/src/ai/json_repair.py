@@ -0,0 +1,345 @@
+"""
+파일명: json_repair.py
+목적: JSON Schema 기반 로컬 JSON 복구 (LLM 수정 호출 전에 타입 변환/필수 키 채우기/길이 절삭/잘린 텍스트 복원)
+작성일: 2026-10-18
+"""
+
+import copy
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.ai.json_stream import parse_partial_json
+from src.ai.schemas import (
+    DEFAULT_GUIDANCE,
+    DEFAULT_SOLUTION,
+    EXPERT_ANALYSIS_SCHEMA,
+    MARI_NARRATIVE_SCHEMA,
+    validate_expert_json,
+    validate_mari_json,
+)
+from src.utils.perf import get_active_tracker
+
+
+# ===== 배열 항목 기본값 (배열 키 기준) =====
+
+DEFAULT_MARI_SOLUTION = {
+    "title": "함께 연습해요",
+    "content": "천천히, 같은 방법으로 반복하면 조금씩 달라질 거예요.",
+    "steps": ["하루 5분, 짧게 연습해요.", "잘했을 때 바로 칭찬해 주세요."],
+}
+
+DEFAULT_MARI_GUIDANCE = {
+    "principle": "일관성",
+    "description": "가족 모두가 같은 규칙으로 대해 주시면 저도 덜 헷갈려요.",
+}
+
+# minItems까지 채울 배열 항목 기본값 (스키마만으로는 의미 있는 값을 만들 수 없음)
+ITEM_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "solutions_best_fit": DEFAULT_SOLUTION,
+    "future_guidance": DEFAULT_GUIDANCE,
+    "solutions": DEFAULT_MARI_SOLUTION,
+    "guidance": DEFAULT_MARI_GUIDANCE,
+}
+
+# 문자열 배열은 후보 문장 중 아직 없는 것부터 채움
+TEXT_ITEM_DEFAULTS: Dict[str, List[str]] = {
+    "key_characteristics": [
+        "설문 응답 기준 추가 관찰이 필요합니다.",
+        "상황별 반응 차이를 기록해 보면 도움이 됩니다.",
+        "보호자의 일관된 대응이 중요합니다.",
+    ],
+    "details": DEFAULT_SOLUTION["details"],
+    "steps": DEFAULT_MARI_SOLUTION["steps"],
+}
+
+# 누락된 필수 스칼라 값 기본값 (analyze_two_stage의 confidence_score 기본값과 같음)
+VALUE_DEFAULTS: Dict[str, Any] = {
+    "confidence_score": 0.5,
+}
+
+
+# ===== 잘린/감싸진 JSON 텍스트 복원 =====
+
+_CODE_FENCE = re.compile(r"```(?:json)?\s*\n?(.*?)(?:\n?```|$)", re.DOTALL)
+
+
+def salvage_json_text(text: str) -> Optional[Any]:
+    """
+    json.loads로 읽히지 않는 응답 텍스트에서 JSON 값을 최대한 복원합니다.
+
+    코드 블록(```json) 제거 → 앞뒤 설명문 제거(첫 '{'부터) → 잘린 끝부분 닫기 순으로 시도합니다.
+
+    Args:
+        text: AI 응답 텍스트
+
+    Returns:
+        Optional[Any]: 복원된 값, 복원할 수 없으면 None
+    """
+    if not text:
+        return None
+    candidate = text.strip()
+    fence = _CODE_FENCE.search(candidate)
+    if fence:
+        candidate = fence.group(1).strip()
+
+    start = candidate.find("{")
+    if start == -1:
+        return None
+    candidate = candidate[start:]
+
+    end = candidate.rfind("}")
+    if end != -1:
+        try:
+            return json.loads(candidate[:end + 1])
+        except json.JSONDecodeError:
+            pass
+    return parse_partial_json(candidate)
+
+
+def loads_or_salvage(text: str) -> Any:
+    """
+    json.loads로 읽고, 실패하면 salvage_json_text로 복원합니다 (복원 횟수는 json_repair 카운터에 기록).
+
+    Raises:
+        ValueError: 복원할 수 없을 때
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        salvaged = salvage_json_text(text)
+        if not isinstance(salvaged, dict):
+            raise ValueError(f"JSON 파싱 실패: {str(e)}")
+        _record(salvaged_text=1)
+        return salvaged
+
+
+# ===== 스키마 기반 복구 =====
+
+def _default_for(schema: Dict[str, Any], key: str, changes: List[str], path: str) -> Any:
+    """필수 키가 빠졌을 때 넣을 값을 스키마 타입으로 만듭니다."""
+    if key in VALUE_DEFAULTS:
+        return VALUE_DEFAULTS[key]
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return _repair_value({}, schema, changes, path, key)
+    if schema_type == "array":
+        return _repair_value([], schema, changes, path, key)
+    if schema_type in ("number", "integer"):
+        return schema.get("minimum", 0)
+    if schema_type == "boolean":
+        return False
+    return ""
+
+
+def _to_text(value: Any) -> str:
+    if isinstance(value, list):
+        return " ".join(_to_text(item) for item in value if item is not None)
+    if isinstance(value, dict):
+        return " ".join(_to_text(item) for item in value.values() if item is not None)
+    return str(value)
+
+
+def _repair_value(value: Any, schema: Dict[str, Any], changes: List[str], path: str, key: str) -> Any:
+    schema_type = schema.get("type")
+
+    if schema_type == "object":
+        properties = schema.get("properties", {})
+        if isinstance(value, str):
+            salvaged = salvage_json_text(value)
+            changes.append(f"{path}: 문자열 → 객체")
+            if isinstance(salvaged, dict):
+                value = salvaged
+            else:
+                # 객체 대신 문장만 온 경우: 가장 긴 문자열 필드(본문)에 넣음
+                text_fields = [name for name, prop in properties.items() if prop.get("type") == "string"]
+                if text_fields:
+                    body = max(text_fields, key=lambda name: properties[name].get("maxLength", 0))
+                    value = {body: value}
+        if not isinstance(value, dict):
+            changes.append(f"{path}: {type(value).__name__} → 객체")
+            value = {}
+        if schema.get("additionalProperties", True) is False:
+            extra = [name for name in value if name not in properties]
+            if extra:
+                changes.append(f"{path}: 허용되지 않은 필드 제거 ({', '.join(extra)})")
+                value = {name: item for name, item in value.items() if name in properties}
+        for name, prop_schema in properties.items():
+            child_path = f"{path}.{name}" if path else name
+            if name in value:
+                value[name] = _repair_value(value[name], prop_schema, changes, child_path, name)
+            elif name in schema.get("required", []):
+                changes.append(f"{child_path}: 누락 → 기본값")
+                value[name] = _default_for(prop_schema, name, changes, child_path)
+        return value
+
+    if schema_type == "array":
+        if value is None:
+            value = []
+        elif isinstance(value, (str, dict)):
+            changes.append(f"{path}: {type(value).__name__} → 배열")
+            value = [value] if value != "" else []
+        elif not isinstance(value, list):
+            changes.append(f"{path}: {type(value).__name__} → 배열")
+            value = [value]
+        item_schema = schema.get("items", {})
+        if item_schema.get("type") == "object":
+            # 객체 자리에 온 null/빈 항목은 버리고 기본값으로 채움
+            kept = [item for item in value if isinstance(item, (dict, str)) and item]
+            if len(kept) != len(value):
+                changes.append(f"{path}: 빈 항목 {len(value) - len(kept)}개 제거")
+            value = kept
+        max_items = schema.get("maxItems")
+        if max_items is not None and len(value) > max_items:
+            changes.append(f"{path}: {len(value)}개 → {max_items}개로 절삭")
+            value = value[:max_items]
+        value = [
+            _repair_value(item, item_schema, changes, f"{path}[{index}]", key)
+            for index, item in enumerate(value)
+        ]
+        min_items = schema.get("minItems", 0)
+        if len(value) < min_items:
+            if item_schema.get("type") == "string":
+                # 빈 문자열로는 채우지 않음 (화면에 빈 항목만 늘어남), 후보가 모자라면 복구 실패
+                candidates = [text for text in TEXT_ITEM_DEFAULTS.get(key, []) if text not in value]
+                fill = candidates[:min_items - len(value)]
+            else:
+                default_item = ITEM_DEFAULTS.get(key)
+                fill = [
+                    copy.deepcopy(default_item) if default_item is not None
+                    else _default_for(item_schema, key, changes, f"{path}[{len(value) + index}]")
+                    for index in range(min_items - len(value))
+                ]
+            if fill:
+                changes.append(f"{path}: {len(value)}개 → {len(value) + len(fill)}개로 채움")
+                value = value + fill
+        return value
+
+    if schema_type in ("number", "integer"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            try:
+                value = float(str(value).strip().rstrip("%"))
+            except (TypeError, ValueError):
+                changes.append(f"{path}: 숫자 변환 실패 → 기본값")
+                return _default_for(schema, key, changes, path)
+            changes.append(f"{path}: 문자열 → 숫자")
+        if "maximum" in schema and value > schema["maximum"]:
+            # 0-1 점수를 퍼센트(85)로 준 경우
+            if schema["maximum"] == 1.0 and value <= 100:
+                value = value / 100
+            else:
+                value = schema["maximum"]
+            changes.append(f"{path}: 최댓값으로 보정")
+        if "minimum" in schema and value < schema["minimum"]:
+            value = schema["minimum"]
+            changes.append(f"{path}: 최솟값으로 보정")
+        return int(value) if schema_type == "integer" else value
+
+    if schema_type == "string":
+        if value is None:
+            changes.append(f"{path}: null → 빈 문자열")
+            value = ""
+        elif not isinstance(value, str):
+            changes.append(f"{path}: {type(value).__name__} → 문자열")
+            value = _to_text(value)
+        max_length = schema.get("maxLength")
+        if max_length is not None and len(value) > max_length:
+            changes.append(f"{path}: {len(value)}자 → {max_length}자로 절삭")
+            value = value[:max_length - 1].rstrip() + "…"
+        return value
+
+    return value
+
+
+def repair_to_schema(data: Any, schema: Dict[str, Any]) -> Tuple[Any, List[str]]:
+    """
+    JSON 값을 스키마에 맞게 고칩니다 (원본은 바꾸지 않음).
+
+    - 타입 변환: 숫자/문자열/배열/객체 간 변환 ("0.8" → 0.8, 문자열 → [문자열] 등)
+    - 필수 키 채우기: VALUE_DEFAULTS → ITEM_DEFAULTS → 스키마 타입 기본값 순
+    - maxLength/maxItems 절삭, minItems 채우기(ITEM_DEFAULTS/TEXT_ITEM_DEFAULTS), minimum/maximum 보정
+
+    additionalProperties가 false인 객체에서는 스키마에 없는 키를 제거합니다.
+
+    Args:
+        data: 복구할 값
+        schema: JSON Schema ({"name", "schema"} 래퍼 또는 schema 본문)
+
+    Returns:
+        tuple: (복구된 값, 변경 내역)
+    """
+    body = schema.get("schema", schema)
+    changes: List[str] = []
+    repaired = _repair_value(copy.deepcopy(data), body, changes, "", "")
+    return repaired, changes
+
+
+def _too_broken(data: Any, schema: Dict[str, Any]) -> Optional[str]:
+    """
+    최상위 필수 필드가 절반 넘게 없으면 복구하지 않습니다 (기본값만으로 문서를 지어내지 않도록).
+    """
+    required = schema["schema"]["required"]
+    if not isinstance(data, dict):
+        return f"복구 불가: 객체가 아님 ({type(data).__name__})"
+    missing = [field for field in required if field not in data]
+    if len(missing) * 2 > len(required):
+        return f"복구 불가: 필수 필드 {len(missing)}/{len(required)}개 누락"
+    return None
+
+
+def _record(**counters: float) -> None:
+    tracker = get_active_tracker()
+    if tracker is not None:
+        tracker.add_counters("json_repair", **counters)
+
+
+def repair_expert_json(data: Any) -> Tuple[Dict[str, Any], bool, str]:
+    """
+    전문가 분석 JSON을 EXPERT_ANALYSIS_SCHEMA로 로컬 복구하고 다시 검증합니다.
+
+    Returns:
+        tuple: (복구된 JSON, 검증 통과 여부, 에러 메시지)
+    """
+    reason = _too_broken(data, EXPERT_ANALYSIS_SCHEMA)
+    if reason is not None:
+        _record(expert_attempts=1, expert_repaired=0)
+        return data, False, reason
+    repaired, changes = repair_to_schema(data, EXPERT_ANALYSIS_SCHEMA)
+    is_valid, error_msg = validate_expert_json(repaired)
+    _record(expert_attempts=1, expert_repaired=1 if is_valid else 0, expert_changes=len(changes))
+    return repaired, is_valid, error_msg
+
+
+def is_expert_json_usable(data: Any) -> bool:
+    """
+    검증을 통과하거나 로컬 복구만으로 통과할 수 있는지 (hedge 판정용, 카운터 기록 없음).
+    """
+    if isinstance(data, dict) and validate_expert_json(data)[0]:
+        return True
+    if _too_broken(data, EXPERT_ANALYSIS_SCHEMA) is not None:
+        return False
+    return validate_expert_json(repair_to_schema(data, EXPERT_ANALYSIS_SCHEMA)[0])[0]
+
+
+def repair_mari_json(data: Any) -> Tuple[Dict[str, Any], bool, str]:
+    """
+    마리 내러티브 JSON을 MARI_NARRATIVE_SCHEMA로 로컬 복구하고 다시 검증합니다.
+
+    Returns:
+        tuple: (복구된 JSON, 검증 통과 여부, 에러 메시지)
+    """
+    reason = _too_broken(data, MARI_NARRATIVE_SCHEMA)
+    if reason is not None:
+        _record(mari_attempts=1, mari_repaired=0)
+        return data, False, reason
+    repaired, changes = repair_to_schema(data, MARI_NARRATIVE_SCHEMA)
+    is_valid, error_msg = validate_mari_json(repaired)
+    _record(mari_attempts=1, mari_repaired=1 if is_valid else 0, mari_changes=len(changes))
+    return repaired, is_valid, error_msg
+
+
+def record_remote_fix(avoided: bool) -> None:
+    """
+    LLM 수정 호출(fix_json_with_prompt)을 로컬 복구로 생략했는지 기록합니다.
+    """
+    _record(remote_fix_avoided=1 if avoided else 0, remote_fix_calls=0 if avoided else 1)
@@ -0,0 +1,171 @@
+"""
+파일명: json_stream.py
+목적: 스트리밍 중인(잘린) JSON 텍스트에서 현재까지 완성된 부분을 복원
+작성일: 2026-10-18
+"""
+
+import json
+from typing import Any, List, Optional
+
+
+_WHITESPACE = " \t\r\n"
+_VALUE_TERMINATORS = ",]}" + _WHITESPACE
+
+
+def _closers(stack: List[List[str]]) -> str:
+    return "".join("}" if frame[0] == "{" else "]" for frame in reversed(stack))
+
+
+def _trim_partial_escape(fragment: str) -> str:
+    """문자열 끝의 미완성 이스케이프(\\, \\u12 등)를 잘라냅니다."""
+    backslash = fragment.rfind("\\")
+    if backslash == -1:
+        return fragment
+
+    # 연속된 백슬래시 개수로 마지막 백슬래시가 이스케이프 시작인지 판단
+    run = 0
+    idx = backslash
+    while idx >= 0 and fragment[idx] == "\\":
+        run += 1
+        idx -= 1
+    if run % 2 == 0:
+        return fragment
+
+    tail = fragment[backslash + 1:]
+    if not tail:
+        return fragment[:backslash]
+    if tail[0] == "u" and len(tail) < 5:
+        return fragment[:backslash]
+    return fragment
+
+
+def complete_partial_json(text: str) -> Optional[str]:
+    """
+    잘린 JSON 텍스트를 유효한 JSON 문자열로 닫습니다.
+
+    완성된 값까지만 남기고 열린 객체/배열을 닫습니다.
+    값 위치의 문자열이 작성 중이면 현재까지의 내용으로 닫아 부분 텍스트도 살립니다.
+    키만 있고 값이 없는 항목, 끝이 확정되지 않은 숫자/리터럴은 버립니다.
+
+    Args:
+        text: 스트리밍으로 누적된 JSON 텍스트
+
+    Returns:
+        Optional[str]: 닫힌 JSON 문자열, 아직 복원할 내용이 없으면 None
+    """
+    # frame = [컨테이너 종류, 상태]
+    # 객체 상태: key → colon → value → comma, 배열 상태: value → comma
+    stack: List[List[str]] = []
+    safe_text: Optional[str] = None
+    i = 0
+    n = len(text)
+
+    def expecting_value() -> bool:
+        return not stack or stack[-1][1] == "value"
+
+    def value_done(end: int) -> None:
+        nonlocal safe_text
+        if stack:
+            stack[-1][1] = "comma"
+        safe_text = text[:end] + _closers(stack)
+
+    while i < n:
+        ch = text[i]
+
+        if ch in _WHITESPACE:
+            i += 1
+            continue
+
+        if ch in "{[":
+            if not expecting_value():
+                return safe_text
+            stack.append([ch, "key" if ch == "{" else "value"])
+            i += 1
+            safe_text = text[:i] + _closers(stack)
+            continue
+
+        if ch in "}]":
+            if not stack:
+                return safe_text
+            stack.pop()
+            i += 1
+            value_done(i)
+            if not stack:
+                return safe_text
+            continue
+
+        if ch == '"':
+            j = i + 1
+            escaped = False
+            while j < n:
+                c = text[j]
+                if escaped:
+                    escaped = False
+                elif c == "\\":
+                    escaped = True
+                elif c == '"':
+                    break
+                j += 1
+
+            is_key = bool(stack) and stack[-1][0] == "{" and stack[-1][1] == "key"
+
+            if j >= n:
+                # 작성 중인 문자열: 값이면 현재까지 내용으로 닫음, 키면 버림
+                if is_key or not expecting_value():
+                    return safe_text
+                fragment = _trim_partial_escape(text[i:n])
+                return text[:i] + fragment + '"' + _closers(stack)
+
+            i = j + 1
+            if is_key:
+                stack[-1][1] = "colon"
+            elif expecting_value():
+                value_done(i)
+            else:
+                return safe_text
+            continue
+
+        if ch == ":":
+            if stack and stack[-1][0] == "{" and stack[-1][1] == "colon":
+                stack[-1][1] = "value"
+            i += 1
+            continue
+
+        if ch == ",":
+            if stack and stack[-1][1] == "comma":
+                stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+            i += 1
+            continue
+
+        # 숫자 / true / false / null
+        j = i
+        while j < n and text[j] not in _VALUE_TERMINATORS:
+            j += 1
+        if j >= n:
+            # 끝이 확정되지 않은 값 (예: 0.8 → 0.85)
+            return safe_text
+        if not expecting_value():
+            return safe_text
+        i = j
+        value_done(i)
+
+    return safe_text
+
+
+def parse_partial_json(text: str) -> Optional[Any]:
+    """
+    잘린 JSON 텍스트를 가능한 만큼 파싱합니다.
+
+    Args:
+        text: 스트리밍으로 누적된 JSON 텍스트
+
+    Returns:
+        Optional[Any]: 파싱된 값, 복원할 수 없으면 None
+    """
+    completed = complete_partial_json(text)
+    if completed is None:
+        return None
+    try:
+        return json.loads(completed)
+    except json.JSONDecodeError:
+        return None
@@ -4,7 +4,7 @@
 작성일: 2025-01-26
 """
 
-from typing import Dict
+from typing import Dict, Tuple
 
 # ===== 1차 AI: 전문가 페르소나 =====
 
@@ -409,6 +409,25 @@ def get_mari_conversion_template() -> str:
     return MARI_CONVERSION_TEMPLATE
 
 
+# 캐시 친화 레이아웃에서 고정 규칙 안의 강아지 이름 자리 표시
+MARI_DOG_NAME_PLACEHOLDER = "[강아지 이름]"
+
+
+def get_mari_conversion_layout() -> Tuple[str, str]:
+    """
+    변환 템플릿을 요청마다 바뀌는 부분과 고정 규칙으로 나눕니다 (프롬프트 캐싱용).
+
+    고정 규칙(변환 규칙 + 출력 형식)은 system 프롬프트 뒤에 붙여 매 요청 같은 prefix가 되도록 하고,
+    규칙 안의 {dog_name}은 MARI_DOG_NAME_PLACEHOLDER로 바꿉니다.
+
+    Returns:
+        (요청 템플릿, 고정 규칙): 요청 템플릿은 raw_analysis/dog_name/dog_age/hardest_part로 format
+    """
+    request_part, _, rules_part = MARI_CONVERSION_TEMPLATE.partition("\n---\n")
+    rules = rules_part.strip().replace("{dog_name}", MARI_DOG_NAME_PLACEHOLDER)
+    return request_part.rstrip() + "\n", rules
+
+
 def get_system_instructions() -> str:
     """
     구버전 시스템 지침을 반환합니다 (하위 호환성).
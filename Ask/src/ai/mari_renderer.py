@@ -0,0 +1,472 @@
+"""
+파일명: mari_renderer.py
+목적: LLM 호출 없이 전문가 분석 JSON을 마리 내러티브(MariNarrative 형식)로 변환하는 로컬 렌더러
+작성일: 2026-10-18
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.settings import settings
+
+
+# ===== 한국어 조사 처리 =====
+
+_HANGUL_START = 0xAC00
+_HANGUL_END = 0xD7A3
+_RIEUL_FINAL = 8  # 종성 인덱스: ㄹ
+
+# 숫자를 읽었을 때 받침 여부 (0 영, 1 일, 3 삼, 6 육, 7 칠, 8 팔 → 받침 있음)
+_DIGIT_FINAL = {"0": 21, "1": 8, "2": 0, "3": 16, "4": 0, "5": 0, "6": 1, "7": 8, "8": 8, "9": 0}
+
+
+def _final_consonant(word: str) -> int:
+    """
+    단어 마지막 글자의 종성 인덱스를 반환합니다 (0이면 받침 없음).
+
+    괄호/공백/문장부호는 건너뛰고, 숫자는 읽는 소리, 영문은 l/m/n 끝만 받침으로 봅니다.
+    """
+    for char in reversed(word.strip()):
+        code = ord(char)
+        if _HANGUL_START <= code <= _HANGUL_END:
+            return (code - _HANGUL_START) % 28
+        if char in _DIGIT_FINAL:
+            return _DIGIT_FINAL[char]
+        if char.isalpha():
+            lowered = char.lower()
+            if lowered == "l":
+                return _RIEUL_FINAL
+            return 4 if lowered in "mn" else 0
+        # ')', '"', '.' 등은 무시하고 앞 글자로
+    return 0
+
+
+def josa(word: str, pair: str) -> str:
+    """
+    받침에 맞는 조사를 붙여 반환합니다.
+
+    Args:
+        word: 앞 단어 (예: "코코")
+        pair: "받침 있을 때/없을 때" 형식 (예: "이/가", "은/는", "을/를", "과/와", "으로/로", "이에요/예요")
+
+    Returns:
+        str: 단어 + 조사 (예: "코코가", "몽실이는")
+    """
+    with_final, without_final = pair.split("/")
+    final = _final_consonant(word)
+    if with_final == "으로":
+        # ㄹ 받침은 "로" (예: 서울로)
+        return word + ("으로" if final and final != _RIEUL_FINAL else "로")
+    return word + (with_final if final else without_final)
+
+
+# ===== 문체 변환 (전문가 문어체 → 마리 해요체) =====
+
+def _polite_copula(match: "re.Match[str]") -> str:
+    stem = match.group(1)
+    return josa(stem, "이에요/예요") + match.group(2)
+
+
+def _polite_generic(match: "re.Match[str]") -> str:
+    stem, tail = match.group(1), match.group(2)
+    # 어간 마지막 모음이 ㅏ/ㅗ이면 "아요", 그 외는 "어요" (예: 높습니다 → 높아요, 먹습니다 → 먹어요)
+    code = ord(stem[-1]) - _HANGUL_START
+    vowel = (code // 28) % 21 if 0 <= code <= _HANGUL_END - _HANGUL_START else -1
+    return stem + ("아요" if vowel in (0, 8) else "어요") + tail
+
+
+# 받침 ㅂ을 떼고 해요체로 줄일 때의 모음 변화 (ㅣ→ㅕ, ㅜ→ㅝ, ㅗ→ㅘ, ㅡ→ㅓ, ㅚ→ㅙ)
+_CONTRACTED_VOWELS = {20: 6, 13: 14, 8: 9, 18: 4, 11: 10}
+_FINAL_BIEUP = 17
+
+# "~입니다" 앞이 이 한 글자면 서술격 조사가 아니라 동사 어간 (예: 경향을 보입니다 → 보여요)
+_VERB_STEMS_BEFORE_I = {"보", "줄", "높", "낮", "먹", "붙", "속", "죽"}
+
+
+def _polite_bieup(match: "re.Match[str]") -> str:
+    # 예: 줍니다 → 줘요, 늘립니다 → 늘려요, 멈춥니다 → 멈춰요, 보냅니다 → 보내요
+    code = ord(match.group(1)) - _HANGUL_START
+    initial, vowel = code // (21 * 28), (code // 28) % 21
+    vowel = _CONTRACTED_VOWELS.get(vowel, vowel)
+    return chr(_HANGUL_START + (initial * 21 + vowel) * 28) + "요" + match.group(2)
+
+
+def _polite_copula_or_verb(match: "re.Match[str]") -> str:
+    if match.group(1) in _VERB_STEMS_BEFORE_I:
+        return match.group(1) + "여요" + match.group(2)
+    return _polite_copula(match)
+
+
+_POLITE_RULES = [
+    (re.compile(r"([가-힣]+?)입니다([.!?]?)"), _polite_copula_or_verb),
+    (re.compile(r"합니다"), "해요"),
+    (re.compile(r"됩니다"), "돼요"),
+    (re.compile(r"(있|없|했|었|았|였|겠)습니다"), r"\1어요"),
+    (re.compile(r"([가-힣])습니다([.!?]?)"), _polite_generic),
+    (re.compile(r"듭니다"), "들어요"),  # ㄹ 탈락 어간 (만듭니다, 힘듭니다, 줄어듭니다)
+    (re.compile(r"([가-힣])니다([.!?]?)"), lambda m: _polite_bieup(m) if _final_consonant(m.group(1)) == _FINAL_BIEUP else m.group(0)),
+    (re.compile(r"(필요|중요|가능|적절|효과적|도움)하다([.!?]|$)"), r"\1해요\2"),
+    (re.compile(r"한다([.!?]|$)"), r"해요\1"),
+    (re.compile(r"된다([.!?]|$)"), r"돼요\1"),
+    (re.compile(r"(있|없)다([.!?]|$)"), r"\1어요\2"),
+    (re.compile(r"하십시오"), "해보세요"),
+]
+
+
+def to_polite(text: str) -> str:
+    """
+    전문가 분석의 합니다체/한다체 문장 끝을 마리의 해요체로 바꿉니다.
+
+    자주 쓰이는 어미만 규칙으로 처리하고, 해당하지 않는 문장은 그대로 둡니다.
+    """
+    result = (text or "").strip()
+    for pattern, replacement in _POLITE_RULES:
+        result = pattern.sub(replacement, result)
+    return result
+
+
+def _clip(text: str, limit: int) -> str:
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + "…"
+
+
+def _pad_items(items: Any, count: int) -> List[Dict[str, Any]]:
+    """목록을 count개로 자르고, 모자라면 빈 항목으로 채웁니다 (스키마의 고정 개수 유지)."""
+    kept = [item for item in items if isinstance(item, dict)][:count] if isinstance(items, list) else []
+    return kept + [{} for _ in range(count - len(kept))]
+
+
+def _sentence(text: str) -> str:
+    text = text.strip()
+    if text and text[-1] not in ".!?~)💛🐾":
+        text += "."
+    return text
+
+
+# ===== 톤 템플릿 =====
+
+# 슬롯별 여러 표현 중 강아지 이름/고민으로 결정적으로 하나를 고름 (같은 입력 → 같은 결과)
+TONE_TEMPLATES: Dict[str, Dict[str, Sequence[str]]] = {
+    "warm": {
+        "title": (
+            "{name_age} 행동 분석 결과예요!",
+            "{name_and} 함께 살펴본 행동 분석 결과예요!",
+        ),
+        "trait_line": (
+            "{name_topic} {traits} 모습이 보이는 아이예요.",
+            "{name}에게서는 {traits} 모습이 느껴져요.",
+        ),
+        "reassure": (
+            "이건 {name_subject} 나빠서가 아니라, 아직 배우는 중이라는 신호예요 🐾",
+            "{name_subject} 보내는 신호를 차근차근 읽어주면 분명 달라질 수 있어요 🐾",
+        ),
+        "hardest": (
+            "보호자님이 가장 힘드셨던 '{hardest}' 부분부터 함께 풀어가 볼게요.",
+            "특히 '{hardest}' 부분이 많이 힘드셨죠. 그 부분을 중심으로 정리했어요.",
+        ),
+        "solution_intro": (
+            "",
+            "{name}에게 잘 맞는 방법이에요. ",
+        ),
+        "extra_step": (
+            "처음엔 하루 5분만, {name_subject} 편안해하는 선에서 시작해요.",
+            "잘 해냈을 때는 바로 간식과 칭찬으로 알려주세요.",
+        ),
+        "guidance_tail": (
+            "",
+            "조급해하지 않아도 괜찮아요.",
+            "작은 변화도 꼭 칭찬해 주세요.",
+        ),
+        "signoff": (
+            "{name_topic} 잘하고 있어요. 보호자님도 너무 잘하고 계세요 💛",
+            "{name}의 속도에 맞춰 한 걸음씩 가면 돼요. 보호자님, 정말 잘하고 계세요 💛",
+        ),
+    },
+    "cheerful": {
+        "title": (
+            "{name_age} 맞춤 솔루션이 도착했어요!",
+            "짜잔! {name_age} 행동 분석 결과예요!",
+        ),
+        "trait_line": (
+            "{name_topic} {traits} 매력 만점 친구예요!",
+            "{name}의 매력 포인트는 {traits} 모습이에요!",
+        ),
+        "reassure": (
+            "조금만 방법을 바꿔주면 {name_subject} 금방 따라올 거예요 🐾",
+            "{name_topic} 배울 준비가 충분히 된 친구예요 🐾",
+        ),
+        "hardest": (
+            "'{hardest}' 고민, 오늘부터 같이 해결해 봐요!",
+            "가장 힘드셨던 '{hardest}' 부분을 콕 집어서 준비했어요!",
+        ),
+        "solution_intro": (
+            "",
+            "이건 {name_and} 함께 재미있게 해볼 수 있어요! ",
+        ),
+        "extra_step": (
+            "놀이처럼 짧고 즐겁게, 하루 5분부터 시작해요!",
+            "성공하면 바로 간식 파티로 칭찬해 주세요!",
+        ),
+        "guidance_tail": (
+            "",
+            "작은 성공도 크게 칭찬해 주세요!",
+            "보호자님과 함께라면 충분히 할 수 있어요!",
+        ),
+        "signoff": (
+            "{name_topic} 잘하고 있어요! 보호자님도 최고예요 💛",
+            "{name_and} 함께하는 매일이 연습이에요. 보호자님, 응원할게요 💛",
+        ),
+    },
+    "calm": {
+        "title": (
+            "{name_age} 행동 분석 결과예요.",
+            "{name}의 마음을 천천히 살펴봤어요.",
+        ),
+        "trait_line": (
+            "{name_topic} {traits} 모습을 보이고 있어요.",
+            "{name}에게서는 {traits} 모습이 관찰돼요.",
+        ),
+        "reassure": (
+            "{name_subject} 불안을 느끼는 건 자연스러운 일이에요. 안전하다고 느끼게 해주는 것부터 시작해요 🐾",
+            "서두르지 않고 {name}의 속도를 존중해 주면 충분히 나아질 수 있어요 🐾",
+        ),
+        "hardest": (
+            "보호자님이 가장 힘드셨던 '{hardest}' 부분을 먼저 살펴볼게요.",
+            "'{hardest}' 부분이 많이 마음 쓰이셨을 거예요. 그 부분을 중심으로 정리했어요.",
+        ),
+        "solution_intro": (
+            "",
+            "{name_subject} 편안함을 느끼는 범위 안에서 해주세요. ",
+        ),
+        "extra_step": (
+            "{name_subject} 긴장하는 기색이 보이면 거리를 늘리고 잠시 쉬어가요.",
+            "차분하게 해냈을 때 낮은 목소리로 칭찬해 주세요.",
+        ),
+        "guidance_tail": (
+            "",
+            "천천히 가도 괜찮아요.",
+            "{name}의 신호를 먼저 살펴주세요.",
+        ),
+        "signoff": (
+            "{name_topic} 충분히 잘하고 있어요. 보호자님도 잘하고 계세요 💛",
+            "오늘의 작은 안정이 내일의 큰 변화가 돼요. 보호자님, 함께할게요 💛",
+        ),
+    },
+}
+
+# 주요 고민별 기본 톤 (MARI_RENDER_TONE="auto"일 때)
+_CONCERN_TONES = {
+    "stranger_anxiety": "calm",
+    "walk_aggression": "calm",
+    "biting": "calm",
+    "barking": "warm",
+    "toilet": "cheerful",
+}
+
+
+def choose_tone(main_concerns: Optional[List[str]] = None) -> str:
+    """
+    MARI_RENDER_TONE 설정 또는 주요 고민으로 톤을 고릅니다.
+    """
+    configured = settings.MARI_RENDER_TONE
+    if configured in TONE_TEMPLATES:
+        return configured
+    for concern in main_concerns or []:
+        if concern in _CONCERN_TONES:
+            return _CONCERN_TONES[concern]
+    return "warm"
+
+
+class _Phrasebook:
+    """톤 템플릿에서 슬롯별 문장을 결정적으로 골라 채웁니다."""
+
+    def __init__(self, tone: str, seed: str, values: Dict[str, str]) -> None:
+        self.templates = TONE_TEMPLATES[tone]
+        self.seed = seed
+        self.values = values
+
+    def say(self, slot: str, index: int = 0, **extra: str) -> str:
+        options = self.templates[slot]
+        digest = hashlib.sha256(f"{self.seed}:{slot}:{index}".encode("utf-8")).digest()
+        template = options[digest[0] % len(options)]
+        return template.format(**self.values, **extra)
+
+
+# ===== 렌더링 =====
+
+def _format_age(dog_age: Any) -> str:
+    if isinstance(dog_age, dict):
+        year, month = dog_age.get("year"), dog_age.get("month")
+        return f"{year}년 {month}월생" if year else ""
+    if dog_age in (None, "", "알 수 없음"):
+        return ""
+    return str(dog_age)
+
+
+def render_mari_story(
+    raw_json: Dict[str, Any],
+    dog_name: str,
+    dog_age: Any = None,
+    hardest_part: Optional[str] = None,
+    main_concerns: Optional[List[str]] = None,
+    tone: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    전문가 분석 JSON을 마리 내러티브로 변환합니다 (LLM 호출 없음, 수 ms 이내).
+
+    2차 AI가 만드는 MariNarrative와 같은 구조를 반환하므로
+    format_mari_story_markdown / normalize_mari_data_for_rendering에서 그대로 사용할 수 있습니다.
+    같은 입력에는 항상 같은 문장이 나옵니다.
+
+    Args:
+        raw_json: 1차 AI 전문가 분석 JSON (Normalize 이후)
+        dog_name: 강아지 이름
+        dog_age: 강아지 나이 (문자열 또는 {"year", "month"})
+        hardest_part: 보호자가 가장 힘들어하는 점
+        main_concerns: 주요 고민 코드 (톤 자동 선택용)
+        tone: "warm" / "cheerful" / "calm" (기본: choose_tone())
+
+    Returns:
+        dict: {"header", "solutions", "guidance", "mari_closing"}
+    """
+    name = (dog_name or "강아지").strip()
+    age = _format_age(dog_age)
+    tone = tone if tone in TONE_TEMPLATES else choose_tone(main_concerns)
+    phrases = _Phrasebook(
+        tone,
+        seed=f"{name}:{','.join(main_concerns or [])}:{hardest_part or ''}",
+        values={
+            "name": name,
+            "name_age": f"{name}({age})의" if age else f"{name}의",
+            "name_topic": josa(name, "은/는"),
+            "name_subject": josa(name, "이/가"),
+            "name_and": josa(name, "과/와"),
+        },
+    )
+
+    summary_data = raw_json.get("analysis_summary", {}) or {}
+    characteristics = [item.strip() for item in summary_data.get("key_characteristics", []) if item and item.strip()]
+
+    # ----- header -----
+    summary_parts: List[str] = []
+    if characteristics:
+        traits = ", ".join(f"'{item}'" for item in characteristics[:3])
+        summary_parts.append(phrases.say("trait_line", traits=traits))
+    if summary_data.get("core_issue"):
+        summary_parts.append(_sentence(to_polite(summary_data["core_issue"])))
+    if summary_data.get("root_cause"):
+        summary_parts.append(_sentence(to_polite(summary_data["root_cause"])))
+    summary_parts.append(phrases.say("reassure"))
+    if hardest_part and hardest_part != "알 수 없음":
+        summary_parts.append(phrases.say("hardest", hardest=_clip(hardest_part, 60)))
+
+    header = {
+        "title": _clip(phrases.say("title"), 120),
+        "summary": _clip(" ".join(summary_parts), 800),
+    }
+
+    # ----- solutions (정확히 3개, 단계 2~4개) - 부족하면 톤 템플릿 기본 단계로 채움 -----
+    solutions = []
+    for index, solution in enumerate(_pad_items(raw_json.get("solutions_best_fit"), 3)):
+        content = phrases.say("solution_intro", index) + _sentence(to_polite(solution.get("content", "")))
+
+        steps = [_clip(_sentence(to_polite(detail)), 300) for detail in solution.get("details", []) if detail][:4]
+        for extra_step in TONE_TEMPLATES[tone]["extra_step"]:
+            if len(steps) >= 2:
+                break
+            steps.append(extra_step.format(**phrases.values))
+
+        solutions.append({
+            "title": _clip(solution.get("title", "") or f"솔루션 {index + 1}", 80),
+            "content": _clip(content, 500),
+            "steps": steps,
+        })
+
+    # ----- guidance (정확히 3개) -----
+    guidance = []
+    for index, item in enumerate(_pad_items(raw_json.get("future_guidance"), 3)):
+        parts = [_sentence(to_polite(item.get("content", "")))]
+        tail = phrases.say("guidance_tail", index)
+        if tail:
+            parts.append(tail)
+        guidance.append({
+            "principle": _clip(item.get("principle", "") or f"원칙 {index + 1}", 80),
+            "description": _clip(" ".join(part for part in parts if part), 400),
+        })
+
+    # ----- closing -----
+    closing_parts = []
+    if raw_json.get("core_message"):
+        closing_parts.append(f"\"{_sentence(to_polite(raw_json['core_message']))}\"")
+    closing_parts.append(phrases.say("signoff"))
+
+    return {
+        "header": header,
+        "solutions": solutions,
+        "guidance": guidance,
+        "mari_closing": {"core_message": _clip(" ".join(closing_parts), 300)},
+    }
+
+
+def format_mari_story_markdown(mari_story: Optional[Dict[str, Any]]) -> str:
+    """
+    마리 내러티브(LLM 또는 로컬 렌더러 결과)를 Markdown 텍스트로 변환합니다.
+    """
+    if not mari_story:
+        return ""
+
+    header = mari_story.get("header", {})
+    solutions = mari_story.get("solutions", [])
+    guidance = mari_story.get("guidance", [])
+    closing = mari_story.get("mari_closing", {})
+
+    parts: List[str] = []
+    title = header.get("title")
+    if title:
+        parts.append(f"**\"{title}\"**\n")
+    summary = header.get("summary")
+    if summary:
+        parts.append(summary + "\n")
+
+    if solutions:
+        parts.append("\n---\n\n🐾 **이런 솔루션이 가장 잘 맞아요!**\n")
+        for idx, sol in enumerate(solutions, start=1):
+            steps = "\n".join(f"- {step}" for step in sol.get("steps", []))
+            parts.append(
+                f"{idx}️⃣ **{sol.get('title', '솔루션')}**\n"
+                f"{sol.get('content', '')}\n{steps}\n\n"
+            )
+
+    if guidance:
+        parts.append("---\n\n🐾 **앞으로 이렇게 해보세요!**\n")
+        for item in guidance:
+            parts.append(f"- **{item.get('principle', '')}**: {item.get('description', '')}\n")
+
+    core_message = closing.get("core_message")
+    final_quote = closing.get("final_quote")
+    if core_message or final_quote:
+        parts.append("\n---\n\n")
+    if core_message:
+        parts.append(core_message + "\n\n")
+    if final_quote:
+        parts.append(final_quote)
+
+    return "".join(parts).strip()
+
+
+def should_render_locally(elapsed_seconds: float) -> bool:
+    """
+    마리 변환을 로컬 렌더러로 처리할지 결정합니다.
+
+    MARI_RENDER_MODE가 "local"이면 항상, "auto"이면 앞 단계까지의 소요 시간이
+    MARI_LOCAL_RENDER_AFTER_SECONDS를 넘었을 때(provider 지연/부하) 로컬로 처리합니다.
+    """
+    mode = settings.MARI_RENDER_MODE
+    if mode == "local":
+        return True
+    if mode == "auto":
+        return elapsed_seconds >= settings.MARI_LOCAL_RENDER_AFTER_SECONDS
+    return False
@@ -0,0 +1,280 @@
+"""
+파일명: progress.py
+목적: 분석 단계별 진행 이벤트(vision/expert/fused/mari)와 performance.log 이력 기반 예상 소요 시간·ETA
+작성일: 2026-10-18
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from config.settings import settings
+from src.ai.effort_controller import is_cache_hit_record
+from src.ai.schemas import MARI_NARRATIVE_SCHEMA
+from src.utils.perf import add_finish_listener, load_performance_records
+
+
+# ===== 단계 정의 =====
+
+STAGE_LABELS: Dict[str, str] = {
+    "queued": "분석 준비 중",
+    "vision": "사진 살펴보는 중",
+    "expert": "전문가 분석 중",
+    "fused": "전문가 분석과 마리 이야기 작성 중",
+    "mari": "마리가 이야기를 쓰는 중",
+    "done": "분석 완료",
+}
+
+# 단계 순서 (ANALYSIS_MODE="fused"는 expert+mari를 fused 1회로 처리, 실패하면 two_stage로 전환)
+TWO_STAGE_PLAN = ("vision", "expert", "mari")
+FUSED_PLAN = ("vision", "fused")
+
+# 단계별 소요 시간을 읽을 performance.log span
+_STAGE_SPANS: Dict[str, str] = {
+    "vision": "vision_analysis",
+    "expert": "expert_analysis",
+    "fused": "fused_analysis",
+    "mari": "mari_conversion",
+}
+
+# 경과 시간만으로는 한 단계를 이 비율 이상 진행된 것으로 보지 않음 (완료 이벤트를 기다림)
+_MAX_TIME_BASED_RATIO = 0.95
+
+_ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+# ===== 단계별 예상 소요 시간 (performance.log 학습) =====
+
+class StageDurationModel:
+    """
+    최근 성공한 분석 기록의 단계(span)별 소요 시간 중앙값을 예상 시간으로 사용합니다.
+
+    표본이 PROGRESS_MIN_SAMPLES보다 적은 단계는 PROGRESS_DEFAULT_STAGE_SECONDS를 씁니다.
+    """
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.window = window or settings.PROGRESS_HISTORY_WINDOW
+        self._samples: Dict[str, Deque[float]] = {
+            stage: deque(maxlen=self.window) for stage in _STAGE_SPANS
+        }
+        self._lock = threading.Lock()
+
+    def observe_record(self, record: Dict[str, Any]) -> None:
+        """
+        performance.log 기록 1건(analyze_two_stage / analyze_two_stage_claude)을 반영합니다.
+
+        전문가 분석/의미 캐시가 hit한 기록은 단계 시간이 실제 LLM 호출보다 짧으므로 제외합니다.
+        """
+        if not str(record.get("name", "")).startswith("analyze_two_stage"):
+            return
+        if record.get("status") != "success" or is_cache_hit_record(record):
+            return
+        durations = {
+            event["label"]: event["duration"]
+            for event in record.get("events", [])
+            if "duration" in event and "error" not in event
+        }
+        with self._lock:
+            for stage, span in _STAGE_SPANS.items():
+                if span in durations:
+                    self._samples[stage].append(durations[span])
+
+    def expected(self, stage: str) -> float:
+        with self._lock:
+            samples = list(self._samples.get(stage, ()))
+        if len(samples) >= settings.PROGRESS_MIN_SAMPLES:
+            return max(statistics.median(samples), 0.5)
+        return settings.PROGRESS_DEFAULT_STAGE_SECONDS.get(stage, 5.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """단계별 표본 수와 예상 시간 (디버깅/로그용)."""
+        with self._lock:
+            counts = {stage: len(samples) for stage, samples in self._samples.items()}
+        return {
+            stage: {"count": counts[stage], "expected": round(self.expected(stage), 2)}
+            for stage in _STAGE_SPANS
+        }
+
+
+_model: Optional[StageDurationModel] = None
+_model_lock = threading.Lock()
+
+
+def get_stage_duration_model() -> StageDurationModel:
+    """
+    프로세스 공용 모델: 처음 사용할 때 performance.log 이력을 읽고, 이후 끝나는 분석마다 갱신합니다.
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            model = StageDurationModel()
+            for record in load_performance_records()[-model.window * 2:]:
+                model.observe_record(record)
+            add_finish_listener(model.observe_record)
+            _model = model
+        return _model
+
+
+# ===== 진행 이벤트 =====
+
+def mari_completion(partial: Any) -> float:
+    """
+    스트리밍 중인 마리 JSON이 MARI_NARRATIVE_SCHEMA 필수 항목을 얼마나 채웠는지 (0~1).
+
+    object 필드는 1칸, array 필드는 maxItems칸으로 셉니다 (header 1 + solutions 3 + guidance 3 + closing 1).
+    """
+    if not isinstance(partial, dict):
+        return 0.0
+    body = MARI_NARRATIVE_SCHEMA["schema"]
+    filled = total = 0
+    for name in body["required"]:
+        prop = body["properties"][name]
+        value = partial.get(name)
+        if prop.get("type") == "array":
+            slots = prop.get("maxItems", 1)
+            filled += min(len(value), slots) if isinstance(value, list) else 0
+        else:
+            slots = 1
+            filled += 1 if value else 0
+        total += slots
+    return filled / total if total else 0.0
+
+
+class ProgressReporter:
+    """
+    analyze_two_stage가 단계 시작/완료/폴백/스트리밍 진행률을 알리는 객체.
+
+    on_progress에는 매번 전체 상태 스냅샷(dict)이 전달되며, 콜백 실패는 분석에 영향을 주지 않습니다.
+    on_progress가 None이면 아무것도 하지 않습니다.
+    """
+
+    def __init__(self, on_progress: Optional[_ProgressCallback], plan=TWO_STAGE_PLAN) -> None:
+        self._on_progress = on_progress
+        self._plan: List[str] = list(plan)
+        self._completed: List[str] = []
+        self._stage = "queued"
+        self._stage_started_at = time.time()
+        self._stage_fraction = 0.0
+        self._status = "started"
+        self._detail: Optional[str] = None
+
+    def _publish(self) -> None:
+        if self._on_progress is None:
+            return
+        snapshot = {
+            "stage": self._stage,
+            "status": self._status,
+            "label": STAGE_LABELS.get(self._stage, self._stage),
+            "detail": self._detail,
+            "plan": list(self._plan),
+            "completed": list(self._completed),
+            "stage_started_at": self._stage_started_at,
+            "stage_fraction": self._stage_fraction,
+            "updated_at": time.time(),
+        }
+        try:
+            self._on_progress(snapshot)
+        except Exception:  # noqa: BLE001 - 진행 표시 실패가 분석 결과에 영향을 주지 않도록
+            pass
+
+    def start(self, stage: str, detail: Optional[str] = None) -> None:
+        self._stage = stage
+        self._status = "started"
+        self._stage_started_at = time.time()
+        self._stage_fraction = 0.0
+        self._detail = detail
+        self._publish()
+
+    def finish(self, stage: str, status: str = "done", detail: Optional[str] = None) -> None:
+        """
+        단계를 끝냅니다. status는 "done" / "fallback" / "cache_hit" 등 (폴백도 단계 완료로 셈).
+        """
+        if stage not in self._completed:
+            self._completed.append(stage)
+        self._stage = stage
+        self._status = status
+        self._stage_fraction = 1.0
+        self._detail = detail
+        self._publish()
+
+    def note(self, status: str, detail: Optional[str] = None) -> None:
+        """현재 단계 안의 세부 이벤트 (예: "self_heal")."""
+        self._status = status
+        self._detail = detail
+        self._publish()
+
+    def stream(self, stage: str, fraction: float) -> None:
+        """스트리밍 중인 단계의 진행률 (0~1, 줄어들지 않음)."""
+        if stage != self._stage:
+            return
+        self._status = "streaming"
+        self._stage_fraction = max(self._stage_fraction, min(fraction, 1.0))
+        self._publish()
+
+    def replan(self, plan) -> None:
+        """단계 구성 변경 (예: fused 실패 → two_stage)."""
+        self._plan = list(plan)
+        self._completed = [stage for stage in self._completed if stage in self._plan]
+        self._publish()
+
+    def complete(self) -> None:
+        self._stage = "done"
+        self._status = "done"
+        self._stage_fraction = 1.0
+        self._detail = None
+        self._publish()
+
+
+# ===== 진행률/ETA 계산 =====
+
+def estimate_progress(
+    snapshot: Optional[Dict[str, Any]],
+    now: Optional[float] = None,
+    model: Optional[StageDurationModel] = None
+) -> Dict[str, Any]:
+    """
+    진행 스냅샷과 단계별 예상 시간으로 전체 진행률과 남은 시간을 계산합니다.
+
+    진행 중인 단계는 max(경과 시간 / 예상 시간(최대 0.95), 스트리밍 진행률)만큼 진행된 것으로 봅니다.
+
+    Args:
+        snapshot: ProgressReporter가 보낸 마지막 스냅샷 (None이면 아직 시작 전)
+        now: 기준 시각 (기본: 현재)
+        model: 단계별 예상 시간 모델 (기본: 프로세스 공용 모델)
+
+    Returns:
+        dict: {"fraction", "eta_seconds", "label", "detail", "stage"}
+    """
+    model = model or get_stage_duration_model()
+    now = time.time() if now is None else now
+
+    if snapshot is None:
+        total = sum(model.expected(stage) for stage in TWO_STAGE_PLAN)
+        return {"fraction": 0.0, "eta_seconds": total, "label": STAGE_LABELS["queued"], "detail": None, "stage": "queued"}
+    if snapshot["stage"] == "done":
+        return {"fraction": 1.0, "eta_seconds": 0.0, "label": STAGE_LABELS["done"], "detail": None, "stage": "done"}
+
+    plan = snapshot["plan"]
+    completed = set(snapshot["completed"])
+    expected = {stage: model.expected(stage) for stage in plan}
+
+    finished_seconds = sum(expected[stage] for stage in plan if stage in completed)
+    remaining_seconds = sum(expected[stage] for stage in plan if stage not in completed and stage != snapshot["stage"])
+
+    current = snapshot["stage"]
+    if current in expected and current not in completed:
+        elapsed = max(now - snapshot["stage_started_at"], 0.0)
+        ratio = max(min(elapsed / expected[current], _MAX_TIME_BASED_RATIO), snapshot.get("stage_fraction") or 0.0)
+        finished_seconds += expected[current] * ratio
+        remaining_seconds += expected[current] * (1 - ratio)
+
+    total = finished_seconds + remaining_seconds
+    return {
+        "fraction": min(finished_seconds / total, 0.99) if total > 0 else 0.0,
+        "eta_seconds": remaining_seconds,
+        "label": snapshot["label"],
+        "detail": snapshot.get("detail"),
+        "stage": current,
+    }
@@ -8,11 +8,19 @@ import base64
 import json
 from typing import Dict, List, Optional, Any
 
+from config.settings import settings
 from src.ai.mari_persona import (
+    MARI_DOG_NAME_PLACEHOLDER,
     get_expert_persona,
     get_mari_persona,
+    get_mari_conversion_layout,
     get_mari_conversion_template,
 )
+from src.ai.rag_search import format_reference_section, retrieve_reference_snippets
+
+
+# 1차 AI 프롬프트 버전 (user 프롬프트 템플릿을 바꾸면 올려서 전문가 분석 캐시를 무효화)
+EXPERT_PROMPT_VERSION = "2025-01-26"
 
 
 # ===== 이미지 처리 =====
@@ -119,8 +127,9 @@ def build_expert_analysis_prompt(
     Returns:
         dict: {
             "system": EXPERT_PERSONA,
-            "user": "구조화된 분석 요청 텍스트 (vision_analysis 포함)",
-            "images": None  # 더 이상 이미지를 전송하지 않음
+            "user": "구조화된 분석 요청 텍스트 (vision_analysis, 참고 자료 포함)",
+            "images": None,  # 더 이상 이미지를 전송하지 않음
+            "references": 주입된 참고 스니펫 id 목록
         }
 
     Raises:
@@ -132,6 +141,13 @@ def build_expert_analysis_prompt(
     # 설문 응답 구조화
     structured = structure_survey_responses(responses)
 
+    # 로컬 참고 자료 검색 (관련 상위 스니펫만 주입)
+    references = retrieve_reference_snippets(structured, vision_analysis)
+    reference_section = format_reference_section(
+        references,
+        heading="참고 훈련 프로토콜 (내부 자료 - 그대로 옮기지 말고 이 반려견 상황에 맞게 응용)"
+    )
+
     # 사용자 프롬프트 텍스트 생성
     dog_info = structured["dog_info"]
     personality = structured["personality"]
@@ -192,6 +208,7 @@ def build_expert_analysis_prompt(
 - 가족 구성: {environment["family"]}
 - 외출 시간: {environment["outing_time"]}
 
+{reference_section}
 ---
 
 위 정보를 바탕으로 **{dog_info["name"]}의 행동을 전문적으로 분석**하고, **JSON 형식으로 출력**해주세요.
@@ -205,6 +222,7 @@ def build_expert_analysis_prompt(
         "system": get_expert_persona(),
         "user": user_prompt,
         "images": None,  # 더 이상 이미지를 전송하지 않음 (GPT-4 Vision이 대신 분석)
+        "references": [snippet["id"] for snippet in references],
     }
 
 
@@ -227,25 +245,36 @@ def build_mari_conversion_prompt(
 
     Returns:
         dict: {
-            "system": MARI_PERSONA,
+            "system": MARI_PERSONA (+ 고정 변환 규칙, PROMPT_CACHE_LAYOUT),
             "user": "변환 요청 텍스트"
         }
     """
     # raw_json을 문자열로 변환 (예쁘게 포맷)
     raw_analysis_str = json.dumps(raw_json, ensure_ascii=False, indent=2)
 
-    # 템플릿 가져오기 및 포맷팅
-    template = get_mari_conversion_template()
-
-    user_prompt = template.format(
-        raw_analysis=raw_analysis_str,
-        dog_name=dog_name,
-        dog_age=dog_age,
-        hardest_part=hardest_part,
-    )
+    if settings.PROMPT_CACHE_LAYOUT:
+        # 페르소나 + 변환 규칙/출력 형식은 고정 prefix (cache_control 대상), 요청별 데이터만 user로
+        request_template, rules = get_mari_conversion_layout()
+        system_prompt = get_mari_persona() + "\n\n" + rules
+        user_prompt = request_template.format(
+            raw_analysis=raw_analysis_str,
+            dog_name=dog_name,
+            dog_age=dog_age,
+            hardest_part=hardest_part,
+        ) + f"\n출력 형식의 {MARI_DOG_NAME_PLACEHOLDER} 자리에는 '{dog_name}'을(를) 넣어주세요.\n"
+    else:
+        # 템플릿 가져오기 및 포맷팅
+        template = get_mari_conversion_template()
+        system_prompt = get_mari_persona()
+        user_prompt = template.format(
+            raw_analysis=raw_analysis_str,
+            dog_name=dog_name,
+            dog_age=dog_age,
+            hardest_part=hardest_part,
+        )
 
     return {
-        "system": get_mari_persona(),
+        "system": system_prompt,
         "user": user_prompt,
     }
 
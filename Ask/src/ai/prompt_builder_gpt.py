@@ -5,14 +5,34 @@
 """
 
 import base64
+import hashlib
 import json
 from typing import Dict, List, Optional, Any
 
+from config.settings import settings
 from src.ai.mari_persona import (
+    MARI_DOG_NAME_PLACEHOLDER,
     get_expert_persona,
     get_mari_persona,
+    get_mari_conversion_layout,
     get_mari_conversion_template,
 )
+from src.ai.rag_search import format_reference_section, retrieve_reference_snippets
+
+
+# 1차 AI 프롬프트 버전 (user 프롬프트 템플릿을 바꾸면 올려서 전문가 분석 캐시를 무효화)
+EXPERT_PROMPT_VERSION = "2026-10-18"
+
+
+def build_prompt_cache_key(stage: str, system_prompt: str) -> str:
+    """
+    OpenAI prompt_cache_key를 만듭니다.
+
+    같은 고정 prefix(system 프롬프트)를 쓰는 요청이 같은 캐시 서버로 라우팅되도록
+    단계명과 system 프롬프트 해시를 조합합니다.
+    """
+    digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+    return f"{settings.PROMPT_CACHE_KEY_PREFIX}:{stage}:{digest}"
 
 
 # ===== 이미지 처리 =====
@@ -155,16 +175,14 @@ Analyze the dog's behavior based on:
         {
             "title": "솔루션 제목",
             "content": "핵심 설명 (구체적 수치 포함)",
-            "details": ["방법 1", "방법 2", "방법 3"],
-            "expected_outcome": "기대 효과"
+            "details": ["방법 1", "방법 2", "방법 3"]
         },
         {}, {}  // EXACTLY 3 solutions
     ],
     "future_guidance": [
         {
             "principle": "핵심 원칙",
-            "content": "설명",
-            "action": "구체적 행동 (수치 포함)"
+            "content": "설명 (구체적 행동과 수치 포함)"
         },
         {}, {}  // EXACTLY 3 guidance items
     ],
@@ -176,6 +194,18 @@ Analyze the dog's behavior based on:
 CRITICAL: Output ONLY valid JSON matching the schema above. No markdown blocks, no explanations.
 """
 
+GPT_EXPERT_TASK_RULES = """## Your Task (STRICT REQUIREMENTS)
+1. **Analyze** {dog_name}'s behavior comprehensively
+2. **Prioritize** {hardest_part}
+3. **Include** specific, actionable numbers in all solutions:
+   - Distances (e.g., "3-5m", "10m")
+   - Time durations (e.g., "5 minutes", "10-15 minutes")
+   - Frequencies (e.g., "3 times daily", "twice a week")
+   - Training periods (e.g., "2 weeks", "1 month")
+4. **Output** EXACTLY 3 solutions and EXACTLY 3 guidance items
+5. **Format** JSON only (no markdown, no explanations)
+"""
+
 
 # ===== 1차 AI: 전문가 분석 프롬프트 (GPT-4o 최적화) =====
 
@@ -196,9 +226,11 @@ def build_expert_analysis_prompt(
 
     Returns:
         dict: {
-            "system": GPT_EXPERT_PERSONA,
-            "user": "구조화된 분석 요청 텍스트 (vision_analysis 포함)",
-            "images": None
+            "system": GPT_EXPERT_PERSONA (+ 고정 작업 규칙, PROMPT_CACHE_LAYOUT),
+            "user": "구조화된 분석 요청 텍스트 (vision_analysis, 참고 자료 포함)",
+            "images": None,
+            "references": 주입된 참고 스니펫 id 목록,
+            "cache_key": OpenAI prompt_cache_key
         }
 
     Raises:
@@ -210,6 +242,13 @@ def build_expert_analysis_prompt(
     # 설문 응답 구조화
     structured = structure_survey_responses(responses)
 
+    # 로컬 참고 자료 검색 (관련 상위 스니펫만 주입)
+    references = retrieve_reference_snippets(structured, vision_analysis)
+    reference_section = format_reference_section(
+        references,
+        heading="Reference Protocols (internal knowledge base - adapt to this dog, do not copy verbatim)"
+    )
+
     # 사용자 프롬프트 텍스트 생성
     dog_info = structured["dog_info"]
     personality = structured["personality"]
@@ -257,26 +296,31 @@ def build_expert_analysis_prompt(
 - **Family Members:** {environment["family"]}
 - **Daily Outing Schedule:** {environment["outing_time"]}
 
+{reference_section}
 ---
 
-## Your Task (STRICT REQUIREMENTS)
-1. **Analyze** {dog_info["name"]}'s behavior comprehensively
-2. **Prioritize** the owner's biggest challenge: "{problem["hardest_part"]}"
-3. **Include** specific, actionable numbers in all solutions:
-   - Distances (e.g., "3-5m", "10m")
-   - Time durations (e.g., "5 minutes", "10-15 minutes")
-   - Frequencies (e.g., "3 times daily", "twice a week")
-   - Training periods (e.g., "2 weeks", "1 month")
-4. **Output** EXACTLY 3 solutions and EXACTLY 3 guidance items
-5. **Format** JSON only (no markdown, no explanations)
-
-**Begin analysis now. Output JSON only.**
 """
 
+    if settings.PROMPT_CACHE_LAYOUT:
+        # 고정 작업 규칙은 system 뒤로 보내 매 요청 같은 prefix 유지, user에는 요청별 데이터만
+        system_prompt = GPT_EXPERT_PERSONA + "\n" + GPT_EXPERT_TASK_RULES.format(
+            dog_name="the dog",
+            hardest_part="the owner's biggest challenge (marked OWNER'S BIGGEST CHALLENGE in the request)",
+        )
+        user_prompt += "**Begin analysis now. Output JSON only.**\n"
+    else:
+        system_prompt = GPT_EXPERT_PERSONA
+        user_prompt += GPT_EXPERT_TASK_RULES.format(
+            dog_name=dog_info["name"],
+            hardest_part=f'the owner\'s biggest challenge: "{problem["hardest_part"]}"',
+        ) + "\n**Begin analysis now. Output JSON only.**\n"
+
     return {
-        "system": GPT_EXPERT_PERSONA,
+        "system": system_prompt,
         "user": user_prompt,
         "images": None,  # GPT-4 Vision이 이미 분석했으므로 이미지 전송 불필요
+        "references": [snippet["id"] for snippet in references],
+        "cache_key": build_prompt_cache_key("expert", system_prompt),
     }
 
 
@@ -299,26 +343,104 @@ def build_mari_conversion_prompt(
 
     Returns:
         dict: {
-            "system": MARI_PERSONA,
-            "user": "변환 요청 텍스트"
+            "system": MARI_PERSONA (+ 고정 변환 규칙, PROMPT_CACHE_LAYOUT),
+            "user": "변환 요청 텍스트",
+            "cache_key": OpenAI prompt_cache_key
         }
     """
     # raw_json을 문자열로 변환 (예쁘게 포맷)
     raw_analysis_str = json.dumps(raw_json, ensure_ascii=False, indent=2)
 
-    # 템플릿 가져오기 및 포맷팅
-    template = get_mari_conversion_template()
+    if settings.PROMPT_CACHE_LAYOUT:
+        # 페르소나 + 변환 규칙/출력 형식은 고정 prefix, 분석 결과와 강아지 정보만 user로
+        request_template, rules = get_mari_conversion_layout()
+        system_prompt = get_mari_persona() + "\n\n" + rules
+        user_prompt = request_template.format(
+            raw_analysis=raw_analysis_str,
+            dog_name=dog_name,
+            dog_age=dog_age,
+            hardest_part=hardest_part,
+        ) + f"\n출력 형식의 {MARI_DOG_NAME_PLACEHOLDER} 자리에는 '{dog_name}'을(를) 넣어주세요.\n"
+    else:
+        # 템플릿 가져오기 및 포맷팅
+        template = get_mari_conversion_template()
+        system_prompt = get_mari_persona()
+        user_prompt = template.format(
+            raw_analysis=raw_analysis_str,
+            dog_name=dog_name,
+            dog_age=dog_age,
+            hardest_part=hardest_part,
+        )
+
+    return {
+        "system": system_prompt,
+        "user": user_prompt,
+        "cache_key": build_prompt_cache_key("mari", system_prompt),
+    }
+
+
+# ===== 단일 호출(fused) 분석 프롬프트 =====
 
-    user_prompt = template.format(
-        raw_analysis=raw_analysis_str,
-        dog_name=dog_name,
-        dog_age=dog_age,
-        hardest_part=hardest_part,
+FUSED_OUTPUT_RULES = """## Fused Output (ONE response, TWO sections)
+Return a single JSON object with exactly two keys:
+1. **expert_analysis**: the expert analysis object described above (same fields and rules)
+2. **mari_narrative**: the same analysis rewritten for the owner in Mari's voice (persona and rules below)
+   - header: title + warm 2-3 sentence summary of key_characteristics
+   - solutions: EXACTLY 3, one per solutions_best_fit item, same order, keep every number
+   - guidance: EXACTLY 3, one per future_guidance item
+   - mari_closing.core_message: core_message in Mari's voice
+
+Write expert_analysis first. mari_narrative must not add or contradict anything in expert_analysis.
+"""
+
+
+def build_fused_analysis_prompt(
+    responses: dict,
+    dog_photo: bytes,
+    behavior_media: Optional[bytes] = None,
+    vision_analysis: Optional[dict] = None
+) -> dict:
+    """
+    전문가 분석 + 마리 변환을 한 번에 요청하는 프롬프트를 생성합니다 (ANALYSIS_MODE="fused").
+
+    system은 전문가 페르소나 → 출력 규칙 → 마리 페르소나/변환 규칙 순의 고정 prefix이고,
+    user는 1차 AI와 같은 요청 데이터에 마리 섹션용 강아지 정보만 덧붙입니다.
+
+    Args:
+        responses: st.session_state.responses (설문 응답 딕셔너리)
+        dog_photo: 강아지 사진 바이트 데이터 (사용하지 않음, vision_analysis로 대체)
+        behavior_media: 행동 영상/사진 바이트 데이터 (선택)
+        vision_analysis: GPT-4 Vision 분석 결과
+
+    Returns:
+        dict: {"system", "user", "references", "cache_key"}
+    """
+    expert_prompt = build_expert_analysis_prompt(
+        responses=responses,
+        dog_photo=dog_photo,
+        behavior_media=behavior_media,
+        vision_analysis=vision_analysis
     )
+    _, mari_rules = get_mari_conversion_layout()
+
+    system_prompt = (
+        expert_prompt["system"] + "\n" + FUSED_OUTPUT_RULES
+        + "\n# Mari Persona (mari_narrative only)\n\n" + get_mari_persona() + "\n\n" + mari_rules
+    )
+
+    dog_name = responses.get("dog_name", "강아지")
+    user_prompt = expert_prompt["user"] + f"""
+## mari_narrative 작성 정보
+- 이름: {dog_name} (변환 규칙의 {MARI_DOG_NAME_PLACEHOLDER} 자리에 사용)
+- 나이: {responses.get("dog_birth", "알 수 없음")}
+- 보호자의 가장 큰 고민: {responses.get("hardest_part", "알 수 없음")}
+"""
 
     return {
-        "system": get_mari_persona(),
+        "system": system_prompt,
         "user": user_prompt,
+        "references": expert_prompt["references"],
+        "cache_key": build_prompt_cache_key("fused", system_prompt),
     }
 
 
@@ -0,0 +1,251 @@
+"""
+파일명: rag_search.py
+목적: 로컬 훈련 프로토콜 검색 (RAG) - 1차 AI 프롬프트에 관련 참고 자료만 주입
+작성일: 2026-10-18
+"""
+
+import hashlib
+import json
+import logging
+import re
+import textwrap
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from config.survey_questions import get_behavior_problem_questions
+from src.ai.mari_persona import EXAMPLE_RESPONSE, MARI_PERSONA
+from src.ai.vector_store import HashingEmbedder, VectorStore
+from src.utils.mock_data import MOCK_ANALYSIS_RESULTS
+from src.utils.paths import get_runtime_logs_dir, get_vector_db_dir
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("rag_search")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [RAG] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+# ===== 코퍼스 구성 =====
+
+# 마리 페르소나 중 훈련 원칙에 해당하는 섹션만 참고 자료로 사용
+_PERSONA_SECTIONS = ("마리의 원칙", "마리의 핵심 철학")
+_NUMBERED_ITEM = re.compile(r"(?=[1-3]️⃣)")
+
+
+def _clean(text: str) -> str:
+    return textwrap.dedent(text).strip()
+
+
+def build_corpus() -> List[Dict[str, str]]:
+    """
+    참고 자료 코퍼스를 만듭니다.
+
+    MOCK_ANALYSIS_RESULTS의 사례별 요약/전문가 의견/단계별 훈련 계획과
+    mari_persona의 훈련 원칙, 예시 솔루션을 스니펫 단위로 나눕니다.
+
+    Returns:
+        List[dict]: {"id", "source", "section", "text"}
+    """
+    corpus: List[Dict[str, str]] = []
+
+    def add(source: str, section: str, text: str) -> None:
+        text = _clean(text)
+        if text:
+            corpus.append({"id": f"{source}#{section}", "source": source, "section": section, "text": text})
+
+    for case in MOCK_ANALYSIS_RESULTS:
+        case_name = case.get("case_name", "사례")
+        add(case_name, "summary", case.get("behavior_summary", ""))
+        add(case_name, "expert_opinion", case.get("expert_opinion", ""))
+        for step_index, step in enumerate(case.get("action_plan", []), start=1):
+            add(case_name, f"step{step_index}", step)
+        add(case_name, "notes", case.get("additional_notes", ""))
+
+    for section in MARI_PERSONA.split("\n## ")[1:]:
+        title, _, body = section.partition("\n")
+        if title.strip() in _PERSONA_SECTIONS:
+            add("마리 페르소나", title.strip(), body)
+
+    solutions = EXAMPLE_RESPONSE.split("## 🐾 마리의 솔루션 제안", 1)[-1].split("🐾 **마리의 한마디:**", 1)[0]
+    for item_index, item in enumerate(_NUMBERED_ITEM.split(solutions)[1:], start=1):
+        add("예시 솔루션 (짖음/사회화)", f"solution{item_index}", item)
+
+    return corpus
+
+
+def get_corpus_fingerprint(corpus: Optional[List[Dict[str, str]]] = None) -> str:
+    """
+    코퍼스 내용 해시 (코퍼스가 바뀌면 인덱스와 전문가 분석 캐시가 함께 무효화됨).
+    """
+    corpus = corpus if corpus is not None else build_corpus()
+    canonical = json.dumps(corpus, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+# ===== 인덱스 =====
+
+_index: Optional[Tuple[VectorStore, HashingEmbedder, str]] = None
+_index_lock = threading.Lock()
+
+
+def _document_text(snippet: Dict[str, str]) -> str:
+    # 단계별 스니펫에도 사례명(문제 유형)이 반영되도록 출처를 함께 임베딩
+    return f"{snippet['source']}\n{snippet['text']}"
+
+
+def _get_index() -> Tuple[VectorStore, HashingEmbedder, str]:
+    """
+    data/vector_db/rag 인덱스를 로드하고, 코퍼스가 바뀌었으면 다시 만듭니다.
+    """
+    global _index
+    with _index_lock:
+        if _index is not None:
+            return _index
+
+        corpus = build_corpus()
+        fingerprint = get_corpus_fingerprint(corpus)
+        documents = [_document_text(snippet) for snippet in corpus]
+        embedder = HashingEmbedder(dim=settings.RAG_EMBEDDING_DIM).fit(documents)
+        store = VectorStore(
+            directory=get_vector_db_dir("rag"),
+            dim=embedder.dim,
+            embedder_name=f"{embedder.name}:{fingerprint}",
+        )
+
+        if len(store) != len(corpus):
+            started = time.perf_counter()
+            store.rebuild(
+                (embedder.embed(document), snippet, {"id": snippet["id"]})
+                for snippet, document in zip(corpus, documents)
+            )
+            logger.info(f"RAG 인덱스 생성: {len(corpus)}개 스니펫 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+
+        _index = (store, embedder, fingerprint)
+        return _index
+
+
+async def warm_up_rag_index() -> None:
+    """
+    백그라운드 루프 시작 시 인덱스를 미리 로드합니다 (첫 분석의 지연 방지).
+    """
+    if settings.RAG_ENABLED:
+        _get_index()
+
+
+# ===== 검색 =====
+
+def _concern_labels() -> Dict[str, str]:
+    for question in get_behavior_problem_questions():
+        if question["id"] == "main_concerns":
+            return {option["value"]: option["label"] for option in question["options"]}
+    return {}
+
+
+def build_rag_query(structured_survey: Dict[str, Any], vision_analysis: Optional[Dict[str, Any]] = None) -> str:
+    """
+    설문(문제 행동 중심)과 Vision 행동 단서로 검색 질의를 만듭니다.
+    """
+    labels = _concern_labels()
+    problem = structured_survey.get("problem", {})
+    dog_info = structured_survey.get("dog_info", {})
+    concerns = [labels.get(concern, concern) for concern in problem.get("main_concerns", [])]
+
+    parts = [
+        " ".join(concerns),
+        problem.get("situation", ""),
+        problem.get("hardest_part", ""),
+        problem.get("tried_solutions", ""),
+        f"{dog_info.get('age', '')} {dog_info.get('breed', '')}",
+        structured_survey.get("environment", {}).get("living", ""),
+    ]
+    if vision_analysis:
+        parts.append(vision_analysis.get("behavioral_cues", ""))
+    return "\n".join(part for part in parts if part)
+
+
+def search_snippets(query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    질의와 관련도가 높은 참고 스니펫을 반환합니다.
+
+    Args:
+        query: 검색 질의 텍스트
+        top_k: 최대 개수 (기본: settings.RAG_TOP_K)
+
+    Returns:
+        List[dict]: {"id", "source", "section", "text", "score"} (관련도 내림차순)
+    """
+    store, embedder, _ = _get_index()
+    top_k = top_k or settings.RAG_TOP_K
+    matches = store.search_payloads(embedder.embed(query), top_k=top_k)
+
+    snippets = []
+    for score, _, snippet in matches:
+        if score < settings.RAG_MIN_SCORE:
+            break
+        snippet["score"] = round(score, 4)
+        snippets.append(snippet)
+    return snippets
+
+
+def retrieve_reference_snippets(
+    structured_survey: Dict[str, Any],
+    vision_analysis: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    1차 AI 프롬프트에 넣을 참고 스니펫을 검색합니다 (RAG_ENABLED가 꺼져 있으면 빈 목록).
+
+    실패해도 분석은 계속되어야 하므로 예외는 로그만 남기고 빈 목록을 반환합니다.
+    """
+    if not settings.RAG_ENABLED:
+        return []
+    try:
+        started = time.perf_counter()
+        snippets = search_snippets(build_rag_query(structured_survey, vision_analysis))
+        logger.debug(
+            f"RAG 검색 {len(snippets)}건 ({(time.perf_counter() - started) * 1000:.1f}ms): "
+            f"{[snippet['id'] for snippet in snippets]}"
+        )
+        return snippets
+    except Exception as e:
+        logger.error(f"RAG 검색 실패, 참고 자료 없이 진행: {str(e)}")
+        return []
+
+
+def format_reference_section(snippets: List[Dict[str, Any]], heading: str) -> str:
+    """
+    참고 스니펫을 프롬프트 섹션으로 만듭니다 (스니펫마다 RAG_SNIPPET_MAX_CHARS 글자로 제한).
+    """
+    if not snippets:
+        return ""
+
+    lines = [f"\n## {heading}"]
+    for snippet in snippets:
+        text = snippet["text"]
+        if len(text) > settings.RAG_SNIPPET_MAX_CHARS:
+            text = text[:settings.RAG_SNIPPET_MAX_CHARS].rstrip() + "…"
+        lines.append(f"[{snippet['source']}]\n{text}")
+    return "\n\n".join(lines) + "\n"
+
+
+def get_rag_version() -> str:
+    """
+    전문가 분석 캐시 키에 포함할 RAG 설정/코퍼스 버전 문자열.
+    """
+    if not settings.RAG_ENABLED:
+        return "rag:off"
+    return f"rag:{get_corpus_fingerprint()}:k{settings.RAG_TOP_K}"
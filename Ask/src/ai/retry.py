@@ -0,0 +1,272 @@
+"""
+파일명: retry.py
+목적: 공용 재시도 엔진 - 오류 분류, Retry-After 준수, decorrelated jitter, 프로세스 공용 재시도 예산
+작성일: 2026-10-18
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+import anthropic
+import openai
+
+from config.settings import settings
+from src.ai.circuit_breaker import CircuitOpenError
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.paths import get_runtime_logs_dir
+from src.utils.perf import get_active_tracker
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("retry")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [RETRY] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+# ===== 오류 분류 =====
+
+RETRYABLE = "retryable"
+RATE_LIMITED = "rate_limited"
+FATAL = "fatal"
+
+# 재시도해도 결과가 같은 상태 코드 외에, 일시적 오류로 보는 4xx
+_RETRYABLE_STATUS = {408, 409, 425}
+
+_CONNECTION_ERRORS = (
+    openai.APIConnectionError,  # APITimeoutError 포함
+    anthropic.APIConnectionError,
+)
+_STATUS_ERRORS = (openai.APIStatusError, anthropic.APIStatusError)
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    예외를 재시도 가능 여부로 분류합니다.
+
+    - rate_limited: 429 (Retry-After를 따름)
+    - retryable: 연결/타임아웃 오류, 5xx, 408/409/425, 원인을 알 수 없는 오류
+    - fatal: 그 밖의 4xx(잘못된 요청, 인증, 스키마 위반), 응답 파싱/검증 오류,
+      요청 단위 Deadline 초과, Circuit open
+    """
+    if isinstance(exc, (DeadlineExceeded, CircuitOpenError)):
+        return FATAL
+    if isinstance(exc, _STATUS_ERRORS):
+        status = exc.status_code
+        if status == 429:
+            return RATE_LIMITED
+        if status >= 500 or status in _RETRYABLE_STATUS:
+            return RETRYABLE
+        return FATAL
+    if isinstance(exc, _CONNECTION_ERRORS) or isinstance(exc, asyncio.TimeoutError):
+        return RETRYABLE
+    if isinstance(exc, (json.JSONDecodeError, ValueError, KeyError, TypeError)):
+        return FATAL
+    return RETRYABLE
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    응답 헤더의 retry-after-ms / retry-after(초 또는 HTTP 날짜)를 초 단위로 반환합니다.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+# ===== 대기 시간 (decorrelated jitter) =====
+
+class DecorrelatedJitter:
+    """
+    다음 대기 = min(max_delay, uniform(base, 직전 대기 × 3)).
+
+    같은 장애를 겪은 요청들이 같은 시각에 다시 몰리지 않도록 대기 시간을 흩뜨립니다.
+    """
+
+    def __init__(self, base: float, max_delay: float, rng: Optional[random.Random] = None) -> None:
+        self.base = base
+        self.max_delay = max_delay
+        self._previous = base
+        self._rng = rng or random
+
+    def next(self) -> float:
+        self._previous = min(self.max_delay, self._rng.uniform(self.base, self._previous * 3))
+        return self._previous
+
+
+# ===== 프로세스 공용 재시도 예산 =====
+
+class RetryBudget:
+    """
+    최근 RETRY_BUDGET_WINDOW_SECONDS 동안의 재시도 수를
+    (기본 요청 수 × RETRY_BUDGET_RATIO + 초당 최소 허용량 × 창 길이) 이하로 제한합니다.
+
+    장애 중 모든 요청이 재시도를 반복해 provider 부하를 몇 배로 키우는 것을 막습니다.
+    """
+
+    def __init__(self) -> None:
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        horizon = now - settings.RETRY_BUDGET_WINDOW_SECONDS
+        for events in (self._requests, self._retries):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """재시도 1회를 예산에서 차감합니다. 예산이 없으면 False."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowance = (
+                len(self._requests) * settings.RETRY_BUDGET_RATIO
+                + settings.RETRY_BUDGET_MIN_PER_SECOND * settings.RETRY_BUDGET_WINDOW_SECONDS
+            )
+            if len(self._retries) >= allowance:
+                return False
+            self._retries.append(now)
+            return True
+
+
+_retry_budget = RetryBudget()
+
+
+def get_retry_budget() -> RetryBudget:
+    return _retry_budget
+
+
+# ===== 실행 =====
+
+def _count(stage: str, **values: float) -> None:
+    tracker = get_active_tracker()
+    if tracker is not None:
+        tracker.add_counters(f"retry.{stage}", **values)
+
+
+async def run_with_retry(
+    stage: str,
+    attempt_fn: Callable[[int], Awaitable[Any]],
+    max_retries: int,
+    deadline: Optional[Deadline] = None,
+    deadline_reserve: float = 0.0,
+    description: str = "API 호출"
+) -> Any:
+    """
+    attempt_fn(시도 번호)를 오류 분류에 따라 재시도합니다.
+
+    - fatal 오류는 즉시 다시 던집니다 (400/401/스키마·파싱 오류, Deadline 초과, Circuit open).
+    - 429는 Retry-After를 따르고(RETRY_AFTER_MAX_SECONDS 초과 시 포기), 그 밖에는 decorrelated jitter로 대기합니다.
+    - 프로세스 공용 재시도 예산이 없으면 마지막 예외를, 대기 후 Deadline이 남지 않으면
+      DeadlineExceeded를 던집니다.
+
+    시도/재시도/포기 횟수는 활성 PerformanceTracker의 "retry.{stage}" 카운터로 기록됩니다.
+
+    Args:
+        stage: 단계명 ("vision" / "expert" / "mari" / "json_fix" / "fused")
+        attempt_fn: 시도 번호(0부터)를 받아 1회 호출하는 코루틴 함수
+        max_retries: 최대 재시도 횟수
+        deadline: 요청 단위 시간 예산 (Optional)
+        deadline_reserve: 재시도 후에도 남겨 둘 시간 (초)
+        description: 로그용 호출 이름
+
+    Returns:
+        Any: attempt_fn의 결과
+
+    Raises:
+        DeadlineExceeded: 재시도 대기 후 남을 예산이 없을 때
+        Exception: 그 밖에 재시도하지 않기로 한 시도의 예외
+    """
+    budget = get_retry_budget()
+    budget.record_request()
+    jitter = DecorrelatedJitter(settings.RETRY_BASE_DELAY_SECONDS, settings.RETRY_MAX_DELAY_SECONDS)
+
+    for attempt in range(max_retries + 1):
+        _count(stage, attempts=1)
+        try:
+            return await attempt_fn(attempt)
+        except Exception as exc:
+            kind = classify_error(exc)
+            logger.warning(
+                f"{description} 실패 ({stage}, 시도 {attempt + 1}/{max_retries + 1}, {kind}): "
+                f"{type(exc).__name__}: {str(exc)[:200]}"
+            )
+
+            if kind == FATAL:
+                _count(stage, fatal=1)
+                raise
+            if attempt >= max_retries:
+                _count(stage, exhausted=1)
+                raise
+
+            wait_time = jitter.next()
+            if kind == RATE_LIMITED:
+                _count(stage, rate_limited=1)
+                retry_after = get_retry_after(exc)
+                if retry_after is not None:
+                    if retry_after > settings.RETRY_AFTER_MAX_SECONDS:
+                        logger.warning(f"Retry-After {retry_after:.1f}s가 너무 길어 재시도하지 않습니다.")
+                        _count(stage, retry_after_too_long=1)
+                        raise
+                    wait_time = retry_after
+
+            if deadline is not None:
+                try:
+                    deadline.check(reserve=deadline_reserve + wait_time, what=f"{description} 재시도")
+                except DeadlineExceeded:
+                    _count(stage, deadline_skipped=1)
+                    raise
+            if not budget.try_acquire():
+                logger.warning(f"재시도 예산 소진 - {stage} 재시도 생략")
+                _count(stage, budget_exhausted=1)
+                raise
+
+            _count(stage, retries=1)
+            logger.info(f"{wait_time:.2f}초 후 재시도 ({stage})...")
+            await asyncio.sleep(wait_time)
@@ -0,0 +1,245 @@
+"""
+파일명: schema_validator.py
+목적: JSON Schema dict(VISION/EXPERT/MARI)를 미리 컴파일한 검증 함수로 변환 (필수 필드, 타입, 길이, 항목 수, additionalProperties)
+작성일: 2026-10-18
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# 노드 검증 함수: (값, 경로, 에러 목록) → 에러를 목록에 추가
+_Check = Callable[[Any, str, List["SchemaError"]], None]
+
+
+@dataclass(frozen=True)
+class SchemaError:
+    """검증 실패 1건 (path 예: "solutions_best_fit[1].details[0]")."""
+
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path or '(root)'}: {self.message}"
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+}
+
+
+def _join(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def _compile_node(schema: Dict[str, Any]) -> _Check:
+    """
+    스키마 노드 하나를 검증 함수로 만듭니다 (하위 노드는 컴파일 시점에 한 번만 재귀).
+    """
+    schema_type = schema.get("type")
+    is_type = _TYPE_CHECKS.get(schema_type, lambda value: True)
+
+    if schema_type == "object":
+        properties = {
+            name: _compile_node(prop_schema)
+            for name, prop_schema in schema.get("properties", {}).items()
+        }
+        required = tuple(schema.get("required", ()))
+        closed = schema.get("additionalProperties", True) is False
+
+        def check_object(value: Any, path: str, errors: List[SchemaError]) -> None:
+            if not isinstance(value, dict):
+                errors.append(SchemaError(path, f"object가 필요합니다 (현재: {type(value).__name__})"))
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(SchemaError(_join(path, name), "필수 필드 누락"))
+            for name, item in value.items():
+                check = properties.get(name)
+                if check is not None:
+                    check(item, _join(path, name), errors)
+                elif closed:
+                    errors.append(SchemaError(_join(path, name), "허용되지 않은 필드"))
+
+        return check_object
+
+    if schema_type == "array":
+        check_item = _compile_node(schema.get("items", {}))
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def check_array(value: Any, path: str, errors: List[SchemaError]) -> None:
+            if not isinstance(value, list):
+                errors.append(SchemaError(path, f"array가 필요합니다 (현재: {type(value).__name__})"))
+                return
+            count = len(value)
+            if min_items is not None and count < min_items:
+                errors.append(SchemaError(path, f"항목이 {min_items}개 이상이어야 합니다 (현재: {count}개)"))
+            if max_items is not None and count > max_items:
+                errors.append(SchemaError(path, f"항목이 {max_items}개 이하여야 합니다 (현재: {count}개)"))
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", errors)
+
+        return check_array
+
+    if schema_type == "string":
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+
+        def check_string(value: Any, path: str, errors: List[SchemaError]) -> None:
+            if not isinstance(value, str):
+                errors.append(SchemaError(path, f"string이 필요합니다 (현재: {type(value).__name__})"))
+                return
+            if max_length is not None and len(value) > max_length:
+                errors.append(SchemaError(path, f"{max_length}자 이하여야 합니다 (현재: {len(value)}자)"))
+            if min_length is not None and len(value) < min_length:
+                errors.append(SchemaError(path, f"{min_length}자 이상이어야 합니다 (현재: {len(value)}자)"))
+
+        return check_string
+
+    if schema_type in ("number", "integer"):
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+
+        def check_number(value: Any, path: str, errors: List[SchemaError]) -> None:
+            if not is_type(value):
+                errors.append(SchemaError(path, f"{schema_type}가 필요합니다 (현재: {type(value).__name__})"))
+                return
+            if minimum is not None and value < minimum:
+                errors.append(SchemaError(path, f"{minimum} 이상이어야 합니다 (현재: {value})"))
+            if maximum is not None and value > maximum:
+                errors.append(SchemaError(path, f"{maximum} 이하여야 합니다 (현재: {value})"))
+
+        return check_number
+
+    def check_scalar(value: Any, path: str, errors: List[SchemaError]) -> None:
+        if not is_type(value):
+            errors.append(SchemaError(path, f"{schema_type}가 필요합니다 (현재: {type(value).__name__})"))
+
+    return check_scalar
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], List[SchemaError]]:
+    """
+    JSON Schema를 검증 함수로 컴파일합니다.
+
+    Args:
+        schema: {"name", "schema"} 래퍼 또는 schema 본문
+
+    Returns:
+        Callable: 문서를 받아 SchemaError 목록(통과하면 빈 목록)을 반환하는 함수
+    """
+    check = _compile_node(schema.get("schema", schema))
+
+    def validate(data: Any) -> List[SchemaError]:
+        errors: List[SchemaError] = []
+        check(data, "", errors)
+        return errors
+
+    return validate
+
+
+# ===== 컴파일 결과 캐시 =====
+
+_compiled: Dict[int, Callable[[Any], List[SchemaError]]] = {}
+_compiled_lock = threading.Lock()
+
+
+def get_validator(schema: Dict[str, Any]) -> Callable[[Any], List[SchemaError]]:
+    """
+    스키마 dict별로 한 번만 컴파일한 검증 함수를 반환합니다 (스키마는 모듈 상수라 id로 구분).
+    """
+    key = id(schema)
+    validator = _compiled.get(key)
+    if validator is None:
+        with _compiled_lock:
+            validator = _compiled.get(key)
+            if validator is None:
+                validator = _compiled[key] = compile_schema(schema)
+    return validator
+
+
+def validate_against(schema: Dict[str, Any], data: Any) -> List[SchemaError]:
+    """
+    data를 스키마로 검증해 에러 목록을 반환합니다.
+    """
+    return get_validator(schema)(data)
+
+
+def format_errors(errors: Sequence[SchemaError], limit: int = 3) -> str:
+    """
+    에러 목록을 로그/수정 프롬프트용 한 줄로 요약합니다.
+    """
+    summary = "; ".join(str(error) for error in errors[:limit])
+    if len(errors) > limit:
+        summary += f" 외 {len(errors) - limit}건"
+    return summary
+
+
+# ===== 벤치마크 =====
+
+def build_example_document(schema: Dict[str, Any]) -> Any:
+    """
+    스키마를 만족하는 예시 문서를 만듭니다 (벤치마크용, 문자열은 최대 길이의 절반).
+    """
+    body = schema.get("schema", schema)
+    schema_type = body.get("type")
+    if schema_type == "object":
+        return {
+            name: build_example_document(prop_schema)
+            for name, prop_schema in body.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        count = body.get("maxItems", body.get("minItems", 1))
+        return [build_example_document(body.get("items", {})) for _ in range(count)]
+    if schema_type == "string":
+        return "가" * (body.get("maxLength", 40) // 2)
+    if schema_type in ("number", "integer"):
+        return body.get("maximum", 1)
+    if schema_type == "boolean":
+        return True
+    return None
+
+
+def benchmark_validators(
+    iterations: int = 2000,
+    documents: Optional[Dict[str, Any]] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    VISION/EXPERT/MARI 스키마 검증 시간을 측정합니다.
+
+    Args:
+        iterations: 문서당 반복 횟수
+        documents: 스키마 이름 → 검증할 문서 (기본: build_example_document 결과)
+
+    Returns:
+        dict: 스키마 이름 → {"compile_ms", "us_per_document", "errors"}
+    """
+    from src.ai.schemas import EXPERT_ANALYSIS_SCHEMA, MARI_NARRATIVE_SCHEMA, VISION_SCHEMA
+
+    results: Dict[str, Dict[str, float]] = {}
+    for schema in (VISION_SCHEMA, EXPERT_ANALYSIS_SCHEMA, MARI_NARRATIVE_SCHEMA):
+        name = schema["name"]
+        document = (documents or {}).get(name, build_example_document(schema))
+
+        started = time.perf_counter()
+        validator = compile_schema(schema)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            errors = validator(document)
+        elapsed = time.perf_counter() - started
+
+        results[name] = {
+            "compile_ms": round(compile_ms, 3),
+            "us_per_document": round(elapsed / iterations * 1_000_000, 2),
+            "errors": len(errors),
+        }
+    return results
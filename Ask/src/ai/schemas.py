@@ -6,6 +6,8 @@
 
 from typing import Dict, Any
 
+from src.ai.schema_validator import format_errors, validate_against
+
 
 # ===== Vision 분석 JSON Schema =====
 
@@ -231,19 +233,35 @@ MARI_NARRATIVE_SCHEMA: Dict[str, Any] = {
 }
 
 
+# ===== 단일 호출(fused) 분석 JSON Schema =====
+
+# 전문가 분석과 마리 내러티브를 한 번의 호출로 생성 (각 섹션은 위 스키마를 그대로 사용)
+FUSED_ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "name": "FusedAnalysis",
+    "schema": {
+        "type": "object",
+        "required": ["expert_analysis", "mari_narrative"],
+        "properties": {
+            "expert_analysis": EXPERT_ANALYSIS_SCHEMA["schema"],
+            "mari_narrative": MARI_NARRATIVE_SCHEMA["schema"],
+        },
+        "additionalProperties": False,
+    },
+    "strict": True,
+}
+
+
 # ===== Normalization용 기본값 =====
 
 DEFAULT_SOLUTION = {
     "title": "추가 솔루션",
     "content": "정보가 부족하여 자동 생성된 솔루션입니다.",
-    "details": ["보호자님의 상황에 맞게 조정해주세요."],
-    "expected_outcome": "점진적인 개선이 기대됩니다."
+    "details": ["보호자님의 상황에 맞게 조정해주세요."]
 }
 
 DEFAULT_GUIDANCE = {
     "principle": "일관성 유지",
-    "content": "훈련은 일관되게 진행하는 것이 중요합니다.",
-    "action": "매일 같은 시간에 짧게라도 훈련을 반복하세요."
+    "content": "훈련은 일관되게 진행하는 것이 중요합니다. 매일 같은 시간에 짧게라도 훈련을 반복하세요."
 }
 
 
@@ -309,37 +327,48 @@ def normalize_expert_json(raw_json: Dict[str, Any]) -> Dict[str, Any]:
 
 def validate_expert_json(data: Dict[str, Any]) -> tuple[bool, str]:
     """
-    전문가 분석 JSON이 스키마를 만족하는지 검증합니다.
+    전문가 분석 JSON이 EXPERT_ANALYSIS_SCHEMA를 만족하는지 검증합니다.
+
+    필수 필드, 타입, 문자열 길이, 배열 항목 수(솔루션/가이던스 정확히 3개), 점수 범위,
+    허용되지 않은 필드를 미리 컴파일한 검증 함수로 확인합니다.
+
+    Args:
+        data: 검증할 JSON
+
+    Returns:
+        tuple: (성공 여부, 에러 메시지 - 경로 포함)
+    """
+    errors = validate_against(EXPERT_ANALYSIS_SCHEMA, data)
+    return not errors, format_errors(errors)
+
+
+def validate_mari_json(data: Dict[str, Any]) -> tuple[bool, str]:
+    """
+    마리 내러티브 JSON이 MARI_NARRATIVE_SCHEMA를 만족하고 제목이 비어 있지 않은지 검증합니다.
+
+    Args:
+        data: 검증할 JSON
+
+    Returns:
+        tuple: (성공 여부, 에러 메시지 - 경로 포함)
+    """
+    errors = validate_against(MARI_NARRATIVE_SCHEMA, data)
+    if errors:
+        return False, format_errors(errors)
+    if not data["header"]["title"].strip():
+        return False, "header.title: 비어 있습니다"
+    return True, ""
+
+
+def validate_vision_json(data: Dict[str, Any]) -> tuple[bool, str]:
+    """
+    GPT-4o Vision 결과가 VISION_SCHEMA를 만족하는지 검증합니다.
 
     Args:
         data: 검증할 JSON
 
     Returns:
-        tuple: (성공 여부, 에러 메시지)
+        tuple: (성공 여부, 에러 메시지 - 경로 포함)
     """
-    try:
-        # 필수 필드 확인
-        required_fields = ["analysis_summary", "solutions_best_fit", "future_guidance", "core_message", "confidence_score"]
-        for field in required_fields:
-            if field not in data:
-                return False, f"필수 필드 누락: {field}"
-
-        # solutions_best_fit 개수 확인
-        solutions = data.get("solutions_best_fit", [])
-        if not isinstance(solutions, list) or len(solutions) != 3:
-            return False, f"solutions_best_fit는 정확히 3개여야 합니다 (현재: {len(solutions)}개)"
-
-        # future_guidance 개수 확인
-        guidance = data.get("future_guidance", [])
-        if not isinstance(guidance, list) or len(guidance) != 3:
-            return False, f"future_guidance는 정확히 3개여야 합니다 (현재: {len(guidance)}개)"
-
-        # confidence_score 범위 확인
-        score = data.get("confidence_score", 0)
-        if not (0.0 <= score <= 1.0):
-            return False, f"confidence_score는 0.0-1.0 범위여야 합니다 (현재: {score})"
-
-        return True, ""
-
-    except Exception as e:
-        return False, f"검증 중 오류: {str(e)}"
+    errors = validate_against(VISION_SCHEMA, data)
+    return not errors, format_errors(errors)
@@ -0,0 +1,265 @@
+"""
+파일명: semantic_cache.py
+목적: 유사 사례 캐시 - 거의 같은 설문 + Vision 사례에는 과거 전문가 분석을 재사용
+작성일: 2026-10-18
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+from src.ai.mari_renderer import josa
+from src.ai.vector_store import HashingEmbedder, VectorStore
+from src.utils.paths import get_runtime_logs_dir, get_vector_db_dir
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("semantic_cache")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [SEMANTIC] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+# Vision 결과 중 사례 유사도에 반영할 항목 (나머지는 사진마다 표현이 달라 잡음이 큼)
+_VISION_FIELDS = ("breed_analysis", "behavioral_cues")
+
+_store: Optional[VectorStore] = None
+_embedder: Optional[HashingEmbedder] = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> Tuple[VectorStore, HashingEmbedder]:
+    global _store, _embedder
+    with _store_lock:
+        if _store is None:
+            _embedder = HashingEmbedder(dim=settings.SEMANTIC_CACHE_EMBEDDING_DIM)
+            _store = VectorStore(
+                directory=get_vector_db_dir("semantic_cache"),
+                dim=_embedder.dim,
+                embedder_name=_embedder.name,
+                max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            )
+        return _store, _embedder
+
+
+def build_case_text(structured_survey: Dict[str, Any], vision_analysis: Optional[Dict[str, Any]]) -> str:
+    """
+    유사도 비교용 사례 텍스트를 만듭니다 (강아지 이름은 제외).
+
+    Args:
+        structured_survey: structure_survey_responses() 결과
+        vision_analysis: GPT-4o Vision 결과
+
+    Returns:
+        str: 항목별 한 줄씩 이어 붙인 텍스트
+    """
+    dog_info = structured_survey.get("dog_info", {})
+    personality = structured_survey.get("personality", {})
+    problem = structured_survey.get("problem", {})
+    environment = structured_survey.get("environment", {})
+
+    lines = [
+        f"품종 {dog_info.get('breed', '')}",
+        f"나이 {dog_info.get('age', '')}",
+        f"성별 {dog_info.get('gender', '')} 중성화 {dog_info.get('neutered', '')}",
+        f"다른 반려동물 {dog_info.get('other_pets', '')}",
+        f"성격 {' '.join(personality.get('traits', []))}",
+        f"활동 시간 {personality.get('activity_time', '')}",
+        f"고민 {' '.join(problem.get('main_concerns', []))}",
+        f"시작 시기 {problem.get('start_time', '')}",
+        f"상황 {problem.get('situation', '')}",
+        f"시도한 방법 {problem.get('tried_solutions', '')}",
+        f"가장 힘든 점 {problem.get('hardest_part', '')}",
+        f"주거 {environment.get('living', '')}",
+        f"가족 {environment.get('family', '')}",
+        f"외출 {environment.get('outing_time', '')}",
+    ]
+    for field in _VISION_FIELDS:
+        if vision_analysis and vision_analysis.get(field):
+            lines.append(f"사진 {vision_analysis[field]}")
+    return "\n".join(lines)
+
+
+def _concern_tag(structured_survey: Dict[str, Any]) -> list:
+    return sorted(structured_survey.get("problem", {}).get("main_concerns", []))
+
+
+# ===== 강아지 이름 치환 =====
+
+# 저장 시 이름 자리에 넣는 표시 (읽을 때 현재 강아지 이름으로 채움)
+_NAME_PLACEHOLDER = "{{dog_name}}"
+
+# 이름 뒤에 올 수 있는 조사 (긴 것부터). "이가/이는"처럼 애칭 접미사 "이"가 붙은 형태 포함
+_PARTICLES = (
+    "이에게", "이한테", "이랑", "이가", "이는", "이를", "이의", "이도", "이와", "이만",
+    "에게", "한테", "께서", "처럼", "보다", "으로", "랑", "로",
+    "이", "가", "은", "는", "을", "를", "의", "와", "과", "도", "만", "네", "께",
+)
+_PARTICLE_PATTERN = "|".join(_PARTICLES)
+_WORD_CHAR = "0-9A-Za-z가-힣"
+
+# 받침 유무에 따라 형태가 바뀌는 조사: 저장된 형태 → (받침 있음, 받침 없음)
+_PARTICLE_FORMS = {
+    "이": ("이", "가"), "가": ("이", "가"), "이가": ("이", "가"),
+    "은": ("은", "는"), "는": ("은", "는"), "이는": ("은", "는"),
+    "을": ("을", "를"), "를": ("을", "를"), "이를": ("을", "를"),
+    "과": ("과", "와"), "와": ("과", "와"), "이와": ("과", "와"),
+    "이랑": ("이랑", "랑"), "랑": ("이랑", "랑"),
+    "으로": ("으로", "로"), "로": ("으로", "로"),
+    "이에게": ("에게", "에게"), "이한테": ("한테", "한테"), "이의": ("의", "의"),
+    "이도": ("도", "도"), "이만": ("만", "만"),
+}
+
+# 이보다 짧은 이름(예: "해", "콩")은 일반 단어와 구분할 수 없어 다른 강아지에게 재사용하지 않음
+_MIN_PORTABLE_NAME_LENGTH = 2
+
+_FILL_PATTERN = re.compile(re.escape(_NAME_PLACEHOLDER) + f"({_PARTICLE_PATTERN})?")
+
+
+def _name_pattern(name: str) -> "re.Pattern[str]":
+    """앞뒤가 단어 경계이고 뒤에 조사만 붙은 이름 (예: "보리가 " O, "보리차" X)."""
+    return re.compile(
+        f"(?<![{_WORD_CHAR}]){re.escape(name)}(?=(?:{_PARTICLE_PATTERN})?(?![{_WORD_CHAR}]))"
+    )
+
+
+def _map_strings(value: Any, convert: Callable[[str], str]) -> Any:
+    if isinstance(value, str):
+        return convert(value)
+    if isinstance(value, list):
+        return [_map_strings(item, convert) for item in value]
+    if isinstance(value, dict):
+        return {key: _map_strings(item, convert) for key, item in value.items()}
+    return value
+
+
+def insert_name_placeholder(analysis: Dict[str, Any], dog_name: str) -> Dict[str, Any]:
+    """
+    분석 문장 속 강아지 이름을 (단어 경계 + 조사 기준으로) 자리 표시로 바꿉니다.
+    """
+    pattern = _name_pattern(dog_name)
+    return _map_strings(analysis, lambda text: pattern.sub(_NAME_PLACEHOLDER, text))
+
+
+def fill_name_placeholder(analysis: Dict[str, Any], dog_name: str) -> Dict[str, Any]:
+    """
+    자리 표시를 현재 강아지 이름으로 채우고, 바로 뒤 조사를 이름의 받침에 맞춥니다
+    (받침 판단은 로컬 렌더러의 josa와 같음: 숫자/영문 이름, ㄹ 받침 + "으로/로" 포함).
+    """
+    def _fill(match: "re.Match[str]") -> str:
+        particle = match.group(1) or ""
+        forms = _PARTICLE_FORMS.get(particle)
+        if forms is not None:
+            return josa(dog_name, "/".join(forms))
+        return dog_name + particle
+
+    return _map_strings(analysis, lambda text: _FILL_PATTERN.sub(_fill, text))
+
+
+def find_similar_analysis(
+    structured_survey: Dict[str, Any],
+    vision_analysis: Optional[Dict[str, Any]]
+) -> Optional[Tuple[Dict[str, Any], float]]:
+    """
+    임계값 이상으로 유사한 과거 사례의 전문가 분석을 찾아 현재 강아지에 맞게 변환합니다.
+
+    주요 고민(main_concerns)이 정확히 같은 사례만 후보로 삼고, 저장 시 자리 표시로 바꿔 둔
+    강아지 이름은 현재 강아지 이름으로 채웁니다.
+
+    Args:
+        structured_survey: structure_survey_responses() 결과
+        vision_analysis: GPT-4o Vision 결과
+
+    Returns:
+        Optional[(전문가 분석 JSON, 유사도)]: 없으면 None
+    """
+    store, embedder = _get_store()
+
+    started = time.perf_counter()
+    query = embedder.embed(build_case_text(structured_survey, vision_analysis))
+    concerns = _concern_tag(structured_survey)
+    dog_name = structured_survey.get("dog_info", {}).get("name", "")
+
+    def _reusable(tags: Dict[str, Any]) -> bool:
+        if tags.get("concerns") != concerns:
+            return False
+        if tags.get("dog_name") == dog_name:
+            return True
+        # 이름을 자리 표시로 바꾸지 못한 사례는 같은 이름의 강아지에게만 재사용
+        return bool(dog_name) and tags.get("portable", False)
+
+    matches = store.search_payloads(query, top_k=1, where=_reusable)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if not matches or matches[0][0] < settings.SEMANTIC_CACHE_THRESHOLD:
+        best = f"{matches[0][0]:.3f}" if matches else "-"
+        logger.debug(f"유사 사례 없음 (최고 유사도 {best}, {len(store)}건, {elapsed_ms:.1f}ms)")
+        return None
+
+    score, tags, payload = matches[0]
+    analysis = payload["analysis"]
+    if tags.get("portable", False):
+        analysis = fill_name_placeholder(analysis, dog_name)
+
+    logger.info(f"유사 사례 재사용 (유사도 {score:.3f}, {len(store)}건, {elapsed_ms:.1f}ms)")
+    return analysis, score
+
+
+def remember_analysis(
+    structured_survey: Dict[str, Any],
+    vision_analysis: Optional[Dict[str, Any]],
+    analysis: Dict[str, Any],
+    provider: str
+) -> bool:
+    """
+    신뢰도가 충분한 전문가 분석을 인덱스에 추가합니다.
+
+    Args:
+        structured_survey: structure_survey_responses() 결과
+        vision_analysis: GPT-4o Vision 결과
+        analysis: Schema 검증을 통과한 전문가 분석 JSON
+        provider: "gpt" / "claude"
+
+    Returns:
+        bool: 추가 여부
+    """
+    confidence = analysis.get("confidence_score", 0.0)
+    if not isinstance(confidence, (int, float)) or confidence < settings.SEMANTIC_CACHE_MIN_CONFIDENCE:
+        return False
+
+    dog_name = structured_survey.get("dog_info", {}).get("name", "")
+    portable = not dog_name or len(dog_name) >= _MIN_PORTABLE_NAME_LENGTH
+    if dog_name and portable:
+        analysis = insert_name_placeholder(analysis, dog_name)
+
+    store, embedder = _get_store()
+    vector = embedder.embed(build_case_text(structured_survey, vision_analysis))
+    store.add(
+        vector,
+        payload={"analysis": analysis},
+        tags={
+            "concerns": _concern_tag(structured_survey),
+            "dog_name": dog_name,
+            "portable": portable,
+            "confidence": confidence,
+            "provider": provider,
+            "stored_at": time.time(),
+        },
+    )
+    logger.info(f"유사 사례 인덱스 추가 (신뢰도 {confidence}, 총 {len(store)}건)")
+    return True
@@ -0,0 +1,440 @@
+"""
+파일명: vector_store.py
+목적: 외부 서비스 없이 동작하는 로컬 임베딩 + 벡터 인덱스 (data/vector_db 저장)
+작성일: 2026-10-18
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.paths import get_runtime_logs_dir
+
+
+# ===== 로깅 설정 =====
+
+logger = logging.getLogger("vector_store")
+logger.setLevel(logging.DEBUG)
+
+if not logger.handlers:
+    log_dir = get_runtime_logs_dir()
+    log_file = log_dir / "analyzer.log"
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [VECTOR] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+
+# ===== 임베딩 =====
+
+_TOKEN_PATTERN = re.compile(r"[0-9a-zA-Z가-힣]+")
+
+
+class HashingEmbedder:
+    """
+    단어 + 글자 n-gram을 해시해 고정 차원 벡터로 만드는 임베더.
+
+    모델 다운로드나 API 호출 없이 결정적으로 동작하며, 한국어 조사/어미 변화에도
+    글자 n-gram이 겹쳐 비슷한 문장은 높은 코사인 유사도를 갖습니다.
+    fit()으로 코퍼스 IDF를 학습하면 흔한 n-gram의 영향이 줄어 검색(RAG) 품질이 좋아집니다.
+    """
+
+    name = "hashing-v1"
+
+    def __init__(self, dim: int = 256, ngram_sizes: Tuple[int, ...] = (2, 3)) -> None:
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+        self.idf: Optional[Dict[str, float]] = None
+
+    def _features(self, text: str) -> Iterable[str]:
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            yield "w:" + token
+            for size in self.ngram_sizes:
+                for start in range(len(token) - size + 1):
+                    yield f"c{size}:" + token[start:start + size]
+
+    def fit(self, texts: List[str]) -> "HashingEmbedder":
+        """
+        코퍼스 문서 빈도로 IDF 가중치를 학습합니다 (코퍼스에 없는 특징은 무시).
+        """
+        document_frequency: Dict[str, int] = {}
+        for text in texts:
+            for feature in set(self._features(text)):
+                document_frequency[feature] = document_frequency.get(feature, 0) + 1
+
+        total = len(texts)
+        self.idf = {
+            feature: math.log((1 + total) / (1 + frequency)) + 1.0
+            for feature, frequency in document_frequency.items()
+        }
+        self.name = "hashing-idf-v1"
+        return self
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        텍스트를 L2 정규화된 float32 벡터로 변환합니다 (빈 텍스트는 0 벡터).
+        """
+        counts: Dict[str, int] = {}
+        for feature in self._features(text):
+            counts[feature] = counts.get(feature, 0) + 1
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in counts.items():
+            if self.idf is None:
+                weight = float(count)
+            else:
+                idf = self.idf.get(feature)
+                if idf is None:
+                    continue
+                weight = (1.0 + math.log(count)) * idf
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += weight if digest >> 63 else -weight
+
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+# ===== 벡터 인덱스 =====
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        vector BLOB NOT NULL,
+        tags TEXT NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+)
+
+# 이전 형식(행 위치로만 짝을 맞추던 append-only 파일 3개) - 열 때 지움
+_LEGACY_FILES = ("meta.json", "vectors.f32", "index.jsonl", "payloads.jsonl")
+
+
+class VectorStore:
+    """
+    코사인 유사도 검색용 벡터 인덱스 ({directory}/index.sqlite3).
+
+    항목 하나(벡터 BLOB + tags + payload)를 한 행으로 저장하므로, 여러 프로세스가 동시에
+    추가/정리해도 벡터와 payload가 어긋나지 않습니다. 항목 id는 행 id이며 삭제돼도 재사용되지 않습니다.
+
+    검색용 벡터와 tags는 메모리에 캐시하고, 검색할 때마다 같은 읽기 트랜잭션 안에서
+    다른 프로세스가 추가/삭제한 행을 반영한 뒤 행렬곱 1번으로 점수를 계산합니다.
+    변경 여부는 meta의 세대 카운터(generation: 모든 쓰기, epoch: 삭제/교체)로 판단하므로
+    바뀐 것이 없으면 검색마다 entries를 훑지 않습니다.
+    """
+
+    def __init__(self, directory: Path, dim: int, embedder_name: str, max_entries: Optional[int] = None) -> None:
+        self.directory = Path(directory)
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._reset_cache()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / "index.sqlite3"
+
+    # ----- SQLite -----
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(str(self.path), timeout=10.0)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _init_db(self) -> None:
+        for name in _LEGACY_FILES:
+            (self.directory / name).unlink(missing_ok=True)
+
+        config = json.dumps({"dim": self.dim, "embedder": self.embedder_name}, sort_keys=True)
+        with self._lock, self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+            if row is None or row[0] != config:
+                if row is not None:
+                    logger.warning(f"인덱스 설정 변경 감지, 새로 생성합니다: {self.directory}")
+                connection.execute("DELETE FROM entries")
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('config', ?)", (config,))
+                self._bump(connection, deleted=True)
+            self._sync(connection)
+        logger.info(f"벡터 인덱스 로드: {self._count}건 ({self.directory})")
+
+    # ----- 메모리 캐시 (self._lock 안에서만 호출) -----
+
+    def _reset_cache(self) -> None:
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self._ids: List[int] = []
+        self._tags: List[Dict[str, Any]] = []
+        self._count = 0
+        self._last_id = 0
+        self._generation = -1
+        self._epoch = -1
+
+    def _sync(self, connection: sqlite3.Connection) -> None:
+        """
+        캐시를 DB와 맞춥니다. 새 행만 추가로 읽고, 다른 프로세스가 정리(삭제)했으면 전부 다시 읽습니다.
+
+        호출부가 연 트랜잭션 안에서 실행되므로 이후의 payload 조회와 같은 스냅샷을 봅니다.
+        바뀐 것이 없으면 meta 두 행(기본 키 조회)만 읽고 끝납니다.
+        """
+        counters = dict(connection.execute("SELECT key, value FROM meta WHERE key IN ('generation', 'epoch')"))
+        generation = int(counters.get("generation", 0))
+        epoch = int(counters.get("epoch", 0))
+        if generation == self._generation and epoch == self._epoch:
+            return
+        if epoch != self._epoch:
+            self._reset_cache()
+        rows = connection.execute(
+            "SELECT id, vector, tags FROM entries WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        self._generation = generation
+        self._epoch = epoch
+        if not rows:
+            return
+
+        vectors = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), self.dim)
+        needed = self._count + len(rows)
+        if needed > self._matrix.shape[0]:
+            grown = np.zeros((max(needed, self._matrix.shape[0] * 2, 64), self.dim), dtype=np.float32)
+            grown[:self._count] = self._matrix[:self._count]
+            self._matrix = grown
+        self._matrix[self._count:needed] = vectors
+        self._ids.extend(row[0] for row in rows)
+        self._tags.extend(json.loads(row[2]) for row in rows)
+        self._count = needed
+        self._last_id = rows[-1][0]
+
+    @staticmethod
+    def _bump(connection: sqlite3.Connection, deleted: bool = False) -> None:
+        """
+        쓰기 트랜잭션 안에서 세대 카운터를 올립니다 (삭제가 있었으면 epoch도 올려 전체 재로딩).
+        """
+        keys = ("generation", "epoch") if deleted else ("generation",)
+        for key in keys:
+            connection.execute(
+                "INSERT INTO meta (key, value) VALUES (?, '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+                (key,),
+            )
+
+    def _insert(self, connection: sqlite3.Connection, vector: np.ndarray, payload: Dict[str, Any], tags: Optional[Dict[str, Any]]) -> int:
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        cursor = connection.execute(
+            "INSERT INTO entries (vector, tags, payload) VALUES (?, ?, ?)",
+            (vector.tobytes(), json.dumps(tags or {}, ensure_ascii=False), json.dumps(payload, ensure_ascii=False)),
+        )
+        return int(cursor.lastrowid)
+
+    def _rank(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        where: Optional[Callable[[Dict[str, Any]], bool]],
+        candidates: int
+    ) -> List[Tuple[float, int, Dict[str, Any]]]:
+        if self._count == 0:
+            return []
+        scores = self._matrix[:self._count] @ query
+        limit = min(max(candidates, top_k), self._count)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        results: List[Tuple[float, int, Dict[str, Any]]] = []
+        for position in top:
+            tags = self._tags[position]
+            if where is not None and not where(tags):
+                continue
+            results.append((float(scores[position]), self._ids[position], tags))
+            if len(results) >= top_k:
+                break
+        return results
+
+    # ----- 공개 API -----
+
+    def __len__(self) -> int:
+        """마지막 동기화(열기/추가/검색) 시점의 항목 수."""
+        return self._count
+
+    def clear(self) -> None:
+        """
+        모든 항목을 지웁니다.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM entries")
+            self._bump(connection, deleted=True)
+            self._sync(connection)
+
+    def rebuild(self, items: Iterable[Tuple[np.ndarray, Dict[str, Any], Optional[Dict[str, Any]]]]) -> None:
+        """
+        모든 항목을 (벡터, payload, tags) 목록으로 한 트랜잭션 안에서 교체합니다.
+
+        다른 프로세스는 이전 인덱스나 새 인덱스 중 하나만 보게 됩니다 (절반만 만든 상태는 보이지 않음).
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM entries")
+            for vector, payload, tags in items:
+                self._insert(connection, vector, payload, tags)
+            self._bump(connection, deleted=True)
+            self._sync(connection)
+
+    def add(self, vector: np.ndarray, payload: Dict[str, Any], tags: Optional[Dict[str, Any]] = None) -> int:
+        """
+        항목을 추가하고 id를 반환합니다.
+
+        max_entries를 넘으면 같은 트랜잭션에서 오래된 항목을 지워 최근 80%만 남깁니다.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            entry_id = self._insert(connection, vector, payload, tags)
+            self._bump(connection)
+            self._sync(connection)
+            if self.max_entries and self._count > self.max_entries:
+                keep = int(self.max_entries * 0.8)
+                connection.execute(
+                    "DELETE FROM entries WHERE id NOT IN (SELECT id FROM entries ORDER BY id DESC LIMIT ?)",
+                    (keep,),
+                )
+                self._bump(connection, deleted=True)
+                self._sync(connection)
+                logger.info(f"벡터 인덱스 정리: {keep}건 유지")
+            return entry_id
+
+    def search(
+        self,
+        vector: np.ndarray,
+        top_k: int = 5,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        candidates: int = 64
+    ) -> List[Tuple[float, int, Dict[str, Any]]]:
+        """
+        코사인 유사도 상위 항목을 반환합니다.
+
+        Args:
+            vector: 정규화된 질의 벡터
+            top_k: 반환할 최대 개수
+            where: tags를 받아 True인 항목만 남기는 필터
+            candidates: 필터 적용 전 유사도 상위 후보 수
+
+        Returns:
+            List[(유사도, id, tags)]: 유사도 내림차순
+        """
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock, self._connect() as connection:
+            connection.execute("BEGIN")
+            self._sync(connection)
+            return self._rank(query, top_k, where, candidates)
+
+    def search_payloads(
+        self,
+        vector: np.ndarray,
+        top_k: int = 5,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        candidates: int = 64
+    ) -> List[Tuple[float, Dict[str, Any], Dict[str, Any]]]:
+        """
+        search()와 같지만 payload까지 같은 읽기 트랜잭션(스냅샷)에서 함께 읽어 반환합니다.
+
+        Returns:
+            List[(유사도, tags, payload)]: 유사도 내림차순
+        """
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock, self._connect() as connection:
+            connection.execute("BEGIN")
+            self._sync(connection)
+            matches = self._rank(query, top_k, where, candidates)
+            if not matches:
+                return []
+            ids = [entry_id for _, entry_id, _ in matches]
+            placeholders = ",".join("?" * len(ids))
+            payloads = {
+                row[0]: json.loads(row[1])
+                for row in connection.execute(f"SELECT id, payload FROM entries WHERE id IN ({placeholders})", ids)
+            }
+        return [(score, tags, payloads[entry_id]) for score, entry_id, tags in matches if entry_id in payloads]
+
+    def get_payload(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """
+        항목의 payload를 반환합니다 (이미 정리된 항목이면 None).
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT payload FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+# ===== 벤치마크 =====
+
+def benchmark_vector_search(
+    directory: Path,
+    entries: int = 30000,
+    dim: int = 256,
+    iterations: int = 50
+) -> Dict[str, float]:
+    """
+    entries건이 들어 있는 인덱스에서 search_payloads 1회 시간을 측정합니다.
+
+    의미 캐시 조회와 같은 조건(top_k=1, tags 필터)으로 재며, 측정 도중 다른 인스턴스가
+    항목을 추가해 증분 동기화가 섞이도록 합니다.
+
+    Args:
+        directory: 인덱스를 만들 빈 디렉토리
+        entries: 미리 넣을 항목 수 (기본: SEMANTIC_CACHE_MAX_ENTRIES 수준의 수만 건)
+        dim: 벡터 차원
+        iterations: 검색 반복 횟수
+
+    Returns:
+        dict: {"entries", "median_ms", "p95_ms", "max_ms"}
+    """
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(entries, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    store = VectorStore(directory, dim=dim, embedder_name="benchmark")
+    store.rebuild(
+        (vector, {"analysis": {"index": index}}, {"provider": "gpt"}) for index, vector in enumerate(vectors)
+    )
+    writer = VectorStore(directory, dim=dim, embedder_name="benchmark")
+
+    timings: List[float] = []
+    for iteration in range(iterations):
+        if iteration % 10 == 5:
+            writer.add(vectors[iteration], payload={"analysis": {}}, tags={"provider": "gpt"})
+        started = time.perf_counter()
+        store.search_payloads(vectors[iteration], top_k=1, where=lambda tags: tags.get("provider") == "gpt")
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "entries": float(len(store)),
+        "median_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 3),
+        "max_ms": round(timings[-1], 3),
+    }
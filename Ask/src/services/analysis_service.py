@@ -1,47 +1,542 @@
 """
-AI 분석 작업을 백그라운드에서 실행하고 상태를 관리합니다.
+AI 분석 작업을 스케줄링(동시 실행 수 제한, 대기열, 부하 차단)해 백그라운드에서 실행하고 상태를 관리합니다.
 """
 
 from __future__ import annotations
 
+import atexit
+import heapq
+import itertools
+import sqlite3
+import threading
 import time
-from dataclasses import dataclass
-from typing import Optional
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
-from concurrent.futures import Future
+from concurrent.futures import CancelledError, Future
 
-from src.ai.analyzer_factory import get_analyzer
-from src.utils.async_runner import submit_async
+from config.settings import settings
+from src.ai.analyzer_factory import get_analyzer, select_provider
+from src.ai.client_registry import warm_up_clients
+from src.ai.gpt4_vision import prefetch_vision_analysis
+from src.ai.progress import estimate_progress
+from src.ai.rag_search import warm_up_rag_index
+from src.services.job_store import FINAL_STATUSES, get_job_store, is_stale
+from src.utils.async_runner import (
+    register_startup_hook,
+    start_background_loop,
+    submit_call,
+)
+from src.utils.deadline import Deadline
+
+
+class AnalysisRejected(Exception):
+    """대기열이 가득 찼거나 대기 시간이 너무 길어 작업을 받지 않았을 때 (부하 차단)."""
 
 
 @dataclass
 class AnalysisJob:
-    future: Future
+    # 작업 결과 Future: 대기 중에도 만들어져 있고, 실행이 끝나면 결과/예외가 채워짐
+    # (다른 프로세스의 작업을 job_store에서 복원한 경우 None)
+    future: Optional[Future]
     started_at: float
+    # 요청 단위 시간 예산 (ANALYSIS_HARD_SLA_SECONDS), 대기열에서 나와 실행될 때 시작
+    deadline: Optional[Deadline] = None
+    # 스트리밍 중 도착한 부분 결과 (예: {"mari_story": {...}}), 백그라운드 루프에서 교체됨
+    partial_result: Optional[Dict[str, Any]] = None
+    provider: str = "gpt"
+    priority: int = 0
+    # "queued" → "running" → "done" (또는 "failed" / "rejected"), job_store에도 같은 값으로 저장
+    status: str = "queued"
+    running_at: Optional[float] = None
+    # job_store 키 (URL query param "job"으로 새로고침/다른 프로세스에서 재개)
+    job_id: str = ""
+    responses: Optional[Dict[str, Any]] = None
+    # 결과를 이미 화면/CSV로 전달했는지 (재개 시 CSV 중복 저장 방지)
+    delivered: bool = False
+    # analyzer가 보낸 마지막 단계 진행 스냅샷 (src/ai/progress.py ProgressReporter)
+    progress: Optional[Dict[str, Any]] = None
+    _partial_saved_at: float = field(default=0.0, repr=False)
+    _progress_saved_at: float = field(default=0.0, repr=False)
 
+    def publish_partial(self, partial: Dict[str, Any]) -> None:
+        """
+        백그라운드 루프에서 호출: 최신 부분 결과로 교체하고, 일정 간격으로 job_store 쓰기 스레드에 넘깁니다.
+        """
+        self.partial_result = partial
+        now = time.time()
+        if self.job_id and now - self._partial_saved_at >= settings.JOB_PARTIAL_SAVE_INTERVAL_SECONDS:
+            self._partial_saved_at = now
+            _persist_later(get_job_store().save_partial, self.job_id, partial, key=(self.job_id, "partial"))
 
-def start_analysis_job(
+    def publish_progress(self, progress: Dict[str, Any]) -> None:
+        """
+        백그라운드 루프에서 호출: 단계 진행 스냅샷을 교체합니다.
+
+        단계 전환은 바로, 스트리밍 진행률은 JOB_PARTIAL_SAVE_INTERVAL_SECONDS 간격으로 job_store 쓰기
+        스레드에 넘기며, 아직 저장되지 않은 이전 스냅샷은 최신 것으로 교체됩니다.
+        """
+        self.progress = progress
+        now = time.time()
+        if not self.job_id:
+            return
+        if progress.get("status") != "streaming" or now - self._progress_saved_at >= settings.JOB_PARTIAL_SAVE_INTERVAL_SECONDS:
+            self._progress_saved_at = now
+            _persist_later(get_job_store().save_progress, self.job_id, progress, key=(self.job_id, "progress"))
+
+
+def _persist(write: Callable[..., None], *args: Any) -> None:
+    """job_store 기록 실패가 분석 자체를 실패시키지 않도록 합니다 (재개만 불가능해짐)."""
+    try:
+        write(*args)
+    except (sqlite3.Error, TypeError, ValueError):
+        pass
+
+
+class _StoreWriter:
+    """
+    job_store 쓰기를 전용 스레드 1개에서 들어온 순서대로 처리합니다.
+
+    백그라운드 루프(스트리밍 콜백, 작업 완료 콜백)가 SQLite 잠금/디스크 쓰기를 기다리지 않게 합니다.
+    같은 key의 쓰기가 아직 대기 중이면 자리는 그대로 두고 인자만 최신 것으로 바꿉니다.
+    """
+
+    def __init__(self) -> None:
+        self._pending: "OrderedDict[Hashable, Tuple[Callable[..., None], Tuple[Any, ...]]]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, write: Callable[..., None], *args: Any, key: Optional[Hashable] = None) -> None:
+        with self._condition:
+            self._pending[key if key is not None else next(self._sequence)] = (write, args)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="job-store-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                _, (write, args) = self._pending.popitem(last=False)
+                self._busy = True
+            try:
+                _persist(write, *args)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 쓰기가 모두 끝날 때까지 기다립니다 (시간 안에 끝나면 True)."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+
+_store_writer = _StoreWriter()
+# 정상 종료 시 남은 기록 반영 (쓰기 스레드는 daemon)
+atexit.register(lambda: _store_writer.flush(timeout=5.0))
+
+
+def _persist_later(write: Callable[..., None], *args: Any, key: Optional[Hashable] = None) -> None:
+    """_persist와 같지만 job_store 쓰기 스레드에서 실행합니다 (호출 스레드는 기다리지 않음)."""
+    _store_writer.submit(write, *args, key=key)
+
+
+def flush_job_store_writes(timeout: Optional[float] = None) -> bool:
+    """쓰기 스레드에 남은 job_store 기록을 모두 반영합니다."""
+    return _store_writer.flush(timeout)
+
+
+@dataclass(order=True)
+class _QueueEntry:
+    priority: int
+    sequence: int
+    job: AnalysisJob = field(compare=False)
+    start: Callable[[AnalysisJob], Future] = field(compare=False)
+
+
+class AnalysisScheduler:
+    """
+    분석 작업 스케줄러: provider별 동시 실행 수 제한 + 우선순위(같으면 FIFO) 대기열 + 부하 차단.
+
+    - provider별 실행 중 작업이 ANALYSIS_MAX_CONCURRENCY에 도달하면 대기열에 넣습니다.
+    - 대기열이 ANALYSIS_QUEUE_MAX_SIZE만큼 차 있으면 새 작업을 바로 거절합니다 (AnalysisRejected).
+    - ANALYSIS_QUEUE_MAX_WAIT_SECONDS보다 오래 기다린 작업은 실행하지 않고 거절합니다
+      (작업이 끝나지 않아도 타이머가 가장 오래된 작업의 만료 시각에 검사).
+    - 작업이 끝날 때마다(백그라운드 루프 콜백) 실행 가능한 다음 작업을 꺼냅니다.
+      앞선 작업의 provider가 가득 차 있으면 다른 provider 작업이 먼저 나갈 수 있습니다.
+
+    lock 안에서는 대기열/카운터만 바꾸고, job_store 기록과 Future 결과 설정(콜백 실행)은
+    lock을 놓은 뒤에 합니다.
+    """
+
+    def __init__(self) -> None:
+        self._queue: List[_QueueEntry] = []
+        self._running: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.rejected = 0
+
+    def _limit(self, provider: str) -> int:
+        return max(settings.ANALYSIS_MAX_CONCURRENCY.get(provider, 1), 1)
+
+    def _mark_rejected(self, job: AnalysisJob, reason: str) -> Tuple[AnalysisJob, str]:
+        """거절 상태로 표시합니다 (lock 안에서 호출, 기록/통보는 _resolve_rejected)."""
+        job.status = "rejected"
+        self.rejected += 1
+        return job, reason
+
+    def _resolve_rejected(self, rejected: List[Tuple[AnalysisJob, str]]) -> None:
+        """거절된 작업을 기록하고 Future를 AnalysisRejected로 끝냅니다 (lock 밖에서 호출)."""
+        for job, reason in rejected:
+            error = AnalysisRejected(reason)
+            _persist_later(get_job_store().fail, job.job_id, error, "rejected")
+            job.future.set_exception(error)
+
+    def _expired(self, entry: _QueueEntry, now: float) -> bool:
+        return now - entry.job.started_at >= settings.ANALYSIS_QUEUE_MAX_WAIT_SECONDS
+
+    def _arm_timer(self) -> None:
+        """대기열에서 가장 오래된 작업이 만료되는 시각에 검사를 예약합니다 (lock 안에서 호출)."""
+        if self._timer is not None or not self._queue:
+            return
+        oldest = min(entry.job.started_at for entry in self._queue)
+        delay = max(oldest + settings.ANALYSIS_QUEUE_MAX_WAIT_SECONDS - time.time(), 0.01)
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            now = time.time()
+            expired = [entry for entry in self._queue if self._expired(entry, now)]
+            if expired:
+                self._queue = [entry for entry in self._queue if not self._expired(entry, now)]
+                heapq.heapify(self._queue)
+            rejected = [self._mark_rejected(entry.job, "분석 대기 시간이 너무 깁니다") for entry in expired]
+            self._arm_timer()
+        self._resolve_rejected(rejected)
+
+    def submit(self, job: AnalysisJob, start: Callable[[AnalysisJob], Future]) -> None:
+        """
+        작업을 바로 실행하거나 대기열에 넣습니다. 거절하면 job.future에 AnalysisRejected가 설정됩니다.
+
+        Args:
+            job: future가 만들어진 작업 (status="queued")
+            start: 작업을 백그라운드 루프에 제출하고 그 Future를 반환하는 함수
+        """
+        to_start: List[_QueueEntry] = []
+        rejected: List[Tuple[AnalysisJob, str]] = []
+        with self._lock:
+            if self._running.get(job.provider, 0) < self._limit(job.provider):
+                self._running[job.provider] = self._running.get(job.provider, 0) + 1
+                to_start.append(_QueueEntry(job.priority, next(self._sequence), job, start))
+            elif len(self._queue) >= settings.ANALYSIS_QUEUE_MAX_SIZE:
+                rejected.append(self._mark_rejected(job, f"분석 대기열이 가득 찼습니다 ({len(self._queue)}건 대기 중)"))
+            else:
+                heapq.heappush(self._queue, _QueueEntry(job.priority, next(self._sequence), job, start))
+                self._arm_timer()
+        self._resolve_rejected(rejected)
+        self._start(to_start)
+
+    def _release(self, provider: str) -> None:
+        with self._lock:
+            self._running[provider] = max(self._running.get(provider, 0) - 1, 0)
+            to_start, rejected = self._pop_runnable()
+            self._arm_timer()
+        self._resolve_rejected(rejected)
+        self._start(to_start)
+
+    def _pop_runnable(self) -> Tuple[List[_QueueEntry], List[Tuple[AnalysisJob, str]]]:
+        """
+        실행 가능한 대기 작업을 우선순위 순으로 꺼내고, 너무 오래 기다린 작업은 거절 표시합니다 (lock 안에서 호출).
+        """
+        runnable: List[_QueueEntry] = []
+        waiting: List[_QueueEntry] = []
+        rejected: List[Tuple[AnalysisJob, str]] = []
+        now = time.time()
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            if self._expired(entry, now):
+                rejected.append(self._mark_rejected(entry.job, "분석 대기 시간이 너무 깁니다"))
+            elif self._running.get(entry.job.provider, 0) < self._limit(entry.job.provider):
+                self._running[entry.job.provider] = self._running.get(entry.job.provider, 0) + 1
+                runnable.append(entry)
+            else:
+                waiting.append(entry)
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+        return runnable, rejected
+
+    def _start(self, entries: List[_QueueEntry]) -> None:
+        for entry in entries:
+            job = entry.job
+            job.status = "running"
+            job.running_at = time.time()
+            _persist_later(get_job_store().mark_running, job.job_id)
+            try:
+                inner = entry.start(job)
+            except Exception as exc:
+                job.status = "failed"
+                _persist_later(get_job_store().fail, job.job_id, exc)
+                job.future.set_exception(exc)
+                self._release(job.provider)
+                continue
+            inner.add_done_callback(lambda done, job=job: self._finish(job, done))
+
+    def _finish(self, job: AnalysisJob, done: Future) -> None:
+        """작업 완료 콜백 (백그라운드 루프 또는 워커 풀 수집 스레드): 기록은 쓰기 스레드에 넘깁니다."""
+        store = get_job_store()
+        if done.cancelled():
+            job.status = "failed"
+            _persist_later(store.fail, job.job_id, CancelledError("분석 작업이 취소되었습니다"))
+            job.future.cancel()
+        elif done.exception() is not None:
+            job.status = "failed"
+            _persist_later(store.fail, job.job_id, done.exception())
+            job.future.set_exception(done.exception())
+        else:
+            job.status = "done"
+            _persist_later(store.complete, job.job_id, done.result())
+            job.future.set_result(done.result())
+        self._release(job.provider)
+
+    def queue_position(self, job: AnalysisJob) -> Optional[int]:
+        """
+        대기 중인 작업의 순번 (1부터, 같은 provider에서 먼저 나갈 작업 수 + 1). 대기 중이 아니면 None.
+        """
+        with self._lock:
+            if job.status != "queued":
+                return None
+            ahead = [
+                entry for entry in self._queue
+                if entry.job.provider == job.provider and entry.job is not job
+            ]
+            mine = next((entry for entry in self._queue if entry.job is job), None)
+            if mine is None:
+                return None
+            return 1 + sum(1 for entry in ahead if entry < mine)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": dict(self._running),
+                "queued": len(self._queue),
+                "rejected": self.rejected,
+            }
+
+
+_scheduler = AnalysisScheduler()
+
+
+def get_scheduler() -> AnalysisScheduler:
+    return _scheduler
+
+
+def prepare_analysis_backend() -> None:
+    """
+    백그라운드 루프를 미리 띄우고, 설정 시 provider 커넥션과 RAG 인덱스를 워밍업합니다.
+    여러 번 호출해도 안전합니다 (루프 시작 시 1회만 워밍업).
+    """
+    if settings.AI_CLIENT_WARMUP:
+        register_startup_hook(warm_up_clients)
+    register_startup_hook(warm_up_rag_index)
+    start_background_loop()
+
+
+def prefetch_vision(dog_photo: bytes) -> Optional[Future]:
+    """
+    사진 업로드 직후 Vision 분석을 미리 시작합니다.
+    분석 작업은 같은 이미지 바이트로 이 결과를 재사용합니다 (워커 풀에서는 끝난 결과를 디스크 캐시로 공유).
+    """
+    if not settings.VISION_PREFETCH_ENABLED:
+        return None
+    return submit_call(prefetch_vision_analysis, dog_photo)
+
+
+async def run_analysis(
+    provider: str,
     responses: dict,
     dog_photo: bytes,
-    behavior_media: Optional[bytes] = None,
-) -> AnalysisJob:
+    behavior_media: Optional[bytes],
+    deadline: Deadline,
+    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> dict:
     """
-    비동기 분석 작업을 시작하고 Future를 반환합니다.
+    분석 작업 1건을 deadline 안에 실행합니다.
+
+    워커 풀(ASYNC_WORKER_PROCESSES > 0)에서는 다른 프로세스에서 실행되므로 모듈 수준 함수로 두고
+    pickle 가능한 인자만 받습니다 (Deadline은 time.monotonic 기준이라 같은 머신의 프로세스 간에 유효).
     """
-    analyzer = get_analyzer()
-    future = submit_async(
+    analyzer = get_analyzer(provider)
+    return await deadline.run(
         analyzer(
             responses=responses,
             dog_photo=dog_photo,
             behavior_media=behavior_media,
+            on_partial=on_partial,
+            deadline=deadline,
+            on_progress=on_progress,
+        ),
+        what="분석 작업",
+    )
+
+
+def start_analysis_job(
+    responses: dict,
+    dog_photo: bytes,
+    behavior_media: Optional[bytes] = None,
+    priority: int = 0,
+) -> AnalysisJob:
+    """
+    분석 작업을 스케줄러에 넣고 AnalysisJob을 반환합니다.
+
+    provider별 동시 실행 수가 찼으면 대기열에서 기다렸다가 실행되며(queue_position으로 순번 확인),
+    대기열이 가득 차면 job.future가 AnalysisRejected로 끝납니다.
+
+    실행이 시작될 때 ANALYSIS_HARD_SLA_SECONDS 기한을 만들어 analyzer에 전달합니다. 각 단계는 남은 시간에
+    맞춰 설정을 낮추거나 폴백하며, 그래도 기한을 넘기면 작업이 DeadlineExceeded로 끝나
+    화면은 임시 결과로 넘어갑니다.
+
+    Args:
+        responses: 설문 응답
+        dog_photo: 강아지 사진 바이트
+        behavior_media: 행동 사진 바이트 (Optional)
+        priority: 작을수록 먼저 실행 (같으면 먼저 들어온 순서)
+    """
+    provider = select_provider()
+    job = AnalysisJob(
+        future=Future(),
+        started_at=time.time(),
+        provider=provider,
+        priority=priority,
+        job_id=uuid.uuid4().hex,
+        responses=responses,
+    )
+    _persist(get_job_store().create, job.job_id, provider, priority, responses)
+    _remember_job(job)
+
+    def start(job: AnalysisJob) -> Future:
+        job.deadline = Deadline(settings.ANALYSIS_HARD_SLA_SECONDS)
+        return submit_call(
+            run_analysis,
+            job.provider,
+            responses,
+            dog_photo,
+            behavior_media,
+            job.deadline,
+            callbacks={"on_partial": job.publish_partial, "on_progress": job.publish_progress},
         )
+
+    get_scheduler().submit(job, start)
+    return job
+
+
+# ===== 작업 조회/재개 =====
+
+# 이 프로세스에서 시작한 작업 (같은 프로세스로 재연결되면 Future를 그대로 사용)
+_local_jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+_local_jobs_lock = threading.Lock()
+_LOCAL_JOBS_MAX = 256
+
+
+def _remember_job(job: AnalysisJob) -> None:
+    with _local_jobs_lock:
+        _local_jobs[job.job_id] = job
+        while len(_local_jobs) > _LOCAL_JOBS_MAX:
+            _local_jobs.popitem(last=False)
+
+
+def resume_analysis_job(job_id: str) -> Optional[AnalysisJob]:
+    """
+    job id로 작업을 다시 찾습니다 (새로고침, 웹소켓 재연결, 다른 프로세스).
+
+    이 프로세스에서 시작한 작업이면 그 작업을, 아니면 job_store 기록으로 만든 작업을 반환합니다.
+    기록이 없거나 실행하던 프로세스가 사라진(is_stale) 작업이면 None을 반환합니다.
+    """
+    with _local_jobs_lock:
+        job = _local_jobs.get(job_id)
+    if job is not None:
+        return job
+
+    record = get_job_store().get(job_id)
+    if record is None or is_stale(record):
+        return None
+    return AnalysisJob(
+        future=None,
+        started_at=record["created_at"],
+        provider=record["provider"],
+        priority=record["priority"],
+        status=record["status"],
+        job_id=job_id,
+        responses=record["responses"],
+        partial_result=record["partial"],
+        delivered=record["delivered"],
+        progress=record["progress"],
     )
-    return AnalysisJob(future=future, started_at=time.time())
+
+
+def _refresh_stored_job(job: AnalysisJob) -> Optional[Dict[str, Any]]:
+    """다른 프로세스가 실행 중인 작업의 최신 기록을 읽어 상태/부분 결과를 갱신합니다."""
+    record = get_job_store().get(job.job_id)
+    if record is not None:
+        job.status = record["status"]
+        job.partial_result = record["partial"] or job.partial_result
+        job.progress = record["progress"] or job.progress
+    return record
 
 
 def job_done(job: AnalysisJob) -> bool:
-    return job.future.done()
+    if job.future is not None:
+        return job.future.done()
+    record = _refresh_stored_job(job)
+    return record is None or record["status"] in FINAL_STATUSES or is_stale(record)
 
 
 def job_result(job: AnalysisJob):
-    return job.future.result()
+    if job.future is not None:
+        return job.future.result()
+    record = get_job_store().get(job.job_id)
+    if record is None or is_stale(record):
+        raise RuntimeError("분석 작업 기록을 찾을 수 없거나 실행이 중단되었습니다")
+    if record["status"] == "done":
+        return record["result"]
+    if record["status"] == "rejected":
+        raise AnalysisRejected(record["error"])
+    raise RuntimeError(f"{record['error_type']}: {record['error']}")
+
+
+def job_partial_result(job: AnalysisJob) -> Optional[Dict[str, Any]]:
+    return job.partial_result
+
+
+def job_queue_position(job: AnalysisJob) -> Optional[int]:
+    """대기 중이면 순번(1부터), 실행 중이거나 끝났거나 다른 프로세스의 작업이면 None."""
+    if job.future is None:
+        return None
+    return get_scheduler().queue_position(job)
+
+
+def job_progress(job: AnalysisJob) -> Dict[str, Any]:
+    """
+    진행 화면용 단계명/진행률/남은 시간 (performance.log 이력으로 학습한 단계별 예상 시간 기준).
+
+    Returns:
+        dict: {"fraction", "eta_seconds", "label", "detail", "stage"}
+    """
+    return estimate_progress(job.progress)
+
+
+def mark_job_delivered(job: AnalysisJob) -> None:
+    """결과를 화면에 보여주고 CSV에 저장한 뒤 호출합니다 (이후 재개 시 CSV를 다시 저장하지 않음)."""
+    job.delivered = True
+    _persist(get_job_store().mark_delivered, job.job_id)
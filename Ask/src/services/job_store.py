@@ -0,0 +1,160 @@
+"""
+분석 작업 상태/결과를 SQLite(runtime/{APP_ENV}/data/jobs.sqlite3)에 저장합니다.
+
+새로고침, 웹소켓 재연결, 다른 Streamlit 프로세스에서도 job id만으로 진행 상황을 이어 보거나
+끝난 결과를 가져올 수 있게 합니다.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from config.settings import settings
+from src.utils.paths import get_job_store_path
+
+# 끝난 상태 (더 이상 바뀌지 않음)
+FINAL_STATUSES = ("done", "failed", "rejected")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    provider TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    responses TEXT,
+    partial TEXT,
+    progress TEXT,
+    result TEXT,
+    error_type TEXT,
+    error TEXT,
+    delivered INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+# 기존 파일에 나중에 추가된 컬럼 (컬럼명 → 타입)
+_ADDED_COLUMNS = {"progress": "TEXT"}
+
+
+class JobStore:
+    """
+    프로세스 간 공유되는 분석 작업 저장소.
+
+    호출마다 짧은 연결을 열어(WAL 모드) Streamlit 스레드와 백그라운드 루프, 다른 프로세스가
+    같은 파일을 동시에 읽고 쓸 수 있게 합니다.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or get_job_store_path()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(str(self.path), timeout=5.0)
+        connection.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                with self._init_lock:
+                    if not self._initialized:
+                        connection.execute("PRAGMA journal_mode=WAL")
+                        connection.execute(_SCHEMA)
+                        existing = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+                        for column, column_type in _ADDED_COLUMNS.items():
+                            if column not in existing:
+                                connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+                        self._initialized = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _update(self, job_id: str, **columns: Any) -> None:
+        columns["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        with self._connect() as connection:
+            connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                (*columns.values(), job_id),
+            )
+
+    # ----- 상태 전이 -----
+
+    def create(self, job_id: str, provider: str, priority: int, responses: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (job_id, status, provider, priority, responses, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, provider, priority, json.dumps(responses, ensure_ascii=False), now, now),
+            )
+            # 보존 기간이 지난 작업 정리
+            connection.execute(
+                "DELETE FROM jobs WHERE created_at < ?",
+                (now - settings.JOB_STORE_RETENTION_SECONDS,),
+            )
+
+    def mark_running(self, job_id: str) -> None:
+        self._update(job_id, status="running")
+
+    def save_partial(self, job_id: str, partial: Dict[str, Any]) -> None:
+        self._update(job_id, partial=json.dumps(partial, ensure_ascii=False, default=str))
+
+    def save_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        self._update(job_id, progress=json.dumps(progress, ensure_ascii=False, default=str))
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._update(job_id, status="done", result=json.dumps(result, ensure_ascii=False, default=str))
+
+    def fail(self, job_id: str, error: BaseException, status: str = "failed") -> None:
+        self._update(job_id, status=status, error_type=type(error).__name__, error=str(error))
+
+    def mark_delivered(self, job_id: str) -> None:
+        """결과를 화면에 보여주고 CSV에 저장했음을 기록합니다 (재개 시 중복 저장 방지)."""
+        self._update(job_id, delivered=1)
+
+    # ----- 조회 -----
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 기록을 반환합니다 (JSON 컬럼은 파싱, 없으면 None).
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        for column in ("responses", "partial", "progress", "result"):
+            if record[column] is not None:
+                record[column] = json.loads(record[column])
+        record["delivered"] = bool(record["delivered"])
+        return record
+
+
+def is_stale(record: Dict[str, Any]) -> bool:
+    """
+    끝나지 않았는데 JOB_STALE_SECONDS 동안 갱신이 없는 작업 (실행하던 프로세스가 사라짐).
+    """
+    return (
+        record["status"] not in FINAL_STATUSES
+        and time.time() - record["updated_at"] > settings.JOB_STALE_SECONDS
+    )
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+        return _store
@@ -5,12 +5,16 @@
 from __future__ import annotations
 
 import base64
+import io
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
 import streamlit as st
 import streamlit.components.v1 as components
 
+from PIL import Image
+
 from src.ui.media import fix_image_orientation
 
 
@@ -40,12 +44,28 @@ def load_mari_image(image_name: str) -> str | None:
     return str(image_path) if image_path.exists() else None
 
 
+@lru_cache(maxsize=32)
 def get_image_base64(image_path: str) -> str:
-    """이미지를 base64 문자열로 변환."""
+    """이미지를 base64 문자열로 변환 (정적 에셋이라 프로세스 단위로 캐시)."""
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
 
 
+@lru_cache(maxsize=16)
+def load_resized_image(image_path: str, width: int) -> bytes:
+    """
+    st.image용으로 width에 맞춰 줄인 PNG bytes (프로세스 단위로 캐시).
+
+    경로를 그대로 넘기면 st.image가 rerun마다 원본을 디코딩/리사이즈/재인코딩합니다.
+    """
+    with Image.open(image_path) as image:
+        if image.width > width:
+            image = image.resize((width, int(image.height * width / image.width)), Image.BILINEAR)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
 def render_question(q: Dict[str, Any]) -> Any:
     """질문 타입별 컴포넌트를 렌더링하고 응답을 반환."""
     st.markdown(f"### {q['question']}")
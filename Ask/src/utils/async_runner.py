@@ -1,5 +1,7 @@
 """
 백그라운드 asyncio 이벤트 루프를 관리하고 작업을 제출합니다.
+
+ASYNC_WORKER_PROCESSES > 0이면 submit_call 작업은 프로세스 워커 풀(src/utils/worker_pool.py)에서 실행됩니다.
 """
 
 from __future__ import annotations
@@ -7,10 +9,15 @@ from __future__ import annotations
 import asyncio
 import threading
 from concurrent.futures import Future
-from typing import Awaitable
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config.settings import settings
 
 _loop: asyncio.AbstractEventLoop | None = None
 _loop_lock = threading.Lock()
+_startup_hooks: List[Callable[[], Awaitable]] = []
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
 
 
 def _ensure_loop() -> asyncio.AbstractEventLoop:
@@ -31,12 +38,79 @@ def _ensure_loop() -> asyncio.AbstractEventLoop:
         thread = threading.Thread(target=_run_loop, args=(loop,), daemon=True)
         thread.start()
         _loop = loop
+
+        for hook in _startup_hooks:
+            asyncio.run_coroutine_threadsafe(hook(), loop)
         return loop
 
 
+def register_startup_hook(hook: Callable[[], Awaitable]) -> None:
+    """
+    루프가 시작될 때마다 실행할 코루틴 함수를 등록합니다.
+    이미 루프가 실행 중이면 즉시 한 번 실행합니다.
+    """
+    with _loop_lock:
+        if hook in _startup_hooks:
+            return
+        _startup_hooks.append(hook)
+        running_loop = _loop if _loop and _loop.is_running() else None
+
+    if running_loop is not None:
+        asyncio.run_coroutine_threadsafe(hook(), running_loop)
+
+
+def start_background_loop() -> None:
+    """
+    첫 작업 제출을 기다리지 않고 백그라운드 루프(와 설정 시 워커 풀)를 미리 시작합니다.
+    """
+    _ensure_loop()
+    get_worker_pool()
+
+
+def get_worker_pool():
+    """
+    ASYNC_WORKER_PROCESSES > 0이면 프로세스 공용 워커 풀을 (처음 한 번 만들어) 반환하고, 아니면 None.
+
+    워커는 만들어질 때까지 등록된 startup hook을 각자의 루프에서 한 번 실행합니다.
+    """
+    global _worker_pool
+    if settings.ASYNC_WORKER_PROCESSES <= 0:
+        return None
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            from src.utils.worker_pool import WorkerPool
+
+            _worker_pool = WorkerPool(
+                processes=settings.ASYNC_WORKER_PROCESSES,
+                max_inflight=settings.ASYNC_WORKER_MAX_INFLIGHT,
+                start_method=settings.ASYNC_WORKER_START_METHOD,
+                startup_hooks=list(_startup_hooks),
+            )
+        return _worker_pool
+
+
 def submit_async(coro: Awaitable) -> Future:
     """
     코루틴을 백그라운드 이벤트 루프에 제출하고 Future를 반환합니다.
     """
     loop = _ensure_loop()
     return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def submit_call(
+    func: Callable[..., Awaitable[Any]],
+    *args: Any,
+    callbacks: Optional[Dict[str, Callable[[Any], None]]] = None,
+    **kwargs: Any
+) -> Future:
+    """
+    async 함수 호출을 제출하고 Future를 반환합니다.
+
+    워커 풀이 켜져 있으면 워커 프로세스에서 실행하므로 func는 모듈 수준 함수, 인자는 pickle 가능해야 합니다.
+    callbacks(인자 이름 → 함수)는 단일 루프에서는 그대로 전달되고, 워커 풀에서는 부모 프로세스의
+    수집 스레드에서 호출됩니다. 워커 풀을 쓸 수 없게 되면 백그라운드 루프로 대신 실행합니다.
+    """
+    pool = get_worker_pool()
+    if pool is not None and pool.available:
+        return pool.submit(func, *args, callbacks=callbacks, **kwargs)
+    return submit_async(func(*args, **kwargs, **(callbacks or {})))
@@ -0,0 +1,169 @@
+"""
+메모리 LRU + 디스크(JSON) 2단 캐시.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.paths import get_runtime_cache_dir
+
+
+class TieredCache:
+    """
+    JSON 직렬화 가능한 값을 메모리 LRU와 디스크에 함께 저장합니다.
+
+    메모리 tier는 프로세스 내 재요청을, 디스크 tier(runtime/{APP_ENV}/cache/{namespace})는
+    앱 재시작 후 재요청을 처리합니다. 백그라운드 루프와 Streamlit 스레드에서 함께 사용하므로
+    메모리 tier 접근은 lock으로 보호합니다.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = None,
+        disk: bool = True,
+        max_disk_entries: Optional[int] = None,
+    ) -> None:
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = disk
+        self.max_disk_entries = max_disk_entries or max_entries * 4
+        self._memory: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    # ----- 내부 도우미 -----
+
+    def _disk_dir(self) -> Path:
+        disk_dir = get_runtime_cache_dir() / self.namespace
+        disk_dir.mkdir(parents=True, exist_ok=True)
+        return disk_dir
+
+    def _disk_path(self, key: str) -> Path:
+        filename = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+        return self._disk_dir() / filename
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    @staticmethod
+    def _expired(expires_at: Optional[float]) -> bool:
+        return expires_at is not None and expires_at <= time.time()
+
+    def _remember(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Tuple[bool, Optional[float], Any]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                payload = json.load(cache_file)
+        except (OSError, json.JSONDecodeError):
+            return False, None, None
+
+        if payload.get("key") != key or self._expired(payload.get("expires_at")):
+            path.unlink(missing_ok=True)
+            return False, None, None
+        return True, payload.get("expires_at"), payload.get("value")
+
+    def _write_disk(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        payload = {"key": key, "expires_at": expires_at, "stored_at": time.time(), "value": value}
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(payload, cache_file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """오래된 파일부터 지워 디스크 항목 수를 max_disk_entries 이하로 유지합니다."""
+        try:
+            files = sorted(self._disk_dir().glob("*.json"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for path in files[:max(len(files) - self.max_disk_entries, 0)]:
+            path.unlink(missing_ok=True)
+
+    # ----- 공개 API -----
+
+    def lookup(self, key: str, record_miss: bool = True) -> Tuple[Any, Optional[str]]:
+        """
+        캐시 값을 조회합니다.
+
+        Args:
+            key: 캐시 키
+            record_miss: False면 miss 카운터를 올리지 않음 (여러 키를 차례로 조회할 때)
+
+        Returns:
+            (값, tier): tier는 "memory" / "disk", 없으면 (None, None)
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry[0]):
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1], "memory"
+
+        if self.disk:
+            found, expires_at, value = self._read_disk(key)
+            if found:
+                self._remember(key, expires_at, value)
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                return value, "disk"
+
+        if record_miss:
+            with self._lock:
+                self._stats["misses"] += 1
+        return None, None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value, tier = self.lookup(key)
+        return value if tier is not None else default
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = self._expires_at()
+        self._remember(key, expires_at, value)
+        with self._lock:
+            self._stats["writes"] += 1
+        if self.disk:
+            self._write_disk(key, expires_at, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.disk:
+            self._disk_path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.disk:
+            for path in self._disk_dir().glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        """누적 hit/miss 카운터와 현재 메모리 항목 수를 반환합니다."""
+        with self._lock:
+            return {**self._stats, "memory_entries": len(self._memory)}
@@ -0,0 +1,72 @@
+"""
+파일명: deadline.py
+목적: 요청 단위 시간 예산 (Vision → 1차 → 2차 단계와 재시도 루프가 공유)
+작성일: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """남은 시간 예산으로는 작업을 시작/계속할 수 없을 때 발생합니다."""
+
+
+class Deadline:
+    """
+    분석 요청 하나의 마감 시각 (time.monotonic 기준).
+
+    start_analysis_job에서 ANALYSIS_HARD_SLA_SECONDS로 만들어 analyze_two_stage에 전달하면,
+    각 단계와 재시도 루프는 remaining()으로 남은 예산을 보고 호출 설정을 낮추거나 폴백합니다.
+    """
+
+    def __init__(self, budget_seconds: float) -> None:
+        self.budget_seconds = budget_seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_seconds
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def check(self, reserve: float = 0.0, what: str = "작업") -> float:
+        """
+        reserve보다 많은 시간이 남아 있으면 (남은 시간 - reserve)를, 아니면 DeadlineExceeded를 냅니다.
+        """
+        budget = self.remaining() - reserve
+        if budget <= 0:
+            raise DeadlineExceeded(f"{what}: 시간 예산 초과 (예산 {self.budget_seconds:.1f}s)")
+        return budget
+
+    def cap(self, seconds: Optional[float], reserve: float = 0.0) -> float:
+        """단계별 타임아웃을 남은 예산 안으로 줄입니다."""
+        budget = max(self.remaining() - reserve, 0.0)
+        return budget if seconds is None else min(seconds, budget)
+
+    async def run(self, awaitable: Awaitable[T], reserve: float = 0.0, what: str = "작업") -> T:
+        """
+        awaitable을 (남은 시간 - reserve) 안에 끝내고, 넘기면 취소한 뒤 DeadlineExceeded를 냅니다.
+        """
+        try:
+            budget = self.check(reserve, what)
+        except DeadlineExceeded:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        try:
+            return await asyncio.wait_for(awaitable, timeout=budget)
+        except asyncio.TimeoutError as exc:
+            if isinstance(exc, DeadlineExceeded) or self.remaining() - reserve > 0.05:
+                raise  # 예산이 아니라 작업 자체의 타임아웃
+            raise DeadlineExceeded(f"{what}: 시간 예산 초과 (예산 {self.budget_seconds:.1f}s)") from exc
@@ -0,0 +1,63 @@
+"""
+파일명: latency_stats.py
+목적: 단계별 최근 응답 시간 통계 (hedging 지연 기준 등)
+작성일: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyStats:
+    """
+    키(단계/모델)별로 최근 N개의 소요 시간을 보관하고 분위수를 계산합니다.
+
+    백그라운드 루프의 여러 분석 작업이 함께 기록하므로 lock으로 보호합니다.
+    """
+
+    def __init__(self, window: int = 200) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def quantile(self, key: str, q: float) -> Optional[float]:
+        """
+        분위수(0.0~1.0)를 반환합니다. 기록이 없으면 None.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(int(q * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """키별 표본 수와 p50/p90 (performance.log 기록용)."""
+        with self._lock:
+            keys = list(self._samples)
+        return {
+            key: {"count": self.count(key), "p50": self.quantile(key, 0.5), "p90": self.quantile(key, 0.9)}
+            for key in keys
+        }
+
+
+# 프로세스 공용 인스턴스
+_latency_stats = LatencyStats()
+
+
+def get_latency_stats() -> LatencyStats:
+    return _latency_stats
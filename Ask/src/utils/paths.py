@@ -46,6 +46,32 @@ def get_runtime_logs_dir() -> Path:
     return logs_dir
 
 
+def get_runtime_cache_dir() -> Path:
+    """
+    런타임 캐시 디렉토리 (AI 분석 결과 캐시 등)를 반환합니다.
+    """
+    cache_dir = _get_runtime_root() / "cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_job_store_path() -> Path:
+    """
+    분석 작업 저장소(SQLite) 경로를 반환합니다.
+    """
+    return get_runtime_data_dir() / "jobs.sqlite3"
+
+
+def get_vector_db_dir(name: str) -> Path:
+    """
+    로컬 벡터 인덱스 디렉토리 (data/vector_db/{name}/{APP_ENV})를 반환합니다.
+    """
+    env_name = settings.APP_ENV or "development"
+    vector_dir = get_project_root() / "data" / "vector_db" / name / env_name
+    vector_dir.mkdir(parents=True, exist_ok=True)
+    return vector_dir
+
+
 def get_csv_output_path(filename: str = "survey_results.csv") -> Path:
     """
     CSV 기본 저장 경로를 반환합니다.
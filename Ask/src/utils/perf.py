@@ -5,14 +5,23 @@
 from __future__ import annotations
 
 import json
+import statistics
 import time
 from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from src.utils.paths import get_performance_log_path
 
 
+# 현재 asyncio Task(실행 컨텍스트)에서 기록 중인 tracker - 하위 API 호출이 tracker를 인자로 받지 않고도 기록
+_active_tracker: ContextVar[Optional["PerformanceTracker"]] = ContextVar("active_performance_tracker", default=None)
+
+# finish() 때 기록(payload)을 받아 보는 콜백 (예: 적응형 effort 컨트롤러)
+_finish_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+
 class PerformanceTracker:
     """
     특정 작업 내 주요 구간의 실행 시간을 기록하고 JSONL 형태로 저장합니다.
@@ -22,10 +31,12 @@ class PerformanceTracker:
         self.name = name
         self.metadata: Dict[str, Any] = dict(metadata or {})
         self.events: List[Dict[str, Any]] = []
+        self.counters: Dict[str, Dict[str, float]] = {}
         self._started = time.perf_counter()
         self._status = "pending"
         self._error: Optional[str] = None
         self._finished = False
+        self._context_token = None
 
     @contextmanager
     def span(self, label: str):
@@ -43,9 +54,30 @@ class PerformanceTracker:
             duration = time.perf_counter() - span_start
             self.events.append({"label": label, "duration": duration})
 
+    def elapsed(self) -> float:
+        """
+        측정 시작 이후 경과 시간(초)을 반환합니다.
+        """
+        return time.perf_counter() - self._started
+
     def add_metadata(self, **kwargs: Any) -> None:
         self.metadata.update({k: v for k, v in kwargs.items() if v is not None})
 
+    def activate(self) -> None:
+        """
+        현재 실행 컨텍스트의 기록 대상으로 지정합니다 (finish() 시 해제).
+        """
+        self._context_token = _active_tracker.set(self)
+
+    def add_counters(self, group: str, **values: Optional[float]) -> None:
+        """
+        그룹별 누적 카운터를 더합니다 (None 값은 무시).
+        """
+        bucket = self.counters.setdefault(group, {})
+        for key, value in values.items():
+            if value is not None:
+                bucket[key] = bucket.get(key, 0) + value
+
     def mark_event(self, label: str, value: Any) -> None:
         self.events.append({"label": label, "value": value})
 
@@ -73,6 +105,9 @@ class PerformanceTracker:
             "metadata": self.metadata,
         }
 
+        if self.counters:
+            payload["counters"] = self.counters
+
         if self._error:
             payload["error"] = self._error
 
@@ -82,3 +117,118 @@ class PerformanceTracker:
             log_file.write(json.dumps(payload, ensure_ascii=False) + "\n")
 
         self._finished = True
+
+        for listener in list(_finish_listeners):
+            try:
+                listener(payload)
+            except Exception:  # noqa: BLE001 - 계측 콜백 실패가 분석 결과에 영향을 주지 않도록
+                pass
+
+        if self._context_token is not None:
+            try:
+                _active_tracker.reset(self._context_token)
+            except ValueError:
+                pass  # 다른 컨텍스트에서 finish된 경우
+            self._context_token = None
+
+
+def add_finish_listener(listener: Callable[[Dict[str, Any]], None]) -> None:
+    """
+    tracker가 finish될 때마다 performance.log에 쓴 것과 같은 기록을 listener에 전달합니다.
+    """
+    if listener not in _finish_listeners:
+        _finish_listeners.append(listener)
+
+
+def get_active_tracker() -> Optional[PerformanceTracker]:
+    """
+    현재 실행 컨텍스트에서 활성화된 tracker를 반환합니다.
+    """
+    return _active_tracker.get()
+
+
+def record_token_usage(
+    stage: str,
+    input_tokens: Optional[int] = None,
+    cached_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+    cache_write_tokens: Optional[int] = None,
+) -> None:
+    """
+    활성 tracker에 단계별 토큰 사용량(프롬프트 캐시 hit 포함)을 누적합니다.
+    """
+    tracker = get_active_tracker()
+    if tracker is None:
+        return
+    tracker.add_counters(
+        f"tokens.{stage}",
+        calls=1,
+        input=input_tokens,
+        cached=cached_tokens,
+        cache_write=cache_write_tokens,
+        output=output_tokens,
+    )
+
+
+def load_performance_records(name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    performance.log의 기록을 읽습니다 (name이 주어지면 해당 작업만).
+    """
+    log_path = get_performance_log_path()
+    if not log_path.exists():
+        return []
+
+    records: List[Dict[str, Any]] = []
+    with open(log_path, "r", encoding="utf-8") as log_file:
+        for line in log_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if name is None or record.get("name") == name:
+                records.append(record)
+    return records
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(ratio * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize_performance_log(
+    name: str = "analyze_two_stage",
+    group_by: str = "analysis_mode",
+    status: Optional[str] = "success",
+) -> Dict[str, Dict[str, Any]]:
+    """
+    작업별 전체 소요 시간과 구간(span) 소요 시간을 metadata[group_by] 값별로 요약합니다.
+
+    예: ANALYSIS_MODE를 바꿔 가며 실행한 뒤 two_stage / fused 지연 시간을 나란히 비교.
+
+    Returns:
+        dict: {그룹 값: {"count", "mean", "p50", "p90", "max", "spans": {label: 평균}}}
+    """
+    groups: Dict[str, Dict[str, List[float]]] = {}
+    for record in load_performance_records(name):
+        if status is not None and record.get("status") != status:
+            continue
+        group = str(record.get("metadata", {}).get(group_by, "unknown"))
+        bucket = groups.setdefault(group, {"total": []})
+        bucket["total"].append(record.get("total_duration", 0.0))
+        for event in record.get("events", []):
+            if "duration" in event:
+                bucket.setdefault(event["label"], []).append(event["duration"])
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for group, bucket in groups.items():
+        totals = bucket.pop("total")
+        summary[group] = {
+            "count": len(totals),
+            "mean": statistics.fmean(totals),
+            "p50": percentile(totals, 0.5),
+            "p90": percentile(totals, 0.9),
+            "max": max(totals),
+            "spans": {label: statistics.fmean(values) for label, values in bucket.items()},
+        }
+    return summary
@@ -0,0 +1,336 @@
+"""
+파일명: worker_pool.py
+목적: 프로세스 워커 풀 - 워커마다 자체 asyncio 루프를 두고 로컬 IPC로 작업을 받아 결과를 Future로 돌려줌
+작성일: 2026-10-18
+
+코루틴 객체는 프로세스 경계를 넘을 수 없으므로 작업은 (모듈 수준 async 함수, pickle 가능한 인자)로 보냅니다.
+콜백(예: on_partial)은 워커에서 이벤트로 바뀌어 부모 프로세스의 수집 스레드에서 호출됩니다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import itertools
+import json
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import Future, wait
+from multiprocessing.connection import Connection, wait as wait_connections
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 워커 → 부모 메시지 종류
+_RESULT = "result"
+_ERROR = "error"
+_EVENT = "event"
+
+# 워커당 허용하는 재시작 횟수 (풀 전체 합계가 넘으면 사용 불가로 표시 - 기동 직후 죽는 워커의 무한 재시작 방지)
+_MAX_RESTARTS_PER_WORKER = 3
+# 워커 생존 확인 주기 (초)
+_CHECK_INTERVAL_SECONDS = 1.0
+
+
+# ===== 워커 프로세스 =====
+
+def _picklable_error(exc: BaseException) -> BaseException:
+    try:
+        pickle.dumps(exc)
+        return exc
+    except Exception:  # noqa: BLE001 - pickle 불가능한 예외는 메시지만 전달
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+
+def _event_sender(send: Callable[[Tuple], None], task_id: int, name: str) -> Callable[[Any], None]:
+    def _send(payload: Any) -> None:
+        send((task_id, _EVENT, (name, payload)))
+
+    return _send
+
+
+def _worker_main(
+    task_queue: Any,
+    connection: Connection,
+    max_inflight: int,
+    startup_hooks: Sequence[Callable[[], Awaitable]],
+) -> None:
+    """
+    워커 프로세스 진입점: 루프 스레드 1개 + 작업 수신 루프 (동시 실행 max_inflight개까지만 가져감).
+
+    작업 큐와 결과 파이프는 모두 이 워커 전용입니다 (죽은 워커가 공용 큐의 읽기 잠금을 쥔 채 사라지면
+    다른 워커가 영영 작업을 못 받으므로, 재시작할 때 큐와 파이프를 통째로 새로 만듦).
+    """
+    send_lock = threading.Lock()
+
+    def send(message: Tuple) -> None:
+        with send_lock:
+            connection.send(message)
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    for hook in startup_hooks:
+        asyncio.run_coroutine_threadsafe(hook(), loop)
+
+    slots = threading.BoundedSemaphore(max_inflight)
+
+    def _finish(task_id: int, done: Future) -> None:
+        try:
+            if done.cancelled():
+                message = (task_id, _ERROR, RuntimeError("워커 작업이 취소되었습니다"))
+            elif done.exception() is not None:
+                message = (task_id, _ERROR, _picklable_error(done.exception()))
+            else:
+                message = (task_id, _RESULT, pickle.dumps(done.result()))
+        except Exception as exc:  # noqa: BLE001 - 결과 pickle 실패
+            message = (task_id, _ERROR, _picklable_error(exc))
+        send(message)
+        slots.release()
+
+    while True:
+        slots.acquire()
+        payload = task_queue.get()
+        if payload is None:
+            break
+        task_id, func, args, kwargs, callback_names = pickle.loads(payload)
+        for name in callback_names:
+            kwargs[name] = _event_sender(send, task_id, name)
+        try:
+            done = asyncio.run_coroutine_threadsafe(func(*args, **kwargs), loop)
+        except Exception as exc:  # noqa: BLE001 - async 함수가 아니거나 인자 오류
+            send((task_id, _ERROR, _picklable_error(exc)))
+            slots.release()
+            continue
+        done.add_done_callback(lambda future, task_id=task_id: _finish(task_id, future))
+
+    loop.call_soon_threadsafe(loop.stop)
+
+
+# ===== 부모 프로세스 =====
+
+class WorkerPool:
+    """
+    N개의 워커 프로세스에 async 작업을 나눠 실행합니다.
+
+    작업은 제출할 때 밀린 작업이 가장 적은 워커의 큐에 넣고(워커당 동시 실행 max_inflight개),
+    결과/이벤트는 워커별 파이프로 받아 수집 스레드가 Future와 콜백에 전달합니다.
+    워커가 죽으면 그 워커에 맡긴 작업을 실패 처리하고 새 워커를 띄우며,
+    재시작이 워커 수 × _MAX_RESTARTS_PER_WORKER번을 넘으면 풀을 사용 불가(available=False)로 표시합니다.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        max_inflight: int = 8,
+        start_method: str = "spawn",
+        startup_hooks: Sequence[Callable[[], Awaitable]] = (),
+    ) -> None:
+        self._context = multiprocessing.get_context(start_method)
+        self._max_inflight = max_inflight
+        self._startup_hooks = list(startup_hooks)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        # task_id → (Future, 콜백, 맡은 워커 번호)
+        self._pending: Dict[int, Tuple[Future, Dict[str, Callable[[Any], None]], int]] = {}
+        self._closed = False
+        self._restarts = 0
+        self._broken = False
+        self._processes: List[Any] = []
+        self._task_queues: List[Any] = []
+        # 워커별 결과 파이프 (워커가 죽어 EOF를 읽으면 None, 재시작 시 새 파이프로 교체)
+        self._connections: List[Optional[Connection]] = []
+        for _ in range(processes):
+            process, task_queue, connection = self._spawn()
+            self._processes.append(process)
+            self._task_queues.append(task_queue)
+            self._connections.append(connection)
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    @property
+    def size(self) -> int:
+        return len(self._processes)
+
+    @property
+    def available(self) -> bool:
+        return not (self._closed or self._broken)
+
+    def _spawn(self) -> Tuple[Any, Any, Connection]:
+        task_queue = self._context.Queue()
+        reader, writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(task_queue, writer, self._max_inflight, self._startup_hooks),
+            daemon=True,
+        )
+        process.start()
+        writer.close()  # 부모 쪽 쓰기 끝을 닫아야 워커가 죽었을 때 reader가 EOF를 받음
+        return process, task_queue, reader
+
+    def submit(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        callbacks: Optional[Dict[str, Callable[[Any], None]]] = None,
+        **kwargs: Any,
+    ) -> Future:
+        """
+        func(*args, **kwargs, **콜백 프록시)를 워커에서 실행하고 결과 Future를 반환합니다.
+
+        func는 모듈 수준 async 함수여야 하며, 인자를 pickle할 수 없으면 여기서 바로 예외가 납니다.
+        """
+        if not self.available:
+            raise RuntimeError("워커 풀을 사용할 수 없습니다 (종료되었거나 워커가 계속 죽음)")
+        callbacks = dict(callbacks or {})
+        task_id = next(self._ids)
+        payload = pickle.dumps((task_id, func, args, kwargs, tuple(callbacks)))
+        future: Future = Future()
+        with self._lock:
+            load = [0] * len(self._processes)
+            for _, _, worker in self._pending.values():
+                load[worker] += 1
+            index = min(range(len(load)), key=load.__getitem__)
+            self._pending[task_id] = (future, callbacks, index)
+            self._task_queues[index].put(payload)
+        return future
+
+    def _collect(self) -> None:
+        checked_at = time.monotonic()
+        while not self._closed:
+            if time.monotonic() - checked_at >= _CHECK_INTERVAL_SECONDS:
+                self._check_workers()
+                checked_at = time.monotonic()
+            connections = [connection for connection in self._connections if connection is not None]
+            if not connections:
+                time.sleep(_CHECK_INTERVAL_SECONDS)
+                continue
+            for connection in wait_connections(connections, timeout=_CHECK_INTERVAL_SECONDS):
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    # 워커 종료: 남은 작업 실패 처리/재시작은 생존 확인에서 바로 처리
+                    self._connections[self._connections.index(connection)] = None
+                    connection.close()
+                    checked_at = 0.0
+                    continue
+                self._dispatch(*message)
+
+    def _dispatch(self, task_id: int, kind: str, payload: Any) -> None:
+        with self._lock:
+            entry = self._pending.get(task_id)
+            if entry is None:
+                return
+            future, callbacks, _ = entry
+            if kind in (_RESULT, _ERROR):
+                del self._pending[task_id]
+
+        if kind == _EVENT:
+            name, value = payload
+            try:
+                callbacks[name](value)
+            except Exception:  # noqa: BLE001 - 콜백 실패가 작업 결과에 영향을 주지 않도록
+                pass
+        elif kind == _RESULT:
+            future.set_result(pickle.loads(payload))
+        else:
+            future.set_exception(payload)
+
+    def _check_workers(self) -> None:
+        for index, process in enumerate(self._processes):
+            if process.is_alive() or self._closed:
+                continue
+            restart = self._restarts < len(self._processes) * _MAX_RESTARTS_PER_WORKER
+            connection = self._connections[index]
+            if connection is not None and restart:
+                connection.close()
+            # 실패 처리와 큐 교체를 한 잠금 안에서 해야 그사이 제출된 작업이 죽은 워커 큐에 남지 않음
+            with self._lock:
+                lost = [task_id for task_id, (_, _, worker) in self._pending.items() if worker == index]
+                failed = [self._pending.pop(task_id)[0] for task_id in lost]
+                if restart:
+                    self._restarts += 1
+                    self._processes[index], self._task_queues[index], self._connections[index] = self._spawn()
+                else:
+                    self._broken = True
+            for future in failed:
+                future.set_exception(RuntimeError(f"워커 프로세스 {index}가 종료되었습니다 (exitcode={process.exitcode})"))
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """워커에 종료를 알리고 기다립니다 (남은 작업은 실패 처리)."""
+        if self._closed:
+            return
+        self._closed = True
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(deadline - time.monotonic(), 0.0))
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections:
+            if connection is not None:
+                connection.close()
+        with self._lock:
+            pending = [future for future, _, _ in self._pending.values()]
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("워커 풀이 종료되었습니다"))
+
+
+# ===== 벤치마크 =====
+
+async def benchmark_task(image_size: int = 1024, io_seconds: float = 0.05) -> int:
+    """
+    분석 작업의 CPU 부분을 흉내 내는 작업: 이미지 리사이즈/JPEG 인코딩 → base64 → JSON 왕복 + I/O 대기.
+    """
+    from PIL import Image
+
+    image = Image.effect_noise((image_size, image_size), 64).convert("RGB")
+    image = image.resize((image_size // 2, image_size // 2))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    document = json.loads(json.dumps({"image": encoded, "items": [{"index": i, "text": "가" * 40} for i in range(500)]}))
+    await asyncio.sleep(io_seconds)
+    return len(document["image"])
+
+
+def benchmark_worker_pool(
+    tasks: int = 64,
+    processes: int = 4,
+    image_size: int = 1024,
+    io_seconds: float = 0.05,
+) -> Dict[str, Dict[str, float]]:
+    """
+    같은 작업 묶음을 단일 백그라운드 루프와 워커 풀에서 실행해 처리량을 비교합니다.
+
+    Returns:
+        dict: {"single_loop" / "worker_pool": {"tasks", "seconds", "tasks_per_second"}, "speedup": {"ratio"}}
+    """
+    from src.utils.async_runner import submit_async
+
+    def measure(submit: Callable[[], Future]) -> Dict[str, float]:
+        started = time.perf_counter()
+        futures = [submit() for _ in range(tasks)]
+        wait(futures)
+        for future in futures:
+            future.result()
+        seconds = time.perf_counter() - started
+        return {"tasks": tasks, "seconds": round(seconds, 3), "tasks_per_second": round(tasks / seconds, 2)}
+
+    results = {"single_loop": measure(lambda: submit_async(benchmark_task(image_size, io_seconds)))}
+
+    pool = WorkerPool(processes)
+    try:
+        # 워커 기동(spawn + import) 시간은 제외
+        wait([pool.submit(benchmark_task, 64, 0.0) for _ in range(processes * 2)])
+        results["worker_pool"] = measure(lambda: pool.submit(benchmark_task, image_size, io_seconds))
+    finally:
+        pool.shutdown()
+
+    results["speedup"] = {
+        "ratio": round(results["worker_pool"]["tasks_per_second"] / results["single_loop"]["tasks_per_second"], 2)
+    }
+    return results
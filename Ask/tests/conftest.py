@@ -0,0 +1,11 @@
+"""
+파일명: conftest.py
+목적: 테스트 공용 설정 (필수 환경 변수 기본값, 테스트용 APP_ENV)
+"""
+
+import os
+
+# config.settings가 import 시점에 필수 키를 검증하므로 src 모듈보다 먼저 설정
+os.environ.setdefault("APP_ENV", "test")
+for _key in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "SUPABASE_URL", "SUPABASE_KEY"):
+    os.environ.setdefault(_key, "test-key")
@@ -0,0 +1,134 @@
+"""
+파일명: test_analysis_scheduler.py
+목적: AnalysisScheduler의 provider별 동시 실행 제한, 우선순위 대기열, 부하 차단(대기열 크기/최대 대기 시간) 검증
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from config.settings import settings
+from src.services import analysis_service
+from src.services.analysis_service import AnalysisJob, AnalysisRejected, AnalysisScheduler
+from src.services.job_store import JobStore
+
+
+@pytest.fixture(autouse=True)
+def isolated_job_store(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(analysis_service, "get_job_store", lambda: store)
+    monkeypatch.setattr(settings, "ANALYSIS_MAX_CONCURRENCY", {"gpt": 2, "claude": 1})
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_SIZE", 3)
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_WAIT_SECONDS", 60.0)
+    yield store
+    analysis_service.flush_job_store_writes(timeout=5.0)
+
+
+class Runner:
+    """scheduler가 시작한 작업의 내부 Future를 테스트가 직접 끝냅니다."""
+
+    def __init__(self) -> None:
+        self.started = []
+
+    def __call__(self, job: AnalysisJob) -> Future:
+        inner = Future()
+        self.started.append((job, inner))
+        return inner
+
+    def finish(self, job: AnalysisJob, result=None) -> None:
+        inner = next(inner for started, inner in self.started if started is job)
+        inner.set_result(result if result is not None else {"job": job.job_id})
+
+
+def _job(job_id: str, provider: str = "gpt", priority: int = 0) -> AnalysisJob:
+    return AnalysisJob(future=Future(), started_at=time.time(), provider=provider, priority=priority, job_id=job_id)
+
+
+def test_limits_concurrency_per_provider_and_starts_next_on_finish():
+    scheduler, runner = AnalysisScheduler(), Runner()
+    jobs = [_job(f"g{index}") for index in range(3)]
+    claude = _job("c0", provider="claude")
+    for job in jobs + [claude]:
+        scheduler.submit(job, runner)
+
+    assert [job.status for job in jobs] == ["running", "running", "queued"]
+    assert claude.status == "running"
+    assert scheduler.queue_position(jobs[2]) == 1
+
+    runner.finish(jobs[0])
+    assert jobs[0].future.result() == {"job": "g0"}
+    assert jobs[2].status == "running"
+    assert scheduler.snapshot()["running"] == {"gpt": 2, "claude": 1}
+
+
+def test_priority_then_fifo_order():
+    scheduler, runner = AnalysisScheduler(), Runner()
+    blockers = [_job("b0"), _job("b1")]
+    late_urgent = _job("urgent", priority=-1)
+    normal = [_job("n0"), _job("n1")]
+    for job in blockers + normal + [late_urgent]:
+        scheduler.submit(job, runner)
+
+    assert scheduler.queue_position(late_urgent) == 1
+    assert scheduler.queue_position(normal[0]) == 2
+    runner.finish(blockers[0])
+    assert late_urgent.status == "running"
+    assert normal[0].status == "queued"
+
+
+def test_rejects_when_queue_is_full():
+    scheduler, runner = AnalysisScheduler(), Runner()
+    jobs = [_job(f"g{index}") for index in range(6)]
+    for job in jobs:
+        scheduler.submit(job, runner)
+
+    assert jobs[-1].status == "rejected"
+    with pytest.raises(AnalysisRejected):
+        jobs[-1].future.result(timeout=1)
+    assert scheduler.snapshot()["rejected"] == 1
+
+
+def test_max_wait_rejects_without_any_job_finishing(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_WAIT_SECONDS", 0.2)
+    scheduler, runner = AnalysisScheduler(), Runner()
+    running = [_job("g0"), _job("g1")]
+    waiting = _job("g2")
+    for job in running + [waiting]:
+        scheduler.submit(job, runner)
+
+    with pytest.raises(AnalysisRejected):
+        waiting.future.result(timeout=2)
+    assert waiting.status == "rejected"
+    assert scheduler.snapshot()["queued"] == 0
+    assert all(job.status == "running" for job in running)
+
+
+def test_rejection_callbacks_may_reenter_scheduler():
+    scheduler, runner = AnalysisScheduler(), Runner()
+    jobs = [_job(f"g{index}") for index in range(6)]
+    observed = []
+    # 예전에는 lock을 잡은 채 set_exception을 호출해 이 콜백이 교착 상태에 빠졌음
+    jobs[-1].future.add_done_callback(lambda done: observed.append(scheduler.snapshot()))
+
+    thread = threading.Thread(target=lambda: [scheduler.submit(job, runner) for job in jobs])
+    thread.start()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert observed and observed[0]["rejected"] == 1
+
+
+def test_start_failure_releases_slot():
+    scheduler, runner = AnalysisScheduler(), Runner()
+
+    def broken_start(job):
+        raise RuntimeError("submit failed")
+
+    failed = _job("bad")
+    scheduler.submit(failed, broken_start)
+    with pytest.raises(RuntimeError):
+        failed.future.result(timeout=1)
+    assert scheduler.snapshot()["running"]["gpt"] == 0
+
@@ -0,0 +1,101 @@
+"""
+파일명: test_circuit_breaker.py
+목적: CircuitBreaker 상태 전이, 장애성 오류만 실패로 세는 판정, 이전 세대 결과 무시 검증
+"""
+
+import httpx
+import openai
+import pytest
+
+from config.settings import settings
+from src.ai import circuit_breaker
+from src.ai.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_ENABLED", True)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_FAILURE_RATE", 0.5)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_SLOW_CALL_SECONDS", 10.0)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_OPEN_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_HALF_OPEN_PROBES", 1)
+
+
+def _status_error(status: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.test/v1/responses")
+    response = httpx.Response(status, request=request)
+    return openai.APIStatusError(f"status {status}", response=response, body=None)
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for _ in range(settings.CIRCUIT_BREAKER_MIN_CALLS):
+        generation = breaker.acquire()
+        breaker.record(False, 0.1, generation)
+    assert breaker.state == OPEN
+
+
+def _cool_down(breaker: CircuitBreaker, monkeypatch) -> None:
+    opened_at = breaker._opened_at
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: opened_at + settings.CIRCUIT_BREAKER_OPEN_SECONDS)
+
+
+def test_opens_on_failure_rate_and_rejects_calls():
+    breaker = CircuitBreaker("openai:test")
+    _trip(breaker)
+
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    assert breaker.snapshot()["trips"] == 1
+
+
+def test_request_errors_do_not_count_as_failures():
+    breaker = CircuitBreaker("openai:test")
+    for status in (400, 422, 429, 400, 422, 429):
+        generation = breaker.acquire()
+        breaker.record_error(_status_error(status), 0.1, generation)
+    generation = breaker.acquire()
+    breaker.record_error(ValueError("bad json"), 0.1, generation)
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["calls"] == 0
+
+
+def test_server_and_connection_errors_count_as_failures():
+    breaker = CircuitBreaker("openai:test")
+    request = httpx.Request("POST", "https://api.openai.test/v1/responses")
+    errors = [_status_error(500), _status_error(503), openai.APIConnectionError(request=request), TimeoutError()]
+    for error in errors:
+        generation = breaker.acquire()
+        breaker.record_error(error, 0.1, generation)
+
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_success_closes(monkeypatch):
+    breaker = CircuitBreaker("openai:test")
+    _trip(breaker)
+    _cool_down(breaker, monkeypatch)
+
+    generation = breaker.acquire()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    breaker.record(True, 0.1, generation)
+    assert breaker.state == CLOSED
+
+
+def test_stale_results_do_not_decide_half_open_probe(monkeypatch):
+    breaker = CircuitBreaker("openai:test")
+    stale = breaker.acquire()  # open 전에 시작되어 아주 늦게 끝나는 호출
+    _trip(breaker)
+    _cool_down(breaker, monkeypatch)
+
+    probe = breaker.acquire()
+    breaker.record(False, 0.1, stale)
+    breaker.release(stale)
+    assert breaker.state == HALF_OPEN
+    assert breaker._probes_in_flight == 1
+
+    breaker.record(True, 0.1, probe)
+    assert breaker.state == CLOSED
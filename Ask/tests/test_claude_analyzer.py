@@ -0,0 +1,97 @@
+"""
+파일명: test_claude_analyzer.py
+목적: Claude 호출의 Circuit Breaker 슬롯 관리와 analyze_two_stage 종료 시 tracker 정리 검증
+"""
+
+import asyncio
+
+import anthropic
+import httpx
+import pytest
+
+from config.settings import settings
+from src.ai import analyzer_claude
+from src.ai.circuit_breaker import CLOSED, HALF_OPEN, CircuitBreaker
+
+
+def _fake_client(handler) -> anthropic.AsyncAnthropic:
+    return anthropic.AsyncAnthropic(
+        api_key="test-key",
+        base_url="https://anthropic.test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        max_retries=0,
+    )
+
+
+def _message(text: str) -> dict:
+    return {
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "claude-test",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+
+
+@pytest.fixture
+def half_open_breaker(monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_ENABLED", True)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_HALF_OPEN_PROBES", 1)
+    breaker = CircuitBreaker("anthropic:test")
+    breaker.state = HALF_OPEN
+    monkeypatch.setattr(analyzer_claude, "get_breaker", lambda provider, model: breaker)
+    return breaker
+
+
+@pytest.mark.asyncio
+async def test_successful_probe_closes_breaker(half_open_breaker, monkeypatch):
+    async def handler(request):
+        return httpx.Response(200, json=_message("안녕하세요"))
+
+    monkeypatch.setattr(analyzer_claude, "get_anthropic_client", lambda model: _fake_client(handler))
+
+    assert await analyzer_claude.call_claude_api("system", "user", max_retries=0, model="claude-test") == "안녕하세요"
+    assert half_open_breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_returns_probe_slot(half_open_breaker, monkeypatch):
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.sleep(10)
+        return httpx.Response(200, json=_message("늦은 응답"))
+
+    monkeypatch.setattr(analyzer_claude, "get_anthropic_client", lambda model: _fake_client(handler))
+    task = asyncio.create_task(analyzer_claude.call_claude_api("system", "user", max_retries=0, model="claude-test"))
+    await started.wait()
+    assert half_open_breaker._probes_in_flight == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert half_open_breaker._probes_in_flight == 0
+    assert half_open_breaker.state == HALF_OPEN
+
+
+@pytest.mark.asyncio
+async def test_cancelled_analysis_still_finishes_tracker(monkeypatch):
+    finished = []
+
+    class RecordingTracker(analyzer_claude.PerformanceTracker):
+        def finish(self, status="success"):
+            finished.append(status)
+            self._finished = True
+
+    async def stalled_vision(**kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(analyzer_claude, "PerformanceTracker", RecordingTracker)
+    monkeypatch.setattr(analyzer_claude, "run_vision_stage", stalled_vision)
+    task = asyncio.create_task(analyzer_claude.analyze_two_stage({"dog_name": "보리"}, b""))
+    await asyncio.sleep(0.05)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert finished == ["cancelled"]
@@ -0,0 +1,64 @@
+"""
+파일명: test_client_registry.py
+목적: 이벤트 루프가 바뀔 때 이전 Provider 클라이언트의 커넥션 풀이 닫히는지 검증
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.ai import client_registry
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(client_registry, "_clients", {})
+    monkeypatch.setattr(client_registry, "_http_clients", {})
+    monkeypatch.setattr(client_registry, "_registry_loop", None)
+
+
+async def _get_http_client(provider: str = "openai", model: str = "gpt-test"):
+    client = client_registry.get_client(provider, model)
+    return client, client_registry._http_clients[(provider, model)]
+
+
+def test_same_loop_reuses_client():
+    async def scenario():
+        first, _ = await _get_http_client()
+        second, _ = await _get_http_client()
+        return first is second
+
+    assert asyncio.run(scenario())
+
+
+def test_clients_from_closed_loop_are_closed_on_new_loop():
+    old_client, old_http = asyncio.run(_get_http_client())
+
+    async def on_new_loop():
+        client, _ = await _get_http_client()
+        await asyncio.sleep(0.05)
+        return client
+
+    new_client = asyncio.run(on_new_loop())
+    assert new_client is not old_client
+    assert old_http.is_closed
+
+
+def test_clients_from_running_loop_are_closed_on_that_loop():
+    old_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=old_loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        _, old_http = asyncio.run_coroutine_threadsafe(_get_http_client("anthropic", "claude-test"), old_loop).result(5)
+
+        async def on_new_loop():
+            await _get_http_client("anthropic", "claude-test")
+
+        asyncio.run(on_new_loop())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), old_loop).result(5)
+        assert old_http.is_closed
+    finally:
+        old_loop.call_soon_threadsafe(old_loop.stop)
+        thread.join(timeout=5)
+        old_loop.close()
@@ -0,0 +1,98 @@
+"""
+파일명: test_deadline.py
+목적: 요청 단위 시간 예산(Deadline.check/cap/run)과 남은 시간에 따른 호출 설정 하향 검증
+"""
+
+import asyncio
+
+import pytest
+
+from src.ai.analyzer_gpt5 import downgrade_for_deadline
+from src.utils.deadline import Deadline, DeadlineExceeded
+
+
+def test_check_returns_budget_after_reserve_or_raises():
+    deadline = Deadline(10.0)
+    assert 8.0 < deadline.check(reserve=1.0) <= 9.0
+
+    with pytest.raises(DeadlineExceeded, match="1차 AI"):
+        deadline.check(reserve=10.5, what="1차 AI")
+    with pytest.raises(asyncio.TimeoutError):  # 기존 TimeoutError 처리부와 호환
+        Deadline(0.0).check()
+
+
+def test_cap_limits_stage_timeout_to_remaining_budget():
+    deadline = Deadline(5.0)
+    assert deadline.cap(8.0) <= 5.0
+    assert deadline.cap(2.0) == 2.0
+    assert deadline.cap(8.0, reserve=1.0) <= 4.0
+    assert 4.0 < deadline.cap(None) <= 5.0
+    assert Deadline(1.0).cap(3.0, reserve=2.0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_within_budget():
+    async def work():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    assert await Deadline(1.0).run(work()) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_run_cancels_work_that_outlives_budget():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(DeadlineExceeded):
+        await Deadline(0.1).run(slow(), what="Vision")
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_run_without_budget_does_not_start_coroutine():
+    started = []
+
+    async def work():
+        started.append(True)
+
+    coroutine = work()
+    with pytest.raises(DeadlineExceeded):
+        await Deadline(1.0).run(coroutine, reserve=2.0)
+    assert started == []
+    assert coroutine.cr_frame is None  # 닫혀서 "never awaited" 경고가 나지 않음
+
+
+@pytest.mark.asyncio
+async def test_run_passes_through_task_own_timeout():
+    async def own_timeout():
+        raise asyncio.TimeoutError("provider timeout")
+
+    with pytest.raises(asyncio.TimeoutError) as excinfo:
+        await Deadline(10.0).run(own_timeout())
+    assert not isinstance(excinfo.value, DeadlineExceeded)
+
+
+@pytest.mark.parametrize("budget, expected_level, expected_effort, expected_verbosity", [
+    (None, "full", "medium", "medium"),
+    (30.0, "full", "medium", "medium"),
+    (12.0, "reduced", "low", "low"),
+    (2.0, "minimal", "minimal", "low"),
+])
+def test_downgrade_for_deadline_levels(budget, expected_level, expected_effort, expected_verbosity):
+    deadline = None if budget is None else Deadline(budget)
+    model_settings = {"model": "gpt-5", "reasoning_effort": "medium", "verbosity": "medium", "temperature": 0.4}
+
+    downgraded, level = downgrade_for_deadline(model_settings, deadline, full_seconds=20.0, minimal_seconds=5.0)
+
+    assert level == expected_level
+    assert downgraded["reasoning_effort"] == expected_effort
+    assert downgraded["verbosity"] == expected_verbosity
+    assert downgraded["temperature"] == 0.4
+    assert model_settings["reasoning_effort"] == "medium"  # 원본 설정은 그대로
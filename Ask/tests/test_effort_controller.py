@@ -0,0 +1,110 @@
+"""
+파일명: test_effort_controller.py
+목적: effort 컨트롤러/Deadline 하향이 만드는 설정이 모델이 받는 값인지와 컨트롤러 표본 추출 검증
+"""
+
+import pytest
+
+from config.settings import settings
+from src.ai import effort_controller
+from src.ai.analyzer_gpt5 import downgrade_for_deadline
+from src.ai.effort_controller import (
+    EFFORT_LEVELS,
+    EffortController,
+    choose_effort,
+    extract_stage_sample,
+    fit_reasoning_effort,
+)
+from src.utils.deadline import Deadline
+
+# gpt-5.1 Responses API가 받는 reasoning_effort 값
+GPT51_REASONING_EFFORTS = {"none", "low", "medium", "high"}
+VERBOSITIES = {"low", "medium", "high"}
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(settings, "EFFORT_CONTROLLER_ENABLED", True)
+    fresh = EffortController()
+    monkeypatch.setattr(effort_controller, "_controller", fresh)
+    return fresh
+
+
+def test_every_controller_and_deadline_level_is_valid_for_gpt51(monkeypatch, controller):
+    monkeypatch.setattr(settings, "AI_TEXT_MODEL", "gpt-5.1")
+    deadlines = [None, Deadline(0.0), Deadline(settings.DEADLINE_MARI_MIN_SECONDS + 0.5),
+                 Deadline(settings.DEADLINE_EXPERT_MINIMAL_SECONDS + 0.5)]
+
+    produced = set()
+    for stage, levels in EFFORT_LEVELS.items():
+        for level in range(len(levels)):
+            controller._level[stage] = level
+            chosen, chosen_level = choose_effort(stage, {"reasoning_effort": "medium", "verbosity": "medium"})
+            assert chosen_level == level
+            for deadline in deadlines:
+                downgraded, _ = downgrade_for_deadline(chosen, deadline, full_seconds=1000.0, minimal_seconds=5.0)
+                produced.add(downgraded["reasoning_effort"])
+                assert downgraded["verbosity"] in VERBOSITIES
+
+    assert produced <= GPT51_REASONING_EFFORTS
+    assert "none" in produced  # 가장 낮은 단계가 gpt-5.1의 최저 설정으로 매핑됨
+
+
+def test_disabled_controller_default_is_fitted_to_model(monkeypatch):
+    monkeypatch.setattr(settings, "EFFORT_CONTROLLER_ENABLED", False)
+    chosen, level = choose_effort("mari", {"reasoning_effort": "minimal", "verbosity": "low"}, model="gpt-5.1")
+    assert chosen == {"reasoning_effort": "none", "verbosity": "low"}
+    assert level == 0
+
+
+def test_fit_reasoning_effort_keeps_supported_values():
+    assert fit_reasoning_effort("minimal", "gpt-5") == "minimal"
+    assert fit_reasoning_effort("minimal", "gpt-5.1") == "none"
+    assert fit_reasoning_effort("none", "gpt-5") == "minimal"
+    assert fit_reasoning_effort("low", "gpt-5.1-2025-11-13") == "low"
+
+
+def test_deadline_downgrade_uses_model_ladder():
+    downgraded, level = downgrade_for_deadline(
+        {"model": "gpt-5", "reasoning_effort": "low", "verbosity": "medium"},
+        Deadline(0.0), full_seconds=10.0, minimal_seconds=5.0
+    )
+    assert level == "minimal"
+    assert downgraded["reasoning_effort"] == "minimal"
+
+    downgraded, level = downgrade_for_deadline(
+        {"model": "gpt-5.1", "reasoning_effort": "low", "verbosity": "medium"},
+        Deadline(7.0), full_seconds=10.0, minimal_seconds=5.0
+    )
+    assert level == "reduced"
+    assert downgraded["reasoning_effort"] == "none"
+
+
+def _record(*extra_events):
+    return {
+        "name": "analyze_two_stage",
+        "status": "success",
+        "events": [
+            {"label": "effort_level.expert", "value": 1},
+            {"label": "expert_effort", "value": "full"},
+            {"label": "expert_analysis", "duration": 12.5},
+            *extra_events,
+        ],
+        "metadata": {"confidence_score": 0.9},
+    }
+
+
+def test_extract_stage_sample_uses_computed_calls():
+    assert extract_stage_sample(_record(), "expert") == (12.5, 1, True)
+    assert extract_stage_sample(_record({"label": "expert_cache", "value": "computed"}), "expert") == (12.5, 1, True)
+    assert extract_stage_sample(_record({"label": "semantic_cache", "value": "miss"}), "expert") == (12.5, 1, True)
+
+
+@pytest.mark.parametrize("event", [
+    {"label": "expert_cache", "value": "memory"},
+    {"label": "expert_cache", "value": "disk"},
+    {"label": "expert_cache", "value": "inflight"},
+    {"label": "semantic_cache", "value": 0.9731},
+])
+def test_extract_stage_sample_skips_cache_hits(event):
+    assert extract_stage_sample(_record(event), "expert") is None
@@ -0,0 +1,107 @@
+"""
+파일명: test_expert_cache.py
+목적: 전문가 분석 캐시 키 정규화, 동시 중복 요청 1회 계산, 캐시 제외(cacheable=False) 검증
+"""
+
+import asyncio
+
+import pytest
+
+from src.ai import expert_cache
+from src.ai.expert_cache import build_expert_cache_key, get_or_compute_expert
+from src.utils.cache import TieredCache
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = TieredCache(namespace="expert-test", max_entries=32, disk=False)
+    monkeypatch.setattr(expert_cache, "_expert_cache", cache)
+    monkeypatch.setattr(expert_cache, "_inflight", {})
+    return cache
+
+
+def _key(**overrides) -> str:
+    arguments = {
+        "provider": "gpt",
+        "structured_survey": {"dog_info": {"breed": "푸들", "age": 3}, "problem": {"type": "짖음"}},
+        "vision_analysis": {"emotion": "불안", "posture": "낮음"},
+        "prompt_version": "v1",
+        "system_prompt": "system",
+        "model_settings": {"model": "gpt-5.1", "reasoning_effort": "medium", "verbosity": "medium"},
+    }
+    arguments.update(overrides)
+    return build_expert_cache_key(**arguments)
+
+
+def test_cache_key_ignores_dict_order_but_not_values():
+    reordered = _key(
+        structured_survey={"problem": {"type": "짖음"}, "dog_info": {"age": 3, "breed": "푸들"}},
+        vision_analysis={"posture": "낮음", "emotion": "불안"},
+        model_settings={"verbosity": "medium", "reasoning_effort": "medium", "model": "gpt-5.1"},
+    )
+    assert reordered == _key()
+    assert _key().startswith("expert:")
+
+    assert _key(vision_analysis=None) == _key(vision_analysis={})
+    assert _key(system_prompt="system v2") != _key()
+    assert _key(model_settings={"model": "gpt-5.1", "reasoning_effort": "low", "verbosity": "medium"}) != _key()
+    assert _key(provider="claude") != _key()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_compute_once(memory_cache):
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"analysis": "ok"}, True
+
+    tasks = [asyncio.create_task(get_or_compute_expert(_key(), compute)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert sorted(source for _, source in results) == ["computed", "inflight", "inflight"]
+    assert all(result == {"analysis": "ok"} for result, _ in results)
+
+    # 저장된 결과는 다음 요청에서 memory hit, 호출자가 고쳐도 캐시 값은 그대로
+    results[0][0]["analysis"] = "changed"
+    cached, source = await get_or_compute_expert(_key(), compute)
+    assert (cached, source, calls) == ({"analysis": "ok"}, "memory", 1)
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_result_is_not_stored(memory_cache):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return {"analysis": "mock"}, False
+
+    assert await get_or_compute_expert(_key(), compute) == ({"analysis": "mock"}, "computed")
+    assert await get_or_compute_expert(_key(), compute) == ({"analysis": "mock"}, "computed")
+    assert calls == 2
+    assert memory_cache.lookup(_key())[1] is None
+    assert expert_cache._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_and_not_cached(memory_cache):
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        raise RuntimeError("upstream")
+
+    tasks = [asyncio.create_task(get_or_compute_expert(_key(), compute)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert memory_cache.lookup(_key())[1] is None
@@ -0,0 +1,70 @@
+"""
+파일명: test_expert_settings.py
+목적: 1차 AI 실제 호출 설정(effort 컨트롤러 + Deadline 하향)과 전문가 분석 캐시 키, fused 모드 설정 적용 검증
+"""
+
+import pytest
+
+from config.settings import settings
+from src.ai import analyzer_gpt5
+from src.ai.expert_cache import build_expert_cache_key
+from src.utils.deadline import Deadline
+from src.utils.perf import PerformanceTracker
+
+
+def _cache_key(model_settings: dict) -> str:
+    return build_expert_cache_key(
+        provider="gpt",
+        structured_survey={"q1": "a"},
+        vision_analysis=None,
+        prompt_version="v1",
+        system_prompt="system",
+        model_settings=model_settings,
+    )
+
+
+def test_downgraded_settings_get_their_own_cache_key(monkeypatch):
+    monkeypatch.setattr(settings, "EFFORT_CONTROLLER_ENABLED", False)
+    full = analyzer_gpt5.resolve_expert_model_settings(Deadline(settings.DEADLINE_EXPERT_FULL_SECONDS + 60))
+    reduced = analyzer_gpt5.resolve_expert_model_settings(Deadline(settings.DEADLINE_EXPERT_MINIMAL_SECONDS + 1))
+    minimal = analyzer_gpt5.resolve_expert_model_settings(Deadline(0.0))
+
+    assert full == analyzer_gpt5.get_expert_model_settings()
+    assert reduced["reasoning_effort"] == "low"
+    assert minimal["reasoning_effort"] == "none"  # gpt-5.1의 최저 설정
+    assert len({_cache_key(full), _cache_key(reduced), _cache_key(minimal)}) == 3
+
+
+def test_resolve_follows_effort_controller(monkeypatch):
+    monkeypatch.setattr(
+        analyzer_gpt5, "choose_effort", lambda stage, default, model=None: ({"reasoning_effort": "low", "verbosity": "low"}, 2)
+    )
+    model_settings = analyzer_gpt5.resolve_expert_model_settings(None)
+
+    assert (model_settings["reasoning_effort"], model_settings["verbosity"]) == ("low", "low")
+    assert model_settings["model"] == settings.AI_TEXT_MODEL
+
+
+@pytest.mark.asyncio
+async def test_fused_mode_applies_effort_controller(monkeypatch):
+    captured = {}
+
+    async def fake_call_gpt5_api(**kwargs):
+        captured.update(kwargs)
+        raise RuntimeError("stop after request build")
+
+    monkeypatch.setattr(
+        analyzer_gpt5, "choose_effort", lambda stage, default, model=None: ({"reasoning_effort": "low", "verbosity": "low"}, 2)
+    )
+    monkeypatch.setattr(
+        analyzer_gpt5, "build_fused_analysis_prompt",
+        lambda **kwargs: {"system": "s", "user": "u", "references": [], "cache_key": "fused"}
+    )
+    monkeypatch.setattr(analyzer_gpt5, "call_gpt5_api", fake_call_gpt5_api)
+    tracker = PerformanceTracker("fused-test")
+
+    with pytest.raises(RuntimeError):
+        await analyzer_gpt5.run_fused_analysis({}, b"", None, None, tracker)
+
+    assert (captured["reasoning_effort"], captured["verbosity"]) == ("low", "low")
+    assert any(event["label"] == "effort_level.fused" and event["value"] == 2 for event in tracker.events)
@@ -0,0 +1,78 @@
+"""
+파일명: test_fused_analysis.py
+목적: 단일 호출(fused) 분석의 섹션 분리, 로컬 복구, 검증 실패 시 2단계 전환용 예외 검증
+"""
+
+import json
+
+import pytest
+
+from config.settings import settings
+from src.ai import analyzer_gpt5
+from src.ai.schema_validator import build_example_document
+from src.ai.schemas import EXPERT_ANALYSIS_SCHEMA, MARI_NARRATIVE_SCHEMA
+from src.utils.perf import PerformanceTracker
+
+
+@pytest.fixture
+def fused_response(monkeypatch):
+    """call_gpt5_api를 대신해 지정한 fused 응답 텍스트를 돌려줍니다."""
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", False)
+    monkeypatch.setattr(
+        analyzer_gpt5, "build_fused_analysis_prompt",
+        lambda **kwargs: {"system": "s", "user": "u", "references": [], "cache_key": "fused"}
+    )
+    response = {}
+
+    async def fake_call_gpt5_api(**kwargs):
+        response["kwargs"] = kwargs
+        return response["text"]
+
+    monkeypatch.setattr(analyzer_gpt5, "call_gpt5_api", fake_call_gpt5_api)
+    return response
+
+
+async def _run():
+    return await analyzer_gpt5.run_fused_analysis({}, b"", None, None, PerformanceTracker("fused-test"))
+
+
+@pytest.mark.asyncio
+async def test_splits_valid_fused_response(fused_response):
+    expert = build_example_document(EXPERT_ANALYSIS_SCHEMA)
+    story = build_example_document(MARI_NARRATIVE_SCHEMA)
+    fused_response["text"] = json.dumps({"expert_analysis": expert, "mari_narrative": story}, ensure_ascii=False)
+
+    raw_json, mari_story = await _run()
+
+    assert raw_json == expert
+    assert mari_story == story
+    assert fused_response["kwargs"]["stage"] == "fused"
+    assert fused_response["kwargs"]["json_schema"]["name"] == analyzer_gpt5.FUSED_ANALYSIS_SCHEMA["name"]
+
+
+@pytest.mark.asyncio
+async def test_repairs_sections_locally(fused_response):
+    expert = build_example_document(EXPERT_ANALYSIS_SCHEMA)
+    expert["confidence_score"] = "0.8"
+    story = build_example_document(MARI_NARRATIVE_SCHEMA)
+    story["solutions"] = story["solutions"][:1]
+    fused_response["text"] = json.dumps({"expert_analysis": expert, "mari_narrative": story}, ensure_ascii=False)
+
+    raw_json, mari_story = await _run()
+
+    assert raw_json["confidence_score"] == 0.8
+    assert len(mari_story["solutions"]) == len(build_example_document(MARI_NARRATIVE_SCHEMA)["solutions"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [
+    {"expert_analysis": {"core_message": "이것만 있음"}, "mari_narrative": {}},
+    {"expert_analysis": None, "mari_narrative": None},
+])
+async def test_unusable_response_raises_for_two_stage_fallback(fused_response, body):
+    if body["expert_analysis"] is not None:
+        body["mari_narrative"] = build_example_document(MARI_NARRATIVE_SCHEMA)
+    fused_response["text"] = json.dumps(body, ensure_ascii=False)
+
+    with pytest.raises(ValueError):
+        await _run()
@@ -0,0 +1,126 @@
+"""
+파일명: test_gpt5_async_client.py
+목적: call_gpt5_api가 이벤트 루프를 막지 않고 여러 호출을 동시에 진행하는지 검증 (가짜 httpx 전송 계층)
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from src.ai import analyzer_gpt5
+
+
+RESPONSE_DELAY_SECONDS = 0.3
+CALLS = 8
+
+
+class FakeResponsesTransport:
+    """Responses API를 흉내 내며 동시에 처리 중인 요청 수를 기록합니다."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(RESPONSE_DELAY_SECONDS)
+        finally:
+            self.in_flight -= 1
+        user_text = body["input"][1]["content"]
+        return httpx.Response(200, json={
+            "id": "resp_test",
+            "object": "response",
+            "created_at": 0,
+            "model": body["model"],
+            "status": "completed",
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [{
+                "type": "message",
+                "id": "msg_test",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": f"echo:{user_text}", "annotations": []}],
+            }],
+            "usage": {
+                "input_tokens": 10,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": 5,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": 15,
+            },
+        })
+
+
+@pytest.fixture
+def fake_transport(monkeypatch):
+    transport = FakeResponsesTransport()
+    client = AsyncOpenAI(
+        api_key="test-key",
+        base_url="http://fake-openai.test/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(transport.handle)),
+    )
+    monkeypatch.setattr(analyzer_gpt5, "get_openai_client", lambda model: client)
+    return transport
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_overlap_on_one_loop(fake_transport):
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        analyzer_gpt5.call_gpt5_api("system", f"user-{index}", max_retries=0, stage="test")
+        for index in range(CALLS)
+    ))
+    elapsed = time.perf_counter() - started
+
+    assert results == [f"echo:user-{index}" for index in range(CALLS)]
+    assert fake_transport.max_in_flight == CALLS
+    # 직렬 실행이면 CALLS × 지연 이상 걸림
+    assert elapsed < RESPONSE_DELAY_SECONDS * CALLS / 2
+
+
+@pytest.mark.asyncio
+async def test_loop_stays_responsive_during_call(fake_transport):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        await analyzer_gpt5.call_gpt5_api("system", "user", max_retries=0, stage="test")
+    finally:
+        ticker_task.cancel()
+
+    # 호출이 루프를 막았다면 ticker가 거의 돌지 못함
+    assert ticks >= (RESPONSE_DELAY_SECONDS / 0.01) * 0.5
+
+
+@pytest.mark.asyncio
+async def test_request_carries_schema_and_reasoning_settings(fake_transport):
+    schema = {"name": "sample", "schema": {"type": "object", "properties": {}, "additionalProperties": False}}
+
+    await analyzer_gpt5.call_gpt5_api(
+        "system", "user", max_retries=0, stage="test",
+        use_json_schema=True, json_schema=schema, verbosity="low", reasoning_effort="minimal",
+    )
+
+    body = fake_transport.requests[0]
+    assert body["reasoning"] == {"effort": "minimal"}
+    assert body["text"]["verbosity"] == "low"
+    assert body["text"]["format"]["type"] == "json_schema"
+    assert body["text"]["format"]["name"] == "sample"
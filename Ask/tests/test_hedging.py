@@ -0,0 +1,98 @@
+"""
+파일명: test_hedging.py
+목적: hedged_call의 hedge 발사/승리 처리와 지연 통계(중도 절단 표본 포함) 기록 검증
+"""
+
+import asyncio
+
+import pytest
+
+from config.settings import settings
+from src.ai import hedging
+from src.utils.latency_stats import LatencyStats
+
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    stats = LatencyStats()
+    monkeypatch.setattr(hedging, "get_latency_stats", lambda: stats)
+    monkeypatch.setattr(hedging, "_recent_hedges", {})
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_STAGES", {"expert": "same"})
+    monkeypatch.setattr(settings, "HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "HEDGE_MIN_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "HEDGE_MAX_RATE", 1.0)
+    return stats
+
+
+def _call(delay, result, calls=None, error=None):
+    async def factory():
+        if calls is not None:
+            calls.append(result)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_wins_without_hedge(hedge_settings):
+    calls = []
+    result = await hedging.hedged_call("expert", "gpt", _call(0.01, "primary", calls), duplicate=_call(0.01, "hedge", calls))
+
+    assert result == "primary"
+    assert calls == ["primary"]
+    assert hedge_settings.count("gpt:expert") == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_loses_and_is_recorded_as_censored_sample(hedge_settings):
+    result = await hedging.hedged_call("expert", "gpt", _call(1.0, "primary"), duplicate=_call(0.01, "hedge"))
+
+    assert result == "hedge"
+    assert hedge_settings.count("gpt:expert") == 1
+    # 취소된 primary는 최소 hedge 지연 이상으로 기록됨
+    assert hedge_settings.quantile("gpt:expert", 0.5) >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_invalid_primary_falls_back_to_valid_hedge(hedge_settings):
+    result = await hedging.hedged_call(
+        "expert", "gpt", _call(0.01, "broken"), duplicate=_call(0.01, "ok"), is_valid=lambda value: value == "ok"
+    )
+
+    assert result == "ok"
+    assert hedge_settings.count("gpt:expert") == 1
+
+
+@pytest.mark.asyncio
+async def test_all_failures_reraise_first_error():
+    with pytest.raises(ValueError):
+        await hedging.hedged_call(
+            "expert", "gpt", _call(0.01, None, error=ValueError("primary")), duplicate=_call(0.01, None, error=RuntimeError("hedge"))
+        )
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget_limits_duplicate_requests(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_MAX_RATE", 0.0)
+    calls = []
+    result = await hedging.hedged_call("expert", "gpt", _call(0.1, "primary", calls), duplicate=_call(0.01, "hedge", calls))
+
+    assert result == "primary"
+    assert calls == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_refused_hedge_is_recorded_once_for_rate_limit(monkeypatch, hedge_settings):
+    monkeypatch.setattr(settings, "HEDGE_MAX_RATE", 0.5)
+
+    results = [
+        await hedging.hedged_call("expert", "gpt", _call(0.2, "primary"), duplicate=_call(0.01, "hedge"))
+        for _ in range(4)
+    ]
+
+    # 발사 1회 → 비율 1.0이라 거절 → 0.5라 거절 → 1/3이라 발사 (거절이 두 번 기록되면 순서가 어긋남)
+    assert list(hedging._recent_hedges["expert"]) == [True, False, False, True]
+    assert results == ["hedge", "primary", "primary", "hedge"]
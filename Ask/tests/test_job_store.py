@@ -0,0 +1,142 @@
+"""
+파일명: test_job_store.py
+목적: SQLite 작업 저장소(JobStore)와 analysis_service의 job_store 쓰기 스레드 검증
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from config.settings import settings
+from src.services import analysis_service
+from src.services.analysis_service import AnalysisJob, AnalysisScheduler, _StoreWriter
+from src.services.job_store import JobStore, is_stale
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / "jobs.sqlite3")
+
+
+def test_job_lifecycle_round_trip(store):
+    store.create("job1", "gpt", 1, {"dog_name": "보리"})
+    assert store.get("job1")["status"] == "queued"
+
+    store.mark_running("job1")
+    store.save_partial("job1", {"mari_story": {"header": "안녕"}})
+    store.save_progress("job1", {"stage": "mari", "status": "streaming"})
+    store.complete("job1", {"final_text": "끝"})
+    store.mark_delivered("job1")
+
+    record = store.get("job1")
+    assert record["status"] == "done"
+    assert record["responses"] == {"dog_name": "보리"}
+    assert record["partial"] == {"mari_story": {"header": "안녕"}}
+    assert record["progress"]["stage"] == "mari"
+    assert record["result"] == {"final_text": "끝"}
+    assert record["delivered"] is True
+    assert store.get("missing") is None
+
+
+def test_fail_records_error_and_status(store):
+    store.create("job1", "claude", 0, {})
+    store.fail("job1", TimeoutError("too slow"), status="rejected")
+
+    record = store.get("job1")
+    assert (record["status"], record["error_type"], record["error"]) == ("rejected", "TimeoutError", "too slow")
+
+
+def test_stale_and_retention(store, monkeypatch):
+    store.create("old", "gpt", 0, {})
+    record = store.get("old")
+    assert not is_stale(record)
+    record["updated_at"] -= settings.JOB_STALE_SECONDS + 1
+    assert is_stale(record)
+    record["status"] = "done"
+    assert not is_stale(record)
+
+    monkeypatch.setattr(settings, "JOB_STORE_RETENTION_SECONDS", -1)
+    store.create("new", "gpt", 0, {})
+    assert store.get("old") is None
+
+
+def test_writer_keeps_order_and_coalesces_pending_writes():
+    writer = _StoreWriter()
+    gate = threading.Event()
+    written = []
+
+    def write(tag):
+        gate.wait(timeout=5)
+        written.append(tag)
+
+    writer.submit(write, "first")
+    time.sleep(0.05)  # "first"가 쓰기 스레드에서 대기 중인 동안 나머지를 쌓음
+    writer.submit(write, "progress-1", key=("job", "progress"))
+    writer.submit(write, "running")
+    writer.submit(write, "progress-2", key=("job", "progress"))
+    writer.submit(write, "progress-3", key=("job", "progress"))
+    gate.set()
+
+    assert writer.flush(timeout=5)
+    assert written == ["first", "progress-3", "running"]
+
+
+def test_publish_progress_does_not_block_caller(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    store.create("job1", "gpt", 0, {})
+    slow_calls = []
+    save_progress = store.save_progress
+
+    def slow_save_progress(job_id, progress):
+        slow_calls.append(progress["stage"])
+        time.sleep(0.2)
+        save_progress(job_id, progress)
+
+    monkeypatch.setattr(analysis_service, "get_job_store", lambda: store)
+    monkeypatch.setattr(store, "save_progress", slow_save_progress, raising=False)
+    job = AnalysisJob(future=Future(), started_at=time.time(), job_id="job1")
+
+    started = time.perf_counter()
+    for stage in ("vision", "expert", "mari"):
+        job.publish_progress({"stage": stage, "status": "started"})
+    assert time.perf_counter() - started < 0.1
+
+    assert analysis_service.flush_job_store_writes(timeout=5)
+    assert store.get("job1")["progress"]["stage"] == "mari"
+    assert len(slow_calls) < 3
+
+
+def test_streaming_progress_is_throttled(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    saved = []
+    monkeypatch.setattr(analysis_service, "get_job_store", lambda: store)
+    monkeypatch.setattr(store, "save_progress", lambda job_id, progress: saved.append(progress), raising=False)
+    monkeypatch.setattr(settings, "JOB_PARTIAL_SAVE_INTERVAL_SECONDS", 60.0)
+    job = AnalysisJob(future=Future(), started_at=time.time(), job_id="job1")
+
+    for fraction in range(20):
+        job.publish_progress({"stage": "mari", "status": "streaming", "stage_fraction": fraction / 20})
+
+    assert analysis_service.flush_job_store_writes(timeout=5)
+    assert len(saved) == 1
+    assert job.progress["stage_fraction"] == 0.95
+
+
+def test_scheduler_final_state_reaches_job_store(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(analysis_service, "get_job_store", lambda: store)
+    scheduler = AnalysisScheduler()
+    job = AnalysisJob(future=Future(), started_at=time.time(), job_id="stored")
+    store.create(job.job_id, "gpt", 0, {"q": "a"})
+    inner = Future()
+
+    scheduler.submit(job, lambda job: inner)
+    inner.set_result({"final_text": "ok"})
+
+    assert job.future.result(timeout=1) == {"final_text": "ok"}
+    assert analysis_service.flush_job_store_writes(timeout=5)
+    record = store.get("stored")
+    assert record["status"] == "done"
+    assert record["result"] == {"final_text": "ok"}
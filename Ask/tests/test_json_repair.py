@@ -0,0 +1,95 @@
+"""
+파일명: test_json_repair.py
+목적: 잘린/감싸진 JSON 텍스트 복원과 스키마 기반 로컬 복구(전문가 분석/마리 내러티브) 검증
+"""
+
+import json
+
+import pytest
+
+from src.ai.json_repair import (
+    is_expert_json_usable,
+    loads_or_salvage,
+    repair_expert_json,
+    repair_mari_json,
+    repair_to_schema,
+    salvage_json_text,
+)
+from src.ai.schema_validator import build_example_document
+from src.ai.schemas import EXPERT_ANALYSIS_SCHEMA, MARI_NARRATIVE_SCHEMA
+
+
+def _expert() -> dict:
+    return build_example_document(EXPERT_ANALYSIS_SCHEMA)
+
+
+def test_salvages_fenced_and_wrapped_json():
+    assert salvage_json_text('설명입니다.\n```json\n{"a": 1}\n```') == {"a": 1}
+    assert salvage_json_text('결과: {"a": [1, 2]} 끝') == {"a": [1, 2]}
+    assert salvage_json_text("JSON 없음") is None
+
+
+def test_salvages_truncated_json():
+    salvaged = salvage_json_text('{"core_message": "끝까지", "items": ["a", "b"')
+    assert salvaged["core_message"] == "끝까지"
+    assert salvaged["items"][:1] == ["a"]
+
+
+def test_loads_or_salvage_raises_when_nothing_recoverable():
+    assert loads_or_salvage('{"a": 1}') == {"a": 1}
+    with pytest.raises(ValueError):
+        loads_or_salvage("모델이 JSON 대신 문장만 보냄")
+
+
+def test_repairs_types_lengths_and_extra_fields():
+    document = _expert()
+    document["confidence_score"] = "85%"
+    document["solutions_best_fit"][0]["details"] = "한 줄 방법"
+    document["solutions_best_fit"][1]["expected_outcome"] = "스키마에 없는 필드"
+    document["analysis_summary"]["core_issue"] = "가" * 1000
+    document["future_guidance"] = document["future_guidance"][:1]
+    original = json.dumps(document, ensure_ascii=False)
+
+    repaired, is_valid, error = repair_expert_json(document)
+
+    assert is_valid, error
+    assert repaired["confidence_score"] == 0.85
+    assert repaired["solutions_best_fit"][0]["details"][0] == "한 줄 방법"
+    assert "expected_outcome" not in repaired["solutions_best_fit"][1]
+    assert repaired["analysis_summary"]["core_issue"].endswith("…")
+    assert len(repaired["future_guidance"]) == len(_expert()["future_guidance"])
+    # 원본은 바뀌지 않음
+    assert json.dumps(document, ensure_ascii=False) == original
+
+
+def test_refuses_to_invent_mostly_missing_documents():
+    repaired, is_valid, error = repair_expert_json({"core_message": "이것만 있음"})
+
+    assert not is_valid
+    assert "복구 불가" in error
+    assert not is_expert_json_usable({"core_message": "이것만 있음"})
+    assert not is_expert_json_usable("문자열")
+
+
+def test_usable_check_does_not_modify_input():
+    document = _expert()
+    document["confidence_score"] = "0.7"
+
+    assert is_expert_json_usable(document)
+    assert document["confidence_score"] == "0.7"
+
+
+def test_repairs_mari_narrative():
+    story = build_example_document(MARI_NARRATIVE_SCHEMA)
+    story["solutions"] = story["solutions"][:1]
+
+    repaired, is_valid, error = repair_mari_json(story)
+
+    assert is_valid, error
+    assert len(repaired["solutions"]) == len(build_example_document(MARI_NARRATIVE_SCHEMA)["solutions"])
+
+
+def test_repair_reports_changes():
+    _, changes = repair_to_schema({"confidence_score": "0.9"}, EXPERT_ANALYSIS_SCHEMA)
+
+    assert any(change.startswith("confidence_score") for change in changes)
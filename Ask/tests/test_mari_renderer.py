@@ -0,0 +1,81 @@
+"""
+파일명: test_mari_renderer.py
+목적: 로컬 마리 렌더러 결과가 입력 상태/톤과 관계없이 MARI_NARRATIVE_SCHEMA를 만족하는지 검증
+"""
+
+import pytest
+
+from src.ai.mari_renderer import TONE_TEMPLATES, josa, render_mari_story
+from src.ai.schema_validator import build_example_document, format_errors, validate_against
+from src.ai.schemas import EXPERT_ANALYSIS_SCHEMA, MARI_NARRATIVE_SCHEMA, validate_mari_json
+
+
+def _expert_json() -> dict:
+    return {
+        "analysis_summary": {
+            "core_issue": "초인종 소리에 과도하게 짖습니다.",
+            "root_cause": "외부 소리에 대한 경계심이 높습니다.",
+            "key_characteristics": ["경계심이 강함", "활발함", "사람을 좋아함", "예민함"],
+        },
+        "solutions_best_fit": [
+            {"title": f"솔루션 {index}", "content": "소리에 둔감해지도록 연습합니다.", "details": ["낮은 볼륨으로 들려줍니다."]}
+            for index in range(1, 5)
+        ],
+        "future_guidance": [
+            {"principle": f"원칙 {index}", "content": "일관되게 반응합니다."} for index in range(1, 4)
+        ],
+        "core_message": "보호자의 차분한 태도가 가장 중요합니다.",
+        "confidence_score": 0.85,
+    }
+
+
+def _assert_valid(story: dict) -> None:
+    errors = validate_against(MARI_NARRATIVE_SCHEMA, story)
+    assert not errors, format_errors(errors)
+    assert validate_mari_json(story) == (True, "")
+
+
+@pytest.mark.parametrize("tone", sorted(TONE_TEMPLATES))
+def test_render_matches_schema_for_every_tone(tone):
+    story = render_mari_story(
+        _expert_json(), dog_name="코코", dog_age={"year": 3, "month": 2},
+        hardest_part="밤에 짖어요", main_concerns=["barking"], tone=tone
+    )
+
+    _assert_valid(story)
+    assert len(story["solutions"]) == 3 and len(story["guidance"]) == 3
+    assert "코코" in story["header"]["title"]
+
+
+def test_render_matches_schema_for_sparse_or_empty_input():
+    _assert_valid(render_mari_story({}, dog_name=""))
+    _assert_valid(render_mari_story({"solutions_best_fit": [{"title": "", "content": "", "details": []}]}, dog_name="별"))
+
+
+def test_render_clips_long_expert_text_to_schema_limits():
+    long_text = "아주 긴 설명입니다. " * 200
+    raw_json = build_example_document(EXPERT_ANALYSIS_SCHEMA)
+    raw_json["analysis_summary"]["core_issue"] = long_text
+    for solution in raw_json["solutions_best_fit"]:
+        solution["content"] = long_text
+        solution["details"] = [long_text] * 6
+    raw_json["core_message"] = long_text
+
+    _assert_valid(render_mari_story(raw_json, dog_name="몽실이" * 20, hardest_part=long_text))
+
+
+def test_render_is_deterministic():
+    first = render_mari_story(_expert_json(), dog_name="보리", main_concerns=["separation"])
+    assert render_mari_story(_expert_json(), dog_name="보리", main_concerns=["separation"]) == first
+
+
+@pytest.mark.parametrize("word, pair, expected", [
+    ("코코", "이/가", "코코가"),
+    ("별", "이/가", "별이"),
+    ("별", "으로/로", "별로"),
+    ("콩", "으로/로", "콩으로"),
+    ("Max", "은/는", "Max는"),
+    ("3", "이에요/예요", "3이에요"),
+])
+def test_josa_follows_final_consonant(word, pair, expected):
+    assert josa(word, pair) == expected
@@ -0,0 +1,85 @@
+"""
+파일명: test_mari_streaming.py
+목적: 스트리밍 중인 마리 JSON의 부분 파싱과 부분 결과 전달 콜백(간격 제한, fused 섹션, 진행률) 검증
+"""
+
+import json
+
+from config.settings import settings
+from src.ai.analyzer_gpt5 import build_mari_partial_emitter
+from src.ai.json_stream import complete_partial_json, parse_partial_json
+from src.ai.progress import ProgressReporter
+from src.utils.perf import PerformanceTracker
+
+
+STORY = {
+    "header": {"title": "보리의 이야기", "summary": "산책이 즐거워요"},
+    "solutions": [{"title": "천천히 걷기", "content": "리드줄을 느슨하게", "steps": ["멈추기", "칭찬하기"]}],
+}
+
+
+def test_partial_json_keeps_completed_values_and_open_strings():
+    text = json.dumps(STORY, ensure_ascii=False)
+    cut = text.index("리드줄을") + 3
+
+    partial = parse_partial_json(text[:cut])
+    assert partial["header"] == STORY["header"]
+    assert partial["solutions"][0]["content"] == "리드줄"
+
+
+def test_partial_json_drops_dangling_keys_and_numbers():
+    assert parse_partial_json('{"a": "x", "b":') == {"a": "x"}
+    assert parse_partial_json('{"a": [1, 2, 3') == {"a": [1, 2]}
+    assert parse_partial_json('{"a": "\\u12') == {"a": ""}
+    assert complete_partial_json("") is None
+
+
+def test_every_prefix_of_a_document_parses_or_returns_none():
+    text = json.dumps(STORY, ensure_ascii=False)
+    for end in range(len(text) + 1):
+        completed = complete_partial_json(text[:end])
+        if completed is not None:
+            json.loads(completed)
+    assert parse_partial_json(text) == STORY
+
+
+def test_emitter_throttles_and_marks_first_content(monkeypatch):
+    monkeypatch.setattr(settings, "MARI_STREAM_EMIT_INTERVAL_SECONDS", 60.0)
+    tracker = PerformanceTracker("stream-test")
+    received = []
+    emit = build_mari_partial_emitter(received.append, tracker)
+    text = json.dumps(STORY, ensure_ascii=False)
+
+    for end in range(len(text) // 2, len(text) + 1):
+        emit(text[:end])
+
+    assert len(received) == 1
+    assert received[0]["mari_story"]["header"]["title"] == "보리의 이야기"
+    assert [event["label"] for event in tracker.events] == ["mari_first_content"]
+
+
+def test_emitter_waits_for_header_and_reads_fused_section(monkeypatch):
+    monkeypatch.setattr(settings, "MARI_STREAM_EMIT_INTERVAL_SECONDS", 0.0)
+    tracker = PerformanceTracker("stream-test")
+    received, snapshots = [], []
+    progress = ProgressReporter(snapshots.append)
+    progress.start("fused")
+    emit = build_mari_partial_emitter(received.append, tracker, section="mari_narrative", progress=progress, stage="fused")
+
+    emit('{"expert_analysis": {"core_message": "준비 중"')
+    assert received == []
+
+    emit(json.dumps({"expert_analysis": {}, "mari_narrative": STORY}, ensure_ascii=False))
+    assert received[-1]["mari_story"] == STORY
+    assert snapshots[-1]["status"] == "streaming"
+    assert 0 < snapshots[-1]["stage_fraction"] < 1
+
+
+def test_emitter_ignores_callback_failures(monkeypatch):
+    monkeypatch.setattr(settings, "MARI_STREAM_EMIT_INTERVAL_SECONDS", 0.0)
+
+    def broken(partial):
+        raise RuntimeError("UI 갱신 실패")
+
+    emit = build_mari_partial_emitter(broken, PerformanceTracker("stream-test"))
+    emit(json.dumps(STORY, ensure_ascii=False))
@@ -0,0 +1,110 @@
+"""
+파일명: test_progress.py
+목적: 단계별 예상 시간(중앙값, 캐시 hit 제외)과 진행률/ETA 계산 검증
+"""
+
+import pytest
+
+from config.settings import settings
+from src.ai.progress import FUSED_PLAN, TWO_STAGE_PLAN, StageDurationModel, estimate_progress
+
+
+@pytest.fixture(autouse=True)
+def progress_settings(monkeypatch):
+    monkeypatch.setattr(settings, "PROGRESS_MIN_SAMPLES", 3)
+    monkeypatch.setattr(
+        settings, "PROGRESS_DEFAULT_STAGE_SECONDS", {"vision": 4.0, "expert": 18.0, "fused": 24.0, "mari": 10.0}
+    )
+
+
+def _record(vision=None, expert=None, mari=None, name="analyze_two_stage", status="success", events=()):
+    spans = [("vision_analysis", vision), ("expert_analysis", expert), ("mari_conversion", mari)]
+    return {
+        "name": name,
+        "status": status,
+        "events": [{"label": label, "duration": value} for label, value in spans if value is not None] + list(events),
+    }
+
+
+def _snapshot(stage, completed=(), started_at=100.0, fraction=0.0, plan=TWO_STAGE_PLAN):
+    return {
+        "stage": stage,
+        "status": "started",
+        "label": stage,
+        "detail": None,
+        "plan": list(plan),
+        "completed": list(completed),
+        "stage_started_at": started_at,
+        "stage_fraction": fraction,
+    }
+
+
+def test_expected_uses_default_until_enough_samples_then_median():
+    model = StageDurationModel(window=10)
+    model.observe_record(_record(expert=30.0))
+    model.observe_record(_record(expert=10.0))
+    assert model.expected("expert") == 18.0
+
+    model.observe_record(_record(expert=12.0, name="analyze_two_stage_claude"))
+    assert model.expected("expert") == 12.0
+    model.observe_record(_record(expert=100.0))
+    assert model.expected("expert") == 21.0  # 이상치 하나에 끌려가지 않는 중앙값
+
+
+def test_failed_cache_hit_and_other_records_are_ignored():
+    model = StageDurationModel(window=10)
+    for _ in range(3):
+        model.observe_record(_record(expert=20.0))
+    model.observe_record(_record(expert=1.0, status="error"))
+    model.observe_record(_record(expert=1.0, name="analysis_progress_ui"))
+    model.observe_record(_record(expert=0.1, events=[{"label": "expert_cache", "value": "memory"}]))
+    model.observe_record(_record(expert=0.2, events=[{"label": "semantic_cache", "value": 0.97}]))
+    model.observe_record({"name": "analyze_two_stage", "status": "success",
+                          "events": [{"label": "expert_analysis", "duration": 1.0, "error": "timeout"}]})
+
+    assert model.snapshot()["expert"] == {"count": 3, "expected": 20.0}
+
+
+def test_window_keeps_recent_samples_only():
+    model = StageDurationModel(window=3)
+    for duration in (50.0, 50.0, 50.0, 5.0, 6.0, 7.0):
+        model.observe_record(_record(mari=duration))
+    assert model.expected("mari") == 6.0
+
+
+def test_estimate_before_start_and_after_done():
+    model = StageDurationModel(window=10)
+    assert estimate_progress(None, model=model)["eta_seconds"] == pytest.approx(4.0 + 18.0 + 10.0)
+
+    done = estimate_progress(_snapshot("done"), model=model)
+    assert (done["fraction"], done["eta_seconds"]) == (1.0, 0.0)
+
+
+def test_estimate_counts_completed_and_elapsed_stage_time():
+    model = StageDurationModel(window=10)
+    snapshot = _snapshot("expert", completed=["vision"], started_at=100.0)
+
+    result = estimate_progress(snapshot, now=109.0, model=model)  # expert 18초 중 9초 경과
+    assert result["eta_seconds"] == pytest.approx(9.0 + 10.0)
+    assert result["fraction"] == pytest.approx((4.0 + 9.0) / 32.0)
+    assert result["stage"] == "expert"
+
+    # 예상보다 오래 걸려도 시간만으로는 95%까지만 진행, 남은 시간은 0이 되지 않음
+    late = estimate_progress(snapshot, now=200.0, model=model)
+    assert late["eta_seconds"] == pytest.approx(18.0 * 0.05 + 10.0)
+
+
+def test_streaming_fraction_moves_progress_ahead_of_time():
+    model = StageDurationModel(window=10)
+    snapshot = _snapshot("mari", completed=["vision", "expert"], started_at=100.0, fraction=0.5)
+
+    result = estimate_progress(snapshot, now=101.0, model=model)
+    assert result["eta_seconds"] == pytest.approx(5.0)
+    assert result["fraction"] == pytest.approx((4.0 + 18.0 + 5.0) / 32.0)
+
+
+def test_fused_plan_uses_fused_estimate():
+    model = StageDurationModel(window=10)
+    result = estimate_progress(_snapshot("fused", completed=["vision"], plan=FUSED_PLAN), now=100.0, model=model)
+    assert result["eta_seconds"] == pytest.approx(24.0)
+    assert result["fraction"] == pytest.approx(4.0 / 28.0)
@@ -0,0 +1,59 @@
+"""
+파일명: test_rag_search.py
+목적: 로컬 참고 자료 검색(search_snippets)의 관련도/필터와 프롬프트 참고 섹션 구성 검증
+"""
+
+import pytest
+
+from config.settings import settings
+from src.ai import rag_search
+from src.ai.rag_search import build_corpus, format_reference_section, search_snippets
+
+
+@pytest.fixture(autouse=True)
+def isolated_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_search, "get_vector_db_dir", lambda name: tmp_path / name)
+    monkeypatch.setattr(rag_search, "_index", None)
+
+
+def test_search_ranks_matching_case_first():
+    snippets = search_snippets("초인종 소리에 심하게 짖어요 짖음", top_k=3)
+
+    assert 0 < len(snippets) <= 3
+    assert snippets[0]["source"] == "과도한 짖음 - 소형견"
+    scores = [snippet["score"] for snippet in snippets]
+    assert scores == sorted(scores, reverse=True)
+    assert set(snippets[0]) == {"id", "source", "section", "text", "score"}
+
+    separation = search_snippets("혼자 있으면 불안해하고 분리불안 증상", top_k=1)
+    assert separation[0]["source"] == "분리불안 - 청소년기"
+
+
+def test_search_drops_results_below_min_score(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_MIN_SCORE", 0.99)
+    assert search_snippets("초인종 소리에 짖어요") == []
+
+
+def test_index_is_built_once_and_reused(tmp_path):
+    search_snippets("짖음")
+    store = rag_search._index[0]
+    assert len(store) == len(build_corpus())
+
+    search_snippets("배변 실수")
+    assert rag_search._index[0] is store
+
+
+def test_format_reference_section_truncates_each_snippet(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_SNIPPET_MAX_CHARS", 10)
+    snippets = [
+        {"source": "사례 A", "text": "가나다라마바사아자차카타파하"},
+        {"source": "사례 B", "text": "짧은 글"},
+    ]
+
+    section = format_reference_section(snippets, heading="참고 자료")
+
+    assert section.startswith("\n## 참고 자료\n\n")
+    assert "[사례 A]\n가나다라마바사아자차…" in section
+    assert "[사례 B]\n짧은 글" in section
+    assert section.endswith("\n")
+    assert format_reference_section([], heading="참고 자료") == ""
@@ -0,0 +1,132 @@
+"""
+파일명: test_retry.py
+목적: 공용 재시도 엔진의 오류 분류, Retry-After 해석, jitter, 재시도 예산 검증
+"""
+
+import asyncio
+import json
+import random
+import time
+from email.utils import formatdate
+
+import httpx
+import openai
+import pytest
+
+from config.settings import settings
+from src.ai import retry
+from src.ai.circuit_breaker import CircuitOpenError
+from src.ai.retry import FATAL, RATE_LIMITED, RETRYABLE, DecorrelatedJitter, RetryBudget, classify_error, get_retry_after
+from src.utils.deadline import DeadlineExceeded
+
+
+def _status_error(status: int, headers=None) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.test/v1/responses")
+    response = httpx.Response(status, request=request, headers=headers or {})
+    return openai.APIStatusError(f"status {status}", response=response, body=None)
+
+
+@pytest.fixture(autouse=True)
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(settings, "RETRY_BASE_DELAY_SECONDS", 0.001)
+    monkeypatch.setattr(settings, "RETRY_MAX_DELAY_SECONDS", 0.005)
+    monkeypatch.setattr(settings, "RETRY_AFTER_MAX_SECONDS", 1.0)
+    monkeypatch.setattr(retry, "_retry_budget", RetryBudget())
+
+
+def _flaky(errors, result="ok"):
+    attempts = []
+
+    async def attempt_fn(attempt):
+        attempts.append(attempt)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return attempt_fn, attempts
+
+
+@pytest.mark.parametrize("error, kind", [
+    (_status_error(500), RETRYABLE),
+    (_status_error(503), RETRYABLE),
+    (_status_error(408), RETRYABLE),
+    (_status_error(429), RATE_LIMITED),
+    (_status_error(400), FATAL),
+    (_status_error(422), FATAL),
+    (openai.APIConnectionError(request=httpx.Request("GET", "https://api.openai.test")), RETRYABLE),
+    (asyncio.TimeoutError(), RETRYABLE),
+    (json.JSONDecodeError("bad", "{", 0), FATAL),
+    (DeadlineExceeded("late"), FATAL),
+    (CircuitOpenError("open"), FATAL),
+    (RuntimeError("unknown"), RETRYABLE),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_retry_after_header_formats():
+    assert get_retry_after(_status_error(429, {"retry-after-ms": "1500"})) == 1.5
+    assert get_retry_after(_status_error(429, {"retry-after": "3"})) == 3.0
+    http_date = get_retry_after(_status_error(429, {"retry-after": formatdate(time.time() + 10, usegmt=True)}))
+    assert 5 < http_date <= 10
+    assert get_retry_after(_status_error(429)) is None
+    assert get_retry_after(ValueError("no response")) is None
+
+
+def test_decorrelated_jitter_stays_in_bounds():
+    jitter = DecorrelatedJitter(base=0.5, max_delay=8.0, rng=random.Random(7))
+    delays = [jitter.next() for _ in range(50)]
+
+    assert all(0.5 <= delay <= 8.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_retryable_errors_are_retried_until_success():
+    attempt_fn, attempts = _flaky([_status_error(503), _status_error(500)])
+
+    assert await retry.run_with_retry("expert", attempt_fn, max_retries=3) == "ok"
+    assert attempts == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_fatal_error_is_not_retried():
+    attempt_fn, attempts = _flaky([_status_error(400)])
+
+    with pytest.raises(openai.APIStatusError):
+        await retry.run_with_retry("expert", attempt_fn, max_retries=3)
+    assert attempts == [0]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_follows_retry_after_or_gives_up():
+    attempt_fn, attempts = _flaky([_status_error(429, {"retry-after-ms": "20"})])
+    started = time.perf_counter()
+    assert await retry.run_with_retry("expert", attempt_fn, max_retries=1) == "ok"
+    assert time.perf_counter() - started >= 0.02
+
+    attempt_fn, attempts = _flaky([_status_error(429, {"retry-after": "60"})])
+    with pytest.raises(openai.APIStatusError):
+        await retry.run_with_retry("expert", attempt_fn, max_retries=1)
+    assert attempts == [0]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_reraise_last_error():
+    attempt_fn, attempts = _flaky([_status_error(503), _status_error(502)])
+
+    with pytest.raises(openai.APIStatusError) as raised:
+        await retry.run_with_retry("expert", attempt_fn, max_retries=1)
+    assert raised.value.status_code == 502
+    assert attempts == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_retries(monkeypatch):
+    monkeypatch.setattr(settings, "RETRY_BUDGET_RATIO", 0.0)
+    monkeypatch.setattr(settings, "RETRY_BUDGET_MIN_PER_SECOND", 0.0)
+    attempt_fn, attempts = _flaky([_status_error(503)])
+
+    with pytest.raises(openai.APIStatusError):
+        await retry.run_with_retry("expert", attempt_fn, max_retries=3)
+    assert attempts == [0]
@@ -0,0 +1,63 @@
+"""
+파일명: test_schema_validator.py
+목적: 컴파일된 JSON Schema 검증기와 1차 AI 프롬프트 템플릿의 스키마 일치 검증
+"""
+
+import re
+
+from src.ai.prompt_builder_gpt import GPT_EXPERT_PERSONA
+from src.ai.schema_validator import build_example_document, compile_schema, format_errors, validate_against
+from src.ai.schemas import EXPERT_ANALYSIS_SCHEMA, MARI_NARRATIVE_SCHEMA, VISION_SCHEMA
+
+
+def _property_names(node: dict) -> set:
+    names = set()
+    for name, child in node.get("properties", {}).items():
+        names.add(name)
+        names |= _property_names(child)
+    if "items" in node:
+        names |= _property_names(node["items"])
+    return names
+
+
+def test_example_documents_pass():
+    for schema in (EXPERT_ANALYSIS_SCHEMA, MARI_NARRATIVE_SCHEMA, VISION_SCHEMA):
+        assert validate_against(schema, build_example_document(schema)) == []
+
+
+def test_reports_paths_for_each_violation():
+    document = build_example_document(EXPERT_ANALYSIS_SCHEMA)
+    document["solutions_best_fit"][1]["expected_outcome"] = "기대 효과"
+    document["future_guidance"][0]["action"] = "행동"
+    del document["core_message"]
+    document["confidence_score"] = "high"
+
+    paths = {error.path for error in validate_against(EXPERT_ANALYSIS_SCHEMA, document)}
+    assert paths == {
+        "solutions_best_fit[1].expected_outcome",
+        "future_guidance[0].action",
+        "core_message",
+        "confidence_score",
+    }
+
+
+def test_array_and_string_bounds():
+    validate = compile_schema({
+        "type": "object",
+        "properties": {
+            "items": {"type": "array", "minItems": 1, "maxItems": 2, "items": {"type": "string", "maxLength": 3}},
+        },
+    })
+
+    assert validate({"items": ["abc"]}) == []
+    errors = validate({"items": ["abcd", "a", "b"]})
+    assert [error.path for error in errors] == ["items", "items[0]"]
+    assert "외 1건" in format_errors(errors * 2, limit=3)
+
+
+def test_expert_prompt_template_uses_only_schema_fields():
+    template = GPT_EXPERT_PERSONA.split("## JSON Schema (STRICT)", 1)[1]
+    template_keys = set(re.findall(r'"(\w+)":', template))
+
+    assert template_keys
+    assert template_keys <= _property_names(EXPERT_ANALYSIS_SCHEMA["schema"])
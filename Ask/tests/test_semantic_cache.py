@@ -0,0 +1,75 @@
+"""
+파일명: test_semantic_cache.py
+목적: 유사 사례 캐시의 강아지 이름 자리 표시 저장/채우기와 재사용 범위 검증
+"""
+
+import pytest
+
+from src.ai import semantic_cache
+from src.ai.semantic_cache import fill_name_placeholder, insert_name_placeholder
+from src.ai.vector_store import HashingEmbedder, VectorStore
+
+
+def _survey(name: str) -> dict:
+    return {
+        "dog_info": {"name": name, "breed": "말티즈", "age": "3살"},
+        "personality": {"traits": ["활발함"]},
+        "problem": {"main_concerns": ["barking"], "situation": "초인종 소리에 짖어요"},
+        "environment": {"living": "아파트"},
+    }
+
+
+def _analysis(text: str) -> dict:
+    return {"confidence_score": 0.9, "summary": text, "items": [text]}
+
+
+@pytest.fixture
+def isolated_store(tmp_path, monkeypatch):
+    embedder = HashingEmbedder(dim=64)
+    store = VectorStore(tmp_path, dim=embedder.dim, embedder_name=embedder.name)
+    monkeypatch.setattr(semantic_cache, "_get_store", lambda: (store, embedder))
+    return store
+
+
+def test_name_is_replaced_only_at_word_boundaries():
+    stored = insert_name_placeholder({"summary": "해가 짖으면 이해해 주고 해결 방법을 찾아요."}, "해")
+    assert stored["summary"] == "{{dog_name}}가 짖으면 이해해 주고 해결 방법을 찾아요."
+
+    stored = insert_name_placeholder({"summary": "보리가 보리차를 엎었어요. 보리는 겁이 많아요."}, "보리")
+    assert stored["summary"] == "{{dog_name}}가 보리차를 엎었어요. {{dog_name}}는 겁이 많아요."
+
+
+def test_fill_adjusts_particles_to_final_consonant():
+    stored = {"summary": "{{dog_name}}가 짖으면 {{dog_name}}를 안아 주고 {{dog_name}}와 산책하세요."}
+
+    assert fill_name_placeholder(stored, "초코")["summary"] == "초코가 짖으면 초코를 안아 주고 초코와 산책하세요."
+    assert fill_name_placeholder(stored, "별")["summary"] == "별이 짖으면 별을 안아 주고 별과 산책하세요."
+
+
+def test_fill_uses_renderer_batchim_rules():
+    stored = {"summary": "{{dog_name}}는 {{dog_name}}로 불러 주세요."}
+
+    # ㄹ 받침 + "으로/로", 숫자/영문 이름도 로컬 렌더러의 josa와 같은 결과
+    assert fill_name_placeholder(stored, "별")["summary"] == "별은 별로 불러 주세요."
+    assert fill_name_placeholder(stored, "콩콩")["summary"] == "콩콩은 콩콩으로 불러 주세요."
+    assert fill_name_placeholder(stored, "Sam")["summary"] == "Sam은 Sam으로 불러 주세요."
+    assert fill_name_placeholder(stored, "Max")["summary"] == "Max는 Max로 불러 주세요."
+
+
+def test_reuse_replaces_name_for_other_dog(isolated_store):
+    assert semantic_cache.remember_analysis(
+        _survey("보리"), None, _analysis("보리가 초인종에 반응하면 보리를 차분하게 불러 주세요."), "gpt"
+    )
+
+    analysis, score = semantic_cache.find_similar_analysis(_survey("구름"), None)
+    assert analysis["summary"] == "구름이 초인종에 반응하면 구름을 차분하게 불러 주세요."
+    assert analysis["items"] == [analysis["summary"]]
+
+
+def test_single_syllable_name_is_reused_only_for_same_name(isolated_store):
+    text = "해가 초인종에 짖으면 해야 할 일을 이해시켜 주세요."
+    assert semantic_cache.remember_analysis(_survey("해"), None, _analysis(text), "gpt")
+
+    assert semantic_cache.find_similar_analysis(_survey("콩"), None) is None
+    analysis, _ = semantic_cache.find_similar_analysis(_survey("해"), None)
+    assert analysis["summary"] == text
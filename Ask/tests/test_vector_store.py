@@ -0,0 +1,151 @@
+"""
+파일명: test_vector_store.py
+목적: VectorStore(SQLite) 검색/정리/다중 인스턴스 동시 쓰기에서 벡터와 payload가 어긋나지 않는지 검증
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.ai.vector_store import HashingEmbedder, VectorStore, benchmark_vector_search
+
+
+DIM = 32
+
+
+def _unit(index: int) -> np.ndarray:
+    rng = np.random.default_rng(index)
+    vector = rng.normal(size=DIM).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _open(directory, max_entries=None, embedder_name="test-v1") -> VectorStore:
+    return VectorStore(directory, dim=DIM, embedder_name=embedder_name, max_entries=max_entries)
+
+
+def test_search_returns_closest_entry_with_its_payload(tmp_path):
+    store = _open(tmp_path)
+    for index in range(10):
+        store.add(_unit(index), payload={"n": index}, tags={"n": index})
+
+    score, entry_id, tags = store.search(_unit(3), top_k=1)[0]
+    assert tags == {"n": 3}
+    assert score == pytest.approx(1.0, abs=1e-5)
+    assert store.get_payload(entry_id) == {"n": 3}
+
+    score, tags, payload = store.search_payloads(_unit(7), top_k=1)[0]
+    assert tags == {"n": 7} and payload == {"n": 7}
+
+
+def test_where_filter_skips_entries(tmp_path):
+    store = _open(tmp_path)
+    store.add(_unit(1), payload={"n": 1}, tags={"kind": "a"})
+    store.add(_unit(2), payload={"n": 2}, tags={"kind": "b"})
+
+    matches = store.search_payloads(_unit(1), top_k=1, where=lambda tags: tags["kind"] == "b")
+    assert [payload for _, _, payload in matches] == [{"n": 2}]
+
+
+def test_reopen_keeps_entries_and_config_change_resets(tmp_path):
+    store = _open(tmp_path)
+    store.add(_unit(1), payload={"n": 1})
+    assert len(_open(tmp_path)) == 1
+    assert len(_open(tmp_path, embedder_name="test-v2")) == 0
+
+
+def test_compaction_keeps_recent_entries_consistent(tmp_path):
+    store = _open(tmp_path, max_entries=10)
+    for index in range(25):
+        store.add(_unit(index), payload={"n": index}, tags={"n": index})
+
+    assert len(store) <= 10
+    for score, tags, payload in store.search_payloads(_unit(24), top_k=10):
+        assert tags["n"] == payload["n"]
+    assert store.search(_unit(24), top_k=1)[0][2] == {"n": 24}
+
+
+def test_other_instance_compaction_is_picked_up_by_search(tmp_path):
+    reader = _open(tmp_path)
+    writer = _open(tmp_path, max_entries=10)
+    for index in range(5):
+        writer.add(_unit(index), payload={"n": index}, tags={"n": index})
+    assert reader.search(_unit(0), top_k=1)[0][2] == {"n": 0}
+
+    # writer가 정리하면서 reader가 캐시해 둔 앞쪽 행이 사라짐
+    for index in range(5, 30):
+        writer.add(_unit(index), payload={"n": index}, tags={"n": index})
+
+    for index in range(22, 30):
+        score, tags, payload = reader.search_payloads(_unit(index), top_k=1)[0]
+        assert tags["n"] == payload["n"] == index
+    assert all(tags["n"] >= 20 for _, _, tags in reader.search(_unit(0), top_k=10))
+
+
+def test_concurrent_writers_never_mismatch_vectors_and_payloads(tmp_path):
+    _open(tmp_path)
+    errors = []
+
+    def write(worker: int) -> None:
+        try:
+            store = _open(tmp_path, max_entries=40)
+            for step in range(30):
+                index = worker * 100 + step
+                store.add(_unit(index), payload={"n": index}, tags={"n": index})
+        except Exception as exc:  # noqa: BLE001 - 스레드 예외를 본 테스트로 전달
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+    store = _open(tmp_path)
+    assert 0 < len(store) <= 40
+    survivors = store.search_payloads(_unit(0), top_k=40, candidates=40)
+    assert len(survivors) == len(store)
+    for _, tags, payload in survivors:
+        assert tags["n"] == payload["n"]
+        # 각 항목의 벡터로 검색하면 자기 payload가 나와야 함
+        assert store.search_payloads(_unit(tags["n"]), top_k=1)[0][2] == payload
+
+
+def test_rebuild_replaces_all_entries(tmp_path):
+    store = _open(tmp_path)
+    store.add(_unit(1), payload={"n": 1})
+    store.rebuild((_unit(index), {"n": index}, {"n": index}) for index in range(100, 103))
+
+    assert len(store) == 3
+    assert store.search_payloads(_unit(101), top_k=1)[0][2] == {"n": 101}
+
+
+def test_hashing_embedder_scores_similar_sentences_higher():
+    embedder = HashingEmbedder(dim=256)
+    base = embedder.embed("산책할 때 다른 강아지를 보면 짖어요")
+    similar = embedder.embed("산책 중 다른 강아지를 보면 심하게 짖습니다")
+    different = embedder.embed("혼자 있으면 배변 실수를 해요")
+
+    assert float(base @ similar) > float(base @ different)
+    assert float(np.linalg.norm(embedder.embed(""))) == 0.0
+
+
+def test_search_skips_rescan_when_nothing_changed(tmp_path):
+    store = _open(tmp_path)
+    store.add(_unit(1), payload={"n": 1})
+    generation = store._generation
+
+    store.search(_unit(1))
+    assert store._generation == generation
+
+    _open(tmp_path).add(_unit(2), payload={"n": 2})
+    assert store.search(_unit(2), top_k=1)[0][2] == {}
+    assert store._generation == generation + 1 and len(store) == 2
+
+
+def test_search_payloads_under_10ms_at_30k_entries(tmp_path):
+    result = benchmark_vector_search(tmp_path, entries=30000, dim=256, iterations=40)
+
+    assert result["entries"] >= 30000
+    assert result["median_ms"] < 10.0
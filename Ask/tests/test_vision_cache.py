@@ -0,0 +1,156 @@
+"""
+파일명: test_vision_cache.py
+목적: Vision 결과 캐시 키(SHA-256 / dHash)와 run_vision_stage의 캐시·선행 분석 재사용 검증
+"""
+
+import asyncio
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.ai import gpt4_vision
+from src.utils.cache import TieredCache
+
+
+def _jpeg(image: Image.Image, size=None, quality: int = 90) -> bytes:
+    if size is not None:
+        image = image.resize(size)
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def _photo() -> Image.Image:
+    image = Image.new("RGB", (320, 240), "white")
+    draw = ImageDraw.Draw(image)
+    for index in range(8):
+        draw.rectangle((index * 40, (index % 3) * 60, index * 40 + 25, 200), fill=(30 * index, 90, 200 - 20 * index))
+    draw.ellipse((100, 40, 220, 160), fill="black")
+    return image
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = TieredCache(namespace="vision-test", max_entries=32, disk=False)
+    monkeypatch.setattr(gpt4_vision, "_vision_cache", cache)
+    monkeypatch.setattr(gpt4_vision, "_vision_tasks", {})
+    return cache
+
+
+def test_uniform_images_get_no_perceptual_key():
+    white = _jpeg(Image.new("RGB", (200, 200), "white"))
+    gray = _jpeg(Image.new("RGB", (300, 300), (128, 128, 128)))
+
+    assert gpt4_vision.compute_perceptual_hash(white) == "0000000000000000"
+    assert [key.split(":")[0] for key in gpt4_vision._vision_cache_keys(white)] == ["sha256"]
+    assert [key.split(":")[0] for key in gpt4_vision._vision_cache_keys(gray)] == ["sha256"]
+
+
+def test_reencoded_photo_shares_perceptual_key():
+    original = _jpeg(_photo())
+    reencoded = _jpeg(_photo(), quality=50)
+
+    original_keys = gpt4_vision._vision_cache_keys(original)
+    reencoded_keys = gpt4_vision._vision_cache_keys(reencoded)
+    assert original_keys[0] != reencoded_keys[0]
+    assert original_keys[1].startswith("dhash:")
+    assert original_keys[1] == reencoded_keys[1]
+
+
+def test_uniform_images_do_not_share_cached_results(memory_cache):
+    white = _jpeg(Image.new("RGB", (200, 200), "white"))
+    black = _jpeg(Image.new("RGB", (200, 200), "black"))
+    gpt4_vision.store_vision_result(white, {"breed_analysis": "흰 배경"})
+
+    assert gpt4_vision.lookup_cached_vision(black) == (None, None)
+    assert gpt4_vision.lookup_cached_vision(white)[1] == "memory"
+
+
+@pytest.mark.asyncio
+async def test_vision_stage_caches_result_and_reuses_it(memory_cache, monkeypatch):
+    calls = []
+
+    async def fake_analyze(image_bytes, max_retries=2, timeout=None):
+        calls.append(timeout)
+        await asyncio.sleep(0.05)
+        return {"breed_analysis": "말티즈"}
+
+    monkeypatch.setattr(gpt4_vision, "analyze_dog_image_with_gpt4", fake_analyze)
+    photo = _jpeg(_photo())
+
+    assert await gpt4_vision.run_vision_stage(photo, timeout=1.0) == {"breed_analysis": "말티즈"}
+    # 캐시 저장은 루프 밖 스레드에서 진행됨
+    await asyncio.gather(*gpt4_vision._cache_writes)
+
+    assert await gpt4_vision.run_vision_stage(photo, timeout=1.0) == {"breed_analysis": "말티즈"}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_task_is_cancelled_after_hard_cap(memory_cache, monkeypatch):
+    cancelled = asyncio.Event()
+
+    async def hung_analyze(image_bytes, max_retries=2, timeout=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(gpt4_vision, "analyze_dog_image_with_gpt4", hung_analyze)
+    monkeypatch.setattr(gpt4_vision.settings, "VISION_LATE_COMPLETION_SECONDS", 0.1)
+    monkeypatch.setattr(gpt4_vision.settings, "VISION_HARD_CAP_GRACE_SECONDS", 0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await gpt4_vision.run_vision_stage(_jpeg(_photo()), timeout=0.05)
+    # 호출부는 떠났지만 shield된 Task는 hard cap(0.2초)까지 살아 있다가 취소됨
+    assert not cancelled.is_set()
+    await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_is_deduplicated_and_reused_by_vision_stage(memory_cache, monkeypatch):
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_analyze(image_bytes, max_retries=2, timeout=None):
+        calls.append(timeout)
+        await release.wait()
+        return {"breed_analysis": "푸들"}
+
+    monkeypatch.setattr(gpt4_vision, "analyze_dog_image_with_gpt4", fake_analyze)
+    photo = _jpeg(_photo())
+
+    assert not gpt4_vision.has_vision_prefetch(photo)
+    await gpt4_vision.prefetch_vision_analysis(photo)
+    await gpt4_vision.prefetch_vision_analysis(photo)
+    await asyncio.sleep(0)
+    assert gpt4_vision.has_vision_prefetch(photo)
+    assert len(calls) == 1
+
+    stage = asyncio.create_task(gpt4_vision.run_vision_stage(photo, timeout=1.0))
+    await asyncio.sleep(0.05)
+    release.set()
+    assert await stage == {"breed_analysis": "푸들"}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_is_not_reused(memory_cache, monkeypatch):
+    calls = []
+
+    async def failing_analyze(image_bytes, max_retries=2, timeout=None):
+        calls.append(timeout)
+        raise RuntimeError("vision down")
+
+    monkeypatch.setattr(gpt4_vision, "analyze_dog_image_with_gpt4", failing_analyze)
+    photo = _jpeg(_photo())
+
+    await gpt4_vision.prefetch_vision_analysis(photo)
+    await asyncio.sleep(0.01)
+    assert not gpt4_vision.has_vision_prefetch(photo)
+
+    await gpt4_vision.prefetch_vision_analysis(photo)
+    await asyncio.sleep(0.01)
+    assert len(calls) == 2
@@ -0,0 +1,94 @@
+"""
+파일명: test_worker_pool.py
+목적: 프로세스 워커 풀의 결과/예외/콜백 전달과 워커가 죽었을 때의 실패 처리·재시작 검증
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from src.utils import worker_pool
+from src.utils.worker_pool import WorkerPool
+
+
+# 워커 프로세스에서 import해 실행하는 작업 (모듈 수준 async 함수)
+
+async def add(left, right):
+    await asyncio.sleep(0)
+    return left + right
+
+
+async def fail(message):
+    raise ValueError(message)
+
+
+async def unpicklable_result():
+    return threading.Lock()
+
+
+async def stream(count, on_partial=None):
+    for index in range(count):
+        on_partial({"index": index})
+    return count
+
+
+async def crash():
+    os._exit(3)
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(processes=1, max_inflight=4)
+    yield pool
+    pool.shutdown()
+
+
+def test_results_errors_and_callbacks_reach_parent(pool):
+    assert pool.submit(add, 2, right=3).result(timeout=30) == 5
+
+    with pytest.raises(ValueError, match="bad input"):
+        pool.submit(fail, "bad input").result(timeout=10)
+    with pytest.raises(TypeError, match="pickle"):
+        pool.submit(unpicklable_result).result(timeout=10)
+
+    events = []
+    assert pool.submit(stream, 3, callbacks={"on_partial": events.append}).result(timeout=10) == 3
+    assert events == [{"index": 0}, {"index": 1}, {"index": 2}]
+
+
+def test_submit_rejects_unpicklable_arguments(pool):
+    with pytest.raises(Exception):
+        pool.submit(add, threading.Lock(), 1)
+
+
+def test_dead_worker_fails_its_task_and_is_restarted(pool):
+    assert pool.submit(add, 1, 1).result(timeout=30) == 2
+
+    with pytest.raises(RuntimeError, match="종료되었습니다"):
+        pool.submit(crash).result(timeout=10)
+
+    assert pool.available
+    assert pool.submit(add, 2, 2).result(timeout=30) == 4
+
+
+def test_pool_becomes_unavailable_when_restart_budget_is_spent(monkeypatch, pool):
+    monkeypatch.setattr(worker_pool, "_MAX_RESTARTS_PER_WORKER", 0)
+    assert pool.submit(add, 1, 1).result(timeout=30) == 2
+
+    with pytest.raises(RuntimeError):
+        pool.submit(crash).result(timeout=10)
+
+    assert not pool.available
+    with pytest.raises(RuntimeError, match="사용할 수 없습니다"):
+        pool.submit(add, 1, 1)
+
+
+def test_shutdown_fails_unfinished_tasks():
+    pool = WorkerPool(processes=1)
+    pool.submit(add, 1, 1).result(timeout=30)
+    pool.shutdown(timeout=5)
+    assert not pool.available
+    with pytest.raises(RuntimeError):
+        pool.submit(add, 1, 1)